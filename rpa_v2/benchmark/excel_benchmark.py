@@ -0,0 +1,128 @@
+"""Compara a leitura das planilhas de entrada: acesso por célula x pandas x src/utils/planilha.
+
+    python -m benchmark.excel_benchmark                 # 10.000 linhas, 3 abas
+    python -m benchmark.excel_benchmark --linhas 50000 --abas 5
+
+Gera uma planilha temporária no formato das de macroscopia/conclusão (código, máscara,
+responsável + colunas extras que os módulos não usam) e mede cada estratégia lendo
+todas as abas e as mesmas 3 colunas.
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+
+from openpyxl import Workbook, load_workbook
+
+from src.utils.planilha import ler_abas, valores_unicos
+
+CABECALHO = ["Código", "Máscara", "Responsável", "Data", "Observação", "Convênio", "Valor", "Situação"]
+COLUNAS = {
+    "codigo": ["codigo", "código", "cod"],
+    "mascara": ["mascara", "máscara", "mask"],
+    "responsavel": ["responsavel", "responsável", "resp"],
+}
+
+
+def gerar_planilha(caminho, linhas, abas):
+    workbook = Workbook(write_only=True)
+    for numero_aba in range(abas):
+        sheet = workbook.create_sheet(f"Aba{numero_aba + 1}")
+        sheet.append(CABECALHO)
+        for i in range(linhas):
+            sheet.append([
+                f"AP{numero_aba}{i:06d}", f"M{i % 40}" if i % 7 else None, f"RESP{i % 5}",
+                "01/01/2025", "texto livre " * 3, "UNIMED", i * 1.5, "pendente",
+            ])
+    workbook.save(caminho)
+
+
+def por_celula(caminho):
+    """Como os módulos faziam: load_workbook completo e sheet[f'A{row}'] por célula."""
+    workbook = load_workbook(caminho)
+    total = {}
+    for sheet in workbook.worksheets:
+        registros = []
+        for row in range(2, sheet.max_row + 1):
+            registros.append({
+                "codigo": sheet[f"A{row}"].value,
+                "mascara": sheet[f"B{row}"].value,
+                "responsavel": sheet[f"C{row}"].value,
+            })
+        total[sheet.title] = registros
+    workbook.close()
+    return total
+
+
+def com_pandas(caminho):
+    """pd.read_excel por aba + iterrows, como em get_unique_exames_multiplas_abas."""
+    import pandas as pd
+
+    total = {}
+    for aba in pd.ExcelFile(caminho).sheet_names:
+        df = pd.read_excel(caminho, sheet_name=aba)
+        total[aba] = [
+            {"codigo": linha["Código"], "mascara": linha["Máscara"], "responsavel": linha["Responsável"]}
+            for _, linha in df.iterrows()
+        ]
+    return total
+
+
+def com_leitor(caminho):
+    return ler_abas(caminho, COLUNAS, obrigatorias=("codigo",))
+
+
+def medir(funcao, caminho, repeticoes):
+    melhor = None
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(caminho)
+        duracao = time.perf_counter() - inicio
+        melhor = duracao if melhor is None else min(melhor, duracao)
+    return melhor, resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de leitura das planilhas de entrada")
+    parser.add_argument("--linhas", type=int, default=10000, help="linhas por aba")
+    parser.add_argument("--abas", type=int, default=3)
+    parser.add_argument("--repeticoes", type=int, default=3, help="vale o melhor tempo")
+    args = parser.parse_args(argv)
+
+    estrategias = [("por célula (load_workbook)", por_celula), ("src/utils/planilha", com_leitor)]
+    if importlib.util.find_spec("pandas"):
+        estrategias.insert(1, ("pandas read_excel + iterrows", com_pandas))
+    else:
+        print("pandas não instalado - estratégia pandas ignorada")
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "benchmark.xlsx")
+        print(f"Gerando planilha: {args.abas} aba(s) x {args.linhas} linhas...")
+        gerar_planilha(caminho, args.linhas, args.abas)
+
+        referencia = None
+        print(f"\n{'estratégia':<32}{'tempo':>10}{'linhas/s':>12}{'x':>7}")
+        for nome, funcao in estrategias:
+            duracao, resultado = medir(funcao, caminho, args.repeticoes)
+            linhas = sum(len(registros) for registros in resultado.values())
+            referencia = referencia or duracao
+            print(f"{nome:<32}{duracao:>9.2f}s{linhas / duracao:>12.0f}{referencia / duracao:>6.1f}x")
+
+        # Conferência: o leitor precisa trazer os mesmos valores que o acesso por célula
+        esperado = por_celula(caminho)
+        obtido = com_leitor(caminho)
+        for aba in esperado:
+            campos = list(COLUNAS)
+            if [[r[c] for c in campos] for r in esperado[aba]] != [[r[c] for c in campos] for r in obtido[aba]] \
+                    or valores_unicos(esperado[aba], "codigo") != valores_unicos(obtido[aba], "codigo"):
+                print(f"❌ Divergência na aba {aba}")
+                return 1
+    print("\n✅ Mesmos registros em todas as estratégias")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
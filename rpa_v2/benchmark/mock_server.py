@@ -0,0 +1,386 @@
+"""Servidor local que imita as telas do Pathoweb e do portal da Unimed usadas pelos módulos.
+
+Reproduz apenas os contratos de DOM que os módulos usam (ids, classes, data-url).
+Nada de dado real: os exames/guias são inventados a partir do que é pesquisado.
+
+    python -m benchmark.mock_server --porta 8765 --latencia 150 --spinner 400
+
+Pathoweb:  http://127.0.0.1:8765/login/auth
+Unimed:    http://127.0.0.1:8765/prestador/
+"""
+import argparse
+import html
+import threading
+import time
+import uuid
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+COOKIE_SESSAO = "JSESSIONID"
+
+# PDF mínimo válido (uma página em branco) servido pelo renderReport
+PDF_VAZIO = (
+    b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+    b"2 0 obj<</Type/Pages/Kids[3 0 R]/Count 1>>endobj\n"
+    b"3 0 obj<</Type/Page/Parent 2 0 R/MediaBox[0 0 595 842]>>endobj\n"
+    b"xref\n0 4\n0000000000 65535 f \n0000000009 00000 n \n0000000052 00000 n \n0000000101 00000 n \n"
+    b"trailer<</Size 4/Root 1 0 R>>\nstartxref\n164\n%%EOF\n"
+)
+
+_SCRIPT_PATHOWEB = """
+<script>
+var SPINNER_MS = %(spinner)d;
+var pendentes = 0;
+function mostrarSpinner() { pendentes++; document.getElementById('spinner').style.display = 'block'; }
+function esconderSpinner() {
+    setTimeout(function() {
+        pendentes = Math.max(0, pendentes - 1);
+        if (!pendentes) { document.getElementById('spinner').style.display = 'none'; }
+    }, SPINNER_MS);
+}
+function carregar(url, dados, alvo) {
+    mostrarSpinner();
+    return fetch(url, {method: 'POST', body: dados || new URLSearchParams(),
+                       headers: {'X-Requested-With': 'XMLHttpRequest'}})
+        .then(function(r) { return r.text(); })
+        .then(function(texto) { if (alvo) { document.querySelector(alvo).innerHTML = texto; } })
+        .finally(esconderSpinner);
+}
+function selecionados() {
+    var dados = new URLSearchParams();
+    document.querySelectorAll("input[type='checkbox'][name]:checked").forEach(function(el) {
+        dados.append(el.name, el.value);
+    });
+    return dados;
+}
+document.addEventListener('click', function(ev) {
+    var toggle = ev.target.closest('a.toggleMaisDeUm');
+    if (toggle) {
+        ev.preventDefault();
+        var menu = toggle.parentElement.querySelector('.dropdown-menu');
+        menu.style.display = menu.style.display === 'block' ? 'none' : 'block';
+        return;
+    }
+    var link = ev.target.closest('a.setupAjax, a.chamadaAjax');
+    if (link) {
+        ev.preventDefault();
+        var form = link.closest('form');
+        var dados = form ? new URLSearchParams(new FormData(form)) : selecionados();
+        var menu = link.closest('.dropdown-menu');
+        if (menu) { menu.style.display = 'none'; }
+        carregar(link.getAttribute('data-url'), dados, link.getAttribute('data-target') || '#conteudo');
+        return;
+    }
+    if (ev.target.id === 'pesquisaFaturamento') {
+        ev.preventDefault();
+        var dados = new URLSearchParams();
+        ['numeroExame', 'numeroGuia'].forEach(function(id) {
+            var campo = document.getElementById(id);
+            if (campo) { dados.append(id, campo.value); }
+        });
+        carregar('/moduloFaturamento/pesquisarPreFaturamento', dados, '#tabelaPreFaturamentoTbody');
+    }
+});
+document.addEventListener('change', function(ev) {
+    if (ev.target.id === 'checkTodosPreFaturar') {
+        document.querySelectorAll("#tabelaPreFaturamentoTbody input[type='checkbox']").forEach(function(el) {
+            el.checked = ev.target.checked;
+        });
+        mostrarSpinner();
+        esconderSpinner();
+    }
+});
+document.addEventListener('keydown', function(ev) {
+    if (ev.target.id === 'inputSearchCodBarra' && ev.key === 'Enter') {
+        ev.preventDefault();
+        var dados = new URLSearchParams({codigo: ev.target.value});
+        carregar('/moduloExame/abrirExame', dados, '#conteudo');
+    }
+});
+</script>
+"""
+
+_SPINNER = """
+<div id="spinner" style="display:none; position:fixed; inset:0; background:rgba(0,0,0,.3)">
+  <div class="modal-body">Carregando...</div>
+</div>
+"""
+
+_PRE_FATURAMENTO = """
+<div class="row">
+  <input id="numeroExame" name="numeroExame" type="text">
+  <input id="numeroGuia" name="numeroGuia" type="text">
+  <button id="pesquisaFaturamento" class="btn btn-primary" type="button">Pesquisar</button>
+  <div class="btn-group">
+    <a href="#" class="btn toggleMaisDeUm">Ações</a>
+    <div class="dropdown-menu" style="display:none">
+      <a href="#" class="chamadaAjax setupAjax" data-target="#tabelaPreFaturamentoTbody"
+         data-url="/moduloFaturamento/alterarStatus?statusConferido=O">On-line</a>
+    </div>
+  </div>
+</div>
+<table class="table">
+  <thead><tr><th><input type="checkbox" id="checkTodosPreFaturar"></th><th>Status</th><th>Exame</th></tr></thead>
+  <tbody id="tabelaPreFaturamentoTbody"></tbody>
+</table>
+"""
+
+
+class EstadoMock:
+    """Estado em memória compartilhado entre as requisições."""
+
+    def __init__(self, latencia=0.1, spinner=0.3, liberar_apos=1):
+        self.latencia = latencia
+        self.spinner = spinner
+        self.liberar_apos = liberar_apos
+        self.sessoes = set()
+        self.status_exames = {}
+        self.consultas_guia = {}
+        self.contadores = {}
+        self._lock = threading.Lock()
+
+    def contar(self, chave):
+        with self._lock:
+            self.contadores[chave] = self.contadores.get(chave, 0) + 1
+
+    def alterar_status(self, exames, status):
+        with self._lock:
+            for exame in exames:
+                self.status_exames[exame] = status
+
+    def status(self, exame):
+        with self._lock:
+            return self.status_exames.get(exame, "Pendente")
+
+    def consultar_guia(self, guia):
+        """A guia fica 'Em análise' até ser consultada `liberar_apos` vezes."""
+        with self._lock:
+            self.consultas_guia[guia] = self.consultas_guia.get(guia, 0) + 1
+            return "Liberada" if self.consultas_guia[guia] >= self.liberar_apos else "Em análise"
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    estado = EstadoMock()
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    # --- utilitários ---
+
+    def _sessao(self):
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        valor = cookie.get(COOKIE_SESSAO)
+        return valor.value if valor and valor.value in self.estado.sessoes else None
+
+    def _dados(self):
+        tamanho = int(self.headers.get("Content-Length") or 0)
+        corpo = self.rfile.read(tamanho).decode("utf-8") if tamanho else ""
+        dados = parse_qs(urlparse(self.path).query)
+        for chave, valores in parse_qs(corpo).items():
+            dados.setdefault(chave, []).extend(valores)
+        return dados
+
+    def _responder(self, corpo, status=200, tipo="text/html; charset=utf-8", headers=None):
+        if isinstance(corpo, str):
+            corpo = corpo.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(corpo)))
+        for chave, valor in (headers or {}).items():
+            self.send_header(chave, valor)
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _redirecionar(self, destino, headers=None):
+        headers = dict(headers or {})
+        headers["Location"] = destino
+        self._responder(b"", status=302, headers=headers)
+
+    def _pagina(self, titulo, corpo, script=True):
+        extra = _SCRIPT_PATHOWEB % {"spinner": int(self.estado.spinner * 1000)} if script else ""
+        return (f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{titulo}</title></head>"
+                f"<body>{_SPINNER if script else ''}{corpo}{extra}</body></html>")
+
+    def _latencia(self):
+        if self.estado.latencia:
+            time.sleep(self.estado.latencia)
+
+    # --- roteamento ---
+
+    def do_GET(self):
+        self._rotear("GET")
+
+    def do_POST(self):
+        self._rotear("POST")
+
+    def _rotear(self, metodo):
+        caminho = urlparse(self.path).path
+        self.estado.contar(caminho)
+
+        if caminho.startswith("/prestador"):
+            return self._unimed(caminho, metodo)
+        if caminho == "/renderReport":
+            self._latencia()
+            return self._responder(PDF_VAZIO, tipo="application/pdf")
+        if caminho == "/login/auth":
+            return self._responder(self._pagina("Login", """
+                <form method="post" action="/login/authenticate">
+                  <input id="username" name="j_username"><input id="password" name="j_password" type="password">
+                  <button type="submit">Entrar</button>
+                </form>""", script=False))
+        if caminho == "/login/authenticate":
+            self._dados()
+            sessao = uuid.uuid4().hex
+            self.estado.sessoes.add(sessao)
+            return self._redirecionar("/", {"Set-Cookie": f"{COOKIE_SESSAO}={sessao}; Path=/"})
+
+        if not self._sessao():
+            return self._redirecionar("/login/auth")
+        self._latencia()
+        self._pathoweb(caminho)
+
+    def _pathoweb(self, caminho):
+        if caminho == "/":
+            return self._responder(self._pagina("Pathoweb", """
+                <a href="/site/trocarModulo?modulo=1">Exames</a>
+                <a href="/site/trocarModulo?modulo=2">Faturamento</a>"""))
+        if caminho == "/site/trocarModulo":
+            modulo = parse_qs(urlparse(self.path).query).get("modulo", ["1"])[0]
+            return self._redirecionar("/moduloFaturamento/index" if modulo == "2" else "/moduloExame/index")
+
+        if caminho == "/moduloFaturamento/index":
+            return self._responder(self._pagina("Faturamento", """
+                <a href="#" class="setupAjax" data-url="/moduloFaturamento/preFaturamento">Preparar exames para fatura</a>
+                <div id="conteudo"></div>"""))
+        if caminho == "/moduloFaturamento/preFaturamento":
+            return self._responder(_PRE_FATURAMENTO)
+        if caminho == "/moduloFaturamento/pesquisarPreFaturamento":
+            dados = self._dados()
+            codigo = (dados.get("numeroExame", [""])[0] or dados.get("numeroGuia", [""])[0]).strip()
+            return self._responder(self._linhas([codigo] if codigo and not codigo.upper().startswith("X") else []))
+        if caminho == "/moduloFaturamento/alterarStatus":
+            dados = self._dados()
+            exames = dados.get("exameId", [])
+            if not exames:
+                return self._responder('<div class="alert alert-danger">Nenhum exame selecionado</div>', status=400)
+            self.estado.alterar_status(exames, "On-line" if dados.get("statusConferido") == ["O"] else "Pendente")
+            return self._responder(self._linhas(exames))
+
+        if caminho == "/moduloExame/index":
+            return self._responder(self._pagina("Exames", """
+                <input id="inputSearchCodBarra" type="text" autofocus>
+                <div id="conteudo"></div>"""))
+        if caminho == "/moduloExame/abrirExame":
+            codigo = html.escape(self._dados().get("codigo", [""])[0])
+            return self._responder(f"""
+                <form id="formExame">
+                  <input type="hidden" name="codigo" value="{codigo}">
+                  <h4>Exame {codigo}</h4>
+                  <a href="#" class="btn btn-sm btn-success chamadaAjax noValidate setupAjax" id="btnSaveAjaxNovalidate"
+                     data-url="/moduloExame/saveExameAjax" data-target="#mensagem">Salvar</a>
+                  <a href="/moduloExame/index" id="fecharExameBarraFerramenta">Fechar exame</a>
+                  <div id="mensagem"></div>
+                </form>""")
+        if caminho in ("/moduloExame/saveExameAjax", "/paciente/saveAjax"):
+            self._dados()
+            return self._responder('{"sucesso": true}', tipo="application/json")
+
+        self._responder("<h1>404</h1>", status=404)
+
+    def _linhas(self, exames):
+        linhas = []
+        for exame in exames:
+            codigo = html.escape(exame)
+            linhas.append(
+                f"<tr><td><input type='checkbox' name='exameId' value='{codigo}'></td>"
+                f"<td>{self.estado.status(exame)}</td><td>{codigo}</td></tr>"
+            )
+        return "".join(linhas)
+
+    def _unimed(self, caminho, metodo):
+        self._latencia()
+        if caminho in ("/prestador", "/prestador/"):
+            if metodo == "POST":
+                self._dados()
+                return self._responder(self._pagina("Unimed", "<h3>Bem-vindo</h3>", script=False))
+            return self._responder(self._pagina("Unimed", """
+                <form method="post"><input id="operador" name="operador"><input id="senha" name="senha" type="password">
+                <button id="entrar" type="submit">Entrar</button></form>""", script=False))
+
+        if caminho == "/prestador/Rastreabilidade.php":
+            dados = self._dados() if metodo == "POST" else {}
+            guia = html.escape(dados.get("numeroGuia", [""])[0])
+            resultado = ""
+            if guia:
+                status = self.estado.consultar_guia(guia)
+                resultado = f"""
+                <input id="status" class="form-control" value="{status}">
+                <div id="procedimentos">
+                  <div class="row"><div class="col-md-3">Código</div><div class="col-md-3">Descrição</div>
+                    <div class="col-md-3">Qtd. solicitada</div><div class="col-md-3">Qtd. autorizada</div></div>
+                  <div class="row">
+                    <div class="col-md-3"><input class="form-control" value="40601110"></div>
+                    <div class="col-md-3"><input class="form-control" value="Exame anatomopatológico"></div>
+                    <div class="col-md-3"><input class="form-control" value="1"></div>
+                    <div class="col-md-3"><input class="form-control" value="1"></div>
+                  </div>
+                </div>"""
+            return self._responder(self._pagina("Rastreabilidade", f"""
+                <form method="post"><input id="numeroGuia" name="numeroGuia" value="{guia}">
+                <button id="consultar" type="submit">Consultar</button></form>{resultado}""", script=False))
+
+        self._responder("<h1>404</h1>", status=404)
+
+
+class MockServer:
+    """Sobe o servidor em uma thread; use como context manager nos benchmarks."""
+
+    def __init__(self, porta=0, latencia=0.1, spinner=0.3, liberar_apos=1):
+        self.estado = EstadoMock(latencia=latencia, spinner=spinner, liberar_apos=liberar_apos)
+        handler = type("MockHandlerConfigurado", (MockHandler,), {"estado": self.estado})
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", porta), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.parar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor local que imita Pathoweb/Unimed")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--latencia", type=int, default=100, help="atraso de cada resposta (ms)")
+    parser.add_argument("--spinner", type=int, default=300, help="tempo que o #spinner fica visível (ms)")
+    parser.add_argument("--liberar-apos", type=int, default=1, help="consultas até a guia ficar 'Liberada'")
+    args = parser.parse_args(argv)
+
+    servidor = MockServer(args.porta, args.latencia / 1000, args.spinner / 1000, args.liberar_apos)
+    print(f"Mock Pathoweb/Unimed em {servidor.url} (Ctrl+C para parar)")
+    try:
+        servidor.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Executa os módulos reais contra o servidor local (benchmark/mock_server.py) e mede itens/minuto.
+
+    python -m benchmark.run_benchmark --itens 30 --workers 2
+    python -m benchmark.run_benchmark --saida bench.json
+    python -m benchmark.run_benchmark --baseline bench.json --tolerancia 0.15
+
+Com `--baseline`, termina com código 1 se algum cenário ficar mais lento que a
+referência além da tolerância - use antes de gerar uma versão.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from tkinter import messagebox
+
+from benchmark.mock_server import MockServer
+
+CENARIOS = ("preparacao_lote", "status_unimed")
+
+
+def _configurar_log(verbose):
+    from src.core.logger import set_logger_callback
+
+    def callback(mensagem, nivel):
+        if verbose or nivel in ("WARNING", "ERROR"):
+            print(f"[{nivel}] {mensagem}")
+
+    set_logger_callback(callback)
+
+
+def _silenciar_dialogos():
+    # Os módulos avisam o fim da execução com messagebox; no benchmark não há ninguém para clicar
+    for nome in ("showinfo", "showwarning", "showerror"):
+        setattr(messagebox, nome, lambda *args, **kwargs: None)
+
+
+def cenario_preparacao_lote(servidor, itens, workers, headless, pasta):
+    import pandas as pd
+    from src.modules.lote.preparacao_lote import PreparacaoLoteModule
+
+    excel = os.path.join(pasta, "preparacao_lote.xlsx")
+    exames = [f"AP{100000 + i}" for i in range(itens)]
+    pd.DataFrame({"Exame": exames}).to_excel(excel, index=False)
+
+    inicio = time.perf_counter()
+    PreparacaoLoteModule().run({
+        "username": "benchmark",
+        "password": "benchmark",
+        "excel_file": excel,
+        "modo_busca": "exame",
+        "cancel_flag": threading.Event(),
+        "gera_xml_tiss": "",
+        "headless_mode": headless,
+        "num_workers": workers,
+    })
+    duracao = time.perf_counter() - inicio
+    concluidos = sum(1 for exame in exames if servidor.estado.status(exame) == "On-line")
+    return duracao, concluidos
+
+
+def cenario_status_unimed(servidor, itens, workers, headless, pasta):
+    from selenium.webdriver.support.ui import WebDriverWait
+    from src.core.browser_factory import BrowserFactory
+    from src.modules.guias.lancamento_guia_unimed import LancamentoGuiaUnimedModule
+
+    modulo = LancamentoGuiaUnimedModule()
+    driver = BrowserFactory.acquire_chrome(headless=headless)
+    try:
+        wait = WebDriverWait(driver, 15)
+        inicio = time.perf_counter()
+        concluidos = 0
+        for i in range(itens):
+            resultado = modulo.consultar_status_guia(driver, wait, str(900000 + i))
+            concluidos += 1 if resultado.get("sucesso") else 0
+        duracao = time.perf_counter() - inicio
+    finally:
+        BrowserFactory.release_chrome(driver)
+    return duracao, concluidos
+
+
+def comparar_com_baseline(resultados, caminho, tolerancia):
+    with open(caminho, "r", encoding="utf-8") as f:
+        referencia = {r["cenario"]: r for r in json.load(f)["resultados"]}
+
+    regressoes = []
+    for resultado in resultados:
+        base = referencia.get(resultado["cenario"])
+        if not base:
+            continue
+        minimo = base["itens_por_minuto"] * (1 - tolerancia)
+        variacao = resultado["itens_por_minuto"] / base["itens_por_minuto"] - 1 if base["itens_por_minuto"] else 0
+        print(f"  {resultado['cenario']:<18} {variacao:+.1%} em relação à referência")
+        if resultado["itens_por_minuto"] < minimo:
+            regressoes.append(resultado["cenario"])
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos módulos contra o mock local do Pathoweb/Unimed")
+    parser.add_argument("--cenarios", nargs="+", choices=CENARIOS, default=list(CENARIOS))
+    parser.add_argument("--itens", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=1, help="navegadores paralelos (preparacao_lote)")
+    parser.add_argument("--latencia", type=int, default=100, help="atraso de cada resposta do mock (ms)")
+    parser.add_argument("--spinner", type=int, default=300, help="tempo do #spinner no mock (ms)")
+    parser.add_argument("--visivel", action="store_true", help="abre o Chrome visível")
+    parser.add_argument("--verbose", action="store_true", help="mostra todo o log dos módulos")
+    parser.add_argument("--saida", help="grava os resultados em JSON")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.15, help="queda aceitável de itens/min (0.15 = 15%%)")
+    args = parser.parse_args(argv)
+
+    _configurar_log(args.verbose)
+    _silenciar_dialogos()
+
+    with tempfile.TemporaryDirectory() as pasta, \
+            MockServer(latencia=args.latencia / 1000, spinner=args.spinner / 1000) as servidor:
+        os.environ["SYSTEM_URL"] = f"{servidor.url}/login/auth"
+        os.environ["UNIMED_URL"] = servidor.url
+
+        from src.core.session_manager import session_manager
+        session_manager.session_file = os.path.join(pasta, "pathoweb_session.json")
+
+        resultados = []
+        for nome in args.cenarios:
+            executar = globals()[f"cenario_{nome}"]
+            print(f"▶ {nome}: {args.itens} itens...")
+            duracao, concluidos = executar(servidor, args.itens, args.workers, not args.visivel, pasta)
+            resultados.append({
+                "cenario": nome,
+                "itens": args.itens,
+                "concluidos": concluidos,
+                "segundos": round(duracao, 2),
+                "itens_por_minuto": round(concluidos / duracao * 60, 1) if duracao else 0.0,
+            })
+
+    print()
+    print(f"{'cenário':<18}{'itens':>7}{'ok':>6}{'tempo':>10}{'itens/min':>12}")
+    for r in resultados:
+        print(f"{r['cenario']:<18}{r['itens']:>7}{r['concluidos']:>6}{r['segundos']:>9.1f}s{r['itens_por_minuto']:>12.1f}")
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump({
+                "data": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "parametros": {"itens": args.itens, "workers": args.workers,
+                               "latencia_ms": args.latencia, "spinner_ms": args.spinner},
+                "resultados": resultados,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"\nResultados gravados em {args.saida}")
+
+    codigo = 0
+    if any(r["concluidos"] < r["itens"] for r in resultados):
+        print("\n⚠️ Nem todos os itens foram concluídos - verifique o log (--verbose)")
+        codigo = 1
+    if args.baseline:
+        print(f"\nComparação com {args.baseline}:")
+        regressoes = comparar_com_baseline(resultados, args.baseline, args.tolerancia)
+        if regressoes:
+            print(f"❌ Regressão de throughput em: {', '.join(regressoes)}")
+            codigo = 1
+    return codigo
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+"""
+Sistema RPA - Clínica
+Execução de módulos pela linha de comando, sem a interface gráfica.
+
+    python cli.py --listar
+    python cli.py preparacao_lote --excel lote.xlsx --modo-busca exame --workers 2
+    python cli.py fatura_mensal --params fatura.json --log-file logs/fatura.log
+    python cli.py conclusao --excel conclusao.xlsx --retomar
+    python cli.py guia_unimed --excel guias.xlsx --enfileirar
+    python cli.py --fila
+
+Os avisos que os módulos mostrariam em janelas (messagebox) viram linhas no log.
+Códigos de saída: 0 sucesso, 1 o módulo informou erro, 2 parâmetros inválidos,
+3 exceção não tratada no módulo, 130 cancelado (Ctrl+C).
+"""
+
+import argparse
+import importlib
+import json
+import os
+import signal
+import sys
+import threading
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from dotenv import load_dotenv
+
+from src.core.fila_jobs import ExecutorFila, fila_jobs
+from src.core.logger import log_message, set_logger_callback
+from src.core.waits import ExecucaoCancelada, definir_cancelamento, log_resumo_esperas, resetar_estatisticas
+
+MODULES_FILE = 'modules.json'
+
+SAIDA_OK = 0
+SAIDA_ERRO_MODULO = 1
+SAIDA_PARAMETROS = 2
+SAIDA_EXCECAO = 3
+SAIDA_CANCELADO = 130
+
+
+class SaidaLog:
+    """Callback do log_message: escreve no stdout e, opcionalmente, em arquivo."""
+
+    def __init__(self, arquivo=None, quiet=False):
+        self.quiet = quiet
+        self._lock = threading.Lock()
+        self._arquivo = None
+        if arquivo:
+            pasta = os.path.dirname(os.path.abspath(arquivo))
+            os.makedirs(pasta, exist_ok=True)
+            self._arquivo = open(arquivo, "a", encoding="utf-8")
+
+    def __call__(self, message, level="INFO"):
+        linha = f"[{datetime.now():%Y-%m-%d %H:%M:%S}] [{level}] {message}"
+        with self._lock:
+            if not self.quiet or level in ("WARNING", "ERROR"):
+                print(linha, flush=True)
+            if self._arquivo:
+                self._arquivo.write(linha + "\n")
+                self._arquivo.flush()
+
+    def fechar(self):
+        if self._arquivo:
+            self._arquivo.close()
+
+
+class DialogosHeadless:
+    """Substitui as janelas do tkinter.messagebox por eventos no log.
+
+    Guarda os erros mostrados pelo módulo para definir o código de saída.
+    """
+
+    NIVEIS = {"showinfo": "INFO", "showwarning": "WARNING", "showerror": "ERROR"}
+
+    def __init__(self):
+        self.eventos = []
+
+    def instalar(self):
+        from tkinter import messagebox
+        for nome, nivel in self.NIVEIS.items():
+            setattr(messagebox, nome, self._dialogo(nivel))
+
+    def _dialogo(self, nivel):
+        def mostrar(title=None, message=None, **kwargs):
+            texto = str(message or "").replace("\n", " | ")
+            self.eventos.append((nivel, title, texto))
+            log_message(f"🪟 {title}: {texto}" if title else f"🪟 {texto}", nivel)
+            return "ok"
+        return mostrar
+
+    @property
+    def erros(self):
+        return [evento for evento in self.eventos if evento[0] == "ERROR"]
+
+
+def carregar_modulos():
+    with open(MODULES_FILE, 'r', encoding='utf-8') as f:
+        return {modulo["id"]: modulo for modulo in json.load(f)}
+
+
+def _valor(texto):
+    """Converte `--param chave=valor` para bool/int/float quando fizer sentido."""
+    minusculo = texto.lower()
+    if minusculo in ("true", "false"):
+        return minusculo == "true"
+    for tipo in (int, float):
+        try:
+            return tipo(texto)
+        except ValueError:
+            pass
+    return texto
+
+
+def montar_params(modulo, args):
+    """Monta o dict de params como a MainWindow faz. Levanta ValueError se faltar algo."""
+    params = {}
+    if args.params:
+        with open(args.params, 'r', encoding='utf-8') as f:
+            params.update(json.load(f))
+
+    params.setdefault("username", args.usuario or os.getenv("LOGIN_USER", ""))
+    params.setdefault("password", args.senha or os.getenv("LOGIN_PASS", ""))
+    params["headless_mode"] = False if args.visivel else params.get("headless_mode", True)
+    if not params["username"] or not params["password"]:
+        raise ValueError("Informe usuário e senha (--usuario/--senha, LOGIN_USER/LOGIN_PASS ou --params)")
+
+    if modulo.get("requires_excel"):
+        params["excel_file"] = args.excel or params.get("excel_file")
+        if not params["excel_file"] or not os.path.exists(params["excel_file"]):
+            raise ValueError("Arquivo Excel não encontrado (--excel)")
+        params["modo_busca"] = args.modo_busca or params.get("modo_busca", "exame")
+        params["retomar"] = args.retomar or params.get("retomar", False)
+    if modulo.get("requires_codificacao"):
+        params["codificacao_file"] = args.codificacao or params.get("codificacao_file")
+        if not params["codificacao_file"] or not os.path.exists(params["codificacao_file"]):
+            raise ValueError("Planilha de codificação não encontrada (--codificacao)")
+    if modulo.get("has_gera_xml_tiss"):
+        params["gera_xml_tiss"] = args.gera_xml_tiss or params.get("gera_xml_tiss", "nao")
+    if modulo.get("supports_parallel"):
+        params["num_workers"] = args.workers or params.get("num_workers", 1)
+    if modulo.get("requires_unimed_credentials"):
+        params.setdefault("unimed_user", args.unimed_usuario or os.getenv("UNIMED_USER", ""))
+        params.setdefault("unimed_pass", args.unimed_senha or os.getenv("UNIMED_PASS", ""))
+        if params.get("gera_xml_tiss", "sim") == "sim" and not (params["unimed_user"] and params["unimed_pass"]):
+            raise ValueError("Informe usuário e senha da Unimed (--unimed-usuario/--unimed-senha)")
+    if modulo.get("requires_hospital_credentials"):
+        params.setdefault("hospital_user", os.getenv("HOSPITAL_USER", ""))
+        params.setdefault("hospital_pass", os.getenv("HOSPITAL_PASS", ""))
+        if not params["hospital_user"] or not params["hospital_pass"]:
+            raise ValueError("Informe usuário e senha do Hospitalar (HOSPITAL_USER/HOSPITAL_PASS ou --params)")
+
+    for item in args.param or []:
+        chave, _, valor = item.partition("=")
+        params[chave.strip()] = _valor(valor.strip())
+    return params
+
+
+def instalar_cancelamento(cancel_flag, ao_cancelar=None):
+    """Ctrl+C/SIGTERM liga o cancel_flag; o segundo força a interrupção."""
+    def cancelar(signum, frame):
+        if cancel_flag.is_set():
+            raise KeyboardInterrupt
+        log_message("Cancelamento solicitado - interrompendo o item atual (repita para forçar)", "WARNING")
+        cancel_flag.set()
+        if ao_cancelar:
+            ao_cancelar()
+
+    definir_cancelamento(cancel_flag)
+    signal.signal(signal.SIGINT, cancelar)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, cancelar)
+
+
+def executar_fila(modulos, args):
+    """Executa os jobs pendentes da fila (src/core/fila_jobs.py) com as credenciais do .env/args."""
+    saida = SaidaLog(args.log_file, quiet=args.quiet)
+    set_logger_callback(saida)
+    DialogosHeadless().instalar()
+    credenciais = {
+        "username": args.usuario or os.getenv("LOGIN_USER", ""),
+        "password": args.senha or os.getenv("LOGIN_PASS", ""),
+        "unimed_user": args.unimed_usuario or os.getenv("UNIMED_USER", ""),
+        "unimed_pass": args.unimed_senha or os.getenv("UNIMED_PASS", ""),
+        "hospital_user": os.getenv("HOSPITAL_USER", ""),
+        "hospital_pass": os.getenv("HOSPITAL_PASS", ""),
+    }
+    cancel_flag = threading.Event()
+    executor = ExecutorFila(modulos, credenciais=lambda: credenciais, cancel_flag=cancel_flag)
+    instalar_cancelamento(cancel_flag, ao_cancelar=executor.parar)
+
+    executor.iniciar()
+    codigo = SAIDA_OK
+    try:
+        while executor.em_execucao:
+            # join com timeout: o Ctrl+C só é tratado na thread principal entre as esperas
+            executor.thread.join(0.5)
+    except KeyboardInterrupt:
+        log_message("Execução interrompida", "WARNING")
+        codigo = SAIDA_CANCELADO
+
+    if codigo == SAIDA_OK:
+        if cancel_flag.is_set():
+            codigo = SAIDA_CANCELADO
+        elif any(job["situacao"] == "erro" for job in fila_jobs.listar()
+                 if job["inicio"] and job["inicio"] >= executor.iniciada_em):
+            codigo = SAIDA_ERRO_MODULO
+    log_message(f"■ Fila finalizada (código {codigo})", "SUCCESS" if codigo == SAIDA_OK else "WARNING")
+    saida.fechar()
+    return codigo
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description="Executa um módulo do Sistema RPA sem interface gráfica")
+    parser.add_argument("modulo", nargs="?", help="id do módulo no modules.json")
+    parser.add_argument("--listar", action="store_true", help="lista os módulos disponíveis")
+    parser.add_argument("--params", help="arquivo JSON com o dict de parâmetros do módulo")
+    parser.add_argument("--param", action="append", metavar="CHAVE=VALOR", help="parâmetro extra (pode repetir)")
+    parser.add_argument("--usuario", help="usuário do Pathoweb (padrão: LOGIN_USER)")
+    parser.add_argument("--senha", help="senha do Pathoweb (padrão: LOGIN_PASS)")
+    parser.add_argument("--excel", help="planilha de entrada")
+    parser.add_argument("--modo-busca", choices=("exame", "guia"))
+    parser.add_argument("--retomar", action="store_true", help="pula os itens já concluídos com a mesma planilha")
+    parser.add_argument("--enfileirar", action="store_true", help="adiciona o módulo à fila em vez de executar")
+    parser.add_argument("--fila", action="store_true", help="executa os jobs pendentes da fila")
+    parser.add_argument("--codificacao", help="planilha de codificação")
+    parser.add_argument("--gera-xml-tiss", choices=("sim", "nao"))
+    parser.add_argument("--workers", type=int, help="navegadores paralelos")
+    parser.add_argument("--unimed-usuario", help="usuário da Unimed (padrão: UNIMED_USER)")
+    parser.add_argument("--unimed-senha", help="senha da Unimed (padrão: UNIMED_PASS)")
+    parser.add_argument("--visivel", action="store_true", help="abre o Chrome visível (padrão: headless)")
+    parser.add_argument("--log-file", help="também grava o log neste arquivo")
+    parser.add_argument("--quiet", action="store_true", help="no stdout, só avisos e erros")
+    return parser
+
+
+def main(argv=None):
+    load_dotenv()
+    args = criar_parser().parse_args(argv)
+
+    try:
+        modulos = carregar_modulos()
+    except Exception as e:
+        print(f"Erro ao carregar {MODULES_FILE}: {e}", file=sys.stderr)
+        return SAIDA_PARAMETROS
+
+    if args.fila:
+        return executar_fila(modulos, args)
+
+    if args.listar or not args.modulo:
+        for id_modulo, modulo in modulos.items():
+            print(f"{id_modulo:<40} {modulo.get('name', '')}")
+        return SAIDA_OK if args.listar else SAIDA_PARAMETROS
+
+    modulo = modulos.get(args.modulo)
+    if not modulo:
+        print(f"Módulo '{args.modulo}' não existe no {MODULES_FILE} (use --listar)", file=sys.stderr)
+        return SAIDA_PARAMETROS
+
+    try:
+        params = montar_params(modulo, args)
+    except (ValueError, OSError) as e:
+        print(f"Parâmetros inválidos: {e}", file=sys.stderr)
+        return SAIDA_PARAMETROS
+
+    if args.enfileirar:
+        print(f"Job {fila_jobs.adicionar(args.modulo, params)} adicionado à fila")
+        return SAIDA_OK
+
+    saida = SaidaLog(args.log_file, quiet=args.quiet)
+    set_logger_callback(saida)
+    dialogos = DialogosHeadless()
+    dialogos.instalar()
+
+    cancel_flag = threading.Event()
+    params["cancel_flag"] = cancel_flag
+    instalar_cancelamento(cancel_flag)
+
+    log_message(f"▶ {modulo.get('name', args.modulo)} ({args.modulo})", "INFO")
+    resetar_estatisticas()
+    codigo = SAIDA_OK
+    try:
+        mod = importlib.import_module(modulo["module_path"])
+        mod.run(params)
+    except KeyboardInterrupt:
+        log_message("Execução interrompida", "WARNING")
+        codigo = SAIDA_CANCELADO
+    except ExecucaoCancelada as e:
+        log_message(f"⏹️ {e}", "WARNING")
+        codigo = SAIDA_CANCELADO
+    except Exception as e:
+        log_message(f"Erro: {e}", "ERROR")
+        codigo = SAIDA_EXCECAO
+    finally:
+        log_resumo_esperas()
+
+    if codigo == SAIDA_OK:
+        if cancel_flag.is_set():
+            codigo = SAIDA_CANCELADO
+        elif dialogos.erros:
+            codigo = SAIDA_ERRO_MODULO
+    log_message(f"■ Execução finalizada (código {codigo})", "SUCCESS" if codigo == SAIDA_OK else "WARNING")
+    saida.fechar()
+    return codigo
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,27 +1,128 @@
 import os
 import json
+import glob
+import hashlib
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 import numpy as np
-from paddleocr import PaddleOCR
 from pdf2image import convert_from_path
 from PIL import Image
 from datetime import datetime
 import re
 from typing import Dict, Optional
 
+try:
+    from pypdf import PdfReader
+except ImportError:  # sem o pypdf todos os PDFs passam pelo OCR
+    PdfReader = None
+
 # Configuração dos diretórios
 EXAMES_DIR = 'exames/'
 RESULTADOS_DIR = 'resultados_ocr/'
 os.makedirs(RESULTADOS_DIR, exist_ok=True)
 
-# Inicialização do PaddleOCR otimizada
-ocr = PaddleOCR(
-    use_angle_cls=True,
-    lang='pt'
-)
+# Ajustes do PaddleOCR (.env). Vazio = padrão da biblioteca
+OCR_ANGLE_CLS = os.getenv("RPA_OCR_ANGLE_CLS", "1") == "1"
+OCR_DET_LIMIT_SIDE_LEN = os.getenv("RPA_OCR_DET_LIMIT_SIDE_LEN", "")
+OCR_CPU_THREADS = os.getenv("RPA_OCR_CPU_THREADS", "")
+OCR_PREWARM = os.getenv("RPA_OCR_PREWARM", "1") == "1"
+# Processos de OCR em paralelo em process_all_files_optimized (1 = sequencial, no processo atual)
+OCR_WORKERS = int(os.getenv("RPA_OCR_WORKERS", "1"))
+# PDFs gerados digitalmente: lê a camada de texto antes de rasterizar e rodar o OCR
+PDF_CAMADA_TEXTO = os.getenv("RPA_PDF_TEXT_LAYER", "1") == "1"
+# Páginas com menos caracteres que isso são tratadas como digitalizadas (sem texto)
+MIN_CARACTERES_TEXTO = 40
+
+# OCR só do cabeçalho: recortes por layout e resoluções tentadas em ordem (baixa primeiro)
+OCR_ROI = os.getenv("RPA_OCR_ROI", "1") == "1"
+OCR_LAYOUTS_ARQUIVO = os.getenv("RPA_OCR_LAYOUTS", "ocr_layouts.json")
+OCR_DPIS = [int(dpi) for dpi in os.getenv("RPA_OCR_DPIS", "150,300").split(",") if dpi.strip()]
+# Usado quando ocr_layouts.json não existe: terço superior da primeira página
+LAYOUTS_PADRAO = [{"nome": "cabecalho", "regiao": [0.0, 0.0, 1.0, 0.35]}]
+
+# Cache dos dados extraídos, por conteúdo do arquivo + versão do extrator
+OCR_CACHE = os.getenv("RPA_OCR_CACHE", "1") == "1"
+OCR_CACHE_DIR = os.getenv("RPA_OCR_CACHE_DIR", os.path.join(RESULTADOS_DIR, ".cache"))
+OCR_CACHE_MAX_MB = float(os.getenv("RPA_OCR_CACHE_MAX_MB", "50"))
+OCR_CACHE_DIAS = float(os.getenv("RPA_OCR_CACHE_DIAS", "30"))
+
+# O modelo só é carregado no primeiro uso (obter_ocr) ou no pré-aquecimento
+_ocr = None
+_ocr_lock = threading.Lock()
+_tempos_ocr = {"carregamento": 0.0, "inferencia": 0.0, "chamadas": 0}
+
+
+def _log(mensagem, nivel="INFO"):
+    try:
+        from src.core.logger import log_message
+        log_message(mensagem, nivel)
+    except ImportError:
+        print(mensagem)
+
+
+def _parametros_ocr():
+    """kwargs do PaddleOCR 3.x (requirements.txt) a partir dos ajustes do .env."""
+    parametros = {"lang": "pt", "use_textline_orientation": OCR_ANGLE_CLS}
+    if OCR_DET_LIMIT_SIDE_LEN:
+        parametros["text_det_limit_side_len"] = int(OCR_DET_LIMIT_SIDE_LEN)
+    if OCR_CPU_THREADS:
+        parametros["cpu_threads"] = int(OCR_CPU_THREADS)
+    return parametros
+
+
+def obter_ocr():
+    """Retorna a instância única do PaddleOCR, criando-a na primeira chamada."""
+    global _ocr
+    if _ocr is not None:
+        return _ocr
+    with _ocr_lock:
+        if _ocr is None:
+            from paddleocr import PaddleOCR
+
+            inicio = time.perf_counter()
+            instancia = PaddleOCR(**_parametros_ocr())
+            _tempos_ocr["carregamento"] = time.perf_counter() - inicio
+            _log(f"🧠 PaddleOCR carregado em {_tempos_ocr['carregamento']:.1f}s "
+                 f"(angle_cls={OCR_ANGLE_CLS}, det_limit={OCR_DET_LIMIT_SIDE_LEN or 'padrão'}, "
+                 f"threads={OCR_CPU_THREADS or 'padrão'})", "INFO")
+            _ocr = instancia
+    return _ocr
+
+
+def pre_aquecer_ocr():
+    """Carrega o modelo em segundo plano (ex.: ao selecionar o módulo na interface)."""
+    if not OCR_PREWARM or _ocr is not None or _ocr_lock.locked():
+        return
+
+    def carregar():
+        try:
+            obter_ocr()
+        except Exception as e:
+            _log(f"⚠️ Falha ao pré-carregar o PaddleOCR: {e}", "WARNING")
+
+    threading.Thread(target=carregar, name="ocr-warmup", daemon=True).start()
+
+
+def executar_ocr(img_np):
+    """Roda o OCR medindo só o tempo de inferência (o carregamento é medido à parte)."""
+    motor = obter_ocr()
+    inicio = time.perf_counter()
+    resultado = motor.predict(img_np)
+    duracao = time.perf_counter() - inicio
+    _tempos_ocr["inferencia"] += duracao
+    _tempos_ocr["chamadas"] += 1
+    _log(f"  ⏱️ Inferência OCR: {duracao:.2f}s", "INFO")
+    return resultado
+
 
 class ExameDataExtractor:
     """Extrator otimizado de dados de exame"""
 
+    # Aumente ao mudar a lógica de extração fora dos regex (invalida o cache de OCR)
+    VERSAO = 1
+
     def __init__(self):
         # Padrões regex otimizados para capturar apenas o valor específico
         self.patterns = {
@@ -131,6 +232,11 @@ class ExameDataExtractor:
 
         return texto
 
+    def versao(self) -> str:
+        """Assinatura da lógica + padrões; muda sempre que algum regex muda."""
+        assinatura = json.dumps({"versao": self.VERSAO, "patterns": self.patterns}, sort_keys=True)
+        return hashlib.sha256(assinatura.encode("utf-8")).hexdigest()[:12]
+
     def is_complete(self, dados: Dict) -> bool:
         """Verifica se todos os dados essenciais foram encontrados"""
         essential_fields = ['paciente', 'numero_exame', 'convenio']
@@ -156,56 +262,235 @@ def extract_texts_from_ocr(resultado_ocr) -> list:
     return []
 
 
-def process_single_file_optimized(file_path: str, filename: str) -> Optional[Dict]:
-    """Processa um arquivo individual de forma otimizada"""
-    print(f"Processando: {filename}")
-    extractor = ExameDataExtractor()
+def chave_cache(file_path: str, extractor: "ExameDataExtractor") -> str:
+    """sha256 do conteúdo do arquivo + versão do extrator."""
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(bloco)
+    return f"{sha.hexdigest()}_{extractor.versao()}"
 
+
+def ler_cache(chave: Optional[str]) -> Optional[Dict]:
+    """dados_exame guardados para a chave, ou None."""
+    if not chave:
+        return None
+    caminho = os.path.join(OCR_CACHE_DIR, f"{chave}.json")
     try:
-        if filename.lower().endswith('.pdf'):
-            # Converter apenas a primeira página (dados geralmente estão lá)
-            pages = convert_from_path(file_path, first_page=1, last_page=1)
+        with open(caminho, 'r', encoding='utf-8') as f:
+            dados = json.load(f)["dados_exame"]
+        os.utime(caminho)  # uso recente: fica por último na remoção por tamanho
+        return dados
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def gravar_cache(chave: Optional[str], dados_exame: Dict):
+    if not chave:
+        return
+    try:
+        os.makedirs(OCR_CACHE_DIR, exist_ok=True)
+        caminho = os.path.join(OCR_CACHE_DIR, f"{chave}.json")
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump({"dados_exame": dados_exame}, f, ensure_ascii=False)
+        os.replace(temporario, caminho)
+    except OSError as e:
+        print(f"  Aviso: não foi possível gravar o cache de OCR ({e})")
+
+
+def limpar_cache(max_mb: float = None, dias: float = None) -> int:
+    """Remove entradas mais velhas que `dias` e, depois, as menos usadas até caber em `max_mb`."""
+    max_mb = OCR_CACHE_MAX_MB if max_mb is None else max_mb
+    dias = OCR_CACHE_DIAS if dias is None else dias
+    entradas = []
+    for caminho in glob.glob(os.path.join(OCR_CACHE_DIR, "*.json")):
+        try:
+            info = os.stat(caminho)
+            entradas.append((info.st_mtime, info.st_size, caminho))
+        except OSError:
+            continue
+
+    limite_idade = time.time() - dias * 86400
+    total = sum(tamanho for _, tamanho, _ in entradas)
+    removidos = 0
+    for mtime, tamanho, caminho in sorted(entradas):
+        if mtime >= limite_idade and total <= max_mb * 1024 * 1024:
+            break
+        try:
+            os.remove(caminho)
+            total -= tamanho
+            removidos += 1
+        except OSError:
+            continue
+    return removidos
+
+
+def extrair_textos_pdf(file_path: str, max_paginas: int = 2) -> list:
+    """Linhas da camada de texto de cada uma das primeiras páginas do PDF.
+
+    Retorna uma lista por página; vazia se o pypdf não estiver instalado ou se o PDF
+    for digitalizado (sem texto embutido).
+    """
+    if PdfReader is None or not PDF_CAMADA_TEXTO:
+        return []
+    try:
+        leitor = PdfReader(file_path)
+        paginas = []
+        for pagina in leitor.pages[:max_paginas]:
+            texto = pagina.extract_text() or ""
+            if len(texto.strip()) < MIN_CARACTERES_TEXTO:
+                break
+            paginas.append([linha.strip() for linha in texto.splitlines() if linha.strip()])
+        return paginas
+    except Exception as e:
+        print(f"  Aviso: camada de texto ilegível ({e}), usando OCR")
+        return []
+
+
+def _extrair_por_camada_texto(file_path: str, extractor: "ExameDataExtractor"):
+    """(textos, dados) lidos da camada de texto, ou None se ela faltar ou vier incompleta."""
+    paginas = extrair_textos_pdf(file_path)
+    if not paginas:
+        return None
+
+    textos = list(paginas[0])
+    dados_exame = extractor.extract_data_from_texts(textos)
+    # Mesma regra do OCR: segunda página só quando a primeira não basta
+    if not extractor.is_complete(dados_exame) and len(paginas) > 1:
+        textos.extend(paginas[1])
+        dados_exame = extractor.extract_data_from_texts(textos)
+
+    if not extractor.is_complete(dados_exame):
+        print("  Camada de texto incompleta, usando OCR")
+        return None
+    return textos, dados_exame
+
+
+def carregar_layouts() -> list:
+    """Layouts de cabeçalho: [{"nome", "regiao": [x0, y0, x1, y1]}] em frações da página."""
+    try:
+        with open(OCR_LAYOUTS_ARQUIVO, 'r', encoding='utf-8') as f:
+            layouts = json.load(f)
+        return [layout for layout in layouts if len(layout.get("regiao", ())) == 4] or LAYOUTS_PADRAO
+    except (OSError, ValueError):
+        return LAYOUTS_PADRAO
+
+
+def recortar_regiao(page, regiao):
+    largura, altura = page.size
+    x0, y0, x1, y1 = regiao
+    return page.crop((int(x0 * largura), int(y0 * altura), int(x1 * largura), int(y1 * altura)))
+
+
+def _extrair_por_regioes(file_path: str, filename: str, extractor: "ExameDataExtractor"):
+    """OCR só das regiões de cabeçalho, subindo o DPI apenas se nenhum layout bastar.
+
+    Retorna (textos, dados) completos ou None para cair no OCR da página inteira.
+    """
+    eh_pdf = filename.lower().endswith('.pdf')
+    layouts = carregar_layouts()
+    for dpi in (OCR_DPIS if eh_pdf else [None]):
+        if eh_pdf:
+            pages = convert_from_path(file_path, dpi=dpi, first_page=1, last_page=1)
             if not pages:
-                print(f"  Erro: Nenhuma página encontrada em {filename}")
                 return None
-
             page = pages[0]
-
-        else:  # Imagem
+        else:
             page = Image.open(file_path)
 
-        # Converter para numpy array
-        img_np = np.array(page)
+        for layout in layouts:
+            textos = extract_texts_from_ocr(executar_ocr(np.array(recortar_regiao(page, layout["regiao"]))))
+            if not textos:
+                continue
+            dados_exame = extractor.extract_data_from_texts(textos)
+            if extractor.is_complete(dados_exame):
+                print(f"  🎯 Cabeçalho '{layout['nome']}'" + (f" a {dpi} dpi" if dpi else ""))
+                return textos, dados_exame
+
+    print("  Cabeçalho incompleto, usando a página inteira")
+    return None
+
+
+def _extrair_por_ocr(file_path: str, filename: str, extractor: "ExameDataExtractor", usar_roi: bool = None):
+    """(textos, dados) extraídos com o PaddleOCR, ou None se não houver texto."""
+    if OCR_ROI if usar_roi is None else usar_roi:
+        extraido = _extrair_por_regioes(file_path, filename, extractor)
+        if extraido:
+            return extraido
+
+    if filename.lower().endswith('.pdf'):
+        # Converter apenas a primeira página (dados geralmente estão lá)
+        pages = convert_from_path(file_path, first_page=1, last_page=1)
+        if not pages:
+            print(f"  Erro: Nenhuma página encontrada em {filename}")
+            return None
+
+        page = pages[0]
 
-        # Aplicar OCR
-        resultado_ocr = ocr.predict(img_np)
+    else:  # Imagem
+        page = Image.open(file_path)
 
-        # Extrair textos
-        textos = extract_texts_from_ocr(resultado_ocr)
+    # Converter para numpy array
+    img_np = np.array(page)
 
-        if not textos:
-            print(f"  Aviso: Nenhum texto extraído de {filename}")
-            return None
+    # Aplicar OCR
+    resultado_ocr = executar_ocr(img_np)
+
+    # Extrair textos
+    textos = extract_texts_from_ocr(resultado_ocr)
+
+    if not textos:
+        print(f"  Aviso: Nenhum texto extraído de {filename}")
+        return None
+
+    # Extrair dados estruturados
+    dados_exame = extractor.extract_data_from_texts(textos)
+
+    # Verificar se encontrou dados essenciais
+    if not extractor.is_complete(dados_exame):
+        print(f"  Aviso: Dados incompletos em {filename}")
+        # Tentar processar segunda página se for PDF
+        if filename.lower().endswith('.pdf'):
+            print("  Tentando segunda página...")
+            try:
+                pages = convert_from_path(file_path, first_page=2, last_page=2)
+                if pages:
+                    img_np = np.array(pages[0])
+                    resultado_ocr = executar_ocr(img_np)
+                    textos_p2 = extract_texts_from_ocr(resultado_ocr)
+                    textos.extend(textos_p2)
+                    dados_exame = extractor.extract_data_from_texts(textos)
+            except:
+                pass
+
+    return textos, dados_exame
 
-        # Extrair dados estruturados
-        dados_exame = extractor.extract_data_from_texts(textos)
 
-        # Verificar se encontrou dados essenciais
-        if not extractor.is_complete(dados_exame):
-            print(f"  Aviso: Dados incompletos em {filename}")
-            # Tentar processar segunda página se for PDF
+def process_single_file_optimized(file_path: str, filename: str) -> Optional[Dict]:
+    """Processa um arquivo individual de forma otimizada"""
+    print(f"Processando: {filename}")
+    extractor = ExameDataExtractor()
+
+    try:
+        inicio = time.perf_counter()
+        chave = chave_cache(file_path, extractor) if OCR_CACHE else None
+        dados_exame = ler_cache(chave)
+        metodo = "cache"
+        if dados_exame is None:
+            extraido = None
+            metodo = "OCR"
             if filename.lower().endswith('.pdf'):
-                print(f"  Tentando segunda página...")
-                try:
-                    pages = convert_from_path(file_path, first_page=2, last_page=2)
-                    if pages:
-                        img_np = np.array(pages[0])
-                        resultado_ocr = ocr.predict(img_np)
-                        textos_p2 = extract_texts_from_ocr(resultado_ocr)
-                        textos.extend(textos_p2)
-                        dados_exame = extractor.extract_data_from_texts(textos)
-                except:
-                    pass
+                extraido = _extrair_por_camada_texto(file_path, extractor)
+                if extraido:
+                    metodo = "camada de texto"
+            if extraido is None:
+                extraido = _extrair_por_ocr(file_path, filename, extractor)
+            if extraido is None:
+                return None
+            _, dados_exame = extraido
+            gravar_cache(chave, dados_exame)
+        print(f"  🔎 Extração via {metodo} em {time.perf_counter() - inicio:.2f}s")
 
         # Resultado final
         resultado = {
@@ -235,8 +520,85 @@ def process_single_file_optimized(file_path: str, filename: str) -> Optional[Dic
         return None
 
 
-def process_all_files_optimized():
-    """Processa todos os arquivos da pasta de forma otimizada"""
+def _inicializar_worker(threads):
+    """Roda uma vez em cada processo do pool: carrega o modelo antes do primeiro arquivo."""
+    global OCR_CPU_THREADS
+    if not OCR_CPU_THREADS:
+        # Divide os núcleos entre os processos em vez de cada um tentar usar todos
+        OCR_CPU_THREADS = str(threads)
+    obter_ocr()
+
+
+def _processar_no_worker(file_path, filename):
+    inferencia, chamadas = _tempos_ocr["inferencia"], _tempos_ocr["chamadas"]
+    resultado = process_single_file_optimized(file_path, filename)
+    return resultado, _tempos_ocr["inferencia"] - inferencia, _tempos_ocr["chamadas"] - chamadas
+
+
+def iterar_resultados_ocr(arquivos, workers=1, parar=None):
+    """Gera (arquivo, resultado) de cada arquivo de EXAMES_DIR à medida que o OCR termina.
+
+    Com `workers > 1` usa um pool de processos, cada um com seu PaddleOCR. Falha em um
+    arquivo resulta em `None` só para ele; se o pool não iniciar ou cair, o restante
+    segue sequencial.
+    Com o evento `parar` setado, os arquivos que ainda não começaram são descartados.
+    """
+    if workers <= 1:
+        for filename in arquivos:
+            if parar is not None and parar.is_set():
+                return
+            yield filename, process_single_file_optimized(os.path.join(EXAMES_DIR, filename), filename)
+        return
+
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    pendentes = list(arquivos)
+    pool = None
+    try:
+        # Os processos do pool sobem no primeiro submit
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_inicializar_worker,
+                                   initargs=(threads,))
+        futuros = {
+            pool.submit(_processar_no_worker, os.path.join(EXAMES_DIR, filename), filename): filename
+            for filename in arquivos
+        }
+    except Exception as e:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        _log(f"⚠️ Pool de OCR não iniciou ({type(e).__name__}: {e}); seguindo sem paralelismo", "WARNING")
+        yield from iterar_resultados_ocr(pendentes, 1, parar)
+        return
+
+    try:
+        with pool:
+            for futuro in as_completed(futuros):
+                if parar is not None and parar.is_set():
+                    for pendente in futuros:
+                        pendente.cancel()
+                    return
+                filename = futuros[futuro]
+                try:
+                    resultado, inferencia, chamadas = futuro.result()
+                except BrokenProcessPool:
+                    raise
+                except Exception as e:
+                    print(f"  ❌ Erro ao processar {filename}: {str(e)}")
+                    resultado, inferencia, chamadas = None, 0.0, 0
+                pendentes.remove(filename)
+                _tempos_ocr["inferencia"] += inferencia
+                _tempos_ocr["chamadas"] += chamadas
+                yield filename, resultado
+    except BrokenProcessPool as e:
+        _log(f"⚠️ Pool de OCR interrompido ({e}); {len(pendentes)} arquivo(s) seguem sem paralelismo", "WARNING")
+        yield from iterar_resultados_ocr(pendentes, 1, parar)
+
+
+def process_all_files_optimized(workers: Optional[int] = None, ao_concluir=None, parar=None):
+    """Processa todos os arquivos da pasta de forma otimizada
+
+    `workers` processos de OCR (padrão RPA_OCR_WORKERS); `ao_concluir(resultado)` é
+    chamado para cada arquivo assim que o resultado fica pronto; `parar` (Event)
+    interrompe o lote entre um arquivo e outro.
+    """
     print("🚀 Iniciando processamento OCR otimizado")
     print(f"📁 Diretório: {EXAMES_DIR}")
     print("-" * 50)
@@ -245,8 +607,15 @@ def process_all_files_optimized():
         print(f"❌ Diretório {EXAMES_DIR} não encontrado!")
         return []
 
+    if OCR_CACHE:
+        removidos = limpar_cache()
+        if removidos:
+            print(f"🧹 {removidos} entrada(s) antigas removidas do cache de OCR")
+
     resultados = []
     arquivos_processados = 0
+    _tempos_ocr["inferencia"] = 0.0
+    _tempos_ocr["chamadas"] = 0
 
     # Buscar arquivos válidos
     valid_extensions = ('.pdf', '.png', '.jpg', '.jpeg', '.tiff', '.bmp')
@@ -257,16 +626,22 @@ def process_all_files_optimized():
     print(f"📊 Encontrados {len(arquivos)} arquivos para processar")
     print("-" * 50)
 
-    for filename in arquivos:
-        file_path = os.path.join(EXAMES_DIR, filename)
-        resultado = process_single_file_optimized(file_path, filename)
-
+    workers = max(1, min(workers or OCR_WORKERS, len(arquivos) or 1))
+    if workers > 1:
+        print(f"⚙️ OCR em {workers} processos")
+    for filename, resultado in iterar_resultados_ocr(arquivos, workers, parar):
         if resultado:
             resultados.append(resultado)
             arquivos_processados += 1
+            if ao_concluir:
+                ao_concluir(resultado)
 
         print("-" * 30)
 
+    # Mantém a ordem da pasta, como no processamento sequencial
+    ordem = {nome: i for i, nome in enumerate(arquivos)}
+    resultados.sort(key=lambda r: ordem.get(r["arquivo_origem"], len(ordem)))
+
     # Resumo final
     print(f"🎉 Processamento concluído!")
     print(f"📊 Arquivos processados: {arquivos_processados}/{len(arquivos)}")
@@ -279,6 +654,13 @@ def process_all_files_optimized():
     print(f"✅ Extrações completas: {completos}")
     print(f"⚠️ Extrações incompletas: {incompletos}")
 
+    if _tempos_ocr["chamadas"]:
+        # No modo com processos, cada worker registra o próprio carregamento
+        carregamento = f"carregamento {_tempos_ocr['carregamento']:.1f}s, " if _tempos_ocr["carregamento"] else ""
+        _log(f"⏱️ OCR: {carregamento}inferência {_tempos_ocr['inferencia']:.1f}s em "
+             f"{_tempos_ocr['chamadas']} página(s) "
+             f"(média {_tempos_ocr['inferencia'] / _tempos_ocr['chamadas']:.2f}s)", "INFO")
+
     return resultados
 
 
@@ -291,8 +673,81 @@ def extract_exam_data_from_file(file_path: str) -> Optional[Dict]:
     return process_single_file_optimized(file_path, filename)
 
 
-def main():
+def relatorio_desempenho(pasta: str) -> list:
+    """Compara página inteira x regiões de cabeçalho numa pasta de amostras.
+
+    Sem cache e sem camada de texto: mede só o OCR. A referência de cada arquivo é o
+    `<nome>_esperado.json` ao lado dele (mesmo formato de `dados_exame`), ou, se não
+    houver, o resultado da página inteira.
+    """
+    extractor = ExameDataExtractor()
+    obter_ocr()  # carregamento fora da medição
+    linhas = []
+    arquivos = sorted(f for f in os.listdir(pasta)
+                      if f.lower().endswith(('.pdf', '.png', '.jpg', '.jpeg', '.tiff', '.bmp')))
+    for filename in arquivos:
+        file_path = os.path.join(pasta, filename)
+        medicoes = {}
+        for estrategia, usar_roi in (("pagina", False), ("regioes", True)):
+            inicio = time.perf_counter()
+            try:
+                extraido = _extrair_por_ocr(file_path, filename, extractor, usar_roi=usar_roi)
+            except Exception as e:
+                print(f"  ❌ {filename} ({estrategia}): {e}")
+                extraido = None
+            medicoes[estrategia] = (time.perf_counter() - inicio, extraido[1] if extraido else {})
+
+        esperado_path = os.path.join(pasta, f"{os.path.splitext(filename)[0]}_esperado.json")
+        if os.path.exists(esperado_path):
+            with open(esperado_path, 'r', encoding='utf-8') as f:
+                esperado = json.load(f)
+        else:
+            esperado = medicoes["pagina"][1]
+
+        campos = [campo for campo, valor in esperado.items() if valor]
+        linha = {"arquivo": filename}
+        for estrategia, (duracao, dados) in medicoes.items():
+            acertos = sum(1 for campo in campos if dados.get(campo) == esperado[campo])
+            linha[estrategia] = {
+                "segundos": round(duracao, 2),
+                "acerto": acertos / len(campos) if campos else 0.0,
+                "completo": extractor.is_complete(dados),
+            }
+        linhas.append(linha)
+
+    print(f"\n{'arquivo':<40}{'página':>10}{'acerto':>8}{'regiões':>10}{'acerto':>8}{'ganho':>8}")
+    for linha in linhas:
+        pagina, regioes = linha["pagina"], linha["regioes"]
+        ganho = pagina["segundos"] / regioes["segundos"] if regioes["segundos"] else 0.0
+        print(f"{linha['arquivo'][:39]:<40}{pagina['segundos']:>9.2f}s{pagina['acerto']:>8.0%}"
+              f"{regioes['segundos']:>9.2f}s{regioes['acerto']:>8.0%}{ganho:>7.1f}x")
+    if linhas:
+        total_pagina = sum(linha["pagina"]["segundos"] for linha in linhas)
+        total_regioes = sum(linha["regioes"]["segundos"] for linha in linhas)
+        acerto_pagina = sum(linha["pagina"]["acerto"] for linha in linhas) / len(linhas)
+        acerto_regioes = sum(linha["regioes"]["acerto"] for linha in linhas) / len(linhas)
+        print(f"{'média por documento':<40}{total_pagina / len(linhas):>9.2f}s{acerto_pagina:>8.0%}"
+              f"{total_regioes / len(linhas):>9.2f}s{acerto_regioes:>8.0%}"
+              f"{(total_pagina / total_regioes if total_regioes else 0.0):>7.1f}x")
+    return linhas
+
+
+def main(argv=None):
     """Função principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Extração de dados dos exames do HCL SUS")
+    parser.add_argument("--relatorio", metavar="PASTA",
+                        help="compara velocidade/acerto do OCR da página inteira x cabeçalho nas amostras da pasta")
+    parser.add_argument("--saida", help="grava o relatório em JSON")
+    args = parser.parse_args(argv)
+
+    if args.relatorio:
+        linhas = relatorio_desempenho(args.relatorio)
+        if args.saida:
+            with open(args.saida, 'w', encoding='utf-8') as f:
+                json.dump(linhas, f, ensure_ascii=False, indent=2)
+        return linhas
     return process_all_files_optimized()
 
 
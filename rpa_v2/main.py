@@ -5,6 +5,7 @@ Ponto de entrada principal
 
 import sys
 import os
+import multiprocessing
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
@@ -21,4 +22,6 @@ def main():
     print("Sistema finalizado.")
 
 if __name__ == "__main__":
+    # Necessário no executável (PyInstaller) para os processos do pool de OCR
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -1,13 +1,46 @@
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
+import atexit
 import os
 import shutil
+import threading
+
+from src.core.http_transport import descartar_transporte
+
+# Configuração do pool de navegadores (pode ser sobrescrita via .env / variáveis de ambiente)
+POOL_SIZE = int(os.getenv("RPA_POOL_SIZE", "1"))
+POOL_MAX_LEASES = int(os.getenv("RPA_POOL_MAX_LEASES", "20"))
+
+# Perfil enxuto: não carrega imagens, fontes, mídia, PDFs nem scripts de analytics
+LEAN_BROWSER = os.getenv("RPA_LEAN_BROWSER", "0") == "1"
+# normal = espera a página inteira; eager = só o DOM; none = não espera
+PAGE_LOAD_STRATEGY = os.getenv("RPA_PAGE_LOAD_STRATEGY", "normal")
+
+BLOQUEIOS_LEAN = {
+    "imagens": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp"],
+    "fontes": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*fonts.googleapis.com*", "*fonts.gstatic.com*"],
+    "midia": ["*.mp4", "*.webm", "*.mp3", "*.ogg", "*.wav"],
+    "pdf": ["*.pdf"],
+    "analytics": [
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+        "*hotjar.com*", "*connect.facebook.net*", "*clarity.ms*",
+    ],
+}
+
 
 class BrowserFactory:
     @staticmethod
-    def create_chrome(download_dir=None, headless=False):
+    def create_chrome(download_dir=None, headless=False, permitir=None, lean=None, page_load_strategy=None):
+        """Cria um Chrome novo.
+
+        `lean` (padrão: RPA_LEAN_BROWSER) bloqueia as categorias de `BLOQUEIOS_LEAN`,
+        exceto as listadas em `permitir` (ex.: ("pdf",) para quem baixa PDFs).
+        """
         print("🔧 Configurando opções do Chrome...")
+        lean = LEAN_BROWSER if lean is None else lean
+        bloquear = BrowserFactory.categorias_bloqueadas(permitir) if lean else []
         chrome_options = webdriver.ChromeOptions()
+        chrome_options.page_load_strategy = page_load_strategy or PAGE_LOAD_STRATEGY
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-dev-shm-usage")
         chrome_options.add_argument("--window-size=1920,1080")
@@ -27,15 +60,31 @@ class BrowserFactory:
         chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
         chrome_options.add_experimental_option('useAutomationExtension', False)
 
+        prefs = {}
         if download_dir:
-            prefs = {
+            prefs.update({
                 "download.default_directory": download_dir,
                 "download.prompt_for_download": False,
                 "download.directory_upgrade": True,
                 "safebrowsing.enabled": True,
                 "safebrowsing.disable_download_protection": True,
                 "plugins.always_open_pdf_externally": True
-            }
+            })
+        if bloquear:
+            print(f"🪶 Perfil enxuto - bloqueando: {', '.join(bloquear)}")
+            prefs["profile.default_content_setting_values.notifications"] = 2
+            prefs["profile.default_content_setting_values.geolocation"] = 2
+            if "imagens" in bloquear:
+                prefs["profile.managed_default_content_settings.images"] = 2
+            if "midia" in bloquear:
+                prefs["profile.default_content_setting_values.media_stream_mic"] = 2
+                prefs["profile.default_content_setting_values.media_stream_camera"] = 2
+                chrome_options.add_argument("--autoplay-policy=user-gesture-required")
+            chrome_options.add_argument("--disable-extensions")
+            chrome_options.add_argument("--disable-background-networking")
+            chrome_options.add_argument("--disable-component-update")
+            chrome_options.add_argument("--disable-renderer-backgrounding")
+        if prefs:
             chrome_options.add_experimental_option("prefs", prefs)
         
         print("🔍 Procurando ChromeDriver...")
@@ -53,9 +102,236 @@ class BrowserFactory:
         print("🚀 Criando instância do Chrome...")
         try:
             driver = webdriver.Chrome(service=service, options=chrome_options)
+            BrowserFactory.aplicar_bloqueios(driver, bloquear)
             print("✅ Chrome criado com sucesso!")
             return driver
         except Exception as e:
             print(f"❌ Erro ao criar Chrome: {e}")
             print("💡 Dica: Certifique-se de que o Google Chrome está instalado e atualizado")
-            raise
\ No newline at end of file
+            raise
+
+    @staticmethod
+    def categorias_bloqueadas(permitir=None):
+        permitidas = set(permitir or ())
+        return [categoria for categoria in BLOQUEIOS_LEAN if categoria not in permitidas]
+
+    @staticmethod
+    def aplicar_bloqueios(driver, categorias):
+        """Bloqueia na rede (CDP) as URLs das categorias informadas na aba atual."""
+        if not categorias:
+            return
+        padroes = [padrao for categoria in categorias for padrao in BLOQUEIOS_LEAN[categoria]]
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": padroes})
+        except Exception as e:
+            print(f"⚠️ Não foi possível bloquear recursos via CDP: {e}")
+
+    @staticmethod
+    def acquire_chrome(download_dir=None, headless=False, permitir=None):
+        """Obtém um Chrome já aquecido do pool (ou cria um novo se não houver livre).
+
+        `permitir` lista as categorias do perfil enxuto que o módulo precisa carregar.
+        """
+        return BrowserPool.instance().acquire(download_dir=download_dir, headless=headless, permitir=permitir)
+
+    @staticmethod
+    def release_chrome(driver, clear_cookies=True):
+        """Devolve o Chrome ao pool. Drivers inválidos ou esgotados são encerrados.
+
+        Os cookies são apagados: o próximo módulo recebe a sessão do Pathoweb pelo
+        session_manager, e nenhum formulário de login encontra o driver já autenticado.
+        """
+        if driver is None:
+            return
+        descartar_transporte(driver)
+        BrowserPool.instance().release(driver, clear_cookies=clear_cookies)
+
+    @staticmethod
+    def warm_up(download_dir=None, headless=False, permitir=None):
+        """Pré-inicia navegadores em segundo plano até completar o tamanho do pool."""
+        BrowserPool.instance().warm_up(download_dir=download_dir, headless=headless, permitir=permitir)
+
+    @staticmethod
+    def shutdown_pool(emprestados=False):
+        """Encerra os Chrome ociosos do pool; com `emprestados`, também os que não foram devolvidos."""
+        BrowserPool.instance().shutdown(emprestados=emprestados)
+
+
+class BrowserPool:
+    """Pool de instâncias do Chrome reaproveitadas entre execuções dos módulos.
+
+    Os drivers são separados por variante (headless/visual), pasta de download e
+    categorias bloqueadas pelo perfil enxuto.
+    Cada driver é verificado antes de ser emprestado, tem o estado limpo ao ser
+    devolvido e é reciclado depois de `max_leases` empréstimos.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, size=POOL_SIZE, max_leases=POOL_MAX_LEASES):
+        self.size = max(0, size)
+        self.max_leases = max(1, max_leases)
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._leases = {}
+        self._in_use = {}
+        self._warming = set()
+
+    @classmethod
+    def instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+                atexit.register(cls._instance.shutdown)
+            return cls._instance
+
+    @classmethod
+    def configure(cls, size=None, max_leases=None):
+        pool = cls.instance()
+        with pool._lock:
+            if size is not None:
+                pool.size = max(0, int(size))
+            if max_leases is not None:
+                pool.max_leases = max(1, int(max_leases))
+        return pool
+
+    @staticmethod
+    def _key(download_dir, headless, permitir=None):
+        bloquear = tuple(BrowserFactory.categorias_bloqueadas(permitir)) if LEAN_BROWSER else ()
+        return (bool(headless), os.path.abspath(download_dir) if download_dir else None, bloquear)
+
+    def _create(self, key):
+        headless, download_dir, bloquear = key
+        permitir = [categoria for categoria in BLOQUEIOS_LEAN if categoria not in bloquear]
+        driver = BrowserFactory.create_chrome(download_dir=download_dir, headless=headless,
+                                              permitir=permitir, lean=bool(bloquear))
+        self._leases[id(driver)] = 0
+        return driver
+
+    @staticmethod
+    def _is_healthy(driver):
+        try:
+            driver.execute_script("return 1")
+            return len(driver.window_handles) > 0
+        except Exception:
+            return False
+
+    def _discard(self, driver):
+        self._leases.pop(id(driver), None)
+        descartar_transporte(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _reset(self, driver, key, clear_cookies):
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.get("about:blank")
+        driver.set_page_load_timeout(300)
+        driver.set_script_timeout(30)
+        driver.implicitly_wait(0)
+        if clear_cookies:
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        _, download_dir, bloquear = key
+        BrowserFactory.aplicar_bloqueios(driver, bloquear)
+        if download_dir:
+            driver.execute_cdp_cmd("Page.setDownloadBehavior", {
+                "behavior": "allow",
+                "downloadPath": download_dir
+            })
+
+    def acquire(self, download_dir=None, headless=False, permitir=None):
+        key = self._key(download_dir, headless, permitir)
+        while True:
+            with self._lock:
+                idle = self._idle.get(key, [])
+                driver = idle.pop() if idle else None
+            if driver is None:
+                break
+            if self._is_healthy(driver):
+                print("♻️ Reutilizando Chrome aquecido do pool")
+                break
+            print("⚠️ Chrome do pool não respondeu - descartando")
+            self._discard(driver)
+
+        if driver is None:
+            driver = self._create(key)
+
+        with self._lock:
+            self._leases[id(driver)] = self._leases.get(id(driver), 0) + 1
+            self._in_use[id(driver)] = (key, driver)
+        return driver
+
+    def release(self, driver, clear_cookies=True):
+        with self._lock:
+            key, _ = self._in_use.pop(id(driver), (None, None))
+            leases = self._leases.get(id(driver), 0)
+
+        if key is None or self.size == 0:
+            self._discard(driver)
+            return
+        if leases >= self.max_leases:
+            print(f"🔁 Chrome atingiu {leases} empréstimos - reciclando")
+            self._discard(driver)
+            return
+        if not self._is_healthy(driver):
+            self._discard(driver)
+            return
+        try:
+            self._reset(driver, key, clear_cookies)
+        except Exception as e:
+            print(f"⚠️ Falha ao limpar estado do Chrome ({e}) - descartando")
+            self._discard(driver)
+            return
+
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.size:
+                idle.append(driver)
+                return
+        self._discard(driver)
+
+    def warm_up(self, download_dir=None, headless=False, permitir=None):
+        key = self._key(download_dir, headless, permitir)
+        with self._lock:
+            if key in self._warming or len(self._idle.get(key, [])) >= self.size:
+                return
+            self._warming.add(key)
+
+        def _fill():
+            try:
+                while True:
+                    with self._lock:
+                        if len(self._idle.get(key, [])) >= self.size:
+                            return
+                    driver = self._create(key)
+                    with self._lock:
+                        idle = self._idle.setdefault(key, [])
+                        if len(idle) < self.size:
+                            idle.append(driver)
+                            continue
+                    self._discard(driver)
+                    return
+            except Exception as e:
+                print(f"⚠️ Falha ao aquecer Chrome do pool: {e}")
+            finally:
+                with self._lock:
+                    self._warming.discard(key)
+
+        threading.Thread(target=_fill, daemon=True).start()
+
+    def shutdown(self, emprestados=False):
+        with self._lock:
+            drivers = [d for idle in self._idle.values() for d in idle]
+            self._idle.clear()
+            if emprestados:
+                drivers += [driver for _key, driver in self._in_use.values()]
+                self._in_use.clear()
+        for driver in drivers:
+            self._discard(driver)
@@ -0,0 +1,379 @@
+"""Diário de progresso das execuções (SQLite), para retomar depois de uma queda.
+
+Cada item processado pelos métodos por item dos módulos (os mesmos rastreados pelo
+tracer) é gravado com a situação `iniciado`, `sucesso`, `falha` ou `indefinido` (o
+método não devolveu nada, então não há como saber se o item foi feito). A chave é o módulo,
+o hash da planilha de entrada, o método e o item (código do exame, número da guia...).
+O hash é calculado uma vez no início da execução; quando o `GravadorResultados` regrava a
+planilha com os resultados, o hash do arquivo novo fica associado ao da execução (tabela
+`versoes`), e uma retomada com a planilha já regravada continua com a mesma chave.
+Cada gravação é uma transação própria, então uma queda do Chrome, o botão Parar ou o
+fechamento do programa deixam o diário consistente até o último item.
+
+Com `params["retomar"]` ligado, os itens que já tiveram sucesso com a mesma planilha
+não são processados de novo: o método devolve o resultado gravado na execução anterior.
+
+    python -m src.core.diario                  # execuções recentes
+    python -m src.core.diario --limpar 30      # remove registros com mais de 30 dias
+"""
+import argparse
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from src.core.logger import log_message
+from src.core.tracer import identificar_item, resultado_ok
+
+DIARIO_ATIVO = os.getenv("RPA_DIARIO", "1") == "1"
+DIARIO_DB = os.getenv("RPA_DIARIO_DB", os.path.join(os.getcwd(), "logs", "progresso.sqlite3"))
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS execucoes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    modulo TEXT NOT NULL,
+    arquivo TEXT,
+    arquivo_hash TEXT NOT NULL,
+    retomada INTEGER NOT NULL DEFAULT 0,
+    inicio TEXT NOT NULL,
+    fim TEXT,
+    situacao TEXT NOT NULL DEFAULT 'em_andamento'
+);
+CREATE TABLE IF NOT EXISTS itens (
+    modulo TEXT NOT NULL,
+    arquivo_hash TEXT NOT NULL,
+    metodo TEXT NOT NULL,
+    item TEXT NOT NULL,
+    situacao TEXT NOT NULL,
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    resultado TEXT,
+    reutilizavel INTEGER NOT NULL DEFAULT 0,
+    erro TEXT,
+    execucao INTEGER,
+    atualizado_em TEXT NOT NULL,
+    PRIMARY KEY (modulo, arquivo_hash, metodo, item)
+);
+CREATE TABLE IF NOT EXISTS versoes (
+    versao_hash TEXT PRIMARY KEY,
+    arquivo_hash TEXT NOT NULL,
+    atualizado_em TEXT NOT NULL
+);
+"""
+
+
+def hash_arquivo(caminho):
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def _agora():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class Diario:
+    """Diário da execução corrente. Uma conexão só, protegida por lock (workers paralelos)."""
+
+    def __init__(self, caminho=DIARIO_DB, ativo=DIARIO_ATIVO):
+        self.caminho = caminho
+        self.ativo = ativo
+        self.execucao = None
+        self.modulo = None
+        self.arquivo_hash = None
+        self.retomar = False
+        self.pulados = 0
+        self._conexao = None
+        self._lock = threading.Lock()
+
+    def _conectar(self):
+        if self._conexao is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.caminho)), exist_ok=True)
+            conexao = sqlite3.connect(self.caminho, timeout=10, check_same_thread=False)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            conexao.executescript(ESQUEMA)
+            self._conexao = conexao
+        return self._conexao
+
+    @property
+    def em_execucao(self):
+        return self.execucao is not None
+
+    def iniciar(self, modulo, arquivo, retomar=False):
+        """Abre o registro da execução para o módulo e a planilha. Retorna o id ou None."""
+        if not self.ativo or not arquivo or not os.path.isfile(arquivo):
+            return None
+        try:
+            arquivo_hash = hash_arquivo(arquivo)
+            with self._lock:
+                conexao = self._conectar()
+                # Planilha regravada pelo GravadorResultados: continua com a chave original
+                original = conexao.execute(
+                    "SELECT arquivo_hash FROM versoes WHERE versao_hash = ?", (arquivo_hash,)
+                ).fetchone()
+                if original is not None:
+                    arquivo_hash = original[0]
+                with conexao:
+                    cursor = conexao.execute(
+                        "INSERT INTO execucoes (modulo, arquivo, arquivo_hash, retomada, inicio) VALUES (?, ?, ?, ?, ?)",
+                        (modulo, os.path.abspath(arquivo), arquivo_hash, int(retomar), _agora()),
+                    )
+                concluidos = conexao.execute(
+                    "SELECT COUNT(*) FROM itens WHERE modulo = ? AND arquivo_hash = ? AND situacao = 'sucesso' "
+                    "AND reutilizavel = 1",
+                    (modulo, arquivo_hash),
+                ).fetchone()[0]
+        except (OSError, sqlite3.Error) as e:
+            log_message(f"⚠️ Diário de progresso indisponível: {e}", "WARNING")
+            return None
+
+        self.execucao = cursor.lastrowid
+        self.modulo = modulo
+        self.arquivo_hash = arquivo_hash
+        self.retomar = retomar
+        self.pulados = 0
+        if concluidos and retomar:
+            log_message(f"📒 Retomando: {concluidos} item(ns) já concluído(s) com esta planilha serão pulados", "INFO")
+        elif concluidos:
+            log_message(
+                f"📒 Esta planilha já tem {concluidos} item(ns) concluído(s) em execução anterior. "
+                "Use a opção Retomar para não repeti-los", "INFO"
+            )
+        return self.execucao
+
+    def finalizar(self, situacao="concluida"):
+        with self._lock:
+            execucao, self.execucao = self.execucao, None
+            if execucao is None:
+                return None
+            try:
+                conexao = self._conectar()
+                with conexao:
+                    conexao.execute("UPDATE execucoes SET fim = ?, situacao = ? WHERE id = ?",
+                                    (_agora(), situacao, execucao))
+                contagem = dict(conexao.execute(
+                    "SELECT situacao, COUNT(*) FROM itens WHERE execucao = ? GROUP BY situacao", (execucao,)
+                ).fetchall())
+            except sqlite3.Error as e:
+                log_message(f"⚠️ Falha ao fechar o diário de progresso: {e}", "WARNING")
+                return None
+        log_message(
+            f"📒 Diário: {contagem.get('sucesso', 0)} sucesso(s), {contagem.get('falha', 0)} falha(s), "
+            f"{contagem.get('iniciado', 0)} interrompido(s), {contagem.get('indefinido', 0)} sem resultado, "
+            f"{self.pulados} pulado(s) por retomada", "INFO"
+        )
+        return contagem
+
+    def registrar_versao(self, caminho):
+        """Associa o conteúdo atual de `caminho`, regravado durante a execução, à chave dela."""
+        if self.execucao is None:
+            return
+        try:
+            versao_hash = hash_arquivo(caminho)
+            with self._lock:
+                if self.execucao is None or versao_hash == self.arquivo_hash:
+                    return
+                conexao = self._conectar()
+                with conexao:
+                    conexao.execute(
+                        "INSERT OR REPLACE INTO versoes (versao_hash, arquivo_hash, atualizado_em) VALUES (?, ?, ?)",
+                        (versao_hash, self.arquivo_hash, _agora()),
+                    )
+        except (OSError, sqlite3.Error) as e:
+            log_message(f"⚠️ Falha ao gravar o diário de progresso ({os.path.basename(caminho)}): {e}", "WARNING")
+
+    def concluido(self, metodo, item):
+        """(True, resultado) se o item já teve sucesso com esta planilha e pode ser pulado."""
+        with self._lock:
+            linha = self._conectar().execute(
+                "SELECT resultado FROM itens WHERE modulo = ? AND arquivo_hash = ? AND metodo = ? AND item = ? "
+                "AND situacao = 'sucesso' AND reutilizavel = 1",
+                (self.modulo, self.arquivo_hash, metodo, item),
+            ).fetchone()
+        if linha is None:
+            return False, None
+        return True, json.loads(linha[0])
+
+    def registrar(self, metodo, item, situacao, resultado=None, erro=None):
+        """Grava o estado do item numa transação própria."""
+        reutilizavel = 0
+        resultado_json = None
+        if situacao == "sucesso":
+            try:
+                resultado_json = json.dumps(resultado, ensure_ascii=False)
+                reutilizavel = 1
+            except (TypeError, ValueError):
+                # Sem como devolver o mesmo resultado numa retomada, o item é refeito
+                pass
+        with self._lock:
+            if self.execucao is None:
+                return
+            try:
+                conexao = self._conectar()
+                with conexao:
+                    conexao.execute(
+                        """
+                        INSERT INTO itens (modulo, arquivo_hash, metodo, item, situacao, tentativas, resultado,
+                                           reutilizavel, erro, execucao, atualizado_em)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT (modulo, arquivo_hash, metodo, item) DO UPDATE SET
+                            situacao = excluded.situacao,
+                            tentativas = itens.tentativas + excluded.tentativas,
+                            resultado = excluded.resultado,
+                            reutilizavel = excluded.reutilizavel,
+                            erro = excluded.erro,
+                            execucao = excluded.execucao,
+                            atualizado_em = excluded.atualizado_em
+                        """,
+                        (self.modulo, self.arquivo_hash, metodo, item, situacao, int(situacao == "iniciado"),
+                         resultado_json, reutilizavel, erro, self.execucao, _agora()),
+                    )
+            except sqlite3.Error as e:
+                log_message(f"⚠️ Falha ao gravar o diário de progresso ({item}): {e}", "WARNING")
+
+    def limpar(self, dias):
+        limite = (datetime.now() - timedelta(days=dias)).isoformat(timespec="seconds")
+        with self._lock:
+            conexao = self._conectar()
+            with conexao:
+                removidos = conexao.execute("DELETE FROM itens WHERE atualizado_em < ?", (limite,)).rowcount
+                conexao.execute("DELETE FROM execucoes WHERE inicio < ?", (limite,))
+                conexao.execute("DELETE FROM versoes WHERE atualizado_em < ?", (limite,))
+        return removidos
+
+    def execucoes_recentes(self, limite=20):
+        with self._lock:
+            return self._conectar().execute(
+                """
+                SELECT e.id, e.modulo, e.arquivo, e.inicio, e.fim, e.situacao,
+                       SUM(i.situacao = 'sucesso'), SUM(i.situacao = 'falha'), SUM(i.situacao = 'iniciado')
+                FROM execucoes e LEFT JOIN itens i ON i.execucao = e.id
+                GROUP BY e.id ORDER BY e.id DESC LIMIT ?
+                """,
+                (limite,),
+            ).fetchall()
+
+
+diario = Diario()
+
+
+def _nome_modulo(cls):
+    # A interface importa "modules.x" e os scripts "src.modules.x": o id tem de ser o mesmo
+    nome = cls.__module__
+    return nome[len("src."):] if nome.startswith("src.") else nome
+
+
+def _situacao(resultado):
+    """Só um dict de status ok ou um retorno verdadeiro contam como item concluído."""
+    if isinstance(resultado, dict) or resultado is False:
+        return "sucesso" if resultado_ok(resultado) else "falha"
+    # None (método que só registra no log) não prova que o item foi feito: ele é refeito na retomada
+    return "sucesso" if resultado else "indefinido"
+
+
+def registrar_item(func):
+    """Grava início/sucesso/falha do item e, na retomada, pula os itens já concluídos."""
+    metodo = func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not diario.em_execucao:
+            return func(*args, **kwargs)
+        identificador = identificar_item(args[1:], kwargs)
+        if identificador is None:
+            return func(*args, **kwargs)
+        item = str(identificador)
+
+        if diario.retomar:
+            concluido, resultado = diario.concluido(metodo, item)
+            if concluido:
+                with diario._lock:
+                    diario.pulados += 1
+                log_message(f"⏭️ {item} já concluído em execução anterior - pulando", "INFO")
+                return resultado
+
+        diario.registrar(metodo, item, "iniciado")
+        try:
+            resultado = func(*args, **kwargs)
+        except BaseException as e:
+            diario.registrar(metodo, item, "falha", erro=f"{type(e).__name__}: {e}"[:300])
+            raise
+        situacao = _situacao(resultado)
+        if situacao != "falha":
+            diario.registrar(metodo, item, situacao, resultado=resultado)
+        else:
+            erro = (resultado.get("detalhes") or resultado.get("erro")) if isinstance(resultado, dict) else None
+            diario.registrar(metodo, item, "falha", erro=None if erro is None else str(erro)[:300])
+        return resultado
+
+    wrapper._diario = True
+    return wrapper
+
+
+def _registrar_execucao(func, modulo):
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        params = args[0] if args and isinstance(args[0], dict) else kwargs.get("params")
+        if not diario.ativo or diario.em_execucao or not isinstance(params, dict):
+            return func(self, *args, **kwargs)
+        if diario.iniciar(modulo, params.get("excel_file"), retomar=bool(params.get("retomar"))) is None:
+            return func(self, *args, **kwargs)
+
+        situacao = "erro"
+        try:
+            resultado = func(self, *args, **kwargs)
+            cancel_flag = params.get("cancel_flag")
+            situacao = "cancelada" if cancel_flag is not None and cancel_flag.is_set() else "concluida"
+            return resultado
+        except BaseException as e:
+            # KeyboardInterrupt, ou ExecucaoCancelada lançada por dormir/aguardar depois do Parar
+            cancel_flag = params.get("cancel_flag")
+            if isinstance(e, KeyboardInterrupt) or (cancel_flag is not None and cancel_flag.is_set()):
+                situacao = "cancelada"
+            raise
+        finally:
+            diario.finalizar(situacao)
+
+    wrapper._diario = True
+    return wrapper
+
+
+def instrumentar_classe(cls, itens=()):
+    """Liga o diário ao `run` e aos métodos por item de `cls` (usado por BaseModule)."""
+    for nome, valor in list(vars(cls).items()):
+        if not inspect.isfunction(valor) or getattr(valor, "_diario", False):
+            continue
+        if nome == "run":
+            setattr(cls, nome, _registrar_execucao(valor, _nome_modulo(cls)))
+        elif nome in itens:
+            setattr(cls, nome, registrar_item(valor))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Diário de progresso das execuções do RPA")
+    parser.add_argument("--limite", type=int, default=20, help="quantidade de execuções listadas")
+    parser.add_argument("--limpar", type=int, metavar="DIAS", help="remove registros mais antigos que DIAS")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(diario.caminho):
+        print(f"Nenhum diário em {diario.caminho}")
+        return 1
+    if args.limpar is not None:
+        print(f"{diario.limpar(args.limpar)} item(ns) removido(s)")
+        return 0
+
+    print(f"{'id':>5}  {'início':<20}{'situação':<14}{'ok':>6}{'falha':>7}{'interr.':>9}  módulo / arquivo")
+    for id_, modulo, arquivo, inicio, _fim, situacao, ok, falha, iniciado in diario.execucoes_recentes(args.limite):
+        print(f"{id_:>5}  {inicio:<20}{situacao:<14}{ok or 0:>6}{falha or 0:>7}{iniciado or 0:>9}  "
+              f"{modulo} / {os.path.basename(arquivo or '')}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
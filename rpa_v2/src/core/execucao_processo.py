@@ -0,0 +1,201 @@
+"""Execução de um módulo num processo separado da interface.
+
+Com RPA_EXECUCAO=processo a janela não roda `mod.run(params)` numa thread própria: cada
+execução ganha um processo filho (contexto spawn, o mesmo no Windows e no executável
+do PyInstaller). Os `log_message` e os instantâneos do progresso (src/core/progresso.py)
+voltam por uma multiprocessing.Queue.
+
+O botão Parar liga o `cancel_flag` (um multiprocessing.Event, que os módulos consultam
+como antes) e, se o módulo não terminar em RPA_CANCELAMENTO_PRAZO segundos, o processo
+é encerrado junto com os chromedriver/Chrome que abriu. Ao fim da execução o processo
+fecha todos os Chrome do pool, inclusive os que o módulo deixou abertos de propósito,
+e termina; toda a memória (pandas, drivers, OCR) volta para o sistema.
+"""
+import builtins
+import importlib
+import multiprocessing
+import os
+import queue
+import signal
+import subprocess
+import threading
+
+EXECUCAO_PROCESSO = os.getenv("RPA_EXECUCAO", "thread").lower() == "processo"
+CANCELAMENTO_PRAZO = float(os.getenv("RPA_CANCELAMENTO_PRAZO", "10"))
+INTERVALO_PROGRESSO = 0.5
+
+
+def encerrar_arvore(pid):
+    """Mata o processo `pid` e os filhos dele (chromedriver e Chrome)."""
+    if os.name == "nt":
+        subprocess.run(["taskkill", "/F", "/T", "/PID", str(pid)], capture_output=True)
+        return
+    try:
+        # O filho chama os.setsid(): o grupo dele tem o mesmo número do pid
+        os.killpg(pid, signal.SIGKILL)
+    except OSError:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+
+def _janela_oculta():
+    # Os módulos usam tkinter.messagebox; sem uma raiz oculta o Tk abriria uma janela vazia
+    try:
+        import tkinter as tk
+        raiz = tk.Tk()
+        raiz.withdraw()
+        return raiz
+    except Exception:
+        return None
+
+
+def _executar_no_filho(module_path, params, cancel_flag, fila):
+    if hasattr(os, "setsid"):
+        os.setsid()
+
+    from src.core.browser_factory import BrowserFactory
+    from src.core.logger import log_message, set_logger_callback
+    from src.core.progresso import progresso
+    from src.core.waits import ExecucaoCancelada, definir_cancelamento, log_resumo_esperas, resetar_estatisticas
+
+    set_logger_callback(lambda message, level="INFO": fila.put(("log", str(message), level)))
+    definir_cancelamento(cancel_flag)
+    # O stdin do filho é /dev/null: o input("Pressione Enter para fechar o navegador...")
+    # do finally de alguns módulos lançaria EOFError e pularia o release_chrome
+    builtins.input = lambda prompt="": ""
+    parar = threading.Event()
+
+    def enviar_progresso():
+        geracao = None
+        while not parar.wait(INTERVALO_PROGRESSO):
+            dados = progresso.instantaneo()
+            if dados["em_execucao"] or dados["geracao"] != geracao:
+                fila.put(("progresso", dados))
+                geracao = dados["geracao"]
+
+    threading.Thread(target=enviar_progresso, daemon=True).start()
+    raiz = _janela_oculta()
+    erro = None
+    resetar_estatisticas()
+    try:
+        mod = importlib.import_module(module_path)
+        if hasattr(mod, "run"):
+            mod.run(dict(params, cancel_flag=cancel_flag))
+    except ExecucaoCancelada as e:
+        log_message(f"⏹️ {e}", "WARNING")
+    except Exception as e:
+        erro = str(e)
+        log_message(f"Erro: {e}", "ERROR")
+    finally:
+        log_resumo_esperas()
+        # Ninguém mais usaria um navegador deixado aberto: sem o quit o chromedriver e o
+        # Chrome sobreviveriam ao processo
+        BrowserFactory.shutdown_pool(emprestados=True)
+        parar.set()
+        fila.put(("progresso", progresso.instantaneo()))
+        fila.put(("fim", erro))
+        if raiz is not None:
+            raiz.destroy()
+
+
+class ExecucaoProcesso:
+    """Um módulo rodando num processo filho.
+
+    ao_log(message, level) e ao_progresso(instantaneo) são chamados da thread que lê a
+    fila; ao_terminar() uma vez, depois que o processo saiu.
+    """
+
+    def __init__(self, module_path, params, ao_log, ao_progresso=None, ao_terminar=None):
+        self.module_path = module_path
+        self.params = {chave: valor for chave, valor in params.items() if chave != "cancel_flag"}
+        self.ao_log = ao_log
+        self.ao_progresso = ao_progresso
+        self.ao_terminar = ao_terminar
+        self.processo = None
+        self.encerrado = False
+        self.erro = None
+        contexto = multiprocessing.get_context("spawn")
+        self._contexto = contexto
+        self.cancel_flag = contexto.Event()
+        self.fila = contexto.Queue()
+
+    @property
+    def em_execucao(self):
+        return self.processo is not None and self.processo.is_alive()
+
+    def iniciar(self):
+        self.processo = self._contexto.Process(
+            target=_executar_no_filho,
+            args=(self.module_path, self.params, self.cancel_flag, self.fila),
+            name="rpa-modulo",
+            # Não daemon: processos daemon não podem ter filhos (pool de OCR com
+            # RPA_OCR_WORKERS > 1). O encerramento forçado já mata a árvore inteira.
+            daemon=False,
+        )
+        self.processo.start()
+        threading.Thread(target=self._acompanhar, daemon=True).start()
+        return self
+
+    def _tratar(self, mensagem):
+        tipo = mensagem[0]
+        if tipo == "log":
+            self.ao_log(mensagem[1], mensagem[2])
+        elif tipo == "progresso" and self.ao_progresso:
+            self.ao_progresso(mensagem[1])
+        elif tipo == "fim":
+            self.erro = mensagem[1]
+            return True
+        return False
+
+    def _acompanhar(self):
+        try:
+            while True:
+                try:
+                    if self._tratar(self.fila.get(timeout=0.2)):
+                        break
+                except queue.Empty:
+                    if not self.processo.is_alive():
+                        # Morreu sem avisar (encerrado ou travou): lê o que ainda ficou na fila
+                        while True:
+                            try:
+                                self._tratar(self.fila.get_nowait())
+                            except queue.Empty:
+                                break
+                        break
+
+            self.processo.join(CANCELAMENTO_PRAZO)
+            if self.processo.is_alive():
+                self.encerrar()
+            if self.encerrado:
+                self.ao_log("⛔ Processo do módulo encerrado à força", "WARNING")
+            elif self.processo.exitcode:
+                self.ao_log(f"❌ Processo do módulo terminou com código {self.processo.exitcode}", "ERROR")
+        finally:
+            if self.ao_terminar:
+                self.ao_terminar()
+
+    def cancelar(self, prazo=CANCELAMENTO_PRAZO):
+        """Pede o cancelamento e encerra o processo se ele não parar em `prazo` segundos."""
+        self.cancel_flag.set()
+
+        def encerrar_apos_prazo():
+            self.processo.join(prazo)
+            if self.processo.is_alive():
+                self.ao_log(f"⛔ O módulo não parou em {prazo:.0f}s - encerrando o processo", "WARNING")
+                self.encerrar()
+
+        if self.em_execucao:
+            threading.Thread(target=encerrar_apos_prazo, daemon=True).start()
+
+    def encerrar(self):
+        """Cancelamento imediato: mata o processo e os navegadores que ele abriu."""
+        if self.processo is None or not self.processo.is_alive():
+            return
+        self.encerrado = True
+        encerrar_arvore(self.processo.pid)
+        self.processo.join(5)
+        if self.processo.is_alive():
+            self.processo.kill()
+            self.processo.join(5)
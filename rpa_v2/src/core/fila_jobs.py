@@ -0,0 +1,370 @@
+"""Fila de execuções (jobs) gravada em SQLite, para encadear módulos sem esperar o operador.
+
+Cada job é o id de um módulo do modules.json com os params da execução (planilha,
+opções). A fila fica em RPA_FILA_DB e sobrevive ao fechamento do programa: um job que
+estava em execução volta para `pendente`, com `retomar` ligado, e o diário de progresso
+pula os itens já concluídos. As senhas não são gravadas; elas são preenchidas na hora
+de executar com as credenciais da janela (ou do .env, no cli.py).
+
+Com RPA_FILA_CONCORRENCIA=1 (padrão) os jobs rodam um depois do outro no próprio
+processo, na ordem em que entraram, reaproveitando o pool de navegadores e as sessões
+já logadas. Com mais de 1, cada job roda num processo separado
+(src/core/execucao_processo.py), respeitando o limite de jobs simultâneos por portal
+de RPA_FILA_LIMITES (ex.: "pathoweb=2,unimed=1").
+
+    python -m src.core.fila_jobs                  # jobs da fila
+    python -m src.core.fila_jobs --remover 12     # tira um job pendente da fila
+    python -m src.core.fila_jobs --limpar         # remove os jobs finalizados
+"""
+import argparse
+import importlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from src.core.execucao_processo import ExecucaoProcesso
+from src.core.logger import log_message
+from src.core.waits import ExecucaoCancelada, log_resumo_esperas, resetar_estatisticas
+
+FILA_DB = os.getenv("RPA_FILA_DB", os.path.join(os.getcwd(), "logs", "fila.sqlite3"))
+FILA_CONCORRENCIA = int(os.getenv("RPA_FILA_CONCORRENCIA", "1"))
+FILA_LIMITES = os.getenv("RPA_FILA_LIMITES", "")
+FILA_PARAR_EM_ERRO = os.getenv("RPA_FILA_PARAR_EM_ERRO", "1") == "1"
+
+# Não vão para o disco: são preenchidas na hora de executar
+CHAVES_SENHA = ("password", "unimed_pass", "hospital_pass")
+SITUACOES_FINAIS = ("concluido", "erro", "cancelado")
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    modulo TEXT NOT NULL,
+    params TEXT NOT NULL,
+    excel_file TEXT,
+    situacao TEXT NOT NULL DEFAULT 'pendente',
+    criado_em TEXT NOT NULL,
+    inicio TEXT,
+    fim TEXT,
+    erro TEXT
+);
+"""
+
+
+def _agora():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def ler_limites(texto):
+    """"pathoweb=2,unimed=1" -> {"pathoweb": 2, "unimed": 1}"""
+    limites = {}
+    for parte in (texto or "").split(","):
+        portal, _, valor = parte.partition("=")
+        if portal.strip() and valor.strip().isdigit():
+            limites[portal.strip().lower()] = int(valor)
+    return limites
+
+
+def portais_do_modulo(modulo):
+    """Portais que o módulo usa: "portais" no modules.json ou deduzidos das credenciais exigidas."""
+    if modulo.get("portais"):
+        return [portal.lower() for portal in modulo["portais"]]
+    portais = ["pathoweb"]
+    if modulo.get("requires_unimed_credentials"):
+        portais.append("unimed")
+    if modulo.get("requires_hospital_credentials"):
+        portais.append("hospital")
+    return portais
+
+
+class FilaJobs:
+    """Jobs gravados em disco. Uma conexão só, protegida por lock (janela + executor)."""
+
+    def __init__(self, caminho=FILA_DB):
+        self.caminho = caminho
+        self._conexao = None
+        self._lock = threading.Lock()
+
+    def _conectar(self):
+        if self._conexao is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.caminho)), exist_ok=True)
+            conexao = sqlite3.connect(self.caminho, timeout=10, check_same_thread=False)
+            conexao.row_factory = sqlite3.Row
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.executescript(ESQUEMA)
+            self._conexao = conexao
+        return self._conexao
+
+    @staticmethod
+    def _job(linha):
+        job = dict(linha)
+        job["params"] = json.loads(job["params"])
+        return job
+
+    def adicionar(self, modulo, params):
+        """Enfileira `modulo` com `params` (sem senhas nem cancel_flag). Devolve o id do job."""
+        gravaveis = {chave: valor for chave, valor in params.items()
+                     if chave not in CHAVES_SENHA and chave != "cancel_flag"}
+        with self._lock:
+            conexao = self._conectar()
+            with conexao:
+                cursor = conexao.execute(
+                    "INSERT INTO jobs (modulo, params, excel_file, criado_em) VALUES (?, ?, ?, ?)",
+                    (modulo, json.dumps(gravaveis, ensure_ascii=False), params.get("excel_file"), _agora()),
+                )
+        return cursor.lastrowid
+
+    def listar(self, somente_pendentes=False):
+        filtro = "WHERE situacao = 'pendente'" if somente_pendentes else ""
+        with self._lock:
+            linhas = self._conectar().execute(f"SELECT * FROM jobs {filtro} ORDER BY id").fetchall()
+        return [self._job(linha) for linha in linhas]
+
+    def marcar(self, job_id, situacao, erro=None):
+        coluna = "inicio" if situacao == "executando" else "fim"
+        with self._lock:
+            conexao = self._conectar()
+            with conexao:
+                conexao.execute(f"UPDATE jobs SET situacao = ?, erro = ?, {coluna} = ? WHERE id = ?",
+                                (situacao, erro, _agora(), job_id))
+
+    def recuperar_interrompidos(self):
+        """Jobs que estavam em execução quando o programa caiu voltam para a fila, em modo retomar."""
+        with self._lock:
+            conexao = self._conectar()
+            linhas = conexao.execute("SELECT * FROM jobs WHERE situacao = 'executando'").fetchall()
+            with conexao:
+                for linha in linhas:
+                    params = json.loads(linha["params"])
+                    if params.get("excel_file"):
+                        params["retomar"] = True
+                    conexao.execute("UPDATE jobs SET situacao = 'pendente', params = ? WHERE id = ?",
+                                    (json.dumps(params, ensure_ascii=False), linha["id"]))
+        return len(linhas)
+
+    def remover(self, job_id):
+        with self._lock:
+            conexao = self._conectar()
+            with conexao:
+                return conexao.execute("DELETE FROM jobs WHERE id = ? AND situacao != 'executando'",
+                                       (job_id,)).rowcount
+
+    def limpar_finalizados(self):
+        with self._lock:
+            conexao = self._conectar()
+            with conexao:
+                return conexao.execute(
+                    f"DELETE FROM jobs WHERE situacao IN ({', '.join('?' * len(SITUACOES_FINAIS))})",
+                    SITUACOES_FINAIS,
+                ).rowcount
+
+
+fila_jobs = FilaJobs()
+
+
+def executar_no_processo_atual(module_path, params):
+    """Mesmo fluxo da janela: zera as estatísticas de espera, roda o módulo e registra o resumo."""
+    resetar_estatisticas()
+    try:
+        mod = importlib.import_module(module_path)
+        if hasattr(mod, "run"):
+            mod.run(params)
+    finally:
+        log_resumo_esperas()
+
+
+class ExecutorFila:
+    """Consome a fila numa thread até ela esvaziar, parar por erro ou `parar()`.
+
+    modulos -> {id: entrada do modules.json}
+    credenciais() -> dict com usuário/senhas usados para completar os params de cada job
+    cancel_flag -> evento de cancelamento da execução no próprio processo (o do Parar)
+    limites -> {portal: jobs simultâneos}; portal fora dele só é limitado pela concorrência
+    """
+
+    def __init__(self, modulos, credenciais=None, cancel_flag=None, ao_log=log_message, ao_progresso=None,
+                 ao_terminar=None, fila=fila_jobs, concorrencia=FILA_CONCORRENCIA, limites=None,
+                 parar_em_erro=FILA_PARAR_EM_ERRO):
+        self.modulos = modulos
+        self.credenciais = credenciais or (lambda: {})
+        self.cancel_flag = cancel_flag or threading.Event()
+        self.ao_log = ao_log
+        self.ao_progresso = ao_progresso
+        self.ao_terminar = ao_terminar
+        self.fila = fila
+        self.concorrencia = max(1, concorrencia)
+        self.limites = ler_limites(FILA_LIMITES) if limites is None else limites
+        self.parar_em_erro = parar_em_erro
+        self._parar = threading.Event()
+        self._lock = threading.Lock()
+        self._rodando = {}
+        self.thread = None
+        self.iniciada_em = None
+
+    @property
+    def em_execucao(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def iniciar(self):
+        recuperados = self.fila.recuperar_interrompidos()
+        if recuperados:
+            self.ao_log(f"📋 {recuperados} job(s) interrompido(s) voltaram para a fila em modo retomar", "WARNING")
+        self._parar.clear()
+        self.iniciada_em = _agora()
+        self.thread = threading.Thread(target=self._consumir, daemon=True)
+        self.thread.start()
+        return self
+
+    def parar(self, imediato=False):
+        """Não inicia mais jobs e cancela os que estão rodando (eles ficam como `cancelado`).
+
+        Com `imediato` os processos dos jobs são encerrados na hora (fechamento da janela).
+        """
+        self._parar.set()
+        self.cancel_flag.set()
+        with self._lock:
+            execucoes = [execucao for _job, execucao in self._rodando.values() if execucao is not None]
+        for execucao in execucoes:
+            if imediato:
+                execucao.encerrar()
+            else:
+                execucao.cancelar()
+
+    def _params(self, job):
+        params = dict(job["params"])
+        for chave, valor in self.credenciais().items():
+            if valor and not params.get(chave):
+                params[chave] = valor
+        return params
+
+    def limite(self, portal):
+        """Jobs simultâneos permitidos no portal: o de RPA_FILA_LIMITES ou a própria concorrência."""
+        return self.limites.get(portal, self.concorrencia)
+
+    def _cabe(self, job, ocupados):
+        if len(self._rodando) >= self.concorrencia:
+            return False
+        for portal in portais_do_modulo(self.modulos.get(job["modulo"], {})):
+            if ocupados.get(portal, 0) >= self.limite(portal):
+                return False
+        return True
+
+    def _proximo(self):
+        ocupados = {}
+        with self._lock:
+            for job, _execucao in self._rodando.values():
+                for portal in portais_do_modulo(self.modulos.get(job["modulo"], {})):
+                    ocupados[portal] = ocupados.get(portal, 0) + 1
+            for job in self.fila.listar(somente_pendentes=True):
+                if job["id"] not in self._rodando and self._cabe(job, ocupados):
+                    return job
+        return None
+
+    def _consumir(self):
+        try:
+            while not self._parar.is_set():
+                job = self._proximo()
+                if job is None:
+                    with self._lock:
+                        vazio = not self._rodando
+                    if vazio:
+                        break
+                    self._parar.wait(0.5)
+                    continue
+
+                modulo = self.modulos.get(job["modulo"])
+                if modulo is None:
+                    self.fila.marcar(job["id"], "erro", f"Módulo '{job['modulo']}' não existe no modules.json")
+                    continue
+
+                self.fila.marcar(job["id"], "executando")
+                self.ao_log(f"📋 Job {job['id']}: {modulo.get('name', job['modulo'])} "
+                            f"({os.path.basename(job.get('excel_file') or '') or 'sem planilha'})", "INFO")
+                if self.concorrencia == 1:
+                    self._executar_aqui(job, modulo)
+                else:
+                    self._executar_em_processo(job, modulo)
+
+            # Parado: espera os jobs em processo separado terminarem (o Parar já os cancelou)
+            while True:
+                with self._lock:
+                    if not self._rodando:
+                        break
+                self._parar.wait(0.5)
+        finally:
+            pendentes = len(self.fila.listar(somente_pendentes=True))
+            self.ao_log(f"📋 Fila encerrada - {pendentes} job(s) pendente(s)", "INFO")
+            if self.ao_terminar:
+                self.ao_terminar()
+
+    def _terminar(self, job, situacao, erro=None):
+        with self._lock:
+            self._rodando.pop(job["id"], None)
+        self.fila.marcar(job["id"], situacao, erro)
+        nivel = {"concluido": "SUCCESS", "cancelado": "WARNING"}.get(situacao, "ERROR")
+        self.ao_log(f"📋 Job {job['id']} {situacao}" + (f": {erro}" if erro else ""), nivel)
+        if situacao == "erro" and self.parar_em_erro:
+            self.ao_log("📋 Fila pausada por erro (RPA_FILA_PARAR_EM_ERRO) - os próximos jobs continuam pendentes",
+                        "WARNING")
+            self._parar.set()
+        elif situacao == "cancelado":
+            self._parar.set()
+
+    def _executar_aqui(self, job, modulo):
+        # Mesmo processo: o pool de navegadores e as sessões logadas passam de um job para o outro
+        with self._lock:
+            self._rodando[job["id"]] = (job, None)
+        params = self._params(job)
+        params["cancel_flag"] = self.cancel_flag
+        try:
+            executar_no_processo_atual(modulo["module_path"], params)
+        except ExecucaoCancelada:
+            self._terminar(job, "cancelado")
+            return
+        except Exception as e:
+            self._terminar(job, "erro", str(e)[:300])
+            return
+        self._terminar(job, "cancelado" if self.cancel_flag.is_set() else "concluido")
+
+    def _executar_em_processo(self, job, modulo):
+        def ao_log(message, level="INFO"):
+            self.ao_log(f"[job {job['id']}] {message}", level)
+
+        def ao_terminar():
+            if execucao.encerrado or execucao.cancel_flag.is_set():
+                self._terminar(job, "cancelado")
+            elif execucao.erro or execucao.processo.exitcode:
+                self._terminar(job, "erro", execucao.erro or f"código de saída {execucao.processo.exitcode}")
+            else:
+                self._terminar(job, "concluido")
+
+        execucao = ExecucaoProcesso(modulo["module_path"], self._params(job), ao_log=ao_log,
+                                    ao_progresso=self.ao_progresso, ao_terminar=ao_terminar)
+        with self._lock:
+            self._rodando[job["id"]] = (job, execucao)
+        execucao.iniciar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fila de execuções do RPA")
+    parser.add_argument("--remover", type=int, metavar="ID", help="remove um job que não está em execução")
+    parser.add_argument("--limpar", action="store_true", help="remove os jobs finalizados")
+    args = parser.parse_args(argv)
+
+    if args.remover is not None:
+        print(f"{fila_jobs.remover(args.remover)} job(s) removido(s)")
+        return 0
+    if args.limpar:
+        print(f"{fila_jobs.limpar_finalizados()} job(s) removido(s)")
+        return 0
+
+    print(f"{'id':>5}  {'situação':<12}{'criado em':<21}módulo / planilha")
+    for job in fila_jobs.listar():
+        print(f"{job['id']:>5}  {job['situacao']:<12}{job['criado_em']:<21}"
+              f"{job['modulo']} / {os.path.basename(job['excel_file'] or '')}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,257 @@
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from urllib.parse import urljoin, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from selenium.webdriver.remote.webelement import WebElement
+
+from src.core.logger import log_message
+
+# Ativa o envio direto (HTTP) das ações AJAX do Pathoweb; o navegador continua como reserva
+HTTP_FAST_PATH = os.getenv("RPA_HTTP_FAST_PATH", "0") == "1"
+HTTP_TIMEOUT = float(os.getenv("RPA_HTTP_TIMEOUT", "15"))
+HTTP_POOL = int(os.getenv("RPA_HTTP_POOL", "4"))
+# Depois de tantas falhas seguidas o atalho é desligado até o fim da execução
+MAX_FALHAS_SEGUIDAS = 3
+
+MARCADORES_ERRO = ("alert-danger", "swal2-error", "Ocorreu um erro", "j_password")
+# Alerta de sucesso que o clique mostra depois de salvar
+MARCADORES_SUCESSO = ("alert-success", "swal2-success")
+
+_JS_DADOS_LINK = """
+    var link = arguments[0], nomes = arguments[1] || [], seletorEscopo = arguments[2];
+    if (typeof link === 'string') { link = document.querySelector(link); }
+    if (!link) { return null; }
+    var url = link.getAttribute('data-url') || link.getAttribute('href');
+    var seletorForm = link.getAttribute('data-form');
+    var form = seletorForm ? document.querySelector(seletorForm) : link.closest('form');
+    var campos = [];
+    if (window.CKEDITOR) {
+        // O CKEditor só copia o texto para o textarea no submit
+        for (var nome in CKEDITOR.instances) { CKEDITOR.instances[nome].updateElement(); }
+    }
+    if (form) {
+        new FormData(form).forEach(function(valor, nome) {
+            if (typeof valor === 'string') { campos.push([nome, valor]); }
+        });
+    } else if (nomes.length) {
+        // Só os checkboxes informados pelo chamador, dentro da tabela da ação
+        var escopo = seletorEscopo ? document.querySelector(seletorEscopo) : link.closest('table');
+        if (!escopo) { return {url: url, escopo: false}; }
+        escopo.querySelectorAll("input[type='checkbox'][name]:checked").forEach(function(el) {
+            if (nomes.indexOf(el.name) >= 0) { campos.push([el.name, el.value]); }
+        });
+    }
+    return {
+        url: url,
+        metodo: (link.getAttribute('data-method') || 'POST').toUpperCase(),
+        campos: campos,
+        escopo: true,
+        formulario: !!form,
+        pagina: window.location.href,
+        agente: navigator.userAgent
+    };
+"""
+
+
+class FalhaTransporte(Exception):
+    pass
+
+
+class TransporteAjax:
+    """Envia as ações AJAX do Pathoweb direto por HTTP, reaproveitando a sessão do navegador.
+
+    Os cookies e o User-Agent são copiados do driver a cada envio, então a sessão é
+    sempre a mesma que o Selenium está usando. A resposta é validada (status, volta
+    para o login, marcadores de erro) e só conta como feita com a mesma confirmação
+    que o clique espera: `sucesso: true` no JSON ou um dos marcadores de `confirmacao`
+    no HTML. Qualquer dúvida vira `FalhaTransporte` - quem chama repete a ação pelo
+    navegador. Por isso só deve ser usado em ações idempotentes (salvar o mesmo
+    formulário, mudar o status para o mesmo valor).
+    """
+
+    def __init__(self, pool_size=HTTP_POOL, timeout=HTTP_TIMEOUT):
+        self.timeout = timeout
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.http.mount("https://", adapter)
+        self.http.mount("http://", adapter)
+        self.http.headers.update({
+            "X-Requested-With": "XMLHttpRequest",
+            "Accept": "text/html, application/json, */*; q=0.01",
+        })
+
+    def sincronizar(self, driver, agente=None):
+        self.http.cookies.clear()
+        for cookie in driver.get_cookies():
+            self.http.cookies.set(cookie["name"], cookie["value"],
+                                  domain=cookie.get("domain"), path=cookie.get("path", "/"))
+        if agente:
+            self.http.headers["User-Agent"] = agente
+
+    @staticmethod
+    def _validar(resposta, confirmacao=MARCADORES_SUCESSO, valores=()):
+        if resposta.status_code >= 400:
+            raise FalhaTransporte(f"HTTP {resposta.status_code}")
+        if "login/auth" in urlparse(resposta.url).path:
+            raise FalhaTransporte("sessão expirada")
+
+        if "json" in resposta.headers.get("Content-Type", ""):
+            try:
+                dados = resposta.json()
+            except ValueError:
+                raise FalhaTransporte("JSON inválido")
+            if isinstance(dados, dict):
+                if dados.get("erro") or dados.get("error") or dados.get("errors"):
+                    raise FalhaTransporte(str(dados.get("erro") or dados.get("error") or dados.get("errors")))
+                if dados.get("success") is True or dados.get("sucesso") is True:
+                    return
+            raise FalhaTransporte(f"resposta sem confirmação: {json.dumps(dados, ensure_ascii=False)[:200]}")
+
+        texto = resposta.text
+        for marcador in MARCADORES_ERRO:
+            if marcador in texto:
+                raise FalhaTransporte(f"resposta contém '{marcador}'")
+        if not any(marcador in texto for marcador in confirmacao):
+            raise FalhaTransporte("resposta sem confirmação")
+        # Tabela redesenhada pela ação: cada item enviado tem de voltar nela
+        faltando = [valor for valor in valores if valor not in texto]
+        if faltando:
+            raise FalhaTransporte(f"itens ausentes na resposta: {', '.join(faltando[:5])}")
+
+    def enviar(self, url, campos=None, metodo="POST", referer=None, confirmacao=MARCADORES_SUCESSO,
+               confirmar_itens=False):
+        headers = {"Referer": referer} if referer else {}
+        try:
+            if metodo == "GET":
+                resposta = self.http.get(url, params=campos, headers=headers, timeout=self.timeout)
+            else:
+                resposta = self.http.post(url, data=campos, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise FalhaTransporte(str(e))
+        valores = [valor for _nome, valor in campos or ()] if confirmar_itens else ()
+        self._validar(resposta, confirmacao, valores)
+        return resposta
+
+    def disparar_link(self, driver, link, campos=(), escopo=None, confirmacao=MARCADORES_SUCESSO,
+                      exigir_campos=False, exigir_formulario=False):
+        """Faz o mesmo envio que o clique em um link `chamadaAjax` (data-url + formulário).
+
+        Sem formulário associado ao link, envia só os checkboxes marcados cujo nome está
+        em `campos`, dentro de `escopo` (seletor CSS; padrão: a tabela do link), e a
+        resposta tem de trazer de volta cada item enviado (a tabela redesenhada). Sem
+        formulário nem `campos` a ação não tem como montar o corpo e fica para o navegador.
+        """
+        dados = driver.execute_script(_JS_DADOS_LINK, link, list(campos), escopo)
+        if not dados or not dados.get("url"):
+            raise FalhaTransporte("link não encontrado")
+        if not dados["escopo"]:
+            raise FalhaTransporte(f"tabela da ação não encontrada ({escopo})")
+        if exigir_formulario and not dados["formulario"]:
+            raise FalhaTransporte("formulário não encontrado")
+        if not dados["formulario"] and not campos:
+            raise FalhaTransporte("campos da ação não informados")
+        if exigir_campos and not dados["campos"]:
+            raise FalhaTransporte("nenhum item selecionado")
+
+        self.sincronizar(driver, dados.get("agente"))
+        url = urljoin(dados["pagina"], dados["url"])
+        return self.enviar(url, [tuple(campo) for campo in dados["campos"]], dados["metodo"], dados["pagina"],
+                           confirmacao=confirmacao, confirmar_itens=not dados["formulario"])
+
+
+_transportes = {}
+_falhas_seguidas = 0
+_lock = threading.Lock()
+
+
+def http_ativo():
+    return HTTP_FAST_PATH and _falhas_seguidas < MAX_FALHAS_SEGUIDAS
+
+
+def reiniciar():
+    """Religa o atalho desligado por falhas seguidas (início de cada execução de módulo)."""
+    global _falhas_seguidas
+    with _lock:
+        _falhas_seguidas = 0
+
+
+def descartar_transporte(driver):
+    """Esquece o transporte do driver devolvido ou encerrado (o id pode ser reaproveitado)."""
+    with _lock:
+        transporte = _transportes.pop(id(driver), None)
+    if transporte is not None:
+        transporte.http.close()
+
+
+def transporte_para(driver):
+    """Transporte (com pool de conexões próprio) associado ao driver."""
+    with _lock:
+        transporte = _transportes.get(id(driver))
+        if transporte is None:
+            transporte = _transportes[id(driver)] = TransporteAjax()
+        return transporte
+
+
+def _registrar_resultado(ok):
+    global _falhas_seguidas
+    with _lock:
+        _falhas_seguidas = 0 if ok else _falhas_seguidas + 1
+        desligar = not ok and _falhas_seguidas == MAX_FALHAS_SEGUIDAS
+    if desligar:
+        log_message(f"⚡ {MAX_FALHAS_SEGUIDAS} falhas seguidas no envio HTTP - usando só o navegador", "WARNING")
+
+
+def tentar_link_http(driver, link, nome="ação", campos=(), escopo=None, confirmacao=MARCADORES_SUCESSO,
+                     exigir_campos=False, exigir_formulario=False):
+    """Tenta executar a ação de um link AJAX por HTTP.
+
+    `link` pode ser um seletor CSS ou um WebElement. Retorna True se o servidor
+    confirmou a ação; False quando o atalho está desligado ou falhou - nesse caso
+    o chamador segue com o clique pelo Selenium. `exigir_formulario` deve ser usado
+    nos botões de salvar, para nunca enviar um cadastro incompleto. Links sem
+    formulário (ações em lote) precisam de `campos` e `escopo`: os nomes dos
+    checkboxes e a tabela de onde vêm; `confirmacao` são os textos que o clique espera
+    ver na resposta.
+    """
+    if not http_ativo():
+        return False
+    if not isinstance(link, (str, WebElement)):
+        return False
+
+    inicio = time.time()
+    try:
+        transporte_para(driver).disparar_link(
+            driver, link, campos=campos, escopo=escopo, confirmacao=confirmacao,
+            exigir_campos=exigir_campos, exigir_formulario=exigir_formulario
+        )
+    except Exception as e:
+        _registrar_resultado(False)
+        log_message(f"⚡ {nome} via HTTP falhou ({e}) - usando o navegador", "WARNING")
+        return False
+
+    _registrar_resultado(True)
+    log_message(f"⚡ {nome} via HTTP ({(time.time() - inicio) * 1000:.0f} ms)", "INFO")
+    return True
+
+
+def _reiniciar_na_execucao(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        reiniciar()
+        return func(*args, **kwargs)
+
+    wrapper._http = True
+    return wrapper
+
+
+def instrumentar_classe(cls):
+    """Faz o `run` de `cls` religar o atalho HTTP a cada execução (usado por BaseModule)."""
+    run = vars(cls).get("run")
+    if inspect.isfunction(run) and not getattr(run, "_http", False):
+        cls.run = _reiniciar_na_execucao(run)
@@ -0,0 +1,170 @@
+import queue
+import threading
+import time
+
+from src.core.browser_factory import BrowserFactory
+from src.core.logger import log_message
+from src.core.progresso import progresso
+from src.core.tracer import resultado_ok
+from src.core.waits import ExecucaoCancelada
+
+
+class ExecutorParalelo:
+    """Distribui as linhas de uma planilha entre vários navegadores headless.
+
+    Cada worker tem o seu próprio driver já logado (preparado por `preparar_worker`)
+    e consome itens de uma fila compartilhada. O `cancel_flag` da execução interrompe
+    todos os workers entre um item e outro; cada worker também tem o seu próprio
+    evento de parada, usado quando o navegador dele não pode ser recuperado.
+    Os resultados voltam na mesma ordem dos itens de entrada.
+
+    O `driver_principal` continua sendo do módulo, que o libera. Se ele cair durante a
+    execução e o worker 1 conseguir um navegador novo, o perdido é liberado aqui e o novo
+    passa para o módulo em `executor.driver_principal`.
+    """
+
+    def __init__(self, num_workers=1, cancel_flag=None, headless=True):
+        self.num_workers = max(1, int(num_workers))
+        self.cancel_flag = cancel_flag
+        self.headless = headless
+        self.paradas = []
+        self.driver_principal = None
+        self._erro_worker = None
+
+    def _cancelado(self, parada):
+        return parada.is_set() or (self.cancel_flag is not None and self.cancel_flag.is_set())
+
+    def cancelar_worker(self, numero):
+        if 0 <= numero < len(self.paradas):
+            self.paradas[numero].set()
+
+    @staticmethod
+    def _driver_ativo(driver):
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _novo_driver(self, numero, preparar_worker):
+        driver = BrowserFactory.acquire_chrome(headless=self.headless)
+        try:
+            if preparar_worker:
+                preparar_worker(driver)
+        except Exception:
+            BrowserFactory.release_chrome(driver)
+            raise
+        log_message(f"🧵 Worker {numero + 1}: navegador pronto", "INFO")
+        return driver
+
+    def _worker(self, numero, fila, resultados, processar_item, preparar_worker, ao_falhar, driver_inicial):
+        parada = self.paradas[numero]
+        driver = driver_inicial
+        try:
+            if driver is None:
+                driver = self._novo_driver(numero, preparar_worker)
+
+            while not self._cancelado(parada):
+                try:
+                    indice, item = fila.get_nowait()
+                except queue.Empty:
+                    break
+
+                try:
+                    resultados[indice] = processar_item(driver, item)
+                    falhou = not resultado_ok(resultados[indice])
+                except ExecucaoCancelada:
+                    # Parar durante o item: ele fica de fora do resultado, como os da fila
+                    break
+                except Exception as e:
+                    log_message(f"❌ Worker {numero + 1}: erro no item {indice + 1}: {e}", "ERROR")
+                    resultados[indice] = ao_falhar(item, e)
+                    falhou = True
+
+                # Os métodos por item costumam devolver {"status": "erro"} em vez de lançar
+                # exceção: o navegador é verificado depois de qualquer item com erro
+                if falhou and not self._driver_ativo(driver):
+                    log_message(f"🔄 Worker {numero + 1}: navegador perdido - recriando", "WARNING")
+                    perdido, driver = driver, None
+                    if perdido is not self.driver_principal:
+                        BrowserFactory.release_chrome(perdido)
+                    try:
+                        driver = self._novo_driver(numero, preparar_worker)
+                    except Exception as erro_driver:
+                        log_message(f"❌ Worker {numero + 1} encerrado: {erro_driver}", "ERROR")
+                        self._erro_worker = erro_driver
+                        parada.set()
+                    else:
+                        if perdido is self.driver_principal:
+                            # O módulo passa a usar o navegador novo e não libera o perdido
+                            self.driver_principal = driver
+                            BrowserFactory.release_chrome(perdido)
+        except Exception as e:
+            log_message(f"❌ Worker {numero + 1} não pôde iniciar: {e}", "ERROR")
+            self._erro_worker = e
+            parada.set()
+        finally:
+            if driver is not None and driver is not self.driver_principal:
+                BrowserFactory.release_chrome(driver)
+
+    def executar(self, itens, processar_item, preparar_worker=None, ao_falhar=None, driver_principal=None):
+        """Processa `itens` em paralelo e devolve a lista de resultados na ordem original.
+
+        processar_item(driver, item) -> resultado
+        preparar_worker(driver) -> deixa um driver novo logado e na tela inicial do fluxo
+        ao_falhar(item, erro) -> resultado registrado quando processar_item lança exceção
+        driver_principal -> driver já preparado pelo módulo, usado pelo primeiro worker
+
+        Itens não processados por causa de cancelamento ficam de fora do resultado. Os que
+        sobram porque nenhum worker conseguiu navegador entram como `ao_falhar(item, erro)`.
+        Depois da chamada, o módulo continua com `executor.driver_principal`.
+        """
+        itens = list(itens)
+        if ao_falhar is None:
+            ao_falhar = lambda item, erro: {"status": "erro", "erro": str(erro)}
+
+        fila = queue.Queue()
+        for indice, item in enumerate(itens):
+            fila.put((indice, item))
+
+        resultados = [None] * len(itens)
+        if progresso.total is None:
+            progresso.definir_total(len(itens))
+        num_workers = min(self.num_workers, len(itens)) or 1
+        self.paradas = [threading.Event() for _ in range(num_workers)]
+        self.driver_principal = driver_principal
+        self._erro_worker = None
+
+        inicio = time.time()
+        log_message(f"🧵 Distribuindo {len(itens)} itens entre {num_workers} navegador(es)", "INFO")
+        threads = []
+        for numero in range(num_workers):
+            thread = threading.Thread(
+                target=self._worker,
+                args=(numero, fila, resultados, processar_item, preparar_worker, ao_falhar,
+                      driver_principal if numero == 0 else None),
+                daemon=True,
+            )
+            threads.append(thread)
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if not (self.cancel_flag is not None and self.cancel_flag.is_set()):
+            # Workers encerrados sem navegador: o que ficou na fila não pode sumir do resultado
+            erro = self._erro_worker or RuntimeError("Nenhum navegador disponível para processar o item")
+            sobras = 0
+            while True:
+                try:
+                    indice, item = fila.get_nowait()
+                except queue.Empty:
+                    break
+                resultados[indice] = ao_falhar(item, erro)
+                sobras += 1
+            if sobras:
+                log_message(f"❌ {sobras} item(ns) sem navegador para processar: {erro}", "ERROR")
+
+        concluidos = [r for r in resultados if r is not None]
+        duracao = time.time() - inicio
+        log_message(f"🧵 {len(concluidos)}/{len(itens)} itens processados em {duracao:.1f}s", "INFO")
+        return concluidos
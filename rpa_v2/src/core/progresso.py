@@ -0,0 +1,220 @@
+"""Progresso da execução em andamento, para o painel da janela principal.
+
+Os módulos informam quantos itens vão processar (`definir_total`) e cada item concluído
+(`item_concluido`); os métodos por item e as etapas de BaseModule já são medidos
+automaticamente, como no tracer. A interface lê um `instantaneo()` periodicamente com
+itens feitos/total, sucessos/erros, ritmo nos últimos RPA_PROGRESSO_JANELA segundos,
+previsão de término e as últimas durações de cada etapa (sparkline).
+
+Tudo aqui é só contagem em memória protegida por um lock: pode ser chamado dos workers
+do ExecutorParalelo e não depende do tracer nem do diário estarem ligados.
+"""
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import deque
+
+from src.core.tracer import resultado_ok
+
+PROGRESSO_JANELA = float(os.getenv("RPA_PROGRESSO_JANELA", "300"))
+# Quantas durações recentes cada etapa guarda para a sparkline
+PONTOS_SPARKLINE = 40
+ETAPA_ITEM = "item"
+
+
+class Progresso:
+    def __init__(self, janela=PROGRESSO_JANELA, pontos=PONTOS_SPARKLINE):
+        self.janela = janela
+        self.pontos = pontos
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.geracao = 0
+        self.modulo = None
+        self.em_execucao = False
+        self._zerar()
+
+    def _zerar(self):
+        self.total = None
+        self.concluidos = 0
+        self.sucessos = 0
+        self.erros = 0
+        self.inicio = None
+        self.fim = None
+        self._finais = deque()
+        self.etapas = {}
+
+    def iniciar(self, modulo):
+        with self._lock:
+            self._zerar()
+            self.modulo = modulo
+            self.inicio = time.time()
+            self.em_execucao = True
+            self.geracao += 1
+
+    def finalizar(self):
+        with self._lock:
+            self.em_execucao = False
+            self.fim = time.time()
+            self.geracao += 1
+
+    def definir_total(self, total):
+        with self._lock:
+            self.total = max(0, int(total))
+            self.geracao += 1
+
+    def item_concluido(self, ok=True, duracao=None, etapa=ETAPA_ITEM):
+        agora = time.time()
+        with self._lock:
+            self.concluidos += 1
+            if ok:
+                self.sucessos += 1
+            else:
+                self.erros += 1
+            self._finais.append(agora)
+            if duracao is not None:
+                self._amostra(etapa, duracao)
+            self.geracao += 1
+
+    def registrar_etapa(self, nome, duracao):
+        with self._lock:
+            self._amostra(nome, duracao)
+            self.geracao += 1
+
+    def _amostra(self, nome, duracao):
+        amostras = self.etapas.get(nome)
+        if amostras is None:
+            amostras = self.etapas[nome] = deque(maxlen=self.pontos)
+        amostras.append(duracao)
+
+    def itens_por_minuto(self, agora=None):
+        """Ritmo nos últimos `janela` segundos (ou desde o início, se a execução for mais curta)."""
+        agora = agora or time.time()
+        with self._lock:
+            return self._ritmo(agora)
+
+    def _ritmo(self, agora):
+        while self._finais and self._finais[0] < agora - self.janela:
+            self._finais.popleft()
+        if not self._finais or self.inicio is None:
+            return 0.0
+        periodo = min(self.janela, max(agora - self.inicio, 1.0))
+        return len(self._finais) * 60.0 / periodo
+
+    def instantaneo(self):
+        """Cópia dos números atuais para a interface."""
+        agora = time.time()
+        with self._lock:
+            ritmo = self._ritmo(agora)
+            restantes = None if self.total is None else max(0, self.total - self.concluidos)
+            eta = None
+            if restantes is not None and ritmo > 0 and self.em_execucao:
+                eta = restantes * 60.0 / ritmo
+            return {
+                "modulo": self.modulo,
+                "em_execucao": self.em_execucao,
+                "total": self.total,
+                "concluidos": self.concluidos,
+                "sucessos": self.sucessos,
+                "erros": self.erros,
+                "decorrido": ((self.fim if not self.em_execucao and self.fim else agora) - self.inicio)
+                             if self.inicio else 0.0,
+                "itens_por_minuto": ritmo,
+                "eta": eta,
+                "etapas": {nome: list(amostras) for nome, amostras in self.etapas.items()},
+                "geracao": self.geracao,
+            }
+
+
+progresso = Progresso()
+
+
+def definir_total(total):
+    progresso.definir_total(total)
+
+
+def item_concluido(ok=True, duracao=None, etapa=ETAPA_ITEM):
+    progresso.item_concluido(ok=ok, duracao=duracao, etapa=etapa)
+
+
+def registrar_etapa(nome, duracao):
+    progresso.registrar_etapa(nome, duracao)
+
+
+# --- Instrumentação automática dos módulos ----------------------------------
+
+def medir_item(func):
+    """Conta o item ao terminar. Só a chamada mais externa conta (processar_dados_exame
+    chamando processar_exame é um item só)."""
+    nome = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        local = progresso._local
+        profundidade = getattr(local, "profundidade", 0)
+        if not progresso.em_execucao or profundidade:
+            local.profundidade = profundidade + 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                local.profundidade = profundidade
+
+        local.profundidade = 1
+        inicio = time.perf_counter()
+        ok = False
+        try:
+            resultado = func(*args, **kwargs)
+            ok = resultado_ok(resultado)
+            return resultado
+        finally:
+            local.profundidade = 0
+            progresso.item_concluido(ok=ok, duracao=time.perf_counter() - inicio, etapa=nome)
+
+    wrapper._progresso = True
+    return wrapper
+
+
+def medir_etapa(func):
+    nome = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not progresso.em_execucao:
+            return func(*args, **kwargs)
+        inicio = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            progresso.registrar_etapa(nome, time.perf_counter() - inicio)
+
+    wrapper._progresso = True
+    return wrapper
+
+
+def _acompanhar_execucao(func):
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if progresso.em_execucao:
+            return func(self, *args, **kwargs)
+        progresso.iniciar(getattr(self, "nome", type(self).__name__))
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            progresso.finalizar()
+
+    wrapper._progresso = True
+    return wrapper
+
+
+def instrumentar_classe(cls, etapas=(), itens=()):
+    """Liga o `run`, os métodos por item e as etapas de `cls` ao progresso (usado por BaseModule)."""
+    for nome, valor in list(vars(cls).items()):
+        if not inspect.isfunction(valor) or getattr(valor, "_progresso", False):
+            continue
+        if nome == "run":
+            setattr(cls, nome, _acompanhar_execucao(valor))
+        elif nome in itens:
+            setattr(cls, nome, medir_item(valor))
+        elif nome in etapas:
+            setattr(cls, nome, medir_etapa(valor))
@@ -0,0 +1,261 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+from src.core.logger import log_message
+
+# Tempo máximo (segundos) sem uso antes de considerar a sessão expirada
+SESSION_TTL = int(os.getenv("RPA_SESSION_TTL", "1800"))
+
+SELETOR_USUARIO = "#username, input[name='j_username'], input[name='email'], input[type='email']"
+SELETOR_SENHA = "#password, input[name='j_password'], input[type='password']"
+
+MODULOS_PATHOWEB = {
+    1: "/moduloExame/index",
+    2: "/moduloFaturamento/index",
+}
+
+
+def pasta_usuario():
+    """Pasta de dados do RPA do usuário, a mesma não importa de onde o programa foi aberto."""
+    if os.name == "nt":
+        base = os.getenv("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Local")
+    else:
+        base = os.getenv("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "SistemaRPA")
+
+
+def caminho_sessao():
+    """Arquivo dos cookies salvos: RPA_SESSION_FILE ou a pasta de dados do usuário."""
+    return os.getenv("RPA_SESSION_FILE") or os.path.join(pasta_usuario(), "pathoweb_session.json")
+
+
+def _driver_headless(driver):
+    try:
+        return "HeadlessChrome" in (driver.execute_script("return navigator.userAgent") or "")
+    except Exception:
+        return False
+
+
+class PathowebSessionManager:
+    """Mantém a sessão autenticada do Pathoweb compartilhada entre os módulos.
+
+    Depois do primeiro login os cookies são salvos em disco. Os próximos drivers
+    recebem esses cookies e só passam pelo formulário de login quando a sessão
+    salva está expirada ou a requisição de verificação indica que ela caiu. O arquivo
+    fica em `caminho_sessao()` e só o usuário pode lê-lo.
+    """
+
+    def __init__(self, session_file=None, ttl=SESSION_TTL):
+        self._session_file = session_file
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+    @property
+    def session_file(self):
+        # Resolvido no uso: importar o módulo não cria pasta nem depende do diretório atual
+        if self._session_file is None:
+            self._session_file = caminho_sessao()
+        return self._session_file
+
+    @session_file.setter
+    def session_file(self, caminho):
+        self._session_file = caminho
+
+    @staticmethod
+    def _base_url(url):
+        parsed = urlparse(url or "")
+        if parsed.scheme and parsed.netloc:
+            return f"{parsed.scheme}://{parsed.netloc}"
+        return "https://dap.pathoweb.com.br"
+
+    @staticmethod
+    def _chave_usuario(username):
+        return hashlib.sha256((username or "").strip().lower().encode("utf-8")).hexdigest()[:16]
+
+    def _ler_arquivo(self):
+        try:
+            with open(self.session_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _gravar_arquivo(self, dados):
+        pasta = os.path.dirname(os.path.abspath(self.session_file))
+        os.makedirs(pasta, mode=0o700, exist_ok=True)
+        tmp = f"{self.session_file}.tmp"
+        # Cookies de sessão valem como senha: o arquivo nasce legível só pelo usuário
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(dados, f)
+        os.chmod(tmp, 0o600)
+        os.replace(tmp, self.session_file)
+
+    def _expirada(self, sessao):
+        agora = time.time()
+        if agora - sessao.get("last_used", 0) > self.ttl:
+            return True
+        for cookie in sessao.get("cookies", []):
+            expiry = cookie.get("expiry")
+            if expiry is not None and expiry <= agora:
+                return True
+        return False
+
+    def carregar(self, username):
+        """Retorna a sessão salva do usuário ou None se não existir/estiver expirada."""
+        with self._lock:
+            sessao = self._ler_arquivo().get(self._chave_usuario(username))
+        if not sessao or self._expirada(sessao):
+            return None
+        return sessao
+
+    def salvar(self, driver, username):
+        with self._lock:
+            dados = self._ler_arquivo()
+            agora = time.time()
+            dados[self._chave_usuario(username)] = {
+                "cookies": driver.get_cookies(),
+                "saved_at": agora,
+                "last_used": agora,
+            }
+            self._gravar_arquivo(dados)
+
+    def tocar(self, username):
+        """Atualiza o último uso da sessão para renovar o TTL."""
+        with self._lock:
+            dados = self._ler_arquivo()
+            sessao = dados.get(self._chave_usuario(username))
+            if sessao:
+                sessao["last_used"] = time.time()
+                self._gravar_arquivo(dados)
+
+    def invalidar(self, username):
+        with self._lock:
+            dados = self._ler_arquivo()
+            if dados.pop(self._chave_usuario(username), None) is not None:
+                self._gravar_arquivo(dados)
+
+    def sessao_ativa(self, cookies, base_url):
+        """Faz uma requisição leve com os cookies salvos para saber se a sessão ainda vale."""
+        http = requests.Session()
+        for cookie in cookies:
+            http.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path", "/"))
+        try:
+            resposta = http.get(f"{base_url}/", allow_redirects=False, timeout=10)
+        except requests.RequestException:
+            # Sem resposta conclusiva - deixa a verificação final para o navegador
+            return True
+        destino = resposta.headers.get("Location", "")
+        return not (resposta.is_redirect and "login" in destino)
+
+    def _navegar_modulo(self, driver, base_url, modulo):
+        if modulo is None:
+            return
+        driver.get(f"{base_url}/site/trocarModulo?modulo={modulo}")
+        if "trocarModulo" in driver.current_url or driver.current_url.rstrip("/") == base_url:
+            driver.get(f"{base_url}{MODULOS_PATHOWEB.get(modulo, '/')}")
+
+    @staticmethod
+    def _fechar_modal_mensagem(driver, headless=False):
+        try:
+            modal_close_button = driver.find_element(By.CSS_SELECTOR, "#mensagemParaClienteModal .modal-footer button")
+            # Em modo headless o is_displayed() pode dar False com o modal ainda bloqueando os cliques
+            if headless:
+                driver.execute_script("arguments[0].click();", modal_close_button)
+            elif modal_close_button.is_displayed():
+                modal_close_button.click()
+        except Exception:
+            pass
+
+    def _injetar_cookies(self, driver, base_url, modulo, sessao):
+        # O Chrome só aceita cookies do domínio que está aberto
+        driver.get(f"{base_url}/login/auth")
+        for cookie in sessao["cookies"]:
+            cookie = {k: v for k, v in cookie.items() if k != "sameSite" or v in ("Strict", "Lax", "None")}
+            try:
+                driver.add_cookie(cookie)
+            except Exception:
+                pass
+        if modulo is None:
+            driver.get(f"{base_url}/")
+        else:
+            self._navegar_modulo(driver, base_url, modulo)
+        return "login/auth" not in driver.current_url
+
+    def _login_formulario(self, driver, username, password, url, timeout):
+        """Preenche o formulário de login. Devolve False se o driver já estava autenticado."""
+        wait = WebDriverWait(driver, timeout)
+        driver.get(url)
+        # O Spring Security tira de /login/auth quem já tem sessão válida nos cookies
+        wait.until(lambda d: "login/auth" not in d.current_url
+                   or d.find_elements(By.CSS_SELECTOR, SELETOR_USUARIO))
+        if "login/auth" not in driver.current_url:
+            return False
+        campo_usuario = driver.find_element(By.CSS_SELECTOR, SELETOR_USUARIO)
+        campo_usuario.clear()
+        campo_usuario.send_keys(username)
+        campo_senha = driver.find_element(By.CSS_SELECTOR, SELETOR_SENHA)
+        campo_senha.clear()
+        campo_senha.send_keys(password)
+        driver.find_element(By.CSS_SELECTOR, "button[type='submit'], input[type='submit']").click()
+        wait.until(lambda d: "login/auth" not in d.current_url)
+        return True
+
+    def login(self, driver, username, password, modulo=None, url=None, timeout=15, compartilhar=True,
+              headless=None):
+        """Deixa o driver autenticado no Pathoweb e, se informado, no módulo indicado.
+
+        Tenta primeiro reaproveitar a sessão salva; se ela estiver morta, faz o login
+        pelo formulário e salva os novos cookies. Com `compartilhar=False` o driver
+        recebe uma sessão própria (usado pelos workers paralelos, para que a seleção
+        de exames de um não interfira na do outro). `headless` (None = descobre pelo
+        navegador) decide como o modal de mensagens é fechado.
+        """
+        url = url or os.getenv("SYSTEM_URL", "https://dap.pathoweb.com.br/login/auth")
+        base_url = self._base_url(url)
+        if headless is None:
+            headless = _driver_headless(driver)
+
+        if not compartilhar:
+            self._login_formulario(driver, username, password, url, timeout)
+            self._navegar_modulo(driver, base_url, modulo)
+            self._fechar_modal_mensagem(driver, headless)
+            return True
+
+        sessao = self.carregar(username)
+        if sessao:
+            inicio = time.time()
+            if self.sessao_ativa(sessao["cookies"], base_url) and self._injetar_cookies(driver, base_url, modulo, sessao):
+                self.tocar(username)
+                self._fechar_modal_mensagem(driver, headless)
+                log_message(f"🍪 Sessão do Pathoweb reaproveitada ({time.time() - inicio:.1f}s)", "SUCCESS")
+                return True
+            log_message("🍪 Sessão salva do Pathoweb expirou - refazendo login", "INFO")
+            self.invalidar(username)
+
+        inicio = time.time()
+        log_message("Fazendo login no Pathoweb...", "INFO")
+        if not self._login_formulario(driver, username, password, url, timeout):
+            log_message("🍪 Navegador já estava autenticado no Pathoweb", "INFO")
+        self.salvar(driver, username)
+        self._navegar_modulo(driver, base_url, modulo)
+        self._fechar_modal_mensagem(driver, headless)
+        log_message(f"✅ Login no Pathoweb realizado ({time.time() - inicio:.1f}s)", "SUCCESS")
+        return True
+
+
+session_manager = PathowebSessionManager()
+
+
+def login_pathoweb(driver, username, password, modulo=None, url=None, timeout=15, compartilhar=True,
+                   headless=None):
+    """Atalho para o gerenciador de sessão compartilhado."""
+    return session_manager.login(driver, username, password, modulo=modulo, url=url, timeout=timeout,
+                                 compartilhar=compartilhar, headless=headless)
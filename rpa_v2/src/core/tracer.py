@@ -0,0 +1,317 @@
+"""Rastreamento do tempo gasto em cada etapa/item das execuções dos módulos.
+
+Cada execução gera um arquivo JSONL em `RPA_TRACE_DIR` (padrão `logs/traces`), com
+um span por linha. Para ver o relatório de uma execução:
+
+    python -m src.core.tracer                 # última execução
+    python -m src.core.tracer arquivo.jsonl --top 20
+"""
+import argparse
+import functools
+import glob
+import inspect
+import json
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+from src.core.logger import log_message
+
+TRACE_ATIVO = os.getenv("RPA_TRACE", "1") == "1"
+TRACE_DIR = os.getenv("RPA_TRACE_DIR", os.path.join(os.getcwd(), "logs", "traces"))
+
+# Chaves usadas para identificar o item quando o método recebe um dict com os dados da linha
+CHAVES_ITEM = ("guia", "exame", "codigo", "num_exame", "numero_exame", "arquivo", "nome_arquivo")
+
+
+class Rastreador:
+    """Grava spans (nome, item, duração, sucesso) da execução corrente em JSONL."""
+
+    def __init__(self, pasta=TRACE_DIR, ativo=TRACE_ATIVO):
+        self.pasta = pasta
+        self.ativo = ativo
+        self.execucao = None
+        self.modulo = None
+        self.caminho = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def iniciar(self, modulo):
+        """Abre um arquivo novo para a execução do módulo. Retorna o caminho."""
+        if not self.ativo:
+            return None
+        os.makedirs(self.pasta, exist_ok=True)
+        nome = unicodedata.normalize("NFKD", modulo or "modulo").encode("ascii", "ignore").decode()
+        nome = re.sub(r"[^\w-]+", "_", nome).strip("_").lower()
+        with self._lock:
+            self.execucao = uuid.uuid4().hex[:12]
+            self.modulo = modulo
+            self.caminho = os.path.join(self.pasta, f"{datetime.now():%Y%m%d_%H%M%S}_{nome}.jsonl")
+        return self.caminho
+
+    def finalizar(self):
+        with self._lock:
+            caminho, self.execucao, self.caminho = self.caminho, None, None
+        return caminho
+
+    @property
+    def em_execucao(self):
+        return self.execucao is not None
+
+    def _pilha(self):
+        if not hasattr(self._local, "pilha"):
+            self._local.pilha = []
+        return self._local.pilha
+
+    def _gravar(self, span):
+        linha = json.dumps(span, ensure_ascii=False, default=str)
+        with self._lock:
+            if self.caminho is None:
+                return
+            try:
+                with open(self.caminho, "a", encoding="utf-8") as f:
+                    f.write(linha + "\n")
+            except OSError:
+                pass
+
+    @contextmanager
+    def etapa(self, nome, item=None, tipo="etapa"):
+        """Registra a duração do bloco. Exceções marcam o span como falho e seguem adiante."""
+        if not self.ativo or self.execucao is None:
+            yield {}
+            return
+
+        pilha = self._pilha()
+        span = {
+            "execucao": self.execucao,
+            "modulo": self.modulo,
+            "tipo": tipo,
+            "nome": nome,
+            "item": None if item is None else str(item),
+            "pai": pilha[-1] if pilha else None,
+            "thread": threading.current_thread().name,
+            "inicio": datetime.now().isoformat(timespec="milliseconds"),
+            "ok": True,
+            "erro": None,
+        }
+        pilha.append(nome)
+        inicio = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span["ok"] = False
+            span["erro"] = f"{type(e).__name__}: {e}"[:300]
+            raise
+        finally:
+            pilha.pop()
+            span["duracao"] = round(time.perf_counter() - inicio, 4)
+            self._gravar(span)
+
+    def item(self, identificador, nome="item"):
+        return self.etapa(nome, item=identificador, tipo="item")
+
+
+rastreador = Rastreador()
+
+
+def etapa(nome, item=None):
+    """`with etapa("login"):` - registra a duração de um passo da execução corrente."""
+    return rastreador.etapa(nome, item=item)
+
+
+def item(identificador, nome="item"):
+    """`with item(guia):` - registra a duração do processamento de um item."""
+    return rastreador.item(identificador, nome=nome)
+
+
+def identificar_item(args, kwargs):
+    for valor in list(args) + list(kwargs.values()):
+        if isinstance(valor, bool):
+            continue
+        if isinstance(valor, (str, int, float)):
+            return valor
+        if isinstance(valor, dict):
+            for chave in CHAVES_ITEM:
+                if valor.get(chave) not in (None, ""):
+                    return valor[chave]
+    return None
+
+
+def resultado_ok(resultado):
+    # Os métodos por item devolvem {"status": "erro", ...} em vez de lançar exceção
+    if isinstance(resultado, dict):
+        status = str(resultado.get("status", "")).lower()
+        return not status.startswith("erro") and resultado.get("sucesso") is not False
+    return resultado is not False
+
+
+def rastrear(nome=None, por_item=False):
+    """Decorador equivalente a `with etapa(...)` em volta da função.
+
+    Com `por_item=True` o span é do tipo item e identificado pelo primeiro argumento
+    simples (código do exame, número da guia, índice da linha) ou pela chave
+    conhecida do dict de dados recebido.
+    """
+    def decorador(func):
+        nome_span = nome or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not rastreador.ativo or not rastreador.em_execucao:
+                return func(*args, **kwargs)
+            identificador = identificar_item(args[1:], kwargs) if por_item else None
+            with rastreador.etapa(nome_span, item=identificador, tipo="item" if por_item else "etapa") as span:
+                resultado = func(*args, **kwargs)
+                if por_item and not resultado_ok(resultado):
+                    span["ok"] = False
+                return resultado
+
+        wrapper._rastreado = True
+        return wrapper
+    return decorador
+
+
+def _rastrear_execucao(func):
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if not rastreador.ativo:
+            return func(self, *args, **kwargs)
+        iniciou = not rastreador.em_execucao
+        if iniciou:
+            rastreador.iniciar(getattr(self, "nome", type(self).__name__))
+        try:
+            with rastreador.etapa("run"):
+                return func(self, *args, **kwargs)
+        finally:
+            if iniciou:
+                log_resumo(rastreador.finalizar())
+
+    wrapper._rastreado = True
+    return wrapper
+
+
+def instrumentar_classe(cls, etapas=(), itens=()):
+    """Envolve em spans os métodos de `cls` listados (usado por BaseModule)."""
+    for nome, valor in list(vars(cls).items()):
+        if not inspect.isfunction(valor) or getattr(valor, "_rastreado", False):
+            continue
+        if nome == "run":
+            setattr(cls, nome, _rastrear_execucao(valor))
+        elif nome in itens:
+            setattr(cls, nome, rastrear(nome, por_item=True)(valor))
+        elif nome in etapas:
+            setattr(cls, nome, rastrear(nome)(valor))
+
+
+# --- Relatório ---------------------------------------------------------------
+
+def carregar_spans(caminho):
+    spans = []
+    with open(caminho, "r", encoding="utf-8") as f:
+        for linha in f:
+            linha = linha.strip()
+            if linha:
+                try:
+                    spans.append(json.loads(linha))
+                except ValueError:
+                    continue
+    return spans
+
+
+def ultimo_trace(pasta=TRACE_DIR):
+    arquivos = glob.glob(os.path.join(pasta, "*.jsonl"))
+    return max(arquivos, key=os.path.getmtime) if arquivos else None
+
+
+def percentil(valores, p):
+    """Percentil pelo método do posto mais próximo (valores já ordenados)."""
+    if not valores:
+        return 0.0
+    indice = max(0, min(len(valores) - 1, math.ceil(p / 100 * len(valores)) - 1))
+    return valores[indice]
+
+
+def resumir(spans):
+    """{nome: {total, falhas, p50, p95, max, soma}} por nome de etapa/item."""
+    duracoes = {}
+    falhas = {}
+    for span in spans:
+        chave = span["nome"]
+        duracoes.setdefault(chave, []).append(span.get("duracao", 0.0))
+        falhas[chave] = falhas.get(chave, 0) + (0 if span.get("ok", True) else 1)
+
+    resumo = {}
+    for chave, valores in duracoes.items():
+        valores.sort()
+        resumo[chave] = {
+            "total": len(valores),
+            "falhas": falhas[chave],
+            "p50": percentil(valores, 50),
+            "p95": percentil(valores, 95),
+            "max": valores[-1],
+            "soma": sum(valores),
+        }
+    return resumo
+
+
+def relatorio(caminho, top=10):
+    spans = carregar_spans(caminho)
+    if not spans:
+        return f"Nenhum span em {caminho}"
+
+    linhas = [f"Trace: {caminho}", f"Módulo: {spans[0].get('modulo')}", ""]
+    linhas.append(f"{'etapa':<36}{'qtd':>6}{'falhas':>8}{'p50':>9}{'p95':>9}{'max':>9}{'total':>10}")
+    resumo = resumir(spans)
+    for nome, est in sorted(resumo.items(), key=lambda par: -par[1]["soma"]):
+        linhas.append(
+            f"{nome[:35]:<36}{est['total']:>6}{est['falhas']:>8}"
+            f"{est['p50']:>8.2f}s{est['p95']:>8.2f}s{est['max']:>8.2f}s{est['soma']:>9.1f}s"
+        )
+
+    itens = sorted((s for s in spans if s.get("tipo") == "item"), key=lambda s: -s.get("duracao", 0))
+    if itens:
+        linhas += ["", f"Itens mais lentos (top {min(top, len(itens))}):"]
+        for span in itens[:top]:
+            situacao = "ok" if span.get("ok", True) else "falha"
+            linhas.append(f"  {span['duracao']:>8.2f}s  {span['nome']:<24} {span.get('item')}  [{situacao}]")
+    return "\n".join(linhas)
+
+
+def log_resumo(caminho):
+    """Registra no log p50/p95/máx das etapas da execução que acabou de terminar."""
+    if not caminho or not os.path.exists(caminho):
+        return
+    resumo = resumir(carregar_spans(caminho))
+    for nome, est in sorted(resumo.items(), key=lambda par: -par[1]["soma"]):
+        if nome == "run":
+            continue
+        log_message(
+            f"📈 {nome}: {est['total']}x, p50 {est['p50']:.2f}s, p95 {est['p95']:.2f}s, "
+            f"máx {est['max']:.2f}s, falhas {est['falhas']}",
+            "INFO"
+        )
+    log_message(f"📈 Trace da execução salvo em {caminho}", "INFO")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Relatório de tempos de uma execução do RPA")
+    parser.add_argument("arquivo", nargs="?", help="arquivo .jsonl (padrão: o mais recente)")
+    parser.add_argument("--top", type=int, default=10, help="quantidade de itens mais lentos")
+    args = parser.parse_args(argv)
+
+    caminho = args.arquivo or ultimo_trace()
+    if not caminho:
+        print(f"Nenhum trace encontrado em {TRACE_DIR}")
+        return 1
+    print(relatorio(caminho, top=args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,252 @@
+import os
+import threading
+import time
+
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.webdriver.support.ui import WebDriverWait
+
+from src.core.logger import log_message
+
+# Intervalo de verificação das condições (segundos)
+INTERVALO = float(os.getenv("RPA_WAIT_POLL", "0.1"))
+# Quando ativo, registra no log a duração de cada espera
+WAIT_VERBOSE = os.getenv("RPA_WAIT_VERBOSE", "0") == "1"
+
+SELETOR_SPINNER = "#spinner, .loadModal, .spinner"
+SELETOR_MODAL = ".modal.show, .modal.in, .swal2-container"
+
+_JS_VISIVEIS = """
+    var total = 0;
+    document.querySelectorAll(arguments[0]).forEach(function(el) {
+        if (el.offsetWidth || el.offsetHeight || el.getClientRects().length) {
+            total++;
+        }
+    });
+    return total;
+"""
+
+_estatisticas = {}
+_lock = threading.Lock()
+
+# Evento de cancelamento da execução em andamento (o cancel_flag dos params), definido
+# por quem inicia o módulo: janela, processo filho ou cli.py
+_cancelamento = None
+
+
+class ExecucaoCancelada(BaseException):
+    """Lançada por `dormir` e `aguardar` quando o usuário pede para parar.
+
+    Deriva de BaseException, como o KeyboardInterrupt: os `except Exception` dos módulos
+    (fallbacks de clique, tratamento por item) não a engolem, e ela sobe até quem iniciou
+    o `run`, que registra a execução como cancelada.
+    """
+
+    def __init__(self, mensagem="Execução cancelada pelo usuário"):
+        super().__init__(mensagem)
+
+
+def definir_cancelamento(evento):
+    global _cancelamento
+    _cancelamento = evento
+
+
+def cancelado(cancel_flag=None):
+    evento = cancel_flag or _cancelamento
+    return evento is not None and evento.is_set()
+
+
+def esperar_cancelamento(segundos, cancel_flag=None):
+    """Espera `segundos` ou até o Parar. Devolve True se a execução foi cancelada."""
+    evento = cancel_flag or _cancelamento
+    if evento is None:
+        time.sleep(segundos)
+        return False
+    return evento.wait(segundos)
+
+
+def dormir(segundos, cancel_flag=None):
+    """Substitui `time.sleep` nos módulos: acorda na hora em que o Parar é acionado."""
+    if esperar_cancelamento(segundos, cancel_flag):
+        raise ExecucaoCancelada()
+
+
+def _registrar(nome, duracao, ok, avisar=True):
+    with _lock:
+        est = _estatisticas.setdefault(nome, {"total": 0, "timeouts": 0, "soma": 0.0, "max": 0.0})
+        est["total"] += 1
+        est["soma"] += duracao
+        est["max"] = max(est["max"], duracao)
+        if not ok:
+            est["timeouts"] += 1
+    if not ok and avisar:
+        log_message(f"⏱️ Espera '{nome}' esgotou após {duracao:.2f}s", "WARNING")
+    elif WAIT_VERBOSE:
+        log_message(f"⏱️ {nome}: {duracao:.2f}s", "INFO")
+
+
+def estatisticas_esperas():
+    """Cópia das estatísticas acumuladas: {nome: {total, timeouts, soma, max}}."""
+    with _lock:
+        return {nome: dict(est) for nome, est in _estatisticas.items()}
+
+
+def resetar_estatisticas():
+    with _lock:
+        _estatisticas.clear()
+
+
+def log_resumo_esperas():
+    """Registra no log quanto tempo foi gasto em cada tipo de espera desde o último reset."""
+    for nome, est in sorted(estatisticas_esperas().items()):
+        media = est["soma"] / est["total"] if est["total"] else 0
+        log_message(
+            f"⏱️ {nome}: {est['total']}x, média {media:.2f}s, máx {est['max']:.2f}s, "
+            f"total {est['soma']:.1f}s, timeouts {est['timeouts']}",
+            "INFO"
+        )
+
+
+def aguardar(driver, condicao, timeout=10, nome="condicao", avisar=True, timeout_ok=False):
+    """Aguarda `condicao(driver)` ficar verdadeira e devolve o valor retornado por ela.
+
+    Em caso de timeout retorna None (não lança exceção), para poder substituir os
+    `time.sleep` fixos sem mudar o fluxo dos módulos. O tempo gasto é registrado
+    em `estatisticas_esperas()`; `avisar=False` silencia o aviso de timeout para
+    esperas em que a condição pode legitimamente não acontecer. Com `timeout_ok=True` o
+    timeout é o resultado normal (ex.: spinner que não chegou a aparecer): não gera aviso
+    nem conta como timeout no resumo. Se o Parar for acionado durante a espera, lança
+    ExecucaoCancelada.
+    """
+    def condicao_cancelavel(d):
+        if cancelado():
+            raise ExecucaoCancelada()
+        return condicao(d)
+
+    inicio = time.time()
+    try:
+        resultado = WebDriverWait(
+            driver, timeout, poll_frequency=INTERVALO,
+            ignored_exceptions=(StaleElementReferenceException,)
+        ).until(condicao_cancelavel)
+        _registrar(nome, time.time() - inicio, True, avisar)
+        return resultado
+    except TimeoutException:
+        _registrar(nome, time.time() - inicio, timeout_ok, avisar)
+        return None
+
+
+def _visiveis(driver, seletor):
+    try:
+        return driver.execute_script(_JS_VISIVEIS, seletor)
+    except WebDriverException:
+        return 0
+
+
+def aguardar_ajax(driver, timeout=15):
+    """Aguarda não haver requisições jQuery em andamento (`jQuery.active == 0`)."""
+    return aguardar(
+        driver,
+        lambda d: d.execute_script(
+            "return document.readyState === 'complete' && (!window.jQuery || window.jQuery.active === 0);"
+        ),
+        timeout, "ajax"
+    ) is not None
+
+
+def aguardar_spinner(driver, timeout=30, seletor=SELETOR_SPINNER, aparecer=0):
+    """Aguarda o spinner/modal de carregamento sumir.
+
+    `aparecer` dá uma janela (segundos) para o spinner surgir após um clique; se ele
+    não aparecer nesse tempo (requisição rápida, o caso comum), segue direto.
+    """
+    if aparecer:
+        aguardar(driver, lambda d: _visiveis(d, seletor) > 0, aparecer, "spinner_aparecer", timeout_ok=True)
+    return aguardar(driver, lambda d: _visiveis(d, seletor) == 0, timeout, "spinner") is not None
+
+
+def aguardar_pagina_pronta(driver, timeout=30, seletor_spinner=SELETOR_SPINNER):
+    """Requisições AJAX concluídas e nenhum spinner visível."""
+    return aguardar(
+        driver,
+        lambda d: d.execute_script(
+            "return document.readyState === 'complete' && (!window.jQuery || window.jQuery.active === 0);"
+        ) and _visiveis(d, seletor_spinner) == 0,
+        timeout, "pagina_pronta"
+    ) is not None
+
+
+def contar_linhas(driver, seletor):
+    return len(driver.find_elements(By.CSS_SELECTOR, seletor))
+
+
+def aguardar_linhas_mudarem(driver, seletor, contagem_anterior, timeout=15):
+    """Aguarda a quantidade de elementos em `seletor` ser diferente de `contagem_anterior`.
+
+    Retorna a nova contagem ou None em caso de timeout.
+    """
+    if aguardar(driver, lambda d: contar_linhas(d, seletor) != contagem_anterior, timeout, "linhas") is None:
+        return None
+    return contar_linhas(driver, seletor)
+
+
+def _valor(driver, alvo):
+    if isinstance(alvo, WebElement):
+        elemento = alvo
+    elif isinstance(alvo, tuple):
+        elemento = driver.find_element(*alvo)
+    else:
+        elemento = driver.find_element(By.CSS_SELECTOR, alvo)
+    valor = elemento.get_attribute("value")
+    return valor if valor is not None else elemento.text
+
+
+def aguardar_valor_estavel(driver, alvo, timeout=10, janela=0.3, ignorar_vazio=True):
+    """Aguarda o valor/texto de um elemento parar de mudar por `janela` segundos.
+
+    `alvo` pode ser um WebElement, um seletor CSS ou uma tupla (By, valor).
+    Retorna o valor final ou None em caso de timeout.
+    """
+    estado = {"valor": None, "desde": time.time()}
+
+    def _estavel(d):
+        valor = _valor(d, alvo)
+        agora = time.time()
+        if valor != estado["valor"]:
+            estado["valor"], estado["desde"] = valor, agora
+            return False
+        if ignorar_vazio and not valor:
+            return False
+        return agora - estado["desde"] >= janela
+
+    if aguardar(driver, _estavel, timeout, "valor_estavel") is None:
+        return None
+    return estado["valor"]
+
+
+def aguardar_modal_fechado(driver, seletor=SELETOR_MODAL, timeout=10):
+    """Aguarda nenhum modal visível (e nenhum backdrop) restar na página."""
+    return aguardar(
+        driver,
+        lambda d: _visiveis(d, seletor) == 0 and _visiveis(d, ".modal-backdrop") == 0,
+        timeout, "modal_fechado"
+    ) is not None
+
+
+def aguardar_modal_aberto(driver, seletor=SELETOR_MODAL, timeout=10):
+    return aguardar(driver, lambda d: _visiveis(d, seletor) > 0, timeout, "modal_aberto") is not None
+
+
+def aguardar_nova_janela(driver, quantidade_anterior, timeout=10, avisar=True):
+    """Aguarda abrir uma janela/popup além das `quantidade_anterior` já existentes."""
+    return aguardar(
+        driver, lambda d: len(d.window_handles) > quantidade_anterior, timeout, "nova_janela", avisar
+    ) is not None
+
+
+def aguardar_janelas(driver, quantidade, timeout=10, avisar=True):
+    """Aguarda restarem exatamente `quantidade` janelas (ex.: popup fechou sozinho)."""
+    return aguardar(
+        driver, lambda d: len(d.window_handles) == quantidade, timeout, "janelas", avisar
+    ) is not None
@@ -1,10 +1,35 @@
+from src.core import diario, http_transport, progresso, tracer
+
+
 class BaseModule:
     """Classe base para todos os módulos do sistema RPA."""
 
+    # Métodos que ganham um span automático no trace da execução (src/core/tracer.py).
+    # `run` sempre é rastreado; os módulos podem estender ETAPAS_RASTREADAS.
+    # Os métodos por item também são gravados no diário de progresso (src/core/diario.py)
+    # e contados no painel de progresso da interface (src/core/progresso.py).
+    METODOS_POR_ITEM = (
+        "processar_exame", "processar_guia_unimed", "processar_guia", "processar_linha",
+        "processar_registro", "processar_um_exame", "processar_dados_exame",
+    )
+    ETAPAS_RASTREADAS = (
+        "login", "realizar_login", "abrir_preparacao", "fazer_login_unimed", "fazer_login_pathoweb",
+        "consultar_status_guia", "esperar_liberacao_guias",
+    )
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        tracer.instrumentar_classe(cls, etapas=cls.ETAPAS_RASTREADAS, itens=cls.METODOS_POR_ITEM)
+        # Depois do tracer: um item pulado na retomada não gera span
+        diario.instrumentar_classe(cls, itens=cls.METODOS_POR_ITEM)
+        # Por fora de todos: um item pulado na retomada também conta como feito
+        progresso.instrumentar_classe(cls, etapas=cls.ETAPAS_RASTREADAS, itens=cls.METODOS_POR_ITEM)
+        # Cada execução começa com o envio HTTP ligado, mesmo que a anterior o tenha desligado
+        http_transport.instrumentar_classe(cls)
+
     def __init__(self, nome: str):
         self.nome = nome
 
     def run(self, *args, **kwargs):
         """Método que deve ser implementado pelos módulos concretos."""
         raise NotImplementedError("O método run deve ser implementado pelo módulo.")
-
@@ -7,11 +7,15 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
 from dotenv import load_dotenv
-from openpyxl import load_workbook
 
 from src.core.browser_factory import BrowserFactory
+from src.core import progresso
 from src.core.logger import log_message
+from src.core.parallel_executor import ExecutorParalelo
+from src.core.session_manager import login_pathoweb
+from src.core.waits import aguardar, aguardar_ajax, aguardar_modal_fechado, aguardar_pagina_pronta, dormir
 from src.modules.base import BaseModule
+from src.utils.planilha import ler_registros
 
 load_dotenv()
 
@@ -21,19 +25,18 @@ class ConclusaoModule(BaseModule):
 
     def get_dados_exames(self, file_path: str) -> list:
         try:
-            workbook = load_workbook(file_path)
-            sheet = workbook.active
             dados = []
             ultima_mascara = None
             ultimo_patologista = None
             ultimo_unimed = None
             
             # Lê da linha 2 em diante (linha 1 é cabeçalho)
-            for row in range(2, sheet.max_row + 1):
-                codigo = sheet[f'A{row}'].value
-                mascara = sheet[f'B{row}'].value
-                patologista = sheet[f'C{row}'].value
-                unimed = sheet[f'D{row}'].value
+            for registro in ler_registros(file_path, {"codigo": "A", "mascara": "B", "patologista": "C", "unimed": "D"}):
+                row = registro["_linha"]
+                codigo = registro["codigo"]
+                mascara = registro["mascara"]
+                patologista = registro["patologista"]
+                unimed = registro["unimed"]
                 
                 if codigo is not None:
                     codigo = str(codigo).strip()
@@ -77,7 +80,6 @@ class ConclusaoModule(BaseModule):
                         'unimed': unimed
                     })
             
-            workbook.close()
             return dados
         except Exception as e:
             raise Exception(f"Erro ao ler planilha: {e}")
@@ -182,9 +184,9 @@ class ConclusaoModule(BaseModule):
                     if "modulo=1" not in current_url:
                         modulo_link = driver.find_element(By.CSS_SELECTOR, "a[href='/site/trocarModulo?modulo=1']")
                         modulo_link.click()
-                        time.sleep(1.5)
+                        aguardar_pagina_pronta(driver)
                         log_message("🔄 Navegou de volta ao módulo de exames", "INFO")
-                except:
+                except Exception:
                     pass
                     
         except Exception as e:
@@ -206,12 +208,11 @@ class ConclusaoModule(BaseModule):
             # Digitar a máscara
             campo_busca.send_keys(mascara)
             log_message(f"✍️ Máscara '{mascara}' digitada no campo buscaArvore", "INFO")
-            time.sleep(0.5)
             
             # Pressionar Enter
             campo_busca.send_keys(Keys.ENTER)
             log_message(f"⌨️ Enter pressionado após digitar máscara", "INFO")
-            time.sleep(1)
+            aguardar_ajax(driver, timeout=5)
             
         except Exception as e:
             log_message(f"Erro ao digitar máscara: {e}", "ERROR")
@@ -257,13 +258,12 @@ class ConclusaoModule(BaseModule):
                 return
             
             # Rolar até o botão para garantir visibilidade
-            driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", botao_salvar)
-            time.sleep(1)
+            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", botao_salvar)
             
             # Clicar no botão
             botao_salvar.click()
             log_message("💾 Clicou em Salvar", "INFO")
-            time.sleep(1)
+            aguardar_pagina_pronta(driver)
             
         except Exception as e:
             log_message(f"Erro ao salvar: {e}", "ERROR")
@@ -275,8 +275,7 @@ class ConclusaoModule(BaseModule):
                 
                 if botoes_onclick:
                     botao_onclick = botoes_onclick[0]
-                    driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", botao_onclick)
-                    time.sleep(1)
+                    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", botao_onclick)
                     botao_onclick.click()
                     log_message("💾 Clicou em Salvar usando onclick", "INFO")
                     return
@@ -287,8 +286,7 @@ class ConclusaoModule(BaseModule):
                 
                 if botoes_classe:
                     botao_classe = botoes_classe[0]
-                    driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", botao_classe)
-                    time.sleep(1)
+                    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", botao_classe)
                     botao_classe.click()
                     log_message("💾 Clicou em Salvar usando classe", "INFO")
                     return
@@ -319,7 +317,7 @@ class ConclusaoModule(BaseModule):
             )
             botao_enviar.click()
             log_message("➡️ Clicou em Enviar para próxima etapa", "INFO")
-            time.sleep(1.5)
+            aguardar_pagina_pronta(driver, timeout=30)
         except Exception as e:
             log_message(f"Erro ao enviar para próxima etapa: {e}", "ERROR")
             raise
@@ -356,7 +354,6 @@ class ConclusaoModule(BaseModule):
             )
             checkbox.click()
             log_message(f"✅ Checkbox de {nome_patologista} marcado", "INFO")
-            time.sleep(1)
             
             # Aguardar o campo de senha aparecer e digitar a senha
             campo_senha = wait.until(
@@ -364,7 +361,6 @@ class ConclusaoModule(BaseModule):
             )
             campo_senha.send_keys(senha)
             log_message(f"🔐 Senha de {nome_patologista} digitada", "INFO")
-            time.sleep(1)
             
         except Exception as e:
             log_message(f"Erro ao assinar com {nome_patologista}: {e}", "ERROR")
@@ -401,7 +397,7 @@ class ConclusaoModule(BaseModule):
             )
             botao_assinar.click()
             log_message("✍️ Clicou em Assinar", "INFO")
-            time.sleep(1.5)
+            aguardar_modal_fechado(driver, "#assinatura", timeout=15)
             
         except Exception as e:
             log_message(f"Erro no processo de assinatura: {e}", "ERROR")
@@ -414,6 +410,7 @@ class ConclusaoModule(BaseModule):
         cancel_flag = params.get("cancel_flag")
         headless_mode = params.get("headless_mode", False)
         pular_para_laudos = params.get("pular_para_laudos", False)
+        num_workers = params.get("num_workers", 1)
         
         try:
             # Lê os dados dos exames da planilha (código e máscara)
@@ -437,66 +434,13 @@ class ConclusaoModule(BaseModule):
         resultados = []
         
         try:
-            driver = BrowserFactory.create_chrome(headless=headless_mode)
+            driver = BrowserFactory.acquire_chrome(headless=headless_mode)
             wait = WebDriverWait(driver, 20)
             
             log_message("Iniciando automação de conclusão...", "INFO")
             
             # Login
-            log_message("Fazendo login...", "INFO")
-            driver.get(url)
-            
-            # Aguardar página carregar completamente
-            wait.until(EC.presence_of_element_located((By.ID, "username")))
-            
-            username_field = driver.find_element(By.ID, "username")
-            username_field.clear()
-            username_field.send_keys(username)
-            
-            password_field = driver.find_element(By.ID, "password")
-            password_field.clear()
-            password_field.send_keys(password)
-            
-            submit_button = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
-            submit_button.click()
-
-            log_message("Verificando se precisa navegar para módulo de exames...", "INFO")
-            current_url = driver.current_url
-            if current_url == "https://dap.pathoweb.com.br/" or "trocarModulo" in current_url:
-                log_message("Detectada tela de seleção de módulos - navegando para módulo de exames...",
-                            "INFO")
-                try:
-                    modulo_link = wait.until(
-                        EC.element_to_be_clickable(
-                            (By.CSS_SELECTOR, "a[href='/site/trocarModulo?modulo=1']")))
-                    modulo_link.click()
-                    time.sleep(2)
-                    log_message("✅ Navegação para módulo de exames realizada", "SUCCESS")
-                except Exception as e:
-                    log_message(f"⚠️ Erro ao navegar para módulo: {e}", "WARNING")
-                    # Tentar navegar diretamente pela URL como fallback
-                    driver.get("https://dap.pathoweb.com.br/moduloExame/index")
-                    time.sleep(2)
-                    log_message("🔄 Navegação direta para módulo realizada", "INFO")
-
-            elif "moduloExame" in current_url:
-                log_message("✅ Já está no módulo de exames - pulando navegação", "SUCCESS")
-            else:
-                log_message(f"⚠️ URL inesperada detectada: {current_url}", "WARNING")
-                # Tentar navegar diretamente como fallback
-                driver.get("https://dap.pathoweb.com.br/moduloExame/index")
-                time.sleep(2)
-                log_message("🔄 Navegação direta para módulo realizada (fallback)", "INFO")
-
-            # Fechar modal se aparecer
-            try:
-                modal_close_button = driver.find_element(By.CSS_SELECTOR, "#mensagemParaClienteModal .modal-footer button")
-                if modal_close_button.is_displayed():
-                    modal_close_button.click()
-                    time.sleep(1)
-                    log_message("✅ Modal de mensagem fechado", "INFO")
-            except Exception:
-                pass
+            login_pathoweb(driver, username, password, modulo=1, url=url)
 
             log_message("✅ Login realizado com sucesso. Iniciando processamento dos exames.", "SUCCESS")
             
@@ -516,115 +460,53 @@ class ConclusaoModule(BaseModule):
                 
                 # Finalizar sem fazer mais nada
                 return
-            
-            # Processar cada exame da planilha (modo normal)
-            for i, exame_data in enumerate(dados_exames, 1):
-                if cancel_flag and cancel_flag.is_set():
-                    log_message("Execução cancelada pelo usuário.", "WARNING")
-                    break
-                
-                codigo = exame_data['codigo']
-                mascara = exame_data['mascara']
-                patologista = exame_data['patologista']
-                unimed = exame_data['unimed']
-                
-                log_message(f"\n➡️ Processando exame {i}/{len(dados_exames)}: {codigo} (máscara: {mascara}, patologista: {patologista}, unimed: {unimed})", "INFO")
-                
-                try:
+
+            progresso.definir_total(len(dados_exames))
+            if num_workers > 1:
+                executor = ExecutorParalelo(num_workers, cancel_flag=cancel_flag)
+                resultados = executor.executar(
+                    dados_exames,
+                    processar_item=lambda d, exame_data: self.processar_dados_exame(d, WebDriverWait(d, 20), exame_data),
+                    preparar_worker=lambda d: login_pathoweb(d, username, password, modulo=1, url=url, compartilhar=False),
+                    ao_falhar=self._resultado_erro,
+                    driver_principal=driver
+                )
+                # O navegador do módulo pode ter sido trocado se caiu durante a execução
+                driver = executor.driver_principal
+                wait = WebDriverWait(driver, 20)
+            else:
+                # Processar cada exame da planilha (modo normal)
+                for i, exame_data in enumerate(dados_exames, 1):
+                    if cancel_flag and cancel_flag.is_set():
+                        log_message("Execução cancelada pelo usuário.", "WARNING")
+                        break
+
+                    log_message(f"\n➡️ Processando exame {i}/{len(dados_exames)}: {exame_data['codigo']} (máscara: {exame_data['mascara']}, patologista: {exame_data['patologista']}, unimed: {exame_data['unimed']})", "INFO")
+
                     # Verificar se o browser ainda está ativo
                     if not self.verificar_sessao_browser(driver):
                         log_message("🔄 Recriando browser devido à sessão perdida...", "WARNING")
                         try:
-                            driver.quit()
+                            BrowserFactory.release_chrome(driver)
                         except:
                             pass
-                        
-                        # Recriar browser e fazer login novamente
-                        driver = BrowserFactory.create_chrome(headless=headless_mode)
-                        wait = WebDriverWait(driver, 20)
-                        
-                        # Fazer login novamente
-                        log_message("🔄 Fazendo login novamente...", "INFO")
-                        driver.get(url)
-                        
-                        # Aguardar página carregar completamente
-                        wait.until(EC.presence_of_element_located((By.ID, "username")))
-                        time.sleep(2)
-                        
-                        username_field = driver.find_element(By.ID, "username")
-                        username_field.clear()
-                        username_field.send_keys(username)
-                        
-                        password_field = driver.find_element(By.ID, "password")
-                        password_field.clear()
-                        password_field.send_keys(password)
-                        
-                        submit_button = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
-                        submit_button.click()
-                        
-                        log_message("🔄 Navegando para módulo de exames novamente...", "INFO")
 
-                        log_message("Verificando se precisa navegar para módulo de exames...", "INFO")
-                        current_url = driver.current_url
-                        if current_url == "https://dap.pathoweb.com.br/" or "trocarModulo" in current_url:
-                            log_message("Detectada tela de seleção de módulos - navegando para módulo de exames...",
-                                        "INFO")
-                            try:
-                                modulo_link = wait.until(
-                                    EC.element_to_be_clickable(
-                                        (By.CSS_SELECTOR, "a[href='/site/trocarModulo?modulo=1']")))
-                                modulo_link.click()
-                                time.sleep(2)
-                                log_message("✅ Navegação para módulo de exames realizada", "SUCCESS")
-                            except Exception as e:
-                                log_message(f"⚠️ Erro ao navegar para módulo: {e}", "WARNING")
-                                # Tentar navegar diretamente pela URL como fallback
-                                driver.get("https://dap.pathoweb.com.br/moduloExame/index")
-                                time.sleep(2)
-                                log_message("🔄 Navegação direta para módulo realizada", "INFO")
-
-                        elif "moduloExame" in current_url:
-                            log_message("✅ Já está no módulo de exames - pulando navegação", "SUCCESS")
-                        else:
-                            log_message(f"⚠️ URL inesperada detectada: {current_url}", "WARNING")
-                            # Tentar navegar diretamente como fallback
-                            driver.get("https://dap.pathoweb.com.br/moduloExame/index")
-                            time.sleep(2)
-                            log_message("🔄 Navegação direta para módulo realizada (fallback)", "INFO")
-                        
-                        # Fechar modal se aparecer
                         try:
-                            modal_close_button = driver.find_element(By.CSS_SELECTOR, "#mensagemParaClienteModal .modal-footer button")
-                            if modal_close_button.is_displayed():
-                                modal_close_button.click()
-                                time.sleep(1)
-                                log_message("✅ Modal de mensagem fechado", "INFO")
-                        except Exception:
-                            pass
-                        
-                        log_message("✅ Browser recriado e login realizado novamente", "SUCCESS")
-                    
-                    # Processar este exame específico
-                    resultado = self.processar_exame(driver, wait, codigo, mascara, patologista, unimed)
-                    resultados.append({
-                        'codigo': codigo,
-                        'mascara': mascara,
-                        'patologista': patologista,
-                        'unimed': unimed,
-                        'status': resultado['status'],
-                        'detalhes': resultado.get('detalhes', '')
-                    })
-                    
-                except Exception as e:
-                    log_message(f"❌ Erro ao processar exame {codigo}: {e}", "ERROR")
-                    resultados.append({
-                        'codigo': codigo,
-                        'mascara': mascara,
-                        'patologista': patologista,
-                        'unimed': unimed,
-                        'status': 'erro',
-                        'detalhes': str(e)
-                    })
+                            # Recriar browser e fazer login novamente
+                            driver = BrowserFactory.acquire_chrome(headless=headless_mode)
+                            wait = WebDriverWait(driver, 20)
+
+                            # Fazer login novamente (reaproveita a sessão salva se ainda válida)
+                            log_message("🔄 Fazendo login novamente...", "INFO")
+                            login_pathoweb(driver, username, password, modulo=1, url=url)
+
+                            log_message("✅ Browser recriado e login realizado novamente", "SUCCESS")
+                        except Exception as e:
+                            log_message(f"❌ Erro ao processar exame {exame_data['codigo']}: {e}", "ERROR")
+                            resultados.append(self._resultado_erro(exame_data, e))
+                            continue
+
+                    resultados.append(self.processar_dados_exame(driver, wait, exame_data))
             
             # Mostrar resumo final
             self.mostrar_resumo_final(resultados)
@@ -646,6 +528,31 @@ class ConclusaoModule(BaseModule):
             log_message("✅ Execução finalizada - Browser permanece aberto", "SUCCESS")
             pass
 
+    @staticmethod
+    def _resultado_erro(exame_data, erro):
+        return {
+            'codigo': exame_data['codigo'],
+            'mascara': exame_data['mascara'],
+            'patologista': exame_data['patologista'],
+            'unimed': exame_data['unimed'],
+            'status': 'erro',
+            'detalhes': str(erro)
+        }
+
+    def processar_dados_exame(self, driver, wait, exame_data):
+        """Processa uma linha da planilha e devolve o registro de resultado"""
+        codigo = exame_data['codigo']
+        try:
+            resultado = self.processar_exame(driver, wait, codigo, exame_data['mascara'],
+                                             exame_data['patologista'], exame_data['unimed'])
+        except Exception as e:
+            log_message(f"❌ Erro ao processar exame {codigo}: {e}", "ERROR")
+            return self._resultado_erro(exame_data, e)
+
+        registro = self._resultado_erro(exame_data, resultado.get('detalhes', ''))
+        registro['status'] = resultado['status']
+        return registro
+
     def processar_exame(self, driver, wait, codigo, mascara, patologista, unimed):
         """Processa um exame individual"""
         try:
@@ -655,7 +562,7 @@ class ConclusaoModule(BaseModule):
             
             # Aguardar e encontrar o campo de código de barras
             log_message("Aguardando página carregar completamente...", "INFO")
-            time.sleep(0.5)
+            aguardar_pagina_pronta(driver)
             
             # Tentar diferentes formas de encontrar o campo
             campo_codigo = None
@@ -725,8 +632,7 @@ class ConclusaoModule(BaseModule):
         log_message("Campo de código encontrado, interagindo...", "INFO")
         
         # Garantir que o campo está visível
-        driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", campo_codigo)
-        time.sleep(1)
+        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", campo_codigo)
         
         # Verificar se o elemento está visível e habilitado
         is_displayed = campo_codigo.is_displayed()
@@ -741,7 +647,6 @@ class ConclusaoModule(BaseModule):
             driver.execute_script("arguments[0].value = '';", campo_codigo)
             log_message("Campo limpo com JavaScript", "INFO")
         
-        time.sleep(0.5)
         
         # Digitar o código
         try:
@@ -756,7 +661,6 @@ class ConclusaoModule(BaseModule):
             """, campo_codigo)
             log_message(f"Código '{codigo}' digitado com JavaScript", "INFO")
         
-        time.sleep(1)
         
         # Pressionar Enter
         try:
@@ -783,25 +687,15 @@ class ConclusaoModule(BaseModule):
         timeout_andamento = 30
         inicio = time.time()
         
-        while time.time() - inicio < timeout_andamento:
-            try:
-                # Verificar se a div de andamento apareceu
-                andamento_div = driver.find_element(By.ID, "divAndamentoExame")
-                if andamento_div and andamento_div.is_displayed():
-                    log_message("📋 Div de andamento do exame encontrada!", "SUCCESS")
-                    break
-            except:
-                pass
-            
-            time.sleep(1)
-            if int(time.time() - inicio) % 5 == 0:  # Log a cada 5 segundos
-                log_message(f"⏳ Aguardando carregamento... ({int(time.time() - inicio)}s)", "INFO")
+        if aguardar(driver, lambda d: d.find_element(By.ID, "divAndamentoExame").is_displayed(),
+                    timeout=timeout_andamento, nome="andamento"):
+            log_message(f"📋 Div de andamento do exame encontrada! ({time.time() - inicio:.1f}s)", "SUCCESS")
         else:
             log_message("⚠️ Div de andamento não apareceu no tempo esperado", "WARNING")
             return {'status': 'sem_andamento', 'detalhes': 'Exame não encontrado ou não carregou'}
         
         # Aguardar carregamento completo
-        time.sleep(2)
+        aguardar_pagina_pronta(driver)
         
         # Verificar se tem SVG na conclusão
         if self.verificar_svg_conclusao(driver):
@@ -845,7 +739,7 @@ class ConclusaoModule(BaseModule):
             
             # Aguardar o checkbox estar presente
             checkbox = wait.until(EC.presence_of_element_located((By.ID, "acumular")))
-            time.sleep(1)
+            aguardar_ajax(driver, timeout=5)
             
             # Verificar se já está marcado (pela classe do wrapper do iCheck)
             try:
@@ -864,7 +758,7 @@ class ConclusaoModule(BaseModule):
                     driver.execute_script("""
                         $('#acumular').iCheck('check');
                     """)
-                    time.sleep(2)
+                    aguardar_ajax(driver, timeout=5)
                     log_message("✅ Método 1: iCheck check() executado", "SUCCESS")
                 except Exception as e1:
                     log_message(f"⚠️ Método 1 falhou: {e1}", "WARNING")
@@ -873,7 +767,7 @@ class ConclusaoModule(BaseModule):
                     try:
                         wrapper = driver.find_element(By.XPATH, "//input[@id='acumular']/following-sibling::ins[@class='iCheck-helper']")
                         wrapper.click()
-                        time.sleep(2)
+                        aguardar_ajax(driver, timeout=5)
                         log_message("✅ Método 2: Click no iCheck-helper executado", "SUCCESS")
                     except Exception as e2:
                         log_message(f"⚠️ Método 2 falhou: {e2}", "WARNING")
@@ -884,7 +778,7 @@ class ConclusaoModule(BaseModule):
                                 var checkbox = document.getElementById('acumular');
                                 checkbox.click();
                             """)
-                            time.sleep(2)
+                            aguardar_ajax(driver, timeout=5)
                             log_message("✅ Método 3: Click via JavaScript executado", "SUCCESS")
                         except Exception as e3:
                             log_message(f"❌ Método 3 falhou: {e3}", "ERROR")
@@ -892,7 +786,6 @@ class ConclusaoModule(BaseModule):
                 
                 # Verificar se foi marcado (pela classe visual do iCheck)
                 try:
-                    time.sleep(1)  # Aguardar um pouco mais para o iCheck atualizar
                     wrapper = driver.find_element(By.XPATH, "//input[@id='acumular']/parent::div[contains(@class, 'icheckbox')]")
                     wrapper_classes = wrapper.get_attribute("class")
                     is_checked_final = "checked" in wrapper_classes
@@ -988,7 +881,7 @@ class ConclusaoModule(BaseModule):
                     if int(time.time() - inicio) % 5 == 0:
                         log_message(f"⏳ Ainda aguardando carregamento... ({int(time.time() - inicio)}s)", "INFO")
                     
-                    time.sleep(0.5)
+                    dormir(0.5)
                     
                 except Exception as e:
                     # Se houver erro ao verificar modais, assumir que não há modal
@@ -1015,11 +908,6 @@ class ConclusaoModule(BaseModule):
                 codigo = exame_data['codigo']
                 log_message(f"➡️ Acumulando exame {i}/{len(dados_exames)}: {codigo}", "INFO")
                 
-                # Delay progressivo conforme mencionado pelo usuário
-                # Quanto mais exames acumulados, mais lento fica o sistema
-                delay_base = 1.0
-                delay_progressivo = min(delay_base + (i * 0.2), 5.0)  # Máximo de 5 segundos
-                
                 tentativas = 0
                 max_tentativas = 3
                 
@@ -1032,11 +920,9 @@ class ConclusaoModule(BaseModule):
                         
                         # Limpar o campo
                         campo_codigo.clear()
-                        time.sleep(0.3)
                         
                         # Digitar o código
                         campo_codigo.send_keys(codigo)
-                        time.sleep(0.5)
                         
                         # Pressionar Enter
                         campo_codigo.send_keys(Keys.ENTER)
@@ -1045,9 +931,9 @@ class ConclusaoModule(BaseModule):
                         # Aguardar o modal de carregamento desaparecer antes de continuar
                         self.aguardar_modal_carregamento_desaparecer(driver, wait, timeout=30)
                         
-                        # Aguardar delay progressivo para dar tempo ao sistema processar
-                        log_message(f"⏳ Aguardando {delay_progressivo:.1f}s para sistema processar...", "INFO")
-                        time.sleep(delay_progressivo)
+                        # Quanto mais exames acumulados, mais lento fica o sistema - aguardar a resposta
+                        # do servidor em vez de um atraso fixo crescente
+                        aguardar_pagina_pronta(driver, timeout=30)
                         
                         # Verificar se o campo está realmente interagível antes de continuar
                         try:
@@ -1061,7 +947,7 @@ class ConclusaoModule(BaseModule):
                             tentativas += 1
                             if tentativas < max_tentativas:
                                 log_message(f"🔄 Tentativa {tentativas + 1}/{max_tentativas} em 3 segundos...", "WARNING")
-                                time.sleep(3)
+                                dormir(3)
                             else:
                                 log_message(f"⚠️ Máximo de tentativas atingido, continuando mesmo assim...", "WARNING")
                         
@@ -1070,7 +956,7 @@ class ConclusaoModule(BaseModule):
                         log_message(f"❌ Erro na tentativa {tentativas}: {e}", "ERROR")
                         if tentativas < max_tentativas:
                             log_message(f"🔄 Tentando novamente em 5 segundos...", "WARNING")
-                            time.sleep(5)
+                            dormir(5)
                         else:
                             log_message(f"❌ Máximo de tentativas atingido para exame {codigo}", "ERROR")
                             raise
@@ -1084,7 +970,7 @@ class ConclusaoModule(BaseModule):
                     pass
             
             log_message("✅ Todos os exames foram acumulados no formulário", "SUCCESS")
-            time.sleep(2)
+            aguardar_pagina_pronta(driver)
             
         except Exception as e:
             log_message(f"Erro ao acumular exames: {e}", "ERROR")
@@ -1116,12 +1002,11 @@ class ConclusaoModule(BaseModule):
                 )
                 
                 # Rolar até o checkbox
-                driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", checkbox_mark_all)
-                time.sleep(0.5)
+                driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", checkbox_mark_all)
                 
                 # Clicar
                 checkbox_mark_all.click()
-                time.sleep(1.5)
+                aguardar_ajax(driver, timeout=5)
                 log_message("✅ Método 1: Click no markAll executado", "SUCCESS")
                 success = True
             except Exception as e1:
@@ -1135,7 +1020,7 @@ class ConclusaoModule(BaseModule):
                             checkbox.click();
                         }
                     """)
-                    time.sleep(1.5)
+                    aguardar_ajax(driver, timeout=5)
                     log_message("✅ Método 2: Click via JavaScript executado", "SUCCESS")
                     success = True
                 except Exception as e2:
@@ -1148,7 +1033,6 @@ class ConclusaoModule(BaseModule):
                         for cb in checkboxes:
                             if not cb.is_selected():
                                 cb.click()
-                                time.sleep(0.2)
                         log_message("✅ Método 3: Seleção manual executada", "SUCCESS")
                         success = True
                     except Exception as e3:
@@ -1179,13 +1063,11 @@ class ConclusaoModule(BaseModule):
             )
             
             # Rolar até o botão
-            driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", botao_acoes)
-            time.sleep(1)
+            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", botao_acoes)
             
             # Clicar no botão
             botao_acoes.click()
             log_message("✅ Botão Ações clicado, dropdown aberto", "SUCCESS")
-            time.sleep(1.5)
             
         except Exception as e:
             log_message(f"Erro ao clicar no botão Ações: {e}", "ERROR")
@@ -1204,11 +1086,10 @@ class ConclusaoModule(BaseModule):
             # Clicar no link
             link_laudos.click()
             log_message("✅ Opção 'Laudos' clicada", "SUCCESS")
-            time.sleep(3)
+            aguardar_pagina_pronta(driver)
             
             # Aguardar o popup abrir (se necessário)
             log_message("⏳ Aguardando processamento...", "INFO")
-            time.sleep(2)
             
         except Exception as e:
             log_message(f"Erro ao clicar na opção Laudos: {e}", "ERROR")
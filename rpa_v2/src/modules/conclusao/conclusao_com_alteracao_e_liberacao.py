@@ -7,11 +7,13 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
 from dotenv import load_dotenv
-from openpyxl import load_workbook
 
 from src.core.browser_factory import BrowserFactory
 from src.core.logger import log_message
+from src.core.session_manager import login_pathoweb
+from src.core.waits import dormir
 from src.modules.base import BaseModule
+from src.utils.planilha import ler_registros
 
 load_dotenv()
 
@@ -24,20 +26,19 @@ class ConclusaoComAlteracaoELiberacaoModule(BaseModule):
         Se patologista/unimed estiverem vazios, herda o último valor não-vazio.
         """
         try:
-            workbook = load_workbook(file_path)
-            sheet = workbook.active
             dados: list[dict] = []
 
             ultimo_patologista = ""
             ultima_unimed = ""
 
             # Lê da linha 2 em diante (linha 1 é cabeçalho)
-            for row in range(2, sheet.max_row + 1):
+            for registro in ler_registros(file_path, {"codigo": "A", "patologista": "B", "unimed": "C"}):
                 valores_herdados = []
 
-                codigo = sheet[f"A{row}"].value
-                patologista = sheet[f"B{row}"].value
-                unimed = sheet[f"C{row}"].value
+                row = registro["_linha"]
+                codigo = registro["codigo"]
+                patologista = registro["patologista"]
+                unimed = registro["unimed"]
 
                 if codigo is None:
                     continue
@@ -79,7 +80,6 @@ class ConclusaoComAlteracaoELiberacaoModule(BaseModule):
                     }
                 )
 
-            workbook.close()
             return dados
         except Exception as e:
             raise Exception(f"Erro ao ler planilha: {e}")
@@ -231,7 +231,7 @@ class ConclusaoComAlteracaoELiberacaoModule(BaseModule):
             except Exception:
                 pass
 
-            time.sleep(1)
+            dormir(1)
             if int(time.time() - inicio) % 5 == 0:
                 log_message(
                     f"⏳ Aguardando carregamento... ({int(time.time() - inicio)}s)",
@@ -272,7 +272,7 @@ class ConclusaoComAlteracaoELiberacaoModule(BaseModule):
                     log_message(f"⏳ Aguardando envio... ({minutos}m {segundos}s)", "INFO")
                     contador_log = tempo_decorrido
 
-                time.sleep(0.2)
+                dormir(0.2)
 
             log_message(
                 f"⚠️ Timeout de {timeout}s atingido - usuário não enviou o exame {codigo} para próxima etapa",
@@ -414,50 +414,12 @@ class ConclusaoComAlteracaoELiberacaoModule(BaseModule):
         resultados = []
 
         try:
-            driver = BrowserFactory.create_chrome()
+            driver = BrowserFactory.acquire_chrome()
             wait = WebDriverWait(driver, 20)
 
             log_message("Iniciando automação de conclusão com alteração e liberação...", "INFO")
 
-            driver.get(url)
-            wait.until(EC.presence_of_element_located((By.ID, "username")))
-
-            username_field = driver.find_element(By.ID, "username")
-            username_field.clear()
-            username_field.send_keys(username)
-
-            password_field = driver.find_element(By.ID, "password")
-            password_field.clear()
-            password_field.send_keys(password)
-
-            submit_button = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
-            submit_button.click()
-
-            # Navegação módulo (mantém seu comportamento)
-            log_message("Verificando se precisa navegar para módulo de exames...", "INFO")
-            current_url = driver.current_url
-            if current_url == "https://dap.pathoweb.com.br/" or "trocarModulo" in current_url:
-                try:
-                    modulo_link = wait.until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, "a[href='/site/trocarModulo?modulo=1']"))
-                    )
-                    modulo_link.click()
-                    time.sleep(2)
-                    log_message("✅ Navegação para módulo de exames realizada", "SUCCESS")
-                except Exception:
-                    driver.get("https://dap.pathoweb.com.br/moduloExame/index")
-                    time.sleep(2)
-
-            # Fechar modal se aparecer
-            try:
-                modal_close_button = driver.find_element(By.CSS_SELECTOR,
-                                                         "#mensagemParaClienteModal .modal-footer button")
-                if modal_close_button.is_displayed():
-                    modal_close_button.click()
-                    time.sleep(1)
-                    log_message("✅ Modal de mensagem fechado", "INFO")
-            except Exception:
-                pass
+            login_pathoweb(driver, username, password, modulo=1, url=url)
 
             log_message("✅ Login realizado com sucesso. Iniciando processamento dos exames.", "SUCCESS")
 
@@ -7,11 +7,13 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
 from dotenv import load_dotenv
-from openpyxl import load_workbook
 
 from src.core.browser_factory import BrowserFactory
 from src.core.logger import log_message
+from src.core.session_manager import login_pathoweb
+from src.core.waits import dormir
 from src.modules.base import BaseModule
+from src.utils.planilha import ler_registros
 
 load_dotenv()
 
@@ -21,19 +23,18 @@ class ConclusaoModule(BaseModule):
 
     def get_dados_exames(self, file_path: str) -> list:
         try:
-            workbook = load_workbook(file_path)
-            sheet = workbook.active
             dados = []
             ultima_mascara = None
             ultimo_patologista = None
             ultimo_unimed = None
             
             # Lê da linha 2 em diante (linha 1 é cabeçalho)
-            for row in range(2, sheet.max_row + 1):
-                codigo = sheet[f'A{row}'].value
-                mascara = sheet[f'B{row}'].value
-                patologista = sheet[f'C{row}'].value
-                unimed = sheet[f'D{row}'].value
+            for registro in ler_registros(file_path, {"codigo": "A", "mascara": "B", "patologista": "C", "unimed": "D"}):
+                row = registro["_linha"]
+                codigo = registro["codigo"]
+                mascara = registro["mascara"]
+                patologista = registro["patologista"]
+                unimed = registro["unimed"]
                 
                 if codigo is not None:
                     codigo = str(codigo).strip()
@@ -77,7 +78,6 @@ class ConclusaoModule(BaseModule):
                         'unimed': unimed
                     })
             
-            workbook.close()
             return dados
         except Exception as e:
             raise Exception(f"Erro ao ler planilha: {e}")
@@ -90,13 +90,11 @@ class ConclusaoModule(BaseModule):
                 codificacao_path = os.path.normpath(codificacao_path)
             log_message(f"📂 Carregando planilha de codificação: {codificacao_path}", "INFO")
 
-            workbook = load_workbook(codificacao_path)
-            sheet = workbook.active
             codificacao = {}
 
-            for row in range(2, sheet.max_row + 1):
-                mascara = sheet[f'A{row}'].value
-                grupo = sheet[f'C{row}'].value
+            for registro in ler_registros(codificacao_path, {"mascara": "A", "grupo": "C"}):
+                mascara = registro["mascara"]
+                grupo = registro["grupo"]
 
                 if mascara is not None and grupo is not None:
                     mascara_str = str(mascara).strip()
@@ -104,7 +102,6 @@ class ConclusaoModule(BaseModule):
                     if mascara_str and grupo_str:
                         codificacao[mascara_str] = grupo_str
 
-            workbook.close()
             log_message(f"✅ Codificação carregada: {len(codificacao)} máscaras mapeadas", "SUCCESS")
             return codificacao
         except Exception as e:
@@ -470,67 +467,13 @@ class ConclusaoModule(BaseModule):
         resultados = []
         
         try:
-            driver = BrowserFactory.create_chrome(headless=headless_mode)
+            driver = BrowserFactory.acquire_chrome(headless=headless_mode)
             wait = WebDriverWait(driver, 20)
             
             log_message("Iniciando automação de conclusão...", "INFO")
             
             # Login
-            log_message("Fazendo login...", "INFO")
-            driver.get(url)
-            
-            # Aguardar página carregar completamente
-            wait.until(EC.presence_of_element_located((By.ID, "username")))
-            
-            username_field = driver.find_element(By.ID, "username")
-            username_field.clear()
-            username_field.send_keys(username)
-            
-            password_field = driver.find_element(By.ID, "password")
-            password_field.clear()
-            password_field.send_keys(password)
-            
-            submit_button = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
-            submit_button.click()
-
-            log_message("Verificando se precisa navegar para módulo de exames...", "INFO")
-            current_url = driver.current_url
-            if current_url == "https://dap.pathoweb.com.br/" or "trocarModulo" in current_url:
-                log_message("Detectada tela de seleção de módulos - navegando para módulo de exames...",
-                            "INFO")
-                try:
-                    modulo_link = wait.until(
-                        EC.element_to_be_clickable(
-                            (By.CSS_SELECTOR, "a[href='/site/trocarModulo?modulo=1']")))
-                    modulo_link.click()
-                    time.sleep(2)
-                    log_message("✅ Navegação para módulo de exames realizada", "SUCCESS")
-                except Exception as e:
-                    log_message(f"⚠️ Erro ao navegar para módulo: {e}", "WARNING")
-                    # Tentar navegar diretamente pela URL como fallback
-                    driver.get("https://dap.pathoweb.com.br/moduloExame/index")
-                    time.sleep(2)
-                    log_message("🔄 Navegação direta para módulo realizada", "INFO")
-
-            elif "moduloExame" in current_url:
-                log_message("✅ Já está no módulo de exames - pulando navegação", "SUCCESS")
-            else:
-                log_message(f"⚠️ URL inesperada detectada: {current_url}", "WARNING")
-                # Tentar navegar diretamente como fallback
-                driver.get("https://dap.pathoweb.com.br/moduloExame/index")
-                time.sleep(2)
-                log_message("🔄 Navegação direta para módulo realizada (fallback)", "INFO")
-            
-            # Fechar modal se aparecer
-            try:
-                modal_close_button = driver.find_element(By.CSS_SELECTOR,
-                                                         "#mensagemParaClienteModal .modal-footer button")
-                if modal_close_button.is_displayed():
-                    modal_close_button.click()
-                    time.sleep(1)
-                    log_message("✅ Modal de mensagem fechado", "INFO")
-            except Exception:
-                pass
+            login_pathoweb(driver, username, password, modulo=1, url=url)
 
             log_message("✅ Login realizado com sucesso. Iniciando processamento dos exames.", "SUCCESS")
             
@@ -569,72 +512,18 @@ class ConclusaoModule(BaseModule):
                     if not self.verificar_sessao_browser(driver):
                         log_message("🔄 Recriando browser devido à sessão perdida...", "WARNING")
                         try:
-                            driver.quit()
+                            BrowserFactory.release_chrome(driver)
                         except:
                             pass
                         
                         # Recriar browser e fazer login novamente
-                        driver = BrowserFactory.create_chrome(headless=headless_mode)
+                        driver = BrowserFactory.acquire_chrome(headless=headless_mode)
                         wait = WebDriverWait(driver, 20)
                         
-                        # Fazer login novamente
+                        # Fazer login novamente (reaproveita a sessão salva se ainda válida)
                         log_message("🔄 Fazendo login novamente...", "INFO")
-                        driver.get(url)
-                        
-                        # Aguardar página carregar completamente
-                        wait.until(EC.presence_of_element_located((By.ID, "username")))
-                        time.sleep(2)
-                        
-                        username_field = driver.find_element(By.ID, "username")
-                        username_field.clear()
-                        username_field.send_keys(username)
-                        
-                        password_field = driver.find_element(By.ID, "password")
-                        password_field.clear()
-                        password_field.send_keys(password)
-                        
-                        submit_button = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
-                        submit_button.click()
-                        
-                        log_message("🔄 Navegando para módulo de exames novamente...", "INFO")
+                        login_pathoweb(driver, username, password, modulo=1, url=url)
 
-                        log_message("Verificando se precisa navegar para módulo de exames...", "INFO")
-                        current_url = driver.current_url
-                        if current_url == "https://dap.pathoweb.com.br/" or "trocarModulo" in current_url:
-                            log_message("Detectada tela de seleção de módulos - navegando para módulo de exames...",
-                                        "INFO")
-                            try:
-                                modulo_link = wait.until(
-                                    EC.element_to_be_clickable(
-                                        (By.CSS_SELECTOR, "a[href='/site/trocarModulo?modulo=1']")))
-                                modulo_link.click()
-                                time.sleep(2)
-                                log_message("✅ Navegação para módulo de exames realizada", "SUCCESS")
-                            except Exception as e:
-                                log_message(f"⚠️ Erro ao navegar para módulo: {e}", "WARNING")
-                                # Tentar navegar diretamente pela URL como fallback
-                                driver.get("https://dap.pathoweb.com.br/moduloExame/index")
-                                time.sleep(2)
-                                log_message("🔄 Navegação direta para módulo realizada", "INFO")
-
-                        elif "moduloExame" in current_url:
-                            log_message("✅ Já está no módulo de exames - pulando navegação", "SUCCESS")
-                        else:
-                            log_message(f"⚠️ URL inesperada detectada: {current_url}", "WARNING")
-                            # Tentar navegar diretamente como fallback
-                            driver.get("https://dap.pathoweb.com.br/moduloExame/index")
-                            time.sleep(2)
-                            log_message("🔄 Navegação direta para módulo realizada (fallback)", "INFO")
-                        
-                        # Fechar modal se aparecer
-                        try:
-                            modal_close_button = driver.find_element(By.CSS_SELECTOR, "#mensagemParaClienteModal .modal-footer button")
-                            if modal_close_button.is_displayed():
-                                modal_close_button.click()
-                                time.sleep(1)
-                        except Exception:
-                            pass
-                        
                         log_message("✅ Browser recriado e login realizado novamente", "SUCCESS")
                     
                     # Processar este exame específico
@@ -826,7 +715,7 @@ class ConclusaoModule(BaseModule):
             except:
                 pass
             
-            time.sleep(1)
+            dormir(1)
             if int(time.time() - inicio) % 5 == 0:  # Log a cada 5 segundos
                 log_message(f"⏳ Aguardando carregamento... ({int(time.time() - inicio)}s)", "INFO")
         else:
@@ -834,7 +723,7 @@ class ConclusaoModule(BaseModule):
             return {'status': 'sem_andamento', 'detalhes': 'Exame não encontrado ou não carregou'}
         
         # Aguardar carregamento completo
-        time.sleep(2)
+        dormir(2)
         
         # Verificar se tem SVG na conclusão
         if self.verificar_svg_conclusao(driver):
@@ -876,7 +765,7 @@ class ConclusaoModule(BaseModule):
                         cb.click()
                     except Exception:
                         driver.execute_script("arguments[0].click();", cb)
-                    time.sleep(0.3)
+                    dormir(0.3)
 
             log_message("✅ Procedimentos selecionados", "INFO")
             time.sleep(0.5)
@@ -904,7 +793,7 @@ class ConclusaoModule(BaseModule):
             except Exception:
                 pass
 
-            time.sleep(2)
+            dormir(2)
 
             driver.execute_script("""
                 if(window.__orig_confirm) window.confirm = window.__orig_confirm;
@@ -976,7 +865,7 @@ class ConclusaoModule(BaseModule):
             except Exception:
                 pass
 
-            time.sleep(3)
+            dormir(3)
 
             driver.execute_script("""
                 if(window.__orig_confirm) window.confirm = window.__orig_confirm;
@@ -1078,7 +967,7 @@ class ConclusaoModule(BaseModule):
                     driver.execute_script("""
                         $('#acumular').iCheck('check');
                     """)
-                    time.sleep(2)
+                    dormir(2)
                     log_message("✅ Método 1: iCheck check() executado", "SUCCESS")
                 except Exception as e1:
                     log_message(f"⚠️ Método 1 falhou: {e1}", "WARNING")
@@ -1087,7 +976,7 @@ class ConclusaoModule(BaseModule):
                     try:
                         wrapper = driver.find_element(By.XPATH, "//input[@id='acumular']/following-sibling::ins[@class='iCheck-helper']")
                         wrapper.click()
-                        time.sleep(2)
+                        dormir(2)
                         log_message("✅ Método 2: Click no iCheck-helper executado", "SUCCESS")
                     except Exception as e2:
                         log_message(f"⚠️ Método 2 falhou: {e2}", "WARNING")
@@ -1098,7 +987,7 @@ class ConclusaoModule(BaseModule):
                                 var checkbox = document.getElementById('acumular');
                                 checkbox.click();
                             """)
-                            time.sleep(2)
+                            dormir(2)
                             log_message("✅ Método 3: Click via JavaScript executado", "SUCCESS")
                         except Exception as e3:
                             log_message(f"❌ Método 3 falhou: {e3}", "ERROR")
@@ -1202,7 +1091,7 @@ class ConclusaoModule(BaseModule):
                     if int(time.time() - inicio) % 5 == 0:
                         log_message(f"⏳ Ainda aguardando carregamento... ({int(time.time() - inicio)}s)", "INFO")
                     
-                    time.sleep(0.5)
+                    dormir(0.5)
                     
                 except Exception as e:
                     # Se houver erro ao verificar modais, assumir que não há modal
@@ -1246,11 +1135,11 @@ class ConclusaoModule(BaseModule):
                         
                         # Limpar o campo
                         campo_codigo.clear()
-                        time.sleep(0.3)
+                        dormir(0.3)
                         
                         # Digitar o código
                         campo_codigo.send_keys(codigo)
-                        time.sleep(0.5)
+                        dormir(0.5)
                         
                         # Pressionar Enter
                         campo_codigo.send_keys(Keys.ENTER)
@@ -1261,7 +1150,7 @@ class ConclusaoModule(BaseModule):
                         
                         # Aguardar delay progressivo para dar tempo ao sistema processar
                         log_message(f"⏳ Aguardando {delay_progressivo:.1f}s para sistema processar...", "INFO")
-                        time.sleep(delay_progressivo)
+                        dormir(delay_progressivo)
                         
                         # Verificar se o campo está realmente interagível antes de continuar
                         try:
@@ -1275,7 +1164,7 @@ class ConclusaoModule(BaseModule):
                             tentativas += 1
                             if tentativas < max_tentativas:
                                 log_message(f"🔄 Tentativa {tentativas + 1}/{max_tentativas} em 3 segundos...", "WARNING")
-                                time.sleep(3)
+                                dormir(3)
                             else:
                                 log_message(f"⚠️ Máximo de tentativas atingido, continuando mesmo assim...", "WARNING")
                         
@@ -1284,7 +1173,7 @@ class ConclusaoModule(BaseModule):
                         log_message(f"❌ Erro na tentativa {tentativas}: {e}", "ERROR")
                         if tentativas < max_tentativas:
                             log_message(f"🔄 Tentando novamente em 5 segundos...", "WARNING")
-                            time.sleep(5)
+                            dormir(5)
                         else:
                             log_message(f"❌ Máximo de tentativas atingido para exame {codigo}", "ERROR")
                             raise
@@ -1298,7 +1187,7 @@ class ConclusaoModule(BaseModule):
                     pass
             
             log_message("✅ Todos os exames foram acumulados no formulário", "SUCCESS")
-            time.sleep(2)
+            dormir(2)
             
         except Exception as e:
             log_message(f"Erro ao acumular exames: {e}", "ERROR")
@@ -1362,7 +1251,7 @@ class ConclusaoModule(BaseModule):
                         for cb in checkboxes:
                             if not cb.is_selected():
                                 cb.click()
-                                time.sleep(0.2)
+                                dormir(0.2)
                         log_message("✅ Método 3: Seleção manual executada", "SUCCESS")
                         success = True
                     except Exception as e3:
@@ -1418,11 +1307,11 @@ class ConclusaoModule(BaseModule):
             # Clicar no link
             link_laudos.click()
             log_message("✅ Opção 'Laudos' clicada", "SUCCESS")
-            time.sleep(3)
+            dormir(3)
             
             # Aguardar o popup abrir (se necessário)
             log_message("⏳ Aguardando processamento...", "INFO")
-            time.sleep(2)
+            dormir(2)
             
         except Exception as e:
             log_message(f"Erro ao clicar na opção Laudos: {e}", "ERROR")
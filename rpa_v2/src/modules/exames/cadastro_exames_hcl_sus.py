@@ -1,11 +1,16 @@
 import json
+import queue
+import threading
 import time
 from selenium.webdriver import Keys
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from src.core.browser_factory import BrowserFactory
+from src.core.http_transport import tentar_link_http
 from src.core.logger import log_message
+from src.core.session_manager import login_pathoweb
+from src.core.waits import dormir
 from src.modules.base import BaseModule
 
 # Importar funções do OCR
@@ -14,11 +19,16 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from exame_data_extractor import process_all_files_optimized
 
+# Resultados de OCR aguardando o navegador; com a fila cheia o OCR espera
+FILA_OCR_MAX = int(os.getenv("RPA_OCR_FILA", "4"))
+FIM_OCR = object()
+
 class CriacaoExamesHclSus(BaseModule):
     def __init__(self):
         super().__init__(nome="Criação Exame Hospital Câncer")
         self.driver = None
         self.wait = None
+        self.url = None
         self.dados_exame = {}
 
     def carregar_dados_ocr(self, arquivo_json):
@@ -35,20 +45,14 @@ class CriacaoExamesHclSus(BaseModule):
             return False
 
     def setup(self, url):
-        self.driver = BrowserFactory.create_chrome()
+        self.driver = BrowserFactory.acquire_chrome()
         self.wait = WebDriverWait(self.driver, 10)
-        self.driver.get(url)
+        self.url = url
 
     def login(self, username, password):
         """Mesmo login do módulo original"""
         try:
-            user_field = self.wait.until(EC.presence_of_element_located((By.ID, "username")))
-            user_field.clear()
-            user_field.send_keys(username)
-            pass_field = self.driver.find_element(By.ID, "password")
-            pass_field.clear()
-            pass_field.send_keys(password)
-            self.driver.find_element(By.CSS_SELECTOR, "button[type='submit']").click()
+            login_pathoweb(self.driver, username, password, url=self.url)
             log_message("✔ Login realizado", "SUCCESS")
         except Exception as e:
             log_message(f"✗ Erro no login: {str(e)}", "ERROR")
@@ -92,7 +96,7 @@ class CriacaoExamesHclSus(BaseModule):
                 EC.presence_of_element_located((By.ID, "consultarPaciente"))
             )
             self.driver.execute_script("arguments[0].click();", consult_button)
-            time.sleep(3)
+            dormir(3)
 
             # Verificar se encontrou
             rows = self.driver.find_elements(By.CSS_SELECTOR, "#formPacienteId table tbody tr")
@@ -115,7 +119,7 @@ class CriacaoExamesHclSus(BaseModule):
                     EC.presence_of_element_located((By.ID, "criarPaciente"))
                 )
                 self.driver.execute_script("arguments[0].click();", create_patient)
-                time.sleep(2)
+                dormir(2)
 
                 # Preencher dados do novo paciente
                 self.fill_new_patient_data()
@@ -165,7 +169,7 @@ class CriacaoExamesHclSus(BaseModule):
                 )
             )
             self.driver.execute_script("arguments[0].click();", next_button)
-            time.sleep(2)
+            dormir(2)
 
             # Definir convênio baseado nos dados
             convenio = self.dados_exame.get('convenio', 'SUS')
@@ -228,7 +232,7 @@ class CriacaoExamesHclSus(BaseModule):
                 )
             )
             self.driver.execute_script("arguments[0].click();", anchor)
-            time.sleep(2)
+            dormir(2)
             log_message("Âncora 'Vazio' clicada", "SUCCESS")
 
             # Passo 2: Aguardar input aparecer
@@ -260,7 +264,7 @@ class CriacaoExamesHclSus(BaseModule):
             # Passo 4: Dar ENTER
             log_message("Passo 4: Enviando ENTER...", "INFO")
             procedimento_input.send_keys(Keys.ENTER)
-            time.sleep(3)
+            dormir(3)
             log_message("ENTER enviado", "SUCCESS")
 
             log_message("Procedimento preenchido com sucesso!", "SUCCESS")
@@ -384,14 +388,14 @@ class CriacaoExamesHclSus(BaseModule):
                 self.wait.until(
                     EC.element_to_be_clickable((By.CSS_SELECTOR, "a[href='/site/trocarModulo?modulo=1']"))
                 ).click()
-                time.sleep(2)
-            except:
+                dormir(2)
+            except Exception:
                 # Já está no módulo correto
                 pass
 
             # Criar novo exame
             self.driver.find_element(By.XPATH, "//a[contains(text(), 'Criar novo exame')]").click()
-            time.sleep(2)
+            dormir(2)
 
             # Selecionar tipo
             #self.select_exam_type()
@@ -403,7 +407,7 @@ class CriacaoExamesHclSus(BaseModule):
                 )
             )
             self.driver.execute_script("arguments[0].click();", modal_button)
-            time.sleep(2)
+            dormir(2)
 
             # Buscar ou criar paciente
             if not self.search_or_create_patient():
@@ -478,8 +482,9 @@ class CriacaoExamesHclSus(BaseModule):
                     EC.element_to_be_clickable((By.XPATH, "//a[@data-url='/moduloExame/saveExameAjax']"))
                 )
 
-            self.driver.execute_script("arguments[0].click();", btn_salvar)
-            time.sleep(3)  # Aguardar salvamento
+            if not tentar_link_http(self.driver, btn_salvar, "Salvar máscara", exigir_formulario=True):
+                self.driver.execute_script("arguments[0].click();", btn_salvar)
+                dormir(3)  # Aguardar salvamento
             log_message("Alterações salvas", "SUCCESS")
 
             # Passo 7: Clicar no botão "Fechar exame"
@@ -488,7 +493,7 @@ class CriacaoExamesHclSus(BaseModule):
                 EC.element_to_be_clickable((By.ID, "fecharExameBarraFerramenta"))
             )
             self.driver.execute_script("arguments[0].click();", btn_fechar_exame)
-            time.sleep(2)  # Aguardar processamento
+            dormir(2)  # Aguardar processamento
             log_message("Botão 'Fechar exame' clicado", "SUCCESS")
 
             log_message("Máscara preenchida, salva e exame fechado com sucesso!", "SUCCESS")
@@ -506,50 +511,102 @@ class CriacaoExamesHclSus(BaseModule):
 
             return False
 
-    def run(self, params):
-        """Executa a criação de exames para todos os arquivos"""
-        username = params.get("username")
-        password = params.get("password")
-        url = params.get("url", "https://dap.pathoweb.com.br/login/auth")
-
-        # Processar todos os arquivos com OCR
-        try:
-            log_message("🔍 Iniciando processamento OCR de todos os arquivos...", "INFO")
-
-            arquivos_processados = process_all_files_optimized()
-
-            if not arquivos_processados:
-                log_message("❌ Nenhum arquivo foi processado pelo OCR", "ERROR")
-                return
+    def _produzir_ocr(self, fila, parar, workers, estado):
+        """Thread do OCR: coloca cada resultado na fila assim que fica pronto.
+
+        `fila.put` bloqueia quando a fila está cheia (o navegador ficou para trás),
+        verificando `parar` para não travar depois de um cancelamento.
+        """
+        def enfileirar(item):
+            while not parar.is_set():
+                try:
+                    fila.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
 
-            log_message(f"✅ {len(arquivos_processados)} arquivos processados pelo OCR", "SUCCESS")
+        def ao_concluir(resultado):
+            if enfileirar(resultado):
+                estado["produzidos"] += 1
 
+        try:
+            process_all_files_optimized(workers=workers, ao_concluir=ao_concluir, parar=parar)
         except Exception as e:
+            estado["erro"] = e
             log_message(f"❌ Erro no processamento OCR: {str(e)}", "ERROR")
-            return
+        finally:
+            enfileirar(FIM_OCR)
+
+    def _proximo_da_fila(self, fila, parar, cancel_flag):
+        while not parar.is_set():
+            if cancel_flag and cancel_flag.is_set():
+                parar.set()
+                break
+            try:
+                return fila.get(timeout=0.5)
+            except queue.Empty:
+                continue
+        return FIM_OCR
 
-        self.setup(url)
+    def run(self, params):
+        """Executa a criação de exames para todos os arquivos
 
+        O OCR roda em uma thread produtora enquanto o navegador faz login e cria os
+        exames conforme os resultados chegam pela fila (limitada a RPA_OCR_FILA itens).
+        """
+        username = params.get("username")
+        password = params.get("password")
+        url = params.get("url", "https://dap.pathoweb.com.br/login/auth")
+        cancel_flag = params.get("cancel_flag")
+
+        # Evento único para as duas etapas: cancelamento do usuário ou falha do navegador
+        parar = threading.Event()
+        fila = queue.Queue(maxsize=max(1, FILA_OCR_MAX))
+        estado = {"produzidos": 0, "erro": None}
+
+        log_message("🔍 Iniciando processamento OCR de todos os arquivos...", "INFO")
+        produtor = threading.Thread(
+            target=self._produzir_ocr,
+            args=(fila, parar, params.get("ocr_workers"), estado),
+            name="ocr-produtor",
+            daemon=True,
+        )
+        produtor.start()
+
+        exames_criados = 0
+        exames_com_erro = 0
         try:
+            self.setup(url)
             log_message("🚀 Iniciando criação de exames Hospital do Câncer...", "INFO")
 
             # Login
             self.login(username, password)
 
-            # Processar cada arquivo individualmente
-            exames_criados = 0
-            exames_com_erro = 0
-
-            for i, arquivo_info in enumerate(arquivos_processados, 1):
+            # Processar cada arquivo assim que o OCR entrega o resultado
+            i = 0
+            while True:
+                arquivo_info = self._proximo_da_fila(fila, parar, cancel_flag)
+                if cancel_flag and cancel_flag.is_set():
+                    log_message("Execução cancelada pelo usuário.", "WARNING")
+                    break
+                if arquivo_info is FIM_OCR:
+                    break
 
-                log_message(f"📋 Processando exame {i}/{len(arquivos_processados)}: {arquivo_info['arquivo_origem']}", "INFO")
+                i += 1
+                log_message(f"📋 Processando exame {i}: {arquivo_info['arquivo_origem']} "
+                            f"(na fila: {fila.qsize()})", "INFO")
 
                 if self.processar_um_exame(arquivo_info):
                     exames_criados += 1
                 else:
                     exames_com_erro += 1
 
-                time.sleep(2)
+                dormir(2)
+
+            if estado["produzidos"] == 0 and estado["erro"] is None and not parar.is_set():
+                log_message("❌ Nenhum arquivo foi processado pelo OCR", "ERROR")
+                return
 
             # Resumo final
             log_message(f"🎉 Processamento concluído!", "SUCCESS")
@@ -560,8 +617,11 @@ class CriacaoExamesHclSus(BaseModule):
         except Exception as e:
             log_message(f"✗ Erro no processo geral: {str(e)}", "ERROR")
         finally:
-            time.sleep(3)
-            self.driver.quit()
+            # Para o OCR junto com o navegador (cancelamento, erro ou fim normal)
+            parar.set()
+            produtor.join(timeout=30)
+            dormir(3)
+            BrowserFactory.release_chrome(self.driver)
 
 def run(params):
     module = CriacaoExamesHclSus()
@@ -6,6 +6,8 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from src.core.browser_factory import BrowserFactory
 from src.core.logger import log_message
+from src.core.session_manager import login_pathoweb
+from src.core.waits import dormir
 from config import SELECTORS, TIMEOUTS, PATIENT_NAME
 from src.utils.viacep_client import buscar_endereco
 from src.modules.base import BaseModule
@@ -15,21 +17,16 @@ class ExamAutomation(BaseModule):
         super().__init__(nome="Criação de Exames")
         self.driver = None
         self.wait = None
+        self.url = None
 
     def setup(self, url):
-        self.driver = BrowserFactory.create_chrome()
+        self.driver = BrowserFactory.acquire_chrome()
         self.wait = WebDriverWait(self.driver, TIMEOUTS['element_wait'])
-        self.driver.get(url)
+        self.url = url
 
     def login(self, username, password):
         try:
-            user_field = self.wait.until(EC.presence_of_element_located((By.ID, "username")))
-            user_field.clear()
-            user_field.send_keys(username)
-            pass_field = self.driver.find_element(By.ID, "password")
-            pass_field.clear()
-            pass_field.send_keys(password)
-            self.driver.find_element(By.CSS_SELECTOR, "button[type='submit']").click()
+            login_pathoweb(self.driver, username, password, url=self.url)
             log_message("✓ Login realizado", "SUCCESS")
         except Exception as e:
             log_message(f"✗ Erro no login: {str(e)}", "ERROR")
@@ -71,13 +68,13 @@ class ExamAutomation(BaseModule):
     def search_patient(self):
         try:
             log_message("→ Buscando paciente...", "INFO")
-            time.sleep(TIMEOUTS['page_load'])
+            dormir(TIMEOUTS['page_load'])
             search_field = self.wait.until(EC.presence_of_element_located((By.ID, SELECTORS['patient_search_field'])))
             search_field.clear()
             search_field.send_keys(PATIENT_NAME)
             consult_button = self.wait.until(EC.presence_of_element_located((By.ID, SELECTORS['consult_button'])))
             self.driver.execute_script("arguments[0].click();", consult_button)
-            time.sleep(TIMEOUTS['search_result'])
+            dormir(TIMEOUTS['search_result'])
             if self.check_existing_patient():
                 log_message("✓ Paciente encontrado - selecionando", "SUCCESS")
                 return True
@@ -85,7 +82,7 @@ class ExamAutomation(BaseModule):
                 log_message("→ Paciente não encontrado - criando novo", "INFO")
                 create_patient = self.wait.until(EC.presence_of_element_located((By.ID, SELECTORS['create_patient'])))
                 self.driver.execute_script("arguments[0].click();", create_patient)
-                time.sleep(TIMEOUTS['search_result'])
+                dormir(TIMEOUTS['search_result'])
                 return False
         except Exception as e:
             log_message(f"✗ Erro ao buscar paciente: {str(e)}", "ERROR")
@@ -93,7 +90,7 @@ class ExamAutomation(BaseModule):
 
     def check_existing_patient(self):
         try:
-            time.sleep(2)
+            dormir(2)
             rows = self.driver.find_elements(By.CSS_SELECTOR, "#formPacienteId table tbody tr")
             if not rows:
                 return False
@@ -111,7 +108,7 @@ class ExamAutomation(BaseModule):
                 except:
                     continue
             return False
-        except:
+        except Exception:
             return False
 
     def create_patient(self):
@@ -150,7 +147,7 @@ class ExamAutomation(BaseModule):
                 (By.CSS_SELECTOR, "a.btn.btn-sm.btn-primary.chamadaAjax.setupAjax[data-url='/paciente/saveAjax']")
             ))
             self.driver.execute_script("arguments[0].click();", next_button)
-            time.sleep(TIMEOUTS['page_load'])
+            dormir(TIMEOUTS['page_load'])
 
             anchor = self.wait.until(EC.element_to_be_clickable(
                 (By.CSS_SELECTOR, "input#convenioInput + a.table-editable-ancora")
@@ -181,7 +178,7 @@ class ExamAutomation(BaseModule):
             log_message(f"✗ Erro ao preencher dados do exame: {str(e)}", "ERROR")
 
     def fill_doctor_field(self):
-        time.sleep(2)
+        dormir(2)
         try:
             anchor_medico = None
             try:
@@ -219,7 +216,7 @@ class ExamAutomation(BaseModule):
 
     def fill_origin_field(self):
         try:
-            time.sleep(2)
+            dormir(2)
             anchor = self.driver.find_element(By.XPATH, "//input[@id='procedenciaInput']/following-sibling::a[contains(@class, 'table-editable-ancora')]")
             self.driver.execute_script("arguments[0].click();", anchor)
             input_el = self.driver.find_element(By.CSS_SELECTOR, "#procedenciaInput")
@@ -236,14 +233,14 @@ class ExamAutomation(BaseModule):
 
     def add_exam_material(self):
         try:
-            time.sleep(2)
+            dormir(2)
             novo_material_link = self.wait.until(
                 EC.element_to_be_clickable(
                     (By.XPATH, "//a[@title='Novo material' and contains(@class, 'chamadaAjax')]")
                 )
             )
             self.driver.execute_script("arguments[0].click();", novo_material_link)
-            time.sleep(2)
+            dormir(2)
             anchor_quantidade = self.wait.until(
                 EC.element_to_be_clickable(
                     (By.XPATH, "//input[@name='quantidadeRecipiente']/following-sibling::a[contains(@class, 'table-editable-ancora')]")
@@ -259,7 +256,7 @@ class ExamAutomation(BaseModule):
 
     def finalize_exam_creation(self):
         try:
-            time.sleep(2)
+            dormir(2)
             selectors = [
                 "//a[@data-url='/moduloExame/saveExameAjax']",
                 "//a[@title='Próximo']",
@@ -272,9 +269,9 @@ class ExamAutomation(BaseModule):
                     btn = self.driver.find_element(By.XPATH, sel)
                     btn.click()
                     log_message("✓ Botão 'Próximo' clicado - finalizando exame", "SUCCESS")
-                    time.sleep(3)
+                    dormir(3)
                     return
-                except:
+                except Exception:
                     continue
             log_message("✗ Botão 'Próximo' não encontrado", "ERROR")
         except Exception as e:
@@ -290,11 +287,11 @@ class ExamAutomation(BaseModule):
             log_message("Iniciando automação de criação de exame...", "INFO")
             self.login(username, password)
             self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "a[href='/site/trocarModulo?modulo=1']"))).click()
-            time.sleep(2)
+            dormir(2)
             if self.is_initial_screen():
                 log_message("Na tela inicial - navegando para criação de exame", "INFO")
                 self.driver.find_element(By.XPATH, SELECTORS['create_exam_button']).click()
-                time.sleep(TIMEOUTS['page_load'])
+                dormir(TIMEOUTS['page_load'])
                 self.select_exam_type()
                 modal_button = self.wait.until(EC.presence_of_element_located((By.XPATH, SELECTORS['modal_create_button'])))
                 self.driver.execute_script("arguments[0].click();", modal_button)
@@ -307,7 +304,7 @@ class ExamAutomation(BaseModule):
                         self.create_patient()
             else:
                 log_message("Usando paciente existente selecionado", "SUCCESS")
-            time.sleep(2)
+            dormir(2)
             if cancel_flag and cancel_flag.is_set():
                 log_message("Execução cancelada pelo usuário.", "WARNING")
                 return
@@ -321,7 +318,7 @@ class ExamAutomation(BaseModule):
             tb = traceback.format_exc()
             log_message(f"✗ Erro no processo de criação de exame: {str(e)}\n{tb}", "ERROR")
         finally:
-            self.driver.quit()
+            BrowserFactory.release_chrome(self.driver)
 
 def run(params):
     module = ExamAutomation()
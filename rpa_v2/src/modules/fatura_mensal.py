@@ -17,6 +17,8 @@ from requests.utils import add_dict_to_cookiejar
 
 from src.core.browser_factory import BrowserFactory
 from src.core.logger import log_message
+from src.core.session_manager import login_pathoweb
+from src.core.waits import dormir
 from src.modules.base import BaseModule
 
 load_dotenv()
@@ -149,7 +151,7 @@ class FaturaMensalModule(BaseModule):
             try:
                 driver.execute_script(f"$('#{field_id}').select2('open');")
                 log_message(f"✅ Campo Select2 '{field_id}' aberto via JavaScript select2('open')", "SUCCESS")
-                time.sleep(2)  # Aguardar dropdown abrir completamente
+                dormir(2)  # Aguardar dropdown abrir completamente
             except Exception as e1:
                 log_message(f"⚠️ JavaScript select2('open') falhou: {e1}", "WARNING")
                 # Se falhar, tentar clicar no span do Select2
@@ -157,7 +159,7 @@ class FaturaMensalModule(BaseModule):
                     select2_selection = driver.find_element(By.CSS_SELECTOR, f"#select2-{field_id}-container")
                     driver.execute_script("arguments[0].click();", select2_selection)
                     log_message(f"✅ Campo Select2 '{field_id}' clicado via JavaScript click", "SUCCESS")
-                    time.sleep(2)
+                    dormir(2)
                 except Exception as e2:
                     log_message(f"⚠️ JavaScript click falhou: {e2}", "WARNING")
                     # Última tentativa: clique normal
@@ -165,7 +167,7 @@ class FaturaMensalModule(BaseModule):
                         select2_selection = driver.find_element(By.CSS_SELECTOR, f"#select2-{field_id}-container")
                         select2_selection.click()
                         log_message(f"✅ Campo Select2 '{field_id}' clicado normalmente", "SUCCESS")
-                        time.sleep(2)
+                        dormir(2)
                     except Exception as e3:
                         log_message(f"⚠️ Erro ao abrir Select2 '{field_id}': {e3}", "WARNING")
                         return False
@@ -217,7 +219,7 @@ class FaturaMensalModule(BaseModule):
                 if text_to_find.upper() == option_text.upper():
                     log_message(f"✅ Encontrado match exato no Select2 '{field_id}': '{option_text}'", "SUCCESS")
                     option.click()
-                    time.sleep(1)
+                    dormir(1)
                     return True
             
             # Busca parcial (contém)
@@ -226,7 +228,7 @@ class FaturaMensalModule(BaseModule):
                 if text_to_find.upper() in option_text.upper():
                     log_message(f"✅ Encontrado match parcial no Select2 '{field_id}': '{option_text}'", "SUCCESS")
                     option.click()
-                    time.sleep(1)
+                    dormir(1)
                     return True
             
             log_message(f"⚠️ Nenhum match encontrado no Select2 '{field_id}' para '{text_to_find}'", "WARNING")
@@ -259,7 +261,7 @@ class FaturaMensalModule(BaseModule):
                     if os.path.exists(file_path):
                         return file_path
 
-                time.sleep(1)
+                dormir(1)
         except Exception as e:
             log_message(f"⚠️ Erro ao monitorar downloads: {e}", "WARNING")
 
@@ -277,7 +279,7 @@ class FaturaMensalModule(BaseModule):
             wait = WebDriverWait(driver, 15)
 
             # Aguardar página carregar completamente
-            time.sleep(2)
+            dormir(2)
             
             # Tentar localizar o link <a> que contém o botão "Abrir" - método mais confiável
             try:
@@ -423,7 +425,7 @@ class FaturaMensalModule(BaseModule):
         url = os.getenv("SYSTEM_URL", "https://dap.pathoweb.com.br/login/auth")
         parsed_url = urlparse(url)
         base_url = f"{parsed_url.scheme}://{parsed_url.netloc}" if parsed_url.scheme and parsed_url.netloc else "https://dap.pathoweb.com.br"
-        driver = BrowserFactory.create_chrome(download_dir=download_dir, headless=headless_mode)
+        driver = BrowserFactory.acquire_chrome(download_dir=download_dir, headless=headless_mode, permitir=("pdf",))
         wait = WebDriverWait(driver, 15)
 
         try:
@@ -449,45 +451,7 @@ class FaturaMensalModule(BaseModule):
             log_message(f"✅ Carregados {len(dados_excel)} registros do Excel", "SUCCESS")
 
             # Login
-            driver.get(url)
-            wait.until(EC.presence_of_element_located((By.ID, "username"))).send_keys(username)
-            driver.find_element(By.ID, "password").send_keys(password)
-            driver.find_element(By.CSS_SELECTOR, "button[type='submit']").click()
-
-            log_message("Verificando se precisa navegar para módulo de faturamento...", "INFO")
-            current_url = driver.current_url
-
-            if current_url == "https://dap.pathoweb.com.br/" or "trocarModulo" in current_url:
-                log_message("Detectada tela de seleção de módulos - navegando para módulo de faturamento...", "INFO")
-                try:
-                    modulo_link = wait.until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, "a[href='/site/trocarModulo?modulo=2']")))
-                    modulo_link.click()
-                    time.sleep(2)
-                    log_message("✅ Navegação para módulo de faturamento realizada", "SUCCESS")
-                except Exception as e:
-                    log_message(f"⚠️ Erro ao navegar para módulo: {e}", "WARNING")
-                    driver.get("https://dap.pathoweb.com.br/moduloFaturamento/index")
-                    time.sleep(2)
-                    log_message("🔄 Navegação direta para módulo realizada", "INFO")
-
-            elif "moduloFaturamento" in current_url:
-                log_message("✅ Já está no módulo de faturamento - pulando navegação", "SUCCESS")
-            else:
-                log_message(f"⚠️ URL inesperada detectada: {current_url}", "WARNING")
-                driver.get("https://dap.pathoweb.com.br/moduloFaturamento/index")
-                time.sleep(2)
-                log_message("🔄 Navegação direta para módulo realizada (fallback)", "INFO")
-
-            # Fechar modal se existir
-            try:
-                modal_close_button = driver.find_element(By.CSS_SELECTOR, "#mensagemParaClienteModal .modal-footer button")
-                if modal_close_button.is_displayed():
-                    modal_close_button.click()
-                    time.sleep(1)
-                    log_message("✅ Modal fechado", "SUCCESS")
-            except Exception:
-                log_message("ℹ️ Modal não encontrado ou já fechado", "INFO")
+            login_pathoweb(driver, username, password, modulo=2, url=url)
 
             # Acessar explicitamente a página do módulo de faturamento
             log_message("Acessando módulo de faturamento via URL...", "INFO")
@@ -527,7 +491,7 @@ class FaturaMensalModule(BaseModule):
             
             # Aguardar a tela carregar completamente antes de processar
             log_message("Aguardando tela carregar completamente...", "INFO")
-            time.sleep(5)  # Aguardar mais tempo para garantir que a tela carregou
+            dormir(5)  # Aguardar mais tempo para garantir que a tela carregou
             
             # Verificar se os campos principais estão presentes
             try:
@@ -538,7 +502,7 @@ class FaturaMensalModule(BaseModule):
                 log_message("✅ Campos principais detectados - tela pronta", "SUCCESS")
             except Exception as e:
                 log_message(f"⚠️ Campos principais não encontrados: {e}", "WARNING")
-                time.sleep(3)  # Aguardar mais um pouco
+                dormir(3)  # Aguardar mais um pouco
 
             # Processar cada linha do Excel
             resultados = []
@@ -556,7 +520,7 @@ class FaturaMensalModule(BaseModule):
                         select_cobrar = Select(cobrar_de_select)
                         select_cobrar.select_by_value(cobrar_de)
                         log_message(f"✅ Campo 'Cobrar de' configurado para: {cobrar_de}", "SUCCESS")
-                        time.sleep(1)  # Aguardar processamento
+                        dormir(1)  # Aguardar processamento
                     except Exception as e:
                         log_message(f"⚠️ Erro ao configurar 'Cobrar de': {e}", "WARNING")
                     
@@ -566,7 +530,7 @@ class FaturaMensalModule(BaseModule):
                         select_situacao = Select(situacao_select)
                         select_situacao.select_by_value("A")  # "Não enviado"
                         log_message("✅ Situação de faturamento configurada como 'Não enviado'", "SUCCESS")
-                        time.sleep(1)  # Aguardar processamento
+                        dormir(1)  # Aguardar processamento
                     except Exception as e:
                         log_message(f"⚠️ Erro ao configurar situação de faturamento: {e}", "WARNING")
                     
@@ -576,7 +540,7 @@ class FaturaMensalModule(BaseModule):
                         select_empresa = Select(empresa_select)
                         select_empresa.select_by_value("43")  # "DAP - DIAGNOSTICO EM ANATOMIA PATOLOGICA"
                         log_message("✅ Empresa do faturamento configurada como 'DAP'", "SUCCESS")
-                        time.sleep(1)  # Aguardar processamento
+                        dormir(1)  # Aguardar processamento
                     except Exception as e:
                         log_message(f"⚠️ Erro ao configurar empresa do faturamento: {e}", "WARNING")
                     
@@ -586,7 +550,7 @@ class FaturaMensalModule(BaseModule):
                         select_etapa = Select(etapa_select)
                         select_etapa.select_by_value("")  # Valor vazio
                         log_message("✅ Etapa do exame configurada como vazio", "SUCCESS")
-                        time.sleep(1)  # Aguardar processamento
+                        dormir(1)  # Aguardar processamento
                     except Exception as e:
                         log_message(f"⚠️ Erro ao configurar etapa do exame: {e}", "WARNING")
                     
@@ -606,13 +570,13 @@ class FaturaMensalModule(BaseModule):
                                         select_convenio = Select(convenio_select)
                                         select_convenio.select_by_value(option_value)
                                         log_message(f"✅ Convênio selecionado via Select: {dados['cliente']}", "SUCCESS")
-                                        time.sleep(1)
+                                        dormir(1)
                                     except Exception:
                                         # Se falhar, tentar com JavaScript para Select2
                                         try:
                                             driver.execute_script(f"$('#convenioId').val('{option_value}').trigger('change');")
                                             log_message(f"✅ Convênio selecionado via JavaScript: {dados['cliente']}", "SUCCESS")
-                                            time.sleep(1)
+                                            dormir(1)
                                         except Exception as e2:
                                             log_message(f"⚠️ Erro ao selecionar convênio via JavaScript: {e2}", "WARNING")
                                 else:
@@ -636,13 +600,13 @@ class FaturaMensalModule(BaseModule):
                                         select_procedencia = Select(procedencia_select)
                                         select_procedencia.select_by_value(option_value)
                                         log_message(f"✅ Procedência selecionada via Select: {dados['cliente']}", "SUCCESS")
-                                        time.sleep(1)
+                                        dormir(1)
                                     except Exception:
                                         # Se falhar, tentar com JavaScript para Select2
                                         try:
                                             driver.execute_script(f"$('#procedenciaId').val('{option_value}').trigger('change');")
                                             log_message(f"✅ Procedência selecionada via JavaScript: {dados['cliente']}", "SUCCESS")
-                                            time.sleep(1)
+                                            dormir(1)
                                         except Exception as e2:
                                             log_message(f"⚠️ Erro ao selecionar procedência via JavaScript: {e2}", "WARNING")
                                 else:
@@ -660,13 +624,13 @@ class FaturaMensalModule(BaseModule):
                                 campo_data.clear()
                                 campo_data.send_keys(f"{data_inicio} - {data_fim}")
                                 log_message(f"✅ Data de recepção configurada: {data_inicio} - {data_fim}", "SUCCESS")
-                                time.sleep(1)  # Aguardar processamento
+                                dormir(1)  # Aguardar processamento
                             else:  # liberacao
                                 campo_data = wait.until(EC.presence_of_element_located((By.ID, "dataLiberacao")))
                                 campo_data.clear()
                                 campo_data.send_keys(f"{data_inicio} - {data_fim}")
                                 log_message(f"✅ Data de liberação configurada: {data_inicio} - {data_fim}", "SUCCESS")
-                                time.sleep(1)  # Aguardar processamento
+                                dormir(1)  # Aguardar processamento
                         except Exception as e:
                             log_message(f"⚠️ Erro ao configurar data: {e}", "WARNING")
                     
@@ -683,10 +647,10 @@ class FaturaMensalModule(BaseModule):
                             WebDriverWait(driver, 30).until(EC.invisibility_of_element_located((By.ID, "spinner")))
                             log_message("✅ Resultados carregados", "SUCCESS")
                         except Exception:
-                            time.sleep(2)  # Aguardar um tempo fixo se não encontrar spinner
+                            dormir(2)  # Aguardar um tempo fixo se não encontrar spinner
                         
                         # Aguardar mais tempo após o modal fechar para garantir que a página processou
-                        time.sleep(5)
+                        dormir(5)
                         
                         # Verificar se o modal realmente fechou antes de continuar
                         try:
@@ -694,8 +658,8 @@ class FaturaMensalModule(BaseModule):
                             if spinner.is_displayed():
                                 log_message("⚠️ Modal ainda está visível, aguardando mais...", "WARNING")
                                 WebDriverWait(driver, 10).until(EC.invisibility_of_element_located((By.ID, "spinner")))
-                                time.sleep(3)
-                        except:
+                                dormir(3)
+                        except Exception:
                             log_message("✅ Modal confirmado como fechado", "SUCCESS")
                         
                         # PRIMEIRO: Desmarcar o checkbox "gerarArquivoTiss" ANTES de clicar no relatório
@@ -710,7 +674,7 @@ class FaturaMensalModule(BaseModule):
                                     # Se falhar, usar JavaScript
                                     driver.execute_script("arguments[0].click();", checkbox)
                                     log_message("✅ Checkbox 'gerarArquivoTiss' desmarcado via JavaScript ANTES do relatório", "SUCCESS")
-                                time.sleep(1)
+                                dormir(1)
                             else:
                                 log_message("ℹ️ Checkbox 'gerarArquivoTiss' já estava desmarcado", "INFO")
                         except Exception as e_checkbox:
@@ -738,11 +702,11 @@ class FaturaMensalModule(BaseModule):
                                 WebDriverWait(driver, 30).until(EC.invisibility_of_element_located((By.ID, "spinner")))
                                 log_message("✅ Relatório gerado", "SUCCESS")
                             except Exception:
-                                time.sleep(3)  # Aguardar um tempo fixo se não encontrar spinner
+                                dormir(3)  # Aguardar um tempo fixo se não encontrar spinner
                             
                             # Aguardar nova aba abrir com o PDF
                             log_message("🔄 Aguardando nova aba com PDF abrir...", "INFO")
-                            time.sleep(3)  # Aguardar aba abrir
+                            dormir(3)  # Aguardar aba abrir
                             
                             # Salvar referência da aba original
                             original_window = driver.current_window_handle
@@ -765,7 +729,7 @@ class FaturaMensalModule(BaseModule):
                                         break
                                 
                                 # Aguardar página carregar completamente
-                                time.sleep(3)
+                                dormir(3)
                                 
                                 # Tentar obter URL do PDF do DOM
                                 pdf_current_url = self.get_pdf_url(driver, base_url)
@@ -789,7 +753,7 @@ class FaturaMensalModule(BaseModule):
                                             )
                                             abrir_btn.click()
                                             log_message("✅ Botão 'Abrir' (ID: open-button) clicado", "SUCCESS")
-                                            time.sleep(3)  # Aguardar download iniciar
+                                            dormir(3)  # Aguardar download iniciar
                                         except Exception as e1:
                                             log_message(f"⚠️ Erro ao clicar por ID: {e1}", "WARNING")
                                             # Tentar por XPath com texto
@@ -799,14 +763,14 @@ class FaturaMensalModule(BaseModule):
                                                 )
                                                 abrir_btn.click()
                                                 log_message("✅ Botão 'Abrir' clicado via XPath", "SUCCESS")
-                                                time.sleep(3)
+                                                dormir(3)
                                             except Exception as e2:
                                                 log_message(f"⚠️ Erro ao clicar via XPath: {e2}", "WARNING")
                                                 # Tentar JavaScript como último recurso
                                                 try:
                                                     driver.execute_script("document.getElementById('open-button').click();")
                                                     log_message("✅ Botão 'Abrir' clicado via JavaScript", "SUCCESS")
-                                                    time.sleep(3)
+                                                    dormir(3)
                                                 except Exception as e3:
                                                     log_message(f"⚠️ Erro ao clicar via JavaScript: {e3}", "WARNING")
                                     except Exception as e_btn:
@@ -814,7 +778,7 @@ class FaturaMensalModule(BaseModule):
                                 
                                 # Aguardar download completar
                                 log_message("📥 Aguardando download completar...", "INFO")
-                                time.sleep(5)
+                                dormir(5)
                                 
                                 # Se ainda não baixou, tentar verificar se foi baixado pelo clique no botão
                                 if not downloaded_file:
@@ -830,7 +794,7 @@ class FaturaMensalModule(BaseModule):
                                 # Voltar para a aba original
                                 driver.switch_to.window(original_window)
                                 log_message("✅ Voltado para aba original", "SUCCESS")
-                                time.sleep(1)
+                                dormir(1)
                             else:
                                 log_message("⚠️ Nova aba não detectada, continuando...", "WARNING")
                                 pdf_current_url = self.get_pdf_url(driver, base_url)
@@ -863,7 +827,7 @@ class FaturaMensalModule(BaseModule):
                                     driver.back()
                                     wait.until(EC.presence_of_element_located((By.ID, "pesquisaFaturamento")))
                                     log_message("✅ Retorno para tela de Pré Faturamento concluído", "SUCCESS")
-                                    time.sleep(2)
+                                    dormir(2)
                                 except Exception as back_error:
                                     log_message(f"⚠️ Erro ao retornar para tela anterior: {back_error}", "WARNING")
                             
@@ -877,7 +841,7 @@ class FaturaMensalModule(BaseModule):
                                 except:
                                     pass
                                 
-                                time.sleep(2)
+                                dormir(2)
                                 
                                 # Clicar no botão
                                 try:
@@ -890,7 +854,7 @@ class FaturaMensalModule(BaseModule):
                                     log_message("✅ Botão 'Situação faturamento para' clicado via JavaScript", "SUCCESS")
                                 
                                 # Aguardar processamento
-                                time.sleep(3)
+                                dormir(3)
                                 
                                 # Aguardar modal aparecer e fechar
                                 try:
@@ -901,7 +865,7 @@ class FaturaMensalModule(BaseModule):
                                 except Exception:
                                     log_message("ℹ️ Processamento de situação concluído", "INFO")
                                 
-                                time.sleep(2)
+                                dormir(2)
                                 
                             except Exception as e_situacao:
                                 log_message(f"⚠️ Erro ao clicar em 'Situação faturamento para': {e_situacao}", "WARNING")
@@ -917,7 +881,7 @@ class FaturaMensalModule(BaseModule):
                     
                     # Aguardar mais tempo entre processamentos para garantir que tudo foi processado
                     log_message("Aguardando antes do próximo processamento...", "INFO")
-                    time.sleep(5)
+                    dormir(5)
                     
                 except Exception as e:
                     log_message(f"❌ Erro ao processar linha {i+1}: {e}", "ERROR")
@@ -947,7 +911,7 @@ class FaturaMensalModule(BaseModule):
             log_message(f"❌ Erro durante a automação: {e}", "ERROR")
             messagebox.showerror("Erro", f"❌ Erro durante a automação:\n{e}")
         finally:
-            driver.quit()
+            BrowserFactory.release_chrome(driver)
 
 
 def run(params: dict):
@@ -13,11 +13,13 @@ from tkinter import messagebox
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
 from selenium.webdriver.common.action_chains import ActionChains
 
 from src.core.browser_factory import BrowserFactory
 from src.core.logger import log_message
+from src.core.session_manager import login_pathoweb
+from src.core.waits import dormir
 from src.modules.base import BaseModule
 
 # Configurações padrão
@@ -87,7 +89,7 @@ class BaixaLoteModule(BaseModule):
             try:
                 self._scroll_to_element(driver, element)
                 acao()
-                time.sleep(0.3)
+                dormir(0.3)
                 return True
             except StaleElementReferenceException:
                 log_message(f"⚠️ Elemento stale no método {metodo}, tentando próximo...", "WARNING")
@@ -109,7 +111,7 @@ class BaixaLoteModule(BaseModule):
                 try:
                     if btn.is_displayed():
                         btn.click()
-                        time.sleep(0.3)
+                        dormir(0.3)
                 except Exception:
                     pass
 
@@ -159,81 +161,13 @@ class BaixaLoteModule(BaseModule):
     def _fazer_login(self, driver, username, password, url_login):
         log_message("🔐 Iniciando login no Pathoweb...", "INFO")
         try:
-            driver.get(url_login)
-            time.sleep(3)
-            
-            campo_email = self._esperar_elemento_presente(
-                driver, By.NAME, "j_username", timeout=10, descricao="campo de usuário"
-            )
-            if not campo_email:
-                self._salvar_screenshot(driver, "erro_login")
-                self._salvar_html(driver, "erro_login")
-                return False
-            
-            campo_senha = driver.find_element(By.NAME, "j_password")
-            
-            campo_email.clear()
-            campo_email.send_keys(username)
-            campo_senha.clear()
-            campo_senha.send_keys(password)
-            time.sleep(0.5)
-            
-            # Botão login - tentar múltiplos seletores
-            seletores_botao = [
-                (By.XPATH, "//button[normalize-space()='Entrar']"),
-                (By.XPATH, "//button[contains(text(), 'Entrar')]"),
-                (By.XPATH, "//button[contains(text(), 'Login')]"),
-                (By.XPATH, "//button[@type='submit']"),
-                (By.XPATH, "//input[@type='submit']"),
-                (By.CSS_SELECTOR, "button[type='submit']"),
-                (By.CSS_SELECTOR, "input[type='submit']"),
-                (By.XPATH, "//button[contains(@class, 'btn-primary')]"),
-            ]
-            
-            btn_entrar = None
-            for by, selector in seletores_botao:
-                try:
-                    btn_entrar = driver.find_element(by, selector)
-                    break
-                except NoSuchElementException:
-                    continue
-            
-            if not btn_entrar:
-                self._salvar_screenshot(driver, "erro_botao_login")
-                log_message("❌ Botão de login não encontrado", "ERROR")
-                return False
-            
-            btn_entrar.click()
-            time.sleep(5)
-            log_message("✓ Login realizado com sucesso", "SUCCESS")
+            login_pathoweb(driver, username, password, modulo=2, url=url_login)
+            log_message("✓ Login realizado e módulo de Faturamento acessado", "SUCCESS")
             return True
-            
         except Exception as e:
             log_message(f"❌ Erro no login: {type(e).__name__} - {e}", "ERROR")
             self._salvar_screenshot(driver, "erro_login")
-            return False
-
-    def _acessar_faturamento(self, driver):
-        log_message("📊 Acessando módulo de Faturamento...", "INFO")
-        try:
-            menu_faturamento = self._esperar_elemento_clicavel(
-                driver,
-                By.XPATH,
-                "//a[contains(@href, '/site/trocarModulo?modulo=2') and .//h2[contains(text(), 'Faturamento')]]",
-                timeout=20,
-                descricao="menu Faturamento"
-            )
-            if not menu_faturamento:
-                return False
-            
-            menu_faturamento.click()
-            time.sleep(3)
-            log_message("✓ Módulo de Faturamento acessado", "SUCCESS")
-            return True
-            
-        except Exception as e:
-            log_message(f"❌ Erro ao acessar Faturamento: {type(e).__name__}", "ERROR")
-            self._salvar_screenshot(driver, "erro_menu_faturamento")
+            self._salvar_html(driver, "erro_login")
             return False
 
     def _fechar_modal_inicial(self, driver):
@@ -265,7 +199,7 @@ class BaixaLoteModule(BaseModule):
                 return False
             
             botao_faturas.click()
-            time.sleep(3)
+            dormir(3)
             log_message("✓ Tela de faturas enviadas acessada", "SUCCESS")
             return True
             
@@ -279,7 +213,7 @@ class BaixaLoteModule(BaseModule):
         log_message("🔄 Retornando à tela de busca...", "INFO")
         
         try:
-            time.sleep(2)
+            dormir(2)
             
             # Scroll para o topo da página
             driver.execute_script("window.scrollTo(0, 0);")
@@ -302,7 +236,7 @@ class BaixaLoteModule(BaseModule):
                     return false;
                 """)
                 log_message("✓ Botão 'Faturas enviadas e recebimento' clicado", "INFO")
-                time.sleep(3)
+                dormir(3)
             except Exception as e:
                 log_message(f"⚠️ Erro ao clicar via JavaScript puro: {e}", "WARNING")
                 
@@ -316,7 +250,7 @@ class BaixaLoteModule(BaseModule):
                 if botao_faturas:
                     driver.execute_script("arguments[0].click();", botao_faturas)
                     log_message("✓ Botão clicado via fallback", "INFO")
-                    time.sleep(3)
+                    dormir(3)
             
             # Verificar se o campo de busca está disponível
             self._esperar_elemento_presente(driver, By.ID, "numeroLote", descricao="campo de busca de lote")
@@ -351,7 +285,7 @@ class BaixaLoteModule(BaseModule):
             
             btn_pesquisar.click()
             log_message("✓ Botão 'Pesquisar' clicado", "INFO")
-            time.sleep(3)
+            dormir(3)
             return True
             
         except Exception as e:
@@ -387,7 +321,7 @@ class BaixaLoteModule(BaseModule):
                             log_message(f"✓ Checkbox do lote {lote_str} marcado", "SUCCESS")
                         else:
                             log_message(f"ℹ️ Checkbox do lote {lote_str} já estava marcado", "INFO")
-                        time.sleep(1)
+                        dormir(1)
                         return True
                 except Exception:
                     continue
@@ -415,7 +349,7 @@ class BaixaLoteModule(BaseModule):
             
             btn_receber.click()
             log_message("✓ Botão 'Receber' clicado", "SUCCESS")
-            time.sleep(3)
+            dormir(3)
             return True
             
         except Exception as e:
@@ -479,7 +413,7 @@ class BaixaLoteModule(BaseModule):
         log_message("📝 Preenchendo modal de pagamento parcial...", "INFO")
 
         try:
-            time.sleep(2)
+            dormir(2)
 
             # Campo valor pago
             seletores_valor = [
@@ -572,7 +506,7 @@ class BaixaLoteModule(BaseModule):
                     self._salvar_screenshot(driver, "erro_botao_salvarGlosar")
                     return False
 
-            time.sleep(2)
+            dormir(2)
             return True
 
         except Exception as e:
@@ -645,7 +579,7 @@ class BaixaLoteModule(BaseModule):
                             continue
 
                         driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", botao_dollar)
-                        time.sleep(0.5)
+                        dormir(0.5)
                         driver.execute_script("arguments[0].click();", botao_dollar)
                         log_message("✓ Botão de pagamento parcial clicado", "INFO")
 
@@ -770,17 +704,13 @@ class BaixaLoteModule(BaseModule):
 
         driver = None
         try:
-            driver = BrowserFactory.create_chrome(headless=headless_mode)
+            driver = BrowserFactory.acquire_chrome(headless=headless_mode)
             log_message("🚀 Navegador inicializado para Baixa de Lote", "INFO")
 
             if not self._fazer_login(driver, username, password, url):
                 messagebox.showerror("Erro", "Falha no login no Pathoweb.")
                 return
 
-            if not self._acessar_faturamento(driver):
-                messagebox.showerror("Erro", "Falha ao acessar módulo de Faturamento.")
-                return
-
             self._fechar_modal_inicial(driver)
 
             if not self._acessar_faturas_enviadas(driver):
@@ -834,9 +764,9 @@ class BaixaLoteModule(BaseModule):
                     log_message(f"\n📌 Procedimento {idx_proc+1}/{len(linhas_lote)}", "INFO")
                     sucesso, mensagem = self._processar_procedimento(driver, lote_str, row)
                     df.at[df_index, "Status"] = mensagem
-                    time.sleep(1)
+                    dormir(1)
 
-                time.sleep(3)
+                dormir(3)
 
             log_message("\n✅ Processamento de todos os lotes finalizado!", "SUCCESS")
             self._salvar_resultados(df, excel_file)
@@ -851,7 +781,7 @@ class BaixaLoteModule(BaseModule):
         finally:
             if driver:
                 try:
-                    driver.quit()
+                    BrowserFactory.release_chrome(driver)
                 except Exception:
                     pass
 
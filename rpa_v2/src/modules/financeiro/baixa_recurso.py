@@ -12,6 +12,8 @@ from selenium.webdriver.common.action_chains import ActionChains
 
 from src.core.browser_factory import BrowserFactory
 from src.core.logger import log_message
+from src.core.session_manager import login_pathoweb
+from src.core.waits import dormir
 from src.modules.base import BaseModule
 
 # Configurações padrão (podem ser sobrescritas via params)
@@ -82,7 +84,7 @@ class BaixaRecursoModule(BaseModule):
             try:
                 self._scroll_to_element(driver, element)
                 acao()
-                time.sleep(0.3)
+                dormir(0.3)
                 return True
             except StaleElementReferenceException:
                 log_message(f"⚠️ Elemento stale no método {metodo}, tentando próximo...", "WARNING")
@@ -104,7 +106,7 @@ class BaixaRecursoModule(BaseModule):
                 try:
                     if btn.is_displayed():
                         btn.click()
-                        time.sleep(0.3)
+                        dormir(0.3)
                 except Exception:
                     pass
 
@@ -157,22 +159,22 @@ class BaixaRecursoModule(BaseModule):
         for tentativa in range(tentativas):
             try:
                 driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", campo)
-                time.sleep(0.2)
+                dormir(0.2)
                 campo.click()
-                time.sleep(0.2)
+                dormir(0.2)
                 campo.clear()
-                time.sleep(0.2)
+                dormir(0.2)
                 driver.execute_script("arguments[0].value = '';", campo)
-                time.sleep(0.2)
+                dormir(0.2)
                 campo.send_keys(valor_formatado)
-                time.sleep(0.5)
+                dormir(0.5)
                 for event in ["input", "change", "blur"]:
                     driver.execute_script(
                         "arguments[0].dispatchEvent(new Event(arguments[1], { bubbles: true }));",
                         campo,
                         event,
                     )
-                time.sleep(0.3)
+                dormir(0.3)
                 valor_atual = campo.get_attribute("value")
                 if (
                     valor_formatado in valor_atual
@@ -186,7 +188,7 @@ class BaixaRecursoModule(BaseModule):
             except Exception as e:
                 log_message(f"Tentativa {tentativa + 1} falhou: {type(e).__name__}", "WARNING")
             if tentativa < tentativas - 1:
-                time.sleep(0.8)
+                dormir(0.8)
         log_message("Campo de valor não foi preenchido corretamente após múltiplas tentativas", "ERROR")
         return False
 
@@ -231,7 +233,7 @@ class BaixaRecursoModule(BaseModule):
                     if valor_str.lower() in option.text.lower():
                         select.select_by_visible_text(option.text)
                         log_message(f"{descricao} selecionado (parcial): {option.text}", "INFO")
-                        time.sleep(0.3)
+                        dormir(0.3)
                         return True
             except Exception:
                 pass
@@ -383,63 +385,17 @@ class BaixaRecursoModule(BaseModule):
     def _fazer_login(self, driver, username, password, url_login):
         log_message("Fazendo login no Pathoweb...", "INFO")
         try:
-            driver.get(url_login)
-            campo_email = self._esperar_elemento_presente(driver, By.ID, "username", descricao="campo de usuário")
-            if not campo_email:
-                campo_email = self._esperar_elemento_presente(
-                    driver,
-                    By.XPATH,
-                    "//input[@type='email' or @name='username']",
-                    descricao="campo de usuário",
-                )
-            if not campo_email:
-                return False
-            campo_email.clear()
-            campo_email.send_keys(username)
-            campo_senha = driver.find_element(By.ID, "password")
-            campo_senha.clear()
-            campo_senha.send_keys(password)
-            btn_entrar = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
-            btn_entrar.click()
-            log_message("Credenciais enviadas, aguardando sistema...", "INFO")
-            time.sleep(5)
-            return True
-        except Exception as e:
-            log_message(f"Erro no login: {type(e).__name__} - {e}", "ERROR")
-            return False
-
-    def _acessar_faturamento(self, driver):
-        log_message("Acessando módulo Faturamento...", "INFO")
-        try:
-            xpath_faturamento = (
-                "//a[contains(@href, 'modulo=2')] | "
-                "//a[.//h2[contains(text(), 'Faturamento')]] | "
-                "//a[contains(text(), 'Faturamento')]"
-            )
-            link_faturamento = self._esperar_elemento_clicavel(
-                driver, By.XPATH, xpath_faturamento, descricao="link Faturamento"
-            )
-            if not link_faturamento:
-                return False
-            link_faturamento.click()
-            time.sleep(3)
-            try:
-                modal_close = driver.find_element(By.CSS_SELECTOR, "#mensagemParaClienteModal button")
-                if modal_close.is_displayed():
-                    modal_close.click()
-                    time.sleep(1)
-            except Exception:
-                pass
+            login_pathoweb(driver, username, password, modulo=2, url=url_login)
             log_message("Módulo Faturamento acessado", "SUCCESS")
             return True
         except Exception as e:
-            log_message(f"Erro ao acessar Faturamento: {type(e).__name__} - {e}", "ERROR")
+            log_message(f"Erro no login: {type(e).__name__} - {e}", "ERROR")
             return False
 
     def _acessar_recurso(self, driver):
         log_message("Acessando tela de Recurso...", "INFO")
         try:
-            time.sleep(2)
+            dormir(2)
             estrategias = [
                 ("data-url recurso", "//button[@data-url='/moduloFaturamento/recurso']"),
                 ("chamadaAjax + recurso", "//button[contains(@class, 'chamadaAjax') and contains(@data-url, 'recurso')]]"),
@@ -482,7 +438,7 @@ class BaixaRecursoModule(BaseModule):
                 log_message("Botão Recurso demorou para ficar clicável, tentando assim mesmo...", "WARNING")
             if not self._click_element_safe(driver, btn_recurso, "botão Recurso"):
                 return False
-            time.sleep(2)
+            dormir(2)
             log_message("Tela de Recurso acessada", "SUCCESS")
             return True
         except Exception as e:
@@ -522,7 +478,7 @@ class BaixaRecursoModule(BaseModule):
                 return False
             if not self._click_element_safe(driver, btn_pesquisar, "botão Pesquisar"):
                 return False
-            time.sleep(2)
+            dormir(2)
             if not self._esperar_elemento_presente(
                 driver,
                 By.CSS_SELECTOR,
@@ -581,7 +537,7 @@ class BaixaRecursoModule(BaseModule):
                         driver, botao, f"botão do procedimento {codigo_str}"
                     ):
                         continue
-                    time.sleep(2)
+                    dormir(2)
                     return True
                 except StaleElementReferenceException:
                     log_message(f"Elemento stale na linha {i + 1}, continuando...", "WARNING")
@@ -741,7 +697,7 @@ class BaixaRecursoModule(BaseModule):
                     driver, By.XPATH, xpath, timeout=5, descricao="botão Fechar"
                 )
                 if btn_fechar and self._click_element_safe(driver, btn_fechar, "botão Fechar"):
-                    time.sleep(1)
+                    dormir(1)
                     return True
             self._fechar_modais_abertos(driver)
             return True
@@ -871,16 +827,11 @@ class BaixaRecursoModule(BaseModule):
             return
         driver = None
         try:
-            driver = BrowserFactory.create_chrome(headless=headless_mode)
+            driver = BrowserFactory.acquire_chrome(headless=headless_mode)
             log_message("Navegador inicializado para baixa de recurso", "INFO")
             if not self._fazer_login(driver, username, password, url):
                 messagebox.showerror("Erro", "Falha no login no Pathoweb.")
                 return
-            if not self._acessar_faturamento(driver):
-                messagebox.showerror(
-                    "Erro", "Falha ao acessar módulo de Faturamento no Pathoweb."
-                )
-                return
             if not self._acessar_recurso(driver):
                 messagebox.showerror("Erro", "Falha ao acessar tela de Recurso.")
                 return
@@ -893,7 +844,7 @@ class BaixaRecursoModule(BaseModule):
                 sucesso, mensagem = self._processar_recurso(driver, row, index, total)
                 df.at[index, "Status"] = mensagem
                 if index < total - 1:
-                    time.sleep(1)
+                    dormir(1)
             self._salvar_resultados(df, excel_file)
             self._exibir_resumo(df)
         except Exception as e:
@@ -905,7 +856,7 @@ class BaixaRecursoModule(BaseModule):
         finally:
             if driver:
                 try:
-                    driver.quit()
+                    BrowserFactory.release_chrome(driver)
                 except Exception:
                     pass
 
@@ -11,11 +11,12 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import (
     ElementClickInterceptedException,
     TimeoutException,
-    NoSuchElementException,
 )
 
 from src.core.browser_factory import BrowserFactory
 from src.core.logger import log_message
+from src.core.session_manager import login_pathoweb
+from src.core.waits import dormir
 from src.modules.base import BaseModule
 
 
@@ -167,14 +168,14 @@ class LancamentoFinanceiroModule(BaseModule):
 
     def setup_browser(self, headless):
         self.headless_mode = headless
-        self.driver = BrowserFactory.create_chrome(headless=headless)
+        self.driver = BrowserFactory.acquire_chrome(headless=headless)
         self.wait = WebDriverWait(self.driver, 12)
         self.wait_fast = WebDriverWait(self.driver, 4)
 
     def close_browser(self):
         if self.driver:
             log_message("🔒 Encerrando navegador...", "INFO")
-            self.driver.quit()
+            BrowserFactory.release_chrome(self.driver)
             self.driver = None
 
     def click_element(self, element, descricao="elemento"):
@@ -188,39 +189,13 @@ class LancamentoFinanceiroModule(BaseModule):
 
     def realizar_login(self, username, password):
         log_message("🔐 Acessando página de login...", "INFO")
-        self.driver.get(self.LOGIN_URL)
-        sleep(2)
-
-        email_field = None
-        try:
-            email_field = self.wait.until(EC.element_to_be_clickable((By.NAME, "email")))
-        except TimeoutException:
-            email_field = self.wait.until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "input[type='email']"))
-            )
-
-        password_field = None
-        try:
-            password_field = self.driver.find_element(By.NAME, "password")
-        except NoSuchElementException:
-            password_field = self.driver.find_element(By.CSS_SELECTOR, "input[type='password']")
-
-        email_field.clear()
-        email_field.send_keys(username)
-        password_field.clear()
-        password_field.send_keys(password)
-
-        btn_login = self.wait.until(
-            EC.element_to_be_clickable((By.XPATH, "//button[@type='submit' or contains(., 'Entrar')]"))
-        )
-        self.click_element(btn_login, "Entrar")
-        sleep(3)
+        login_pathoweb(self.driver, username, password, url=self.LOGIN_URL)
 
     def acessar_menu_financeiro(self):
         log_message("🧭 Abrindo módulo Financeiro...", "INFO")
         menu = self.wait.until(EC.element_to_be_clickable((By.XPATH, "//a[contains(., 'Financeiro')]")))
         self.click_element(menu, "Menu Financeiro")
-        sleep(2)
+        dormir(2)
 
     def fechar_modal_inicial(self):
         seletores = [
@@ -11,6 +11,8 @@ from datetime import datetime
 
 from src.core.browser_factory import BrowserFactory
 from src.core.logger import log_message
+from src.core.session_manager import login_pathoweb
+from src.core.waits import dormir
 from src.modules.base import BaseModule
 
 load_dotenv()
@@ -42,7 +44,7 @@ class GuiaUnimedModule(BaseModule):
         excel_file = params.get("excel_file")
 
         url = os.getenv("SYSTEM_URL", "https://dap.pathoweb.com.br/login/auth")
-        driver = BrowserFactory.create_chrome(headless=headless_mode)
+        driver = BrowserFactory.acquire_chrome(headless=headless_mode)
         wait = WebDriverWait(driver, 15)
         # Criar um wait mais longo para operações que podem demorar mais
         wait_long = WebDriverWait(driver, 30)
@@ -69,43 +71,7 @@ class GuiaUnimedModule(BaseModule):
             resultados_df = pd.DataFrame(columns=["GUIA", "CARTAO", "MEDICO", "CRM", "PROCEDIMENTOS", "QTD", "TEXTO"])
 
             # Login
-            driver.get(url)
-            wait.until(EC.presence_of_element_located((By.ID, "username"))).send_keys(username)
-            driver.find_element(By.ID, "password").send_keys(password)
-            driver.find_element(By.CSS_SELECTOR, "button[type='submit']").click()
-
-            log_message("Verificando se precisa navegar para módulo de faturamento...", "INFO")
-            current_url = driver.current_url
-
-            if current_url == "https://dap.pathoweb.com.br/" or "trocarModulo" in current_url:
-                log_message("Detectada tela de seleção de módulos - navegando para módulo de faturamento...", "INFO")
-                try:
-                    modulo_link = wait.until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, "a[href='/site/trocarModulo?modulo=2']")))
-                    modulo_link.click()
-                    time.sleep(2)
-                    log_message("✅ Navegação para módulo de faturamento realizada", "SUCCESS")
-                except Exception as e:
-                    log_message(f"⚠️ Erro ao navegar para módulo: {e}", "WARNING")
-                    driver.get("https://dap.pathoweb.com.br/moduloFaturamento/index")
-                    time.sleep(2)
-                    log_message("🔄 Navegação direta para módulo realizada", "INFO")
-
-            elif "moduloFaturamento" in current_url:
-                log_message("✅ Já está no módulo de faturamento - pulando navegação", "SUCCESS")
-            else:
-                log_message(f"⚠️ URL inesperada detectada: {current_url}", "WARNING")
-                driver.get("https://dap.pathoweb.com.br/moduloFaturamento/index")
-                time.sleep(2)
-                log_message("🔄 Navegação direta para módulo realizada (fallback)", "INFO")
-
-            try:
-                modal_close_button = driver.find_element(By.CSS_SELECTOR, "#mensagemParaClienteModal .modal-footer button")
-                if modal_close_button.is_displayed():
-                    modal_close_button.click()
-                    time.sleep(1)
-            except Exception:
-                pass
+            login_pathoweb(driver, username, password, modulo=2, url=url)
 
             # Acessar explicitamente a página do módulo de faturamento
             log_message("Acessando módulo de faturamento via URL...", "INFO")
@@ -151,14 +117,14 @@ class GuiaUnimedModule(BaseModule):
                     campo_exame = wait.until(EC.element_to_be_clickable((By.ID, "codigoBarras")))
 
                     # Aguardar um pouco para garantir que o campo está pronto
-                    time.sleep(1)
+                    dormir(1)
 
                     # Limpar e preencher o campo
                     campo_exame.clear()
-                    time.sleep(0.5)
+                    dormir(0.5)
                     campo_exame.send_keys(str(guia))
                     log_message(f"✅ Código de barras {guia} digitado no campo", "SUCCESS")
-                    time.sleep(0.5)
+                    dormir(0.5)
                     
                     # Clicar no botão Pesquisar
                     pesquisar_btn = wait.until(EC.element_to_be_clickable((By.ID, "pesquisaFaturamento")))
@@ -175,12 +141,12 @@ class GuiaUnimedModule(BaseModule):
                         except Exception:
                             # Se não encontrar o spinner, apenas aguarda um tempo fixo
                             log_message("Aguardando carregamento dos resultados...", "INFO")
-                            time.sleep(5)
+                            dormir(5)
                     except Exception:
                         log_message("Tempo de carregamento excedido, verificando resultados mesmo assim...", "WARNING")
                     
                     # Aguardar mais um pouco para garantir que a tabela foi carregada
-                    time.sleep(3)
+                    dormir(3)
                     
                     # Verificar se há resultados usando diferentes seletores
                     tbody_rows = []
@@ -212,7 +178,7 @@ class GuiaUnimedModule(BaseModule):
                         except Exception:
                             # Se não encontrar a mensagem, aguarda mais um pouco e tenta novamente
                             log_message("Aguardando mais tempo para carregamento completo...", "INFO")
-                            time.sleep(5)
+                            dormir(5)
                             for selector in selectors:
                                 try:
                                     tbody_rows = driver.find_elements(By.CSS_SELECTOR, selector)
@@ -288,7 +254,7 @@ class GuiaUnimedModule(BaseModule):
                                 log_message("ℹ️ Checkbox já estava marcado", "INFO")
                             
                             # Aguardar um pouco após marcar o checkbox
-                            time.sleep(1)
+                            dormir(1)
                             
                             # Procurar e clicar no botão "Abrir exame"
                             log_message("Procurando botão 'Abrir exame'...", "INFO")
@@ -307,7 +273,7 @@ class GuiaUnimedModule(BaseModule):
                                 
                                 # Aguardar o modal aparecer
                                 log_message("Aguardando modal do exame abrir...", "INFO")
-                                time.sleep(3)
+                                dormir(3)
                                 
                                 # Verificar se o modal foi aberto
                                 try:
@@ -316,10 +282,10 @@ class GuiaUnimedModule(BaseModule):
                                         log_message("✅ Modal do exame aberto com sucesso", "SUCCESS")
                                     else:
                                         log_message("⚠️ Modal encontrado mas não está visível", "WARNING")
-                                        time.sleep(2)  # Aguardar mais um pouco
+                                        dormir(2)  # Aguardar mais um pouco
                                 except Exception:
                                     log_message("⚠️ Modal não encontrado, tentando continuar...", "WARNING")
-                                    time.sleep(2)
+                                    dormir(2)
                                 
                             except Exception as e:
                                 log_message(f"❌ Erro ao clicar no botão 'Abrir exame': {e}", "ERROR")
@@ -414,7 +380,7 @@ class GuiaUnimedModule(BaseModule):
                                     while time.time() - start_time < timeout:
                                         if condicao_func():
                                             return True
-                                        time.sleep(intervalo)
+                                        dormir(intervalo)
                                     return False
                                 
                                 # Aguardar tabela aparecer com polling rápido
@@ -450,7 +416,7 @@ class GuiaUnimedModule(BaseModule):
                                             if aguardar_condicao(dropdown_pronto, timeout=2):
                                                 log_message("✅ Dropdown ativado via input", "SUCCESS")
                                                 ativado = True
-                                    except:
+                                    except Exception:
                                         pass
                                     
                                     # Método 2: Âncora (se input falhou)
@@ -470,7 +436,7 @@ class GuiaUnimedModule(BaseModule):
                                                 if aguardar_condicao(dropdown_pronto, timeout=2):
                                                     log_message("✅ Dropdown ativado via âncora", "SUCCESS")
                                                     ativado = True
-                                        except:
+                                        except Exception:
                                             pass
                                     
                                     if not ativado:
@@ -679,16 +645,16 @@ class GuiaUnimedModule(BaseModule):
                             # Procurar botão de fechar modal
                             close_btn = driver.find_element(By.CSS_SELECTOR, "#myModal .modal-header .close")
                             close_btn.click()
-                            time.sleep(1)
+                            dormir(1)
                             log_message("✅ Modal fechado", "INFO")
-                        except:
+                        except Exception:
                             # Tentar fechar com ESC
                             try:
                                 from selenium.webdriver.common.keys import Keys
                                 driver.find_element(By.TAG_NAME, "body").send_keys(Keys.ESCAPE)
-                                time.sleep(1)
+                                dormir(1)
                                 log_message("✅ Modal fechado com ESC", "INFO")
-                            except:
+                            except Exception:
                                 log_message("⚠️ Não foi possível fechar o modal", "WARNING")
                         
                         # Adicionar dados ao DataFrame
@@ -773,7 +739,7 @@ class GuiaUnimedModule(BaseModule):
             log_message(f"❌ Erro durante a automação: {e}", "ERROR")
             messagebox.showerror("Erro", f"❌ Erro durante a automação:\n{e}")
         finally:
-            driver.quit()
+            BrowserFactory.release_chrome(driver)
 
 
 def run(params: dict):
@@ -13,9 +13,12 @@ from dotenv import load_dotenv
 from datetime import datetime
 
 from src.core.browser_factory import BrowserFactory
+from src.core.http_transport import tentar_link_http
 from src.core.logger import log_message
+from src.core.session_manager import login_pathoweb
+from src.core.waits import dormir
 from src.modules.base import BaseModule
-from src.modules.guias.lancamento_guia_unimed import LancamentoGuiaUnimedModule
+from src.modules.guias.lancamento_guia_unimed import IndiceGuiasProcessadas, LancamentoGuiaUnimedModule
 
 load_dotenv()
 
@@ -23,6 +26,7 @@ load_dotenv()
 class GuiaUnimedExamesModule(BaseModule):
     def __init__(self):
         super().__init__(nome="Guia Unimed [Exames]")
+        self.indice_guias = None
 
     @staticmethod
     def get_unique_guias(file_path: str) -> list:
@@ -48,7 +52,7 @@ class GuiaUnimedExamesModule(BaseModule):
         login_url = os.getenv("SYSTEM_URL", "https://dap.pathoweb.com.br/login/auth")
         modulo_exame_url = "https://dap.pathoweb.com.br/moduloExame/index"
 
-        driver = BrowserFactory.create_chrome(headless=headless_mode)
+        driver = BrowserFactory.acquire_chrome(headless=headless_mode)
         wait = WebDriverWait(driver, 15)
         wait_long = WebDriverWait(driver, 30)
 
@@ -86,10 +90,7 @@ class GuiaUnimedExamesModule(BaseModule):
             resultados_df = pd.DataFrame(columns=["GUIA", "CARTAO", "MEDICO", "CRM", "PROCEDIMENTOS", "QTD", "TEXTO"])
             resultados = []
 
-            driver.get(login_url)
-            wait.until(EC.presence_of_element_located((By.ID, "username"))).send_keys(username)
-            driver.find_element(By.ID, "password").send_keys(password)
-            driver.find_element(By.CSS_SELECTOR, "button[type='submit']").click()
+            login_pathoweb(driver, username, password, url=login_url)
 
             self._navegar_para_modulo_exame(driver, wait, modulo_exame_url)
 
@@ -189,11 +190,11 @@ class GuiaUnimedExamesModule(BaseModule):
                     input("Pressione Enter para fechar o navegador...")
                 except EOFError:
                     pass
-            driver.quit()
+            BrowserFactory.release_chrome(driver)
 
     def _navegar_para_modulo_exame(self, driver, wait, modulo_exame_url: str):
         log_message("Verificando módulo atual...", "INFO")
-        time.sleep(2)
+        dormir(2)
         current_url = driver.current_url
 
         if "moduloExame" in current_url:
@@ -312,7 +313,7 @@ class GuiaUnimedExamesModule(BaseModule):
             botao = self._localizar_botao_proximo(driver, selectors)
             if not botao:
                 log_message(f"⚠️ Botão 'Próximo' não localizado (tentativa {tentativa}/{tentativas})", "WARNING")
-                time.sleep(1)
+                dormir(1)
                 self._garantir_formulario_paciente_visivel(driver)
                 continue
 
@@ -322,14 +323,14 @@ class GuiaUnimedExamesModule(BaseModule):
                 log_message(f"✅ Botão 'Próximo' clicado (tentativa {tentativa})", "SUCCESS")
             except Exception as e:
                 log_message(f"⚠️ Erro ao clicar no botão 'Próximo': {e}", "WARNING")
-                time.sleep(1)
+                dormir(1)
                 continue
 
             if self._aguardar_area_detalhes(driver):
                 return
 
             log_message("⚠️ Detalhes do exame não aparecem, tentando novamente...", "WARNING")
-            time.sleep(1)
+            dormir(1)
 
         raise Exception("Não foi possível avançar para a tela de detalhes do exame.")
 
@@ -514,7 +515,8 @@ class GuiaUnimedExamesModule(BaseModule):
         resultado_atualizacoes = []
         lanc_mod = LancamentoGuiaUnimedModule()
         lanc_mod.headless_mode = headless_mode
-        driver_unimed = BrowserFactory.create_chrome(headless=headless_mode)
+        lanc_mod.indice_guias = self.indice_guias
+        driver_unimed = BrowserFactory.acquire_chrome(headless=headless_mode)
         wait_unimed = WebDriverWait(driver_unimed, 15)
 
         try:
@@ -529,6 +531,8 @@ class GuiaUnimedExamesModule(BaseModule):
                 log_message(f"🚀 Lançando guia {dados_guia['guia']} na Unimed ({idx}/{len(dados)})", "INFO")
                 try:
                     resultado = lanc_mod.processar_guia_unimed(driver_unimed, wait_unimed, dados_guia)
+                    if self.indice_guias is not None:
+                        self.indice_guias.atualizar(resultado)
                     if resultado.get("status") in ["sucesso", "analise"] and resultado.get("numero_guia"):
                         resultado_atualizacoes.append({
                             "guia": dados_guia["guia"],
@@ -545,7 +549,7 @@ class GuiaUnimedExamesModule(BaseModule):
                     lanc_mod.acessar_pagina_procedimento(driver_unimed)
 
         finally:
-            driver_unimed.quit()
+            BrowserFactory.release_chrome(driver_unimed)
 
         return resultado_atualizacoes
 
@@ -631,13 +635,15 @@ class GuiaUnimedExamesModule(BaseModule):
                     "a#btnSaveAjaxNovalidate"
                 ))
             )
+            if tentar_link_http(driver, salvar_btn, "Salvar exame", exigir_formulario=True):
+                return
             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", salvar_btn)
             driver.execute_script("arguments[0].click();", salvar_btn)
             try:
                 WebDriverWait(driver, 3).until(EC.presence_of_element_located((By.ID, "spinner")))
                 WebDriverWait(driver, 20).until(EC.invisibility_of_element_located((By.ID, "spinner")))
             except Exception:
-                time.sleep(2)
+                dormir(2)
         except Exception as e:
             raise Exception(f"Erro ao clicar em Salvar no módulo de exames: {e}")
 
@@ -657,25 +663,10 @@ class GuiaUnimedExamesModule(BaseModule):
         return False
 
     def _carregar_guias_processadas_excel(self, excel_file: str) -> dict:
-        try:
-            df = pd.read_excel(excel_file, header=0)
-            if df.empty:
-                return {}
-            df.columns = df.columns.str.upper().str.strip()
-            if "GUIA" not in df.columns or "NUMERO_GUIA" not in df.columns or "STATUS_PROCESSAMENTO" not in df.columns:
-                return {}
-
-            gui_map = {}
-            for _, row in df.iterrows():
-                guia = str(row["GUIA"]).strip() if pd.notna(row["GUIA"]) else ""
-                numero = str(row["NUMERO_GUIA"]).strip() if pd.notna(row["NUMERO_GUIA"]) else ""
-                status = str(row["STATUS_PROCESSAMENTO"]).strip().upper() if pd.notna(row["STATUS_PROCESSAMENTO"]) else ""
-                if guia and numero and status == "SUCESSO":
-                    gui_map[guia] = numero
-            return gui_map
-        except Exception as e:
-            log_message(f"⚠️ Não foi possível verificar guias já processadas: {e}", "WARNING")
-            return {}
+        """{guia: Numero_Guia} das guias com Status_Processamento=SUCESSO, pelo índice compartilhado."""
+        if self.indice_guias is None or self.indice_guias.arquivo != excel_file:
+            self.indice_guias = IndiceGuiasProcessadas.carregar(excel_file)
+        return self.indice_guias.autorizadas()
 
     @staticmethod
     def _ativar_dropdown_medico(driver, input_elem):
@@ -14,7 +14,10 @@ from selenium.common.exceptions import StaleElementReferenceException
 
 from src.core.browser_factory import BrowserFactory
 from src.core.logger import log_message
+from src.core.session_manager import login_pathoweb
+from src.core.waits import dormir
 from src.modules.base import BaseModule
+from src.utils.planilha import GravadorResultados
 
 
 class LancamentoGuiaHospitalarModule(BaseModule):
@@ -25,6 +28,7 @@ class LancamentoGuiaHospitalarModule(BaseModule):
     def __init__(self):
         super().__init__(nome="Lançamento Guia Hospitalar")
         self.headless_mode = False
+        self.gravador_resultados = None
 
     def click_element(self, driver, element, descricao="elemento"):
         try:
@@ -177,10 +181,10 @@ class LancamentoGuiaHospitalarModule(BaseModule):
                         texto = botao.text.strip().lower()
                         if texto in ["ok", "fechar"]:
                             self.click_element(driver, botao, f"botão {texto.upper()} do modal")
-                            time.sleep(1)
+                            dormir(1)
                             return
                     driver.execute_script("arguments[0].style.display='none';", modal)
-                    time.sleep(1)
+                    dormir(1)
         except Exception as e:
             log_message(f"⚠️ Erro ao fechar modal: {e}", "WARNING")
 
@@ -203,7 +207,7 @@ class LancamentoGuiaHospitalarModule(BaseModule):
         log_message(f"ℹ️ URL detectada para Guia SP/SADT: {href_destino}", "INFO")
 
         self.click_element(driver, item_guia, "Guia de SP/SADT")
-        time.sleep(3)
+        dormir(3)
         log_message("✅ Página de procedimentos acessada via menu", "SUCCESS")
 
     def preencher_codigo_beneficiario(self, driver, wait, cartao):
@@ -229,7 +233,7 @@ class LancamentoGuiaHospitalarModule(BaseModule):
         botao_busca = self.wait_for_element(driver, wait, By.ID, "busca_solicitante", condition="clickable")
         handles_antes = set(driver.window_handles)
         self.click_element(driver, botao_busca, "botão buscar solicitante")
-        time.sleep(2)
+        dormir(2)
 
         try:
             WebDriverWait(driver, 10).until(lambda d: len(d.window_handles) > len(handles_antes) or len(d.window_handles) > 1)
@@ -290,7 +294,7 @@ class LancamentoGuiaHospitalarModule(BaseModule):
                 self.set_input_value(driver, campo_nome, tentativa['nome'].upper(), "campo Nome")
 
             self.click_element(driver, botao_localizar, f"botão Localizar ({tentativa['log']})")
-            time.sleep(3)
+            dormir(3)
 
             try:
                 tabela = self.wait_for_element(driver, wait, By.CSS_SELECTOR, "table.table-hover tbody", condition="presence", timeout=5)
@@ -330,7 +334,7 @@ class LancamentoGuiaHospitalarModule(BaseModule):
                 if self.safe_switch_to_window(driver, janela_original):
                     retornou = True
                     break
-            time.sleep(0.3)
+            dormir(0.3)
 
         if not retornou:
             handles_atuais = driver.window_handles
@@ -379,7 +383,7 @@ class LancamentoGuiaHospitalarModule(BaseModule):
                 campo_proc.clear()
                 campo_proc.send_keys(proc)
                 campo_proc.send_keys(Keys.TAB)
-                time.sleep(0.5)
+                dormir(0.5)
             except Exception as e:
                 log_message(f"⚠️ Falha ao digitar procedimento {idx}: {e} - usando JavaScript", "WARNING")
                 driver.execute_script(
@@ -400,7 +404,7 @@ class LancamentoGuiaHospitalarModule(BaseModule):
                 campo_qtd.clear()
                 campo_qtd.send_keys(qtd)
                 campo_qtd.send_keys(Keys.TAB)
-                time.sleep(0.5)
+                dormir(0.5)
             except Exception as e:
                 log_message(f"⚠️ Falha ao digitar quantidade {idx}: {e} - usando JavaScript", "WARNING")
                 driver.execute_script(
@@ -474,38 +478,7 @@ class LancamentoGuiaHospitalarModule(BaseModule):
     def fazer_login_pathoweb(self, driver, wait, username, password):
         try:
             log_message("🔐 Fazendo login no PathoWeb...", "INFO")
-            driver.get("https://dap.pathoweb.com.br/login/auth")
-
-            wait.until(EC.presence_of_element_located((By.ID, "username"))).send_keys(username)
-            driver.find_element(By.ID, "password").send_keys(password)
-            botao_submit = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
-            self.click_element(driver, botao_submit, "botão login PathoWeb")
-
-            log_message("Verificando módulo de faturamento...", "INFO")
-            current_url = driver.current_url
-            if current_url == "https://dap.pathoweb.com.br/" or "trocarModulo" in current_url:
-                try:
-                    modulo_link = self.wait_for_element(
-                        driver, wait, By.CSS_SELECTOR, "a[href='/site/trocarModulo?modulo=2']", condition="presence"
-                    )
-                    self.click_element(driver, modulo_link, "link módulo faturamento")
-                    time.sleep(2)
-                except Exception as e:
-                    log_message(f"⚠️ Falha ao selecionar módulo: {e} - acessando diretamente", "WARNING")
-                    driver.get("https://dap.pathoweb.com.br/moduloFaturamento/index")
-                    time.sleep(2)
-            elif "moduloFaturamento" not in current_url:
-                log_message("⚠️ URL inesperada após login - acessando módulo diretamente", "WARNING")
-                driver.get("https://dap.pathoweb.com.br/moduloFaturamento/index")
-                time.sleep(2)
-
-            try:
-                modal_close_button = driver.find_element(By.CSS_SELECTOR, "#mensagemParaClienteModal .modal-footer button")
-                if self.headless_mode or modal_close_button.is_displayed():
-                    self.click_element(driver, modal_close_button, "fechar modal inicial PathoWeb")
-                    time.sleep(1)
-            except Exception:
-                pass
+            login_pathoweb(driver, username, password, modulo=2)
 
             driver.get("https://dap.pathoweb.com.br/moduloFaturamento/index")
 
@@ -544,7 +517,7 @@ class LancamentoGuiaHospitalarModule(BaseModule):
             ymd = data_atual.strftime("%Y-%m-%d")
             br = data_atual.strftime("%d/%m/%Y")
 
-            time.sleep(2)
+            dormir(2)
 
             js_data_autorizacao = f"""
             const $input = $('#requisicao_r input[name="dataAutorizacao"]').first();
@@ -592,7 +565,7 @@ class LancamentoGuiaHospitalarModule(BaseModule):
             digitarGuia("{numero_guia}", 30);
             """
             driver.execute_script(js_numero_guia)
-            time.sleep(3)
+            dormir(3)
 
             try:
                 botao_proximo = self.wait_for_element(
@@ -601,7 +574,7 @@ class LancamentoGuiaHospitalarModule(BaseModule):
                     condition="presence"
                 )
                 self.click_element(driver, botao_proximo, "botão 'Próximo'")
-                time.sleep(3)
+                dormir(3)
             except Exception as e:
                 log_message(f"⚠️ Erro ao clicar em 'Próximo': {e}", "WARNING")
 
@@ -612,7 +585,7 @@ class LancamentoGuiaHospitalarModule(BaseModule):
                     condition="presence"
                 )
                 self.click_element(driver, botao_salvar, "botão 'Salvar'")
-                time.sleep(3)
+                dormir(3)
             except Exception as e:
                 log_message(f"⚠️ Erro ao clicar em 'Salvar': {e}", "WARNING")
 
@@ -652,9 +625,9 @@ class LancamentoGuiaHospitalarModule(BaseModule):
                 WebDriverWait(driver, 3).until(EC.presence_of_element_located((By.ID, "spinner")))
                 WebDriverWait(driver, 30).until(EC.invisibility_of_element_located((By.ID, "spinner")))
             except Exception:
-                time.sleep(3)
+                dormir(3)
 
-            time.sleep(2)
+            dormir(2)
             tbody_rows = driver.find_elements(By.CSS_SELECTOR, "#tabelaPreFaturamentoTbody tr")
             if not tbody_rows:
                 log_message(f"⚠️ Nenhum resultado no PathoWeb para {numero_guia_original}", "WARNING")
@@ -671,7 +644,7 @@ class LancamentoGuiaHospitalarModule(BaseModule):
                 condition="presence"
             )
             self.click_element(driver, abrir_btn, "botão 'Abrir exame'")
-            time.sleep(2)
+            dormir(2)
 
             try:
                 modal = wait.until(EC.presence_of_element_located((By.ID, "myModal")))
@@ -713,7 +686,7 @@ class LancamentoGuiaHospitalarModule(BaseModule):
                         except Exception:
                             pass
 
-                        time.sleep(0.3)
+                        dormir(0.3)
                         linhas_atual = obter_linhas()
                         if idx >= len(linhas_atual):
                             raise Exception("linha não disponível")
@@ -732,7 +705,7 @@ class LancamentoGuiaHospitalarModule(BaseModule):
                             break
 
                         self.click_element(driver, ancora, f"âncora status linha {idx + 1}")
-                        time.sleep(0.3)
+                        dormir(0.3)
 
                         linhas_temp = obter_linhas()
                         if idx >= len(linhas_temp):
@@ -751,7 +724,7 @@ class LancamentoGuiaHospitalarModule(BaseModule):
                             WebDriverWait(driver, 2).until(EC.presence_of_element_located((By.ID, "spinner")))
                             WebDriverWait(driver, 30).until(EC.invisibility_of_element_located((By.ID, "spinner")))
                         except Exception:
-                            time.sleep(0.3)
+                            dormir(0.3)
 
                         processadas += 1
                         log_message(f"✅ Linha {idx + 1}: marcada como 'Pendente'", "SUCCESS")
@@ -760,11 +733,11 @@ class LancamentoGuiaHospitalarModule(BaseModule):
 
                     except StaleElementReferenceException:
                         log_message(f"⚠️ Linha {idx + 1}: elemento inválido após atualização (tentativa {tentativa + 1})", "WARNING")
-                        time.sleep(0.3)
+                        dormir(0.3)
                         continue
                     except Exception as e:
                         log_message(f"⚠️ Linha {idx + 1}: tentativa {tentativa + 1} falhou: {e}", "WARNING")
-                        time.sleep(0.3)
+                        dormir(0.3)
                         continue
                 if not marcou:
                     log_message(f"❌ Não foi possível marcar linha {idx + 1} como 'Pendente' após tentativas", "ERROR")
@@ -781,7 +754,7 @@ class LancamentoGuiaHospitalarModule(BaseModule):
         except Exception:
             self.click_element(driver, botao_autorizar, "botão Autorizar (fallback)")
 
-        time.sleep(3)
+        dormir(3)
 
         indicadores_sucesso = driver.find_elements(By.CSS_SELECTOR, ".alert-success, .alert.alert-success")
         for alerta in indicadores_sucesso:
@@ -901,75 +874,45 @@ class LancamentoGuiaHospitalarModule(BaseModule):
             'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
 
+    COLUNAS_RESULTADO = ['Numero_Guia', 'Status_Processamento', 'Status_Guia', 'Mensagem_Erro', 'Data_Processamento']
+
+    def abrir_gravador_resultados(self, excel_file):
+        try:
+            return GravadorResultados(excel_file, 'GUIA', self.COLUNAS_RESULTADO)
+        except Exception as e:
+            log_message(f"⚠️ Não foi possível preparar a gravação incremental dos resultados: {e}", "WARNING")
+            return None
+
+    def valores_resultado(self, resultado):
+        valores = {
+            'Data_Processamento': resultado.get('timestamp', ''),
+            'Status_Guia': resultado.get('status_guia', ''),
+            'Numero_Guia': resultado.get('numero_guia', ''),
+        }
+        if resultado.get('status') == 'sucesso':
+            valores['Status_Processamento'] = 'SUCESSO'
+            valores['Mensagem_Erro'] = ''
+        else:
+            valores['Status_Processamento'] = 'ERRO'
+            mensagem = resultado.get('erro', resultado.get('mensagem', ''))
+            valores['Mensagem_Erro'] = self.limpar_mensagem_erro(mensagem)
+        return valores
+
     def salvar_resultados_excel(self, excel_file, resultados):
         try:
             log_message("💾 Salvando resultados no Excel...", "INFO")
-            df = pd.read_excel(excel_file, header=0, dtype={'CARTAO': str})
-            df.columns = [col.strip() for col in df.columns]
-
-            colunas_adicionadas = []
-            if 'Numero_Guia' not in df.columns and 'NUMERO_GUIA' not in df.columns:
-                df['Numero_Guia'] = ''
-                colunas_adicionadas.append('Numero_Guia')
-            if 'Status_Processamento' not in df.columns and 'STATUS_PROCESSAMENTO' not in df.columns:
-                df['Status_Processamento'] = ''
-                colunas_adicionadas.append('Status_Processamento')
-            if 'Status_Guia' not in df.columns and 'STATUS_GUIA' not in df.columns:
-                df['Status_Guia'] = ''
-                colunas_adicionadas.append('Status_Guia')
-            if 'Mensagem_Erro' not in df.columns and 'MENSAGEM_ERRO' not in df.columns:
-                df['Mensagem_Erro'] = ''
-                colunas_adicionadas.append('Mensagem_Erro')
-            if 'Data_Processamento' not in df.columns and 'DATA_PROCESSAMENTO' not in df.columns:
-                df['Data_Processamento'] = ''
-                colunas_adicionadas.append('Data_Processamento')
-
-            if colunas_adicionadas:
-                log_message(f"✅ Colunas adicionadas: {colunas_adicionadas}", "SUCCESS")
-
-            def localizar_coluna(nome):
-                for col in df.columns:
-                    if col.upper().strip() == nome.upper().strip():
-                        return col
-                return None
-
-            coluna_guia = localizar_coluna('GUIA')
-            if not coluna_guia:
-                raise ValueError("Coluna GUIA não encontrada no Excel")
-
-            col_numero_guia = localizar_coluna('NUMERO_GUIA') or 'Numero_Guia'
-            col_status_proc = localizar_coluna('STATUS_PROCESSAMENTO') or 'Status_Processamento'
-            col_status_guia = localizar_coluna('STATUS_GUIA') or 'Status_Guia'
-            col_mensagem_erro = localizar_coluna('MENSAGEM_ERRO') or 'Mensagem_Erro'
-            col_data_proc = localizar_coluna('DATA_PROCESSAMENTO') or 'Data_Processamento'
+            gravador = self.gravador_resultados
+            if gravador is None or gravador.fechado:
+                gravador = GravadorResultados(excel_file, 'GUIA', self.COLUNAS_RESULTADO)
 
             for resultado in resultados:
                 guia = resultado.get('guia')
-                mask = df[coluna_guia].astype(str).str.strip() == str(guia).strip()
-                indices = df[mask].index
-                if len(indices) == 0:
+                if not gravador.atualizar(guia, self.valores_resultado(resultado)):
                     log_message(f"⚠️ Guia {guia} não encontrada no Excel", "WARNING")
-                    continue
 
-                idx = indices[0]
-                df.loc[idx, col_data_proc] = resultado.get('timestamp', '')
-                df.loc[idx, col_status_guia] = resultado.get('status_guia', '')
-                df.loc[idx, col_numero_guia] = resultado.get('numero_guia', '')
-
-                status = resultado.get('status')
-                if status == 'sucesso':
-                    df.loc[idx, col_status_proc] = 'SUCESSO'
-                    df.loc[idx, col_mensagem_erro] = ''
-                else:
-                    df.loc[idx, col_status_proc] = 'ERRO'
-                    mensagem = resultado.get('erro', resultado.get('mensagem', ''))
-                    df.loc[idx, col_mensagem_erro] = self.limpar_mensagem_erro(mensagem)
-
-            with pd.ExcelWriter(excel_file, engine='openpyxl') as writer:
-                df.to_excel(writer, index=False, sheet_name='Sheet1')
-
-            log_message(f"✅ Resultados salvos em {excel_file}", "SUCCESS")
-            return excel_file
+            arquivo = gravador.fechar()
+            log_message(f"✅ Resultados salvos em {arquivo}", "SUCCESS")
+            return arquivo
 
         except Exception as e:
             log_message(f"❌ Erro ao salvar resultados: {e}", "ERROR")
@@ -993,7 +936,7 @@ class LancamentoGuiaHospitalarModule(BaseModule):
             messagebox.showerror("Erro", "Arquivo Excel é obrigatório para este módulo.")
             return
 
-        driver = BrowserFactory.create_chrome(headless=headless_mode)
+        driver = BrowserFactory.acquire_chrome(headless=headless_mode)
         wait = WebDriverWait(driver, 15)
 
         try:
@@ -1016,6 +959,7 @@ class LancamentoGuiaHospitalarModule(BaseModule):
             self.navegar_para_guia_procedimento(driver, wait)
 
             resultados = []
+            self.gravador_resultados = self.abrir_gravador_resultados(excel_file)
 
             for indice, dados in enumerate(dados_excel, start=1):
                 if cancel_flag and cancel_flag.is_set():
@@ -1034,6 +978,8 @@ class LancamentoGuiaHospitalarModule(BaseModule):
                         'erro': str(e),
                         'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                     })
+                if self.gravador_resultados:
+                    self.gravador_resultados.atualizar(dados['guia'], self.valores_resultado(resultados[-1]))
 
                 if indice < len(dados_excel):
                     self.navegar_para_guia_procedimento(driver, wait)
@@ -1072,7 +1018,7 @@ class LancamentoGuiaHospitalarModule(BaseModule):
                             if idx < len(guias_para_pathoweb):
                                 try:
                                     driver.get("https://dap.pathoweb.com.br/moduloFaturamento/index")
-                                    time.sleep(2)
+                                    dormir(2)
                                     preparar_btn = self.wait_for_element(
                                         driver, wait, By.CSS_SELECTOR,
                                         "a.btn.btn-danger.chamadaAjax.setupAjax[data-url='/moduloFaturamento/preFaturamento']",
@@ -1083,7 +1029,7 @@ class LancamentoGuiaHospitalarModule(BaseModule):
                                         WebDriverWait(driver, 3).until(EC.presence_of_element_located((By.ID, "spinner")))
                                         WebDriverWait(driver, 30).until(EC.invisibility_of_element_located((By.ID, "spinner")))
                                     except Exception:
-                                        time.sleep(1)
+                                        dormir(1)
                                 except Exception as e:
                                     log_message(f"⚠️ Erro ao recarregar tela do PathoWeb: {e}", "WARNING")
                     else:
@@ -1129,12 +1075,18 @@ class LancamentoGuiaHospitalarModule(BaseModule):
             log_message(f"❌ Erro durante a automação: {e}", "ERROR")
             messagebox.showerror("Erro", f"❌ Erro durante a automação:\n{e}")
         finally:
+            # Execução interrompida: grava os resultados que ainda estavam no lote
+            if self.gravador_resultados and not self.gravador_resultados.fechado:
+                try:
+                    self.gravador_resultados.fechar()
+                except Exception as e:
+                    log_message(f"⚠️ Erro ao gravar resultados pendentes: {e}", "WARNING")
             if not headless_mode:
                 try:
                     input("Pressione Enter para fechar o navegador...")
                 except Exception:
                     pass
-            driver.quit()
+            BrowserFactory.release_chrome(driver)
 
 
 def run(params: dict):
@@ -12,12 +12,293 @@ import difflib
 
 from src.core.browser_factory import BrowserFactory
 from src.core.logger import log_message
+from src.core.session_manager import login_pathoweb
+from src.core.waits import (
+    aguardar, aguardar_ajax, aguardar_janelas, aguardar_modal_aberto, aguardar_modal_fechado,
+    aguardar_nova_janela, aguardar_pagina_pronta, cancelado, dormir, esperar_cancelamento
+)
 from src.modules.base import BaseModule
+from src.utils.planilha import GravadorResultados, ler_registros, texto_celula
+
+UNIMED_URL = os.getenv("UNIMED_URL", "https://webmed.unimedlondrina.com.br").rstrip("/")
+PATHOWEB_FATURAMENTO_URL = "https://dap.pathoweb.com.br/moduloFaturamento/index"
+
+# Espera pela liberação das guias em Rastreabilidade.php (ConsultaLiberacaoGuias)
+LIBERACAO_TENTATIVAS = int(os.getenv("RPA_LIBERACAO_TENTATIVAS", "5"))
+LIBERACAO_ESPERA = float(os.getenv("RPA_LIBERACAO_ESPERA", "30"))
+LIBERACAO_ESPERA_MAX = float(os.getenv("RPA_LIBERACAO_ESPERA_MAX", "120"))
+LIBERACAO_FATOR = 1.5
+# Intervalo mínimo entre duas consultas seguidas
+LIBERACAO_INTERVALO = 2.0
+
+
+def guia_liberada(status_resultado):
+    return bool(status_resultado.get('sucesso')) and \
+        str(status_resultado.get('status_guia') or '').strip().lower() == 'liberada'
+
+
+class IndiceGuiasProcessadas:
+    """Situação das guias já lançadas, lida uma única vez da planilha.
+
+    Mapa guia -> numero_guia/status_guia/status_processamento, com as colunas gravadas por
+    `salvar_resultados_excel`. Atualizado em memória conforme as guias são concluídas e
+    usado também por guia_unimed_exames.
+    """
+
+    COLUNAS = {
+        "guia": ["guia"],
+        "numero_guia": ["numero_guia", "numeroguia", "numero guia"],
+        "status_guia": ["status_guia", "statusguia", "status guia"],
+        "status_processamento": ["status_processamento"],
+    }
+    STATUS_PROCESSAMENTO = {"sucesso": "SUCESSO", "analise": "ANÁLISE"}
+
+    def __init__(self, arquivo=None, guias=None):
+        self.arquivo = arquivo
+        self.guias = guias or {}
+        self.lancadas = {}
+
+    @classmethod
+    def carregar(cls, excel_file):
+        try:
+            registros = ler_registros(excel_file, cls.COLUNAS, aba=0, obrigatorias=("guia",), parcial=False)
+        except ValueError:
+            log_message("⚠️ Coluna GUIA não encontrada no Excel", "WARNING")
+            return cls(excel_file)
+        except Exception as e:
+            log_message(f"⚠️ Erro ao verificar guias já processadas: {e}", "WARNING")
+            return cls(excel_file)
+
+        guias = {}
+        for registro in registros:
+            guia = texto_celula(registro["guia"])
+            if guia:
+                # Como na busca original, vale a primeira linha da guia
+                guias.setdefault(guia, {
+                    "numero_guia": texto_celula(registro["numero_guia"]),
+                    "status_guia": texto_celula(registro["status_guia"]),
+                    "status_processamento": texto_celula(registro["status_processamento"]).upper(),
+                })
+        return cls(excel_file, guias)
+
+    def __len__(self):
+        return len(self.guias)
+
+    def consultar(self, guia):
+        return self.guias.get(texto_celula(guia))
+
+    def ja_processada(self, guia):
+        """Mesmo formato de `verificar_guia_ja_processada`: número e status da guia preenchidos."""
+        registro = self.consultar(guia)
+        if registro and registro["numero_guia"] and registro["status_guia"]:
+            return {
+                'ja_processada': True,
+                'numero_guia': registro["numero_guia"],
+                'status_guia': registro["status_guia"]
+            }
+        return {'ja_processada': False}
+
+    def autorizadas(self):
+        """{guia: numero_guia} das guias com Status_Processamento=SUCESSO."""
+        return {
+            guia: registro["numero_guia"]
+            for guia, registro in self.guias.items()
+            if registro["numero_guia"] and registro["status_processamento"] == "SUCESSO"
+        }
+
+    def lancada(self, guia):
+        """Número da guia se ela foi criada na Unimed nesta execução (sucesso ou análise)."""
+        return self.lancadas.get(texto_celula(guia))
+
+    def atualizar(self, resultado):
+        """Registra o resultado de `processar_guia_unimed` (mesmos campos salvos no Excel)."""
+        guia = texto_celula(resultado.get('guia'))
+        if not guia:
+            return
+        registro = self.guias.setdefault(guia, {"numero_guia": "", "status_guia": "", "status_processamento": ""})
+        registro["numero_guia"] = texto_celula(resultado.get('numero_guia')) or registro["numero_guia"]
+        registro["status_guia"] = texto_celula(resultado.get('status_guia')) or registro["status_guia"]
+        registro["status_processamento"] = self.STATUS_PROCESSAMENTO.get(resultado.get('status'), "ERRO")
+        if registro["numero_guia"] and resultado.get('status') in self.STATUS_PROCESSAMENTO:
+            self.lancadas[guia] = registro["numero_guia"]
+
+
+class ConsultaLiberacaoGuias:
+    """Espera a liberação de várias guias ao mesmo tempo, consultando em rodízio.
+
+    Cada guia pendente guarda a hora da próxima consulta. A mais atrasada é consultada
+    primeiro. Se ainda não estiver liberada, a espera dela cresce LIBERACAO_FATOR vezes,
+    até LIBERACAO_ESPERA_MAX. A guia liberada sai do rodízio e `ao_liberar(resultado)` é
+    chamado na hora, enquanto as outras continuam pendentes. `consultar(numero_guia)`
+    devolve o mesmo dicionário de `consultar_status_guia`. Usado também por
+    lancamento_guia_unimed_exames.
+    """
+
+    def __init__(self, consultar, cancel_flag=None, max_tentativas=LIBERACAO_TENTATIVAS,
+                 espera=LIBERACAO_ESPERA, espera_max=LIBERACAO_ESPERA_MAX, fator=LIBERACAO_FATOR,
+                 intervalo=LIBERACAO_INTERVALO):
+        self.consultar = consultar
+        self.cancel_flag = cancel_flag
+        self.max_tentativas = max_tentativas
+        self.espera = espera
+        self.espera_max = espera_max
+        self.fator = fator
+        self.intervalo = intervalo
+        self.pendentes = []
+        self.liberadas = 0
+        self._ultima_consulta = None
+
+    def adicionar(self, resultado):
+        """Coloca no rodízio um resultado de `processar_guia_unimed` que tem numero_guia."""
+        self.pendentes.append({'resultado': resultado, 'tentativas': 0, 'espera': self.espera,
+                               'proxima': time.monotonic()})
+
+    def executar(self, ao_liberar=None):
+        """Consulta até cada guia ser liberada, esgotar as tentativas ou o Parar ser acionado."""
+        while self.pendentes:
+            # min() fica com a primeira entre as empatadas: a ordem de entrada desempata
+            estado = min(self.pendentes, key=lambda pendente: pendente['proxima'])
+            inicio = estado['proxima']
+            if self._ultima_consulta is not None:
+                inicio = max(inicio, self._ultima_consulta + self.intervalo)
+            espera = inicio - time.monotonic()
+            if espera > self.intervalo:
+                log_message(f"⏳ {len(self.pendentes)} guia(s) aguardando liberação - próxima consulta "
+                            f"({estado['resultado'].get('numero_guia')}) em {espera:.0f}s", "INFO")
+            if esperar_cancelamento(max(espera, 0), self.cancel_flag) or cancelado(self.cancel_flag):
+                self._cancelar()
+                return
+            self._consultar(estado, ao_liberar)
+
+    def _consultar(self, estado, ao_liberar):
+        resultado = estado['resultado']
+        numero_guia = resultado.get('numero_guia')
+        primeira = estado['tentativas'] == 0
+        if not primeira:
+            log_message(f"🔍 Tentativa {estado['tentativas']}/{self.max_tentativas}: "
+                        f"Consultando status da guia {numero_guia}...", "INFO")
+        try:
+            status_resultado = self.consultar(numero_guia)
+        except Exception as e:
+            status_resultado = {'sucesso': False, 'status_guia': 'Erro ao consultar', 'erro': str(e)}
+        self._ultima_consulta = time.monotonic()
+        status_guia = status_resultado.get('status_guia', 'Erro ao consultar')
+
+        if guia_liberada(status_resultado):
+            self.pendentes.remove(estado)
+            self.liberadas += 1
+            resultado['status_guia'] = status_guia
+            log_message(f"✅ Guia {numero_guia} liberada - {len(self.pendentes)} ainda aguardando", "SUCCESS")
+            if ao_liberar:
+                ao_liberar(resultado)
+            return
+
+        if primeira and not status_resultado.get('sucesso'):
+            # Como antes: erro na primeira consulta não entra na espera
+            self.pendentes.remove(estado)
+            resultado['status_guia'] = status_guia
+            log_message(f"⚠️ Erro ao consultar guia {numero_guia}: {status_resultado.get('erro')}", "WARNING")
+            return
+
+        if primeira:
+            resultado['status_guia'] = status_guia
+        if estado['tentativas'] >= self.max_tentativas:
+            self.pendentes.remove(estado)
+            log_message(f"❌ Guia {numero_guia} não foi liberada após {self.max_tentativas} tentativas. "
+                        f"Número preservado no Excel para consulta.", "ERROR")
+            resultado['status'] = 'erro'
+            resultado['erro'] = 'Não liberada após tentativas'
+            resultado['status_guia'] = 'Não Liberada'
+            return
+
+        estado['tentativas'] += 1
+        estado['proxima'] = self._ultima_consulta + estado['espera']
+        log_message(f"ℹ️ Guia {numero_guia} ainda em status: {status_guia}. "
+                    f"Nova consulta em {estado['espera']:.0f} segundos", "INFO")
+        estado['espera'] = min(estado['espera'] * self.fator, self.espera_max)
+
+    def _cancelar(self):
+        log_message("Execução cancelada pelo usuário durante espera por liberação.", "WARNING")
+        for estado in self.pendentes:
+            # Guias ainda não consultadas ficam como estavam, como no laço anterior
+            if estado['tentativas']:
+                estado['resultado'].update({'status': 'erro', 'status_guia': 'Cancelado',
+                                            'erro': 'Cancelado pelo usuário'})
+        self.pendentes = []
+
+
+class AberturaExamesPathoweb:
+    """Abre no PathoWeb o exame de cada guia liberada, conforme as guias chegam.
+
+    O login é feito na primeira guia. O navegador alterna com as consultas em
+    Rastreabilidade.php, então a busca de 'Preparar exames para fatura' é reaberta antes
+    de cada exame, exceto logo depois do login.
+    """
+
+    def __init__(self, modulo, driver, wait, usuario, senha, cancel_flag=None):
+        self.modulo = modulo
+        self.driver = driver
+        self.wait = wait
+        self.credenciais = bool(usuario and senha)
+        self.usuario = usuario
+        self.senha = senha
+        self.cancel_flag = cancel_flag
+        self.logado = None
+        self.na_busca = False
+        self.tentadas = 0
+        self.sucessos = 0
+        self._abertas = set()
+
+    def ja_tentada(self, resultado):
+        return id(resultado) in self._abertas
+
+    def abrir(self, resultado):
+        if not self.credenciais or self.ja_tentada(resultado) or cancelado(self.cancel_flag):
+            return False
+        if self.logado is None:
+            log_message("\n🌐 Acessando PathoWeb para abrir exames...", "INFO")
+            self.logado = self.modulo.fazer_login_pathoweb(self.driver, self.wait, self.usuario, self.senha)
+            if self.logado:
+                log_message("✅ Login no PathoWeb realizado com sucesso", "SUCCESS")
+                self.na_busca = True
+            else:
+                log_message("❌ Falha no login do PathoWeb", "ERROR")
+        if not self.logado:
+            return False
+
+        self._abertas.add(id(resultado))
+        self.tentadas += 1
+        numero_guia_unimed = resultado.get('numero_guia')
+        guia_original = resultado.get('guia')  # Número da guia original da coluna A
+        status_guia = resultado.get('status_guia', 'Status não consultado')
+        log_message(f"🔍 Abrindo exame {self.tentadas} - Guia Original: {guia_original} "
+                    f"(Unimed: {numero_guia_unimed}, Status: {status_guia})", "INFO")
+        try:
+            if not self.na_busca:
+                self.modulo.abrir_busca_pathoweb(self.driver, self.wait)
+            self.na_busca = False
+            if self.modulo.abrir_exame_pathoweb(self.driver, self.wait, guia_original, numero_guia_unimed):
+                self.sucessos += 1
+                log_message(f"✅ Exame {guia_original} aberto com sucesso no PathoWeb", "SUCCESS")
+                return True
+            log_message(f"❌ Erro ao abrir exame {guia_original} no PathoWeb", "ERROR")
+        except Exception as e:
+            log_message(f"❌ Erro ao abrir exame {guia_original}: {e}", "ERROR")
+        return False
+
 
 class LancamentoGuiaUnimedModule(BaseModule):
+    ETAPAS_RASTREADAS = BaseModule.ETAPAS_RASTREADAS + (
+        "acessar_pagina_procedimento", "verificar_erro_carteirinha", "buscar_medico_solicitante",
+        "preencher_hipotese_diagnostica", "preencher_procedimentos", "autorizar_guia",
+        "abrir_exame_pathoweb", "preencher_campos_exame", "salvar_resultados_excel",
+    )
+
     def __init__(self):
         super().__init__(nome="Lançamento Guia Unimed")
         self.headless_mode = False  # Será definido no run()
+        self.indice_guias = None
+        self.gravador_resultados = None
 
     def click_element(self, driver, element, descricao="elemento"):
         """Clica em um elemento de forma robusta, funcionando em modo headless e normal"""
@@ -170,7 +451,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
     def fazer_login_unimed(self, driver, wait, username, password):
         """Faz login no portal da Unimed"""
         log_message("Fazendo login no portal Unimed...", "INFO")
-        driver.get("https://webmed.unimedlondrina.com.br/prestador/")
+        driver.get(f"{UNIMED_URL}/prestador/")
         
         # Aguardar e preencher campo usuário
         campo_usuario = wait.until(EC.presence_of_element_located((By.ID, "operador")))
@@ -185,16 +466,17 @@ class LancamentoGuiaUnimedModule(BaseModule):
         # Clicar em entrar
         botao_entrar = driver.find_element(By.ID, "entrar")
         botao_entrar.click()
-        time.sleep(2.5)
+        aguardar(driver, lambda d: not d.find_elements(By.ID, "entrar"), timeout=15, nome="login_unimed")
+        aguardar_pagina_pronta(driver)
         
         log_message("✅ Login realizado com sucesso", "SUCCESS")
 
     def acessar_pagina_procedimento(self, driver):
         """Acessa a página de procedimento específica da Unimed"""
-        url_procedimento = "https://webmed.unimedlondrina.com.br/prestador/procedimento.php?pagina=ff25c04430244fa10de866898f1a24d2"
+        url_procedimento = f"{UNIMED_URL}/prestador/procedimento.php?pagina=ff25c04430244fa10de866898f1a24d2"
         log_message(f"Acessando página de procedimentos: {url_procedimento}", "INFO")
         driver.get(url_procedimento)
-        time.sleep(3)
+        aguardar_pagina_pronta(driver)
         log_message("✅ Página de procedimentos acessada", "SUCCESS")
 
     def verificar_erro_carteirinha(self, driver, wait):
@@ -204,7 +486,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
             janela_original = driver.current_window_handle
             
             # Aguardar um pouco para ver se popup abre
-            time.sleep(2)
+            aguardar_nova_janela(driver, 1, timeout=2, avisar=False)
             
             # Verificar se há novas janelas
             todas_janelas = driver.window_handles
@@ -332,7 +614,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
             botao_busca.click()
             
             # 2. Aguardar nova janela abrir e fazer switch
-            time.sleep(3)
+            aguardar_nova_janela(driver, 1, timeout=10)
             
             # Verificar se há novas janelas
             todas_janelas = driver.window_handles
@@ -379,7 +661,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
                     log_message("📝 Campo nome deixado vazio para busca apenas por CRM", "INFO")
                 
                 botao_localizar.click()
-                time.sleep(3) # Aguardar tabela carregar
+                aguardar_pagina_pronta(driver)
 
                 try:
                     tabela = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "table.table-hover tbody")))
@@ -436,7 +718,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
                         
                         # Após o clique, o popup pode fechar. Garantir retorno para a janela original.
                         try:
-                            time.sleep(1)
+                            aguardar_janelas(driver, 1, timeout=1, avisar=False)
                             if janela_original in driver.window_handles:
                                 driver.switch_to.window(janela_original)
                                 log_message("↩️ Voltou para janela principal após selecionar médico", "INFO")
@@ -465,7 +747,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
                 raise Exception(f"Médico não foi selecionado após todas as tentativas para CRM: {crm}")
 
             # 9. Aguardar popup fechar automaticamente e voltar para janela original
-            time.sleep(3)
+            aguardar_janelas(driver, 1, timeout=3, avisar=False)
             
             # O popup fecha automaticamente, então só precisamos voltar para janela original
             driver.switch_to.window(janela_original)
@@ -494,7 +776,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
             driver.execute_script(js_regime)
             
             # Aguardar um pouco
-            time.sleep(1)
+            aguardar_ajax(driver, timeout=5)
             
             # Tipo de atendimento: 23 - Exame
             log_message("📝 Preenchendo tipo de atendimento: 23 - Exame", "INFO")
@@ -506,7 +788,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
             '''
             driver.execute_script(js_tipo)
             
-            time.sleep(1)
+            aguardar_ajax(driver, timeout=5)
             log_message("✅ Campos fixos preenchidos", "SUCCESS")
             
         except Exception as e:
@@ -531,9 +813,6 @@ class LancamentoGuiaUnimedModule(BaseModule):
             )))
             select2_container.click()
             
-            # 2. Aguardar campo de busca aparecer
-            time.sleep(2)
-            
             # 3. Preencher campo de busca
             log_message(f"📝 Digitando texto: {texto_formatado}", "INFO")
             campo_busca = wait.until(EC.presence_of_element_located((
@@ -544,7 +823,13 @@ class LancamentoGuiaUnimedModule(BaseModule):
             campo_busca.send_keys(texto_formatado)
             
             # 4. Aguardar resultados carregar
-            time.sleep(3)
+            aguardar(
+                driver,
+                lambda d: not d.find_elements(By.CSS_SELECTOR, ".select2-results__option.loading-results")
+                and any("Digite 3 ou mais" not in o.text
+                        for o in d.find_elements(By.CSS_SELECTOR, ".select2-results__option")),
+                timeout=10, nome="hipotese_resultados"
+            )
             
             # 5. Verificar se há resultados ou se precisa usar "DIGITAR MANUALMENTE"
             try:
@@ -578,7 +863,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
                         "//li[contains(text(), 'DIGITAR MANUALMENTE')]")
                     digitar_manual.click()
                 
-                time.sleep(1)
+                aguardar_ajax(driver, timeout=5)
                 log_message("✅ Hipótese diagnóstica preenchida", "SUCCESS")
                 
             except Exception as e:
@@ -635,7 +920,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
                     driver.execute_script(js_procedimento)
                     
                     # Aguardar um pouco
-                    time.sleep(1)
+                    aguardar_ajax(driver, timeout=5)
                     
                     # Preencher quantidade
                     log_message(f"📝 Preenchendo quantidade{i}: {quantidade}", "INFO")
@@ -649,7 +934,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
                     '''
                     driver.execute_script(js_quantidade)
                     
-                    time.sleep(1)
+                    aguardar_ajax(driver, timeout=5)
                     log_message(f"✅ Procedimento {i} preenchido: {procedimento} (qtd: {quantidade})", "SUCCESS")
                     
                 except Exception as e:
@@ -708,13 +993,13 @@ class LancamentoGuiaUnimedModule(BaseModule):
                             
                             if botao_ok:
                                 botao_ok.click()
-                                time.sleep(0.5)
+                                aguardar_ajax(driver, timeout=5)
                                 log_message("✅ Popup de aviso fechado, continuando processamento", "SUCCESS")
                             else:
                                 # Se não encontrou botão, tentar fechar via JavaScript
                                 log_message("⚠️ Botão Ok não encontrado, tentando fechar via JavaScript...", "WARNING")
                                 driver.execute_script("arguments[0].remove();", popup)
-                                time.sleep(0.5)
+                                aguardar_ajax(driver, timeout=5)
                     except Exception as e:
                         log_message(f"⚠️ Erro ao processar popup de aviso: {e}", "WARNING")
                         continue
@@ -735,7 +1020,6 @@ class LancamentoGuiaUnimedModule(BaseModule):
                     $('.ui-widget-overlay').remove();
                     $('.ui-front').remove();
                 """)
-                time.sleep(0.5)
             except Exception:
                 pass
             
@@ -751,11 +1035,11 @@ class LancamentoGuiaUnimedModule(BaseModule):
                 driver.execute_script("arguments[0].click();", botao_autorizar)
             
             # Aguardar um momento e verificar se há popups de aviso
-            time.sleep(2)
+            aguardar_pagina_pronta(driver)
             self.fechar_popup_aviso(driver, wait)
             
             # Aguardar modal de resultado aparecer
-            time.sleep(1)
+            aguardar_modal_aberto(driver, "#form-1.modal", timeout=10)
             
             # Verificar se modal de sucesso apareceu
             try:
@@ -785,7 +1069,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
                     try:
                         botao_ok = modal.find_element(By.ID, "btn_OK1")
                         botao_ok.click()
-                        time.sleep(1)
+                        aguardar_modal_fechado(driver, "#form-1.modal", timeout=5)
                         log_message("✅ Modal fechado", "INFO")
                     except Exception as e:
                         log_message(f"⚠️ Erro ao fechar modal: {e}", "WARNING")
@@ -804,7 +1088,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
                     try:
                         botao_ok = modal.find_element(By.ID, "btn_OK1")
                         botao_ok.click()
-                        time.sleep(1)
+                        aguardar_modal_fechado(driver, "#form-1.modal", timeout=5)
                         log_message("✅ Modal fechado", "INFO")
                     except Exception as e:
                         log_message(f"⚠️ Erro ao fechar modal: {e}", "WARNING")
@@ -823,8 +1107,8 @@ class LancamentoGuiaUnimedModule(BaseModule):
                     try:
                         botao_ok = modal.find_element(By.ID, "btn_OK1")
                         botao_ok.click()
-                        time.sleep(1)
-                    except:
+                        aguardar_modal_fechado(driver, "#form-1.modal", timeout=5)
+                    except Exception:
                         pass
                     
                     return {
@@ -855,9 +1139,9 @@ class LancamentoGuiaUnimedModule(BaseModule):
             log_message(f"🔍 Consultando status da guia {numero_guia}...", "INFO")
             
             # Acessar página de rastreabilidade
-            url_rastreabilidade = "https://webmed.unimedlondrina.com.br/prestador/Rastreabilidade.php"
+            url_rastreabilidade = f"{UNIMED_URL}/prestador/Rastreabilidade.php"
             driver.get(url_rastreabilidade)
-            time.sleep(3)
+            aguardar_pagina_pronta(driver)
             
             # Preencher campo do número da guia
             log_message(f"📝 Preenchendo número da guia: {numero_guia}", "INFO")
@@ -871,7 +1155,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
             botao_consultar.click()
             
             # Aguardar carregamento da página
-            time.sleep(3)
+            aguardar_pagina_pronta(driver)
             
             # Tentar extrair o status da guia
             try:
@@ -950,48 +1234,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
             
             # URL do PathoWeb
             url = "https://dap.pathoweb.com.br/login/auth"
-            driver.get(url)
-            
-            # Preencher credenciais
-            wait.until(EC.presence_of_element_located((By.ID, "username"))).send_keys(username)
-            driver.find_element(By.ID, "password").send_keys(password)
-            botao_submit = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
-            self.click_element(driver, botao_submit, "botão login PathoWeb")
-            
-            log_message("Verificando se precisa navegar para módulo de faturamento...", "INFO")
-            current_url = driver.current_url
-
-            if current_url == "https://dap.pathoweb.com.br/" or "trocarModulo" in current_url:
-                log_message("Detectada tela de seleção de módulos - navegando para módulo de faturamento...", "INFO")
-                try:
-                    modulo_link = self.wait_for_element(driver, wait, By.CSS_SELECTOR,
-                        "a[href='/site/trocarModulo?modulo=2']", condition="presence")
-                    self.click_element(driver, modulo_link, "link módulo faturamento")
-                    time.sleep(2)
-                    log_message("✅ Navegação para módulo de faturamento realizada", "SUCCESS")
-                except Exception as e:
-                    log_message(f"⚠️ Erro ao navegar para módulo: {e}", "WARNING")
-                    driver.get("https://dap.pathoweb.com.br/moduloFaturamento/index")
-                    time.sleep(2)
-                    log_message("🔄 Navegação direta para módulo realizada", "INFO")
-
-            elif "moduloFaturamento" in current_url:
-                log_message("✅ Já está no módulo de faturamento - pulando navegação", "SUCCESS")
-            else:
-                log_message(f"⚠️ URL inesperada detectada: {current_url}", "WARNING")
-                driver.get("https://dap.pathoweb.com.br/moduloFaturamento/index")
-                time.sleep(2)
-                log_message("🔄 Navegação direta para módulo realizada (fallback)", "INFO")
-
-            # Fechar modal se aparecer
-            try:
-                modal_close_button = driver.find_element(By.CSS_SELECTOR, "#mensagemParaClienteModal .modal-footer button")
-                # Em modo headless, não verificar is_displayed()
-                if self.headless_mode or modal_close_button.is_displayed():
-                    self.click_element(driver, modal_close_button, "fechar modal inicial")
-                    time.sleep(1)
-            except Exception:
-                pass
+            login_pathoweb(driver, username, password, modulo=2, url=url)
 
             # Acessar explicitamente a página do módulo de faturamento
             log_message("Acessando módulo de faturamento via URL...", "INFO")
@@ -1017,7 +1260,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
                 WebDriverWait(driver, 30).until(EC.invisibility_of_element_located((By.ID, "spinner")))
                 log_message("✅ Modal de carregamento fechado", "INFO")
             except Exception:
-                time.sleep(1)
+                aguardar_pagina_pronta(driver)
 
             log_message("✅ Login no PathoWeb realizado e página de pré-faturamento acessada", "SUCCESS")
             return True
@@ -1041,7 +1284,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
             log_message(f"🔢 Número da guia a ser preenchido: {numero_guia_unimed}", "INFO")
             
             # Aguardar um pouco para garantir que a tabela está carregada
-            time.sleep(2)
+            aguardar_pagina_pronta(driver)
             
             # Preencher campo de data de autorização usando jQuery
             log_message("📝 Preenchendo data de autorização...", "INFO")
@@ -1066,7 +1309,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
             
             driver.execute_script(js_data_autorizacao)
             log_message("✅ Data de autorização preenchida", "SUCCESS")
-            time.sleep(1)
+            aguardar_ajax(driver, timeout=5)
             
             # Preencher campo de data de requisição usando jQuery
             log_message("📝 Preenchendo data de requisição...", "INFO")
@@ -1091,7 +1334,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
             
             driver.execute_script(js_data_requisicao)
             log_message("✅ Data de requisição preenchida", "SUCCESS")
-            time.sleep(1)
+            aguardar_ajax(driver, timeout=5)
             
             # Preencher número da guia usando a função jQuery que você forneceu
             log_message("📝 Preenchendo número da guia...", "INFO")
@@ -1130,7 +1373,12 @@ class LancamentoGuiaUnimedModule(BaseModule):
             log_message(f"✅ Número da guia {numero_guia_unimed} preenchido", "SUCCESS")
             
             # Aguardar um pouco para o processamento
-            time.sleep(3)
+            aguardar(
+                driver,
+                lambda d: d.execute_script("return $('#numeroGuiaInput').attr('value');") == str(numero_guia_unimed),
+                timeout=10, nome="numero_guia_digitado"
+            )
+            aguardar_ajax(driver)
             
             # 1. Clicar no botão "Próximo" para salvar os dados do exame
             log_message("🔄 Clicando no botão 'Próximo' para salvar...", "INFO")
@@ -1142,7 +1390,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
                 log_message("✅ Botão 'Próximo' clicado", "SUCCESS")
                 
                 # Aguardar processamento
-                time.sleep(3)
+                aguardar_pagina_pronta(driver)
                 
             except Exception as e:
                 log_message(f"⚠️ Erro ao clicar no botão 'Próximo': {e}", "WARNING")
@@ -1153,7 +1401,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
                         condition="presence")
                     self.click_element(driver, botao_proximo_alt, "botão 'Próximo' (alternativo)")
                     log_message("✅ Botão 'Próximo' clicado (seletor alternativo)", "SUCCESS")
-                    time.sleep(3)
+                    aguardar_pagina_pronta(driver)
                 except Exception as e2:
                     log_message(f"❌ Erro ao clicar no botão 'Próximo' (tentativa alternativa): {e2}", "ERROR")
             
@@ -1167,7 +1415,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
                 log_message("✅ Botão 'Salvar' clicado", "SUCCESS")
                 
                 # Aguardar processamento
-                time.sleep(3)
+                aguardar_pagina_pronta(driver)
             except Exception as e:
                 log_message(f"⚠️ Erro ao clicar no botão 'Salvar': {e}", "WARNING")
                 # Tentar encontrar o botão com seletor alternativo
@@ -1177,7 +1425,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
                         condition="presence")
                     self.click_element(driver, botao_salvar_alt, "botão 'Salvar' (alternativo)")
                     log_message("✅ Botão 'Salvar' clicado (seletor alternativo)", "SUCCESS")
-                    time.sleep(3)
+                    aguardar_pagina_pronta(driver)
                 except Exception as e2:
                     log_message(f"❌ Erro ao clicar no botão 'Salvar' (tentativa alternativa): {e2}", "ERROR")
 
@@ -1189,7 +1437,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
                 except Exception:
                     close_btn = driver.find_element(By.CSS_SELECTOR, "#myModal button.close, #myModal .modal-header button.close")
                 self.click_element(driver, close_btn, "botão fechar modal")
-                time.sleep(1)
+                aguardar_modal_fechado(driver, "#myModal", timeout=5)
                 log_message("✅ Modal fechado após salvar", "INFO")
             except Exception as e:
                 log_message(f"⚠️ Não foi possível fechar o modal automaticamente: {e}", "WARNING")
@@ -1220,10 +1468,8 @@ class LancamentoGuiaUnimedModule(BaseModule):
 
             # Limpar e preencher o campo
             campo_exame.clear()
-            time.sleep(0.5)
             campo_exame.send_keys(str(numero_guia_original))
             log_message(f"✅ Código de barras {numero_guia_original} digitado no campo", "SUCCESS")
-            time.sleep(0.5)
             
             # Clicar no botão Pesquisar
             pesquisar_btn = self.wait_for_element(driver, wait, By.ID, "pesquisaFaturamento", condition="presence")
@@ -1238,12 +1484,12 @@ class LancamentoGuiaUnimedModule(BaseModule):
                     log_message("🔄 Carregando resultados...", "INFO")
                     WebDriverWait(driver, 30).until(EC.invisibility_of_element_located((By.ID, "spinner")))
                 except Exception:
-                    time.sleep(5)
+                    aguardar_pagina_pronta(driver)
             except Exception:
                 log_message("Tempo de carregamento excedido, verificando resultados mesmo assim...", "WARNING")
             
             # Aguardar mais um pouco para garantir que a tabela foi carregada
-            time.sleep(3)
+            aguardar_ajax(driver)
             
             # Verificar se há resultados
             tbody_rows = []
@@ -1280,7 +1526,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
                 else:
                     log_message("ℹ️ Checkbox já estava marcado", "INFO")
                 
-                time.sleep(1)
+                aguardar_ajax(driver, timeout=5)
                 
                 # Procurar e clicar no botão "Abrir exame"
                 log_message("🔍 Procurando botão 'Abrir exame'...", "INFO")
@@ -1296,7 +1542,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
                 
                 # Aguardar o modal aparecer
                 log_message("⏳ Aguardando modal do exame abrir...", "INFO")
-                time.sleep(3)
+                aguardar_pagina_pronta(driver)
                 
                 # Verificar se o modal foi aberto
                 try:
@@ -1315,11 +1561,11 @@ class LancamentoGuiaUnimedModule(BaseModule):
                         return True
                     else:
                         log_message("⚠️ Modal encontrado mas não está visível", "WARNING")
-                        time.sleep(2)
+                        aguardar_pagina_pronta(driver)
                         return True
                 except Exception:
                     log_message("⚠️ Modal não encontrado, tentando continuar...", "WARNING")
-                    time.sleep(2)
+                    aguardar_pagina_pronta(driver)
                     return True
                     
             except Exception as e:
@@ -1361,201 +1607,64 @@ class LancamentoGuiaUnimedModule(BaseModule):
         # Se não é erro do Selenium, retornar mensagem original (limitada)
         return msg_str[:200]  # Limitar a 200 caracteres
     
+    COLUNAS_RESULTADO = ['Numero_Guia', 'Status_Processamento', 'Status_Guia', 'Mensagem_Erro', 'Data_Processamento']
+
+    def abrir_gravador_resultados(self, excel_file):
+        """Abre o gravador incremental da planilha; None se não for possível (salva só no fim)."""
+        try:
+            return GravadorResultados(excel_file, 'GUIA', self.COLUNAS_RESULTADO)
+        except Exception as e:
+            log_message(f"⚠️ Não foi possível preparar a gravação incremental dos resultados: {e}", "WARNING")
+            return None
+
+    def valores_resultado(self, resultado):
+        """Valores das colunas de resultado da linha da guia"""
+        valores = {
+            'Data_Processamento': resultado.get('timestamp', ''),
+            'Status_Guia': resultado.get('status_guia', ''),
+            # Sempre preservar o número da guia se existir
+            'Numero_Guia': resultado.get('numero_guia', ''),
+        }
+        if resultado.get('status') == 'sucesso':
+            valores['Status_Processamento'] = 'SUCESSO'
+            valores['Mensagem_Erro'] = ''
+        elif resultado.get('status') == 'analise':
+            # Guia criada mas enviada para análise/auditoria
+            valores['Status_Processamento'] = 'ANÁLISE'
+            valores['Mensagem_Erro'] = resultado.get('mensagem', 'Guia enviada para análise')
+        else:
+            # Status de erro - preservar número da guia se houver
+            # (ex: guia criada mas não liberada após tentativas)
+            valores['Status_Processamento'] = 'ERRO'
+            mensagem_erro_original = resultado.get('erro', resultado.get('mensagem', ''))
+            valores['Mensagem_Erro'] = self.limpar_mensagem_erro(mensagem_erro_original)
+        return valores
+
     def salvar_resultados_excel(self, excel_file, resultados):
-        """Salva os resultados no arquivo Excel original"""
+        """Salva os resultados no arquivo Excel original, alterando só as colunas de resultado"""
         try:
             log_message("💾 Salvando resultados no Excel...", "INFO")
             log_message(f"📁 Arquivo de destino: {excel_file}", "INFO")
-            
-            # Ler o arquivo Excel original com dtype específico para evitar conversão de números grandes
-            df = pd.read_excel(excel_file, header=0, dtype={'CARTAO': str})
-            log_message(f"📋 Colunas originais: {list(df.columns)}", "INFO")
-            
-            # Preservar nomes originais das colunas, mas criar um mapeamento para comparação
-            colunas_originais = list(df.columns)
-            mapa_colunas = {}
-            for col in colunas_originais:
-                col_normalizada = col.upper().strip()
-                mapa_colunas[col_normalizada] = col
-            
-            log_message(f"📋 Mapeamento de colunas criado", "INFO")
-            
-            # Adicionar colunas de resultado se não existirem (preservando case original quando possível)
-            colunas_adicionadas = []
-            if 'NUMERO_GUIA' not in [c.upper().strip() for c in df.columns]:
-                df['Numero_Guia'] = ''
-                colunas_adicionadas.append('Numero_Guia')
-            if 'STATUS_PROCESSAMENTO' not in [c.upper().strip() for c in df.columns]:
-                df['Status_Processamento'] = ''
-                colunas_adicionadas.append('Status_Processamento')
-            if 'STATUS_GUIA' not in [c.upper().strip() for c in df.columns]:
-                df['Status_Guia'] = ''
-                colunas_adicionadas.append('Status_Guia')
-            if 'MENSAGEM_ERRO' not in [c.upper().strip() for c in df.columns]:
-                df['Mensagem_Erro'] = ''
-                colunas_adicionadas.append('Mensagem_Erro')
-            if 'DATA_PROCESSAMENTO' not in [c.upper().strip() for c in df.columns]:
-                df['Data_Processamento'] = ''
-                colunas_adicionadas.append('Data_Processamento')
-            
-            if colunas_adicionadas:
-                log_message(f"✅ Colunas adicionadas: {colunas_adicionadas}", "SUCCESS")
-            else:
-                log_message("ℹ️ Todas as colunas já existiam", "INFO")
-            
-            log_message(f"📋 Colunas finais: {list(df.columns)}", "INFO")
-            
-            # Encontrar a coluna GUIA (pode ter qualquer case)
-            coluna_guia = None
-            for col in df.columns:
-                if col.upper().strip() == 'GUIA':
-                    coluna_guia = col
-                    break
-            
-            if not coluna_guia:
-                raise ValueError("Coluna GUIA não encontrada no Excel")
-            
-            # Definir nomes das colunas de resultado (usar existentes ou novos)
-            def get_nome_coluna(nome_procurado):
-                for col in df.columns:
-                    if col.upper().strip() == nome_procurado.upper().strip():
-                        return col
-                # Se não encontrou, usar o nome padrão criado acima
-                mapeamento = {
-                    'NUMERO_GUIA': 'Numero_Guia',
-                    'STATUS_PROCESSAMENTO': 'Status_Processamento', 
-                    'STATUS_GUIA': 'Status_Guia',
-                    'MENSAGEM_ERRO': 'Mensagem_Erro',
-                    'DATA_PROCESSAMENTO': 'Data_Processamento'
-                }
-                return mapeamento.get(nome_procurado.upper().strip(), nome_procurado)
-            
-            col_numero_guia = get_nome_coluna('NUMERO_GUIA')
-            col_status_proc = get_nome_coluna('STATUS_PROCESSAMENTO')
-            col_status_guia = get_nome_coluna('STATUS_GUIA')
-            col_mensagem_erro = get_nome_coluna('MENSAGEM_ERRO')
-            col_data_proc = get_nome_coluna('DATA_PROCESSAMENTO')
-            
-            # Atualizar resultados
+
+            gravador = self.gravador_resultados
+            if gravador is None or gravador.fechado:
+                gravador = GravadorResultados(excel_file, 'GUIA', self.COLUNAS_RESULTADO)
+
             for resultado in resultados:
                 guia = resultado.get('guia')
-                log_message(f"📝 Processando resultado para guia: {guia}", "INFO")
-                
-                # Encontrar linha correspondente
-                mask = df[coluna_guia].astype(str).str.strip() == str(guia).strip()
-                indices = df[mask].index
-                
-                if len(indices) > 0:
-                    indice = indices[0]
-                    log_message(f"✅ Linha encontrada no índice: {indice}", "SUCCESS")
-                    
-                    # Atualizar dados
-                    df.loc[indice, col_data_proc] = resultado.get('timestamp', '')
-                    df.loc[indice, col_status_guia] = resultado.get('status_guia', '')
-                    
-                    # Sempre preservar o número da guia se existir
-                    df.loc[indice, col_numero_guia] = resultado.get('numero_guia', '')
-                    
-                    if resultado.get('status') == 'sucesso':
-                        df.loc[indice, col_status_proc] = 'SUCESSO'
-                        df.loc[indice, col_mensagem_erro] = ''
-                    elif resultado.get('status') == 'analise':
-                        # Guia criada mas enviada para análise/auditoria
-                        df.loc[indice, col_status_proc] = 'ANÁLISE'
-                        df.loc[indice, col_mensagem_erro] = resultado.get('mensagem', 'Guia enviada para análise')
-                    else:
-                        # Status de erro - preservar número da guia se houver
-                        # (ex: guia criada mas não liberada após tentativas)
-                        df.loc[indice, col_status_proc] = 'ERRO'
-                        # Limpar mensagem de erro antes de salvar
-                        mensagem_erro_original = resultado.get('erro', resultado.get('mensagem', ''))
-                        mensagem_erro_limpa = self.limpar_mensagem_erro(mensagem_erro_original)
-                        df.loc[indice, col_mensagem_erro] = mensagem_erro_limpa
-                    
-                    log_message(f"📝 Resultado salvo para guia {guia}: {df.loc[indice, col_status_proc]}", "INFO")
-                    log_message(f"   - {col_numero_guia}: {df.loc[indice, col_numero_guia]}", "INFO")
-                    log_message(f"   - {col_status_guia}: {df.loc[indice, col_status_guia]}", "INFO")
+                # Linhas de guias já processadas em execução anterior ficam como estão
+                if resultado.get('status') == 'ja_processada':
+                    continue
+                valores = self.valores_resultado(resultado)
+                if gravador.atualizar(guia, valores):
+                    log_message(f"📝 Resultado salvo para guia {guia}: {valores['Status_Processamento']}", "INFO")
                 else:
                     log_message(f"⚠️ Linha não encontrada para guia: {guia}", "WARNING")
-            
-            # Função auxiliar para salvar Excel com formatação de texto para CARTAO
-            def salvar_excel_com_formato(caminho_arquivo, dataframe):
-                """Salva Excel garantindo que CARTAO seja salvo como texto"""
-                from openpyxl.utils import get_column_letter
-                
-                with pd.ExcelWriter(caminho_arquivo, engine='openpyxl') as writer:
-                    dataframe.to_excel(writer, index=False, sheet_name='Sheet1')
-                    
-                    # Obter a worksheet
-                    worksheet = writer.sheets['Sheet1']
-                    
-                    # Encontrar coluna CARTAO
-                    coluna_cartao_idx = None
-                    for idx, col_name in enumerate(dataframe.columns, start=1):
-                        if col_name.upper().strip() in ['CARTAO', 'CARTÃO']:
-                            coluna_cartao_idx = idx
-                            break
-                    
-                    # Se encontrou coluna CARTAO, formatar como texto
-                    if coluna_cartao_idx:
-                        col_letter = get_column_letter(coluna_cartao_idx)
-                        
-                        # Formatar toda a coluna como texto
-                        for row in range(2, len(dataframe) + 2):  # +2 porque começa na linha 2 (depois do cabeçalho)
-                            cell = worksheet[f'{col_letter}{row}']
-                            cell.number_format = '@'  # @ = formato de texto
-                            
-                            # Se o valor atual tem notação científica, reconverter para texto
-                            if cell.value:
-                                valor_str = str(cell.value)
-                                if 'E+' in valor_str or 'e+' in valor_str:
-                                    # Tentar converter de notação científica para texto
-                                    try:
-                                        numero = float(valor_str)
-                                        cell.value = f"{numero:.0f}"
-                                    except:
-                                        pass
-                        
-                        log_message(f"✅ Coluna CARTAO formatada como texto na coluna {col_letter}", "SUCCESS")
-            
-            # Estratégia 1: Tentar salvar no arquivo original (sobrescrever)
-            try:
-                log_message("💾 Tentando salvar no arquivo original...", "INFO")
-                salvar_excel_com_formato(excel_file, df)
-                log_message(f"✅ Resultados salvos no arquivo original: {excel_file}", "SUCCESS")
-                return excel_file
-                
-            except PermissionError:
-                log_message("⚠️ Arquivo original em uso, criando arquivo separado...", "WARNING")
-            except Exception as e:
-                log_message(f"⚠️ Erro ao salvar no arquivo original: {e}", "WARNING")
-            
-            # Estratégia 2: Criar arquivo separado com timestamp
-            import os
-            from datetime import datetime
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            nome_base = os.path.splitext(excel_file)[0]
-            nome_arquivo_separado = f"{nome_base}_com_resultados_{timestamp}.xlsx"
-            
-            try:
-                salvar_excel_com_formato(nome_arquivo_separado, df)
-                log_message(f"✅ Resultados salvos em arquivo separado: {nome_arquivo_separado}", "SUCCESS")
-                return nome_arquivo_separado
-                
-            except Exception as e:
-                log_message(f"❌ Erro ao salvar arquivo separado: {e}", "ERROR")
-                
-                # Estratégia 3: Fallback para CSV
-                try:
-                    nome_csv = f"{nome_base}_resultados_{timestamp}.csv"
-                    df.to_csv(nome_csv, index=False, encoding='utf-8-sig')
-                    log_message(f"✅ Resultados salvos como CSV: {nome_csv}", "SUCCESS")
-                    return nome_csv
-                except Exception as e3:
-                    log_message(f"❌ Erro ao salvar CSV: {e3}", "ERROR")
-                    return None
-            
+
+            arquivo = gravador.fechar()
+            log_message(f"✅ Resultados salvos em: {arquivo}", "SUCCESS")
+            return arquivo
+
         except Exception as e:
             log_message(f"❌ Erro geral ao salvar resultados: {e}", "ERROR")
             return None
@@ -1701,84 +1810,49 @@ class LancamentoGuiaUnimedModule(BaseModule):
             }
 
     def verificar_guia_ja_processada(self, excel_file, guia):
-        """Verifica se uma guia já foi processada anteriormente"""
+        """Verifica se uma guia já foi processada anteriormente (planilha lida uma vez só)"""
+        if self.indice_guias is None or self.indice_guias.arquivo != excel_file:
+            self.indice_guias = IndiceGuiasProcessadas.carregar(excel_file)
+        return self.indice_guias.ja_processada(guia)
+
+    def esperar_liberacao_guias(self, driver, wait, resultados, cancel_flag, ao_liberar=None):
+        """Consulta o status das guias criadas em rodízio até serem liberadas (ConsultaLiberacaoGuias)"""
+        consulta = ConsultaLiberacaoGuias(lambda numero_guia: self.consultar_status_guia(driver, wait, numero_guia),
+                                          cancel_flag=cancel_flag)
+        for resultado in resultados:
+            consulta.adicionar(resultado)
+        consulta.executar(ao_liberar)
+        return consulta
+
+    def abrir_busca_pathoweb(self, driver, wait):
+        """Volta à busca de 'Preparar exames para fatura' no PathoWeb"""
+        log_message("🔄 Retornando para página de busca do PathoWeb...", "INFO")
         try:
-            # Ler o arquivo Excel
-            df = pd.read_excel(excel_file, header=0)
-            
-            # Encontrar a coluna GUIA (pode ter qualquer case)
-            coluna_guia = None
-            for col in df.columns:
-                if col.upper().strip() == 'GUIA':
-                    coluna_guia = col
-                    break
-            
-            if not coluna_guia:
-                log_message(f"⚠️ Coluna GUIA não encontrada no Excel", "WARNING")
-                return {'ja_processada': False}
-            
-            # Encontrar colunas de resultado (qualquer case)
-            coluna_numero_guia = None
-            coluna_status_guia = None
-            
-            for col in df.columns:
-                col_upper = col.upper().strip()
-                if col_upper in ['NUMERO_GUIA', 'NUMEROGUIA', 'NUMERO GUIA']:
-                    coluna_numero_guia = col
-                elif col_upper in ['STATUS_GUIA', 'STATUSGUIA', 'STATUS GUIA']:
-                    coluna_status_guia = col
-            
-            # Encontrar linha correspondente
-            mask = df[coluna_guia].astype(str).str.strip() == str(guia).strip()
-            indices = df[mask].index
-            
-            if len(indices) > 0:
-                indice = indices[0]
-                
-                # Verificar se já tem número da guia e status
-                numero_guia = ''
-                status_guia = ''
-                
-                if coluna_numero_guia and coluna_numero_guia in df.columns:
-                    numero_guia = df.loc[indice, coluna_numero_guia]
-                
-                if coluna_status_guia and coluna_status_guia in df.columns:
-                    status_guia = df.loc[indice, coluna_status_guia]
-                
-                # Se tem número da guia e status não está vazio, considera já processada
-                if pd.notna(numero_guia) and str(numero_guia).strip() and pd.notna(status_guia) and str(status_guia).strip():
-                    return {
-                        'ja_processada': True,
-                        'numero_guia': str(numero_guia).strip(),
-                        'status_guia': str(status_guia).strip()
-                    }
-            
-            return {'ja_processada': False}
-            
-        except Exception as e:
-            log_message(f"⚠️ Erro ao verificar se guia já foi processada: {e}", "WARNING")
-            return {'ja_processada': False}
-
-    def esperar_liberacao_guia(self, driver, wait, numero_guia, cancel_flag, max_tentativas=5, tempo_espera=30):
-        """Espera a guia ser liberada, consultando o status repetidamente"""
-        log_message(f"⏳ Aguardando liberação da guia {numero_guia}...", "INFO")
-        for tentativa in range(1, max_tentativas + 1):
-            if cancel_flag and cancel_flag.is_set():
-                log_message("Execução cancelada pelo usuário durante espera por liberação.", "WARNING")
-                return {'sucesso': False, 'status_guia': 'Cancelado', 'numero_guia': numero_guia, 'erro': 'Cancelado pelo usuário'}
-
-            log_message(f"🔍 Tentativa {tentativa}/{max_tentativas}: Consultando status da guia {numero_guia}...", "INFO")
-            status_resultado = self.consultar_status_guia(driver, wait, numero_guia)
-
-            if status_resultado.get('sucesso') and status_resultado.get('status_guia', '').strip().lower() == 'liberada':
-                log_message(f"✅ Guia {numero_guia} liberada com sucesso!", "SUCCESS")
-                return status_resultado
-            else:
-                log_message(f"ℹ️ Guia {numero_guia} ainda em status: {status_resultado.get('status_guia', 'Erro ao consultar')}. Aguardando {tempo_espera} segundos...", "INFO")
-                time.sleep(tempo_espera)
+            driver.get(PATHOWEB_FATURAMENTO_URL)
+            aguardar_pagina_pronta(driver)
 
-        log_message(f"❌ Guia {numero_guia} não foi liberada após {max_tentativas} tentativas.", "ERROR")
-        return {'sucesso': False, 'status_guia': 'Não Liberada', 'numero_guia': numero_guia, 'erro': 'Não liberada após tentativas'}
+            # Clicar em "Preparar exames para fatura" novamente
+            try:
+                preparar_btn = self.wait_for_element(driver, wait, By.CSS_SELECTOR,
+                    "a.btn.btn-danger.chamadaAjax.setupAjax[data-url='/moduloFaturamento/preFaturamento']",
+                    condition="presence")
+                self.click_element(driver, preparar_btn, "botão 'Preparar exames' (reload)")
+            except Exception:
+                preparar_btn = self.wait_for_element(driver, wait, By.XPATH,
+                    "//a[contains(@class, 'setupAjax') and contains(text(), 'Preparar exames para fatura')]",
+                    condition="presence")
+                self.click_element(driver, preparar_btn, "botão 'Preparar exames' (reload alt)")
+
+            # Aguardar spinner se existir
+            try:
+                WebDriverWait(driver, 3).until(EC.presence_of_element_located((By.ID, "spinner")))
+                WebDriverWait(driver, 30).until(EC.invisibility_of_element_located((By.ID, "spinner")))
+            except Exception:
+                aguardar_pagina_pronta(driver)
+
+            log_message("✅ Página de busca recarregada", "SUCCESS")
+        except Exception as e:
+            log_message(f"⚠️ Erro ao recarregar página de busca: {e}", "WARNING")
 
     def run(self, params: dict):
         username = params.get("unimed_user")
@@ -1801,7 +1875,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
             messagebox.showerror("Erro", "Arquivo Excel é obrigatório para este módulo.")
             return
 
-        driver = BrowserFactory.create_chrome(headless=headless_mode)
+        driver = BrowserFactory.acquire_chrome(headless=headless_mode)
         wait = WebDriverWait(driver, 15)
 
         try:
@@ -1826,6 +1900,8 @@ class LancamentoGuiaUnimedModule(BaseModule):
 
             # Verificar quais guias já foram processadas
             log_message("🔍 Verificando guias já processadas...", "INFO")
+            self.indice_guias = IndiceGuiasProcessadas.carregar(excel_file)
+            self.gravador_resultados = self.abrir_gravador_resultados(excel_file)
             guias_ja_processadas = []
             guias_para_processar = []
             
@@ -1864,11 +1940,20 @@ class LancamentoGuiaUnimedModule(BaseModule):
                         log_message("Execução cancelada pelo usuário.", "WARNING")
                         break
                     
+                    # Guia repetida na planilha que já foi lançada nesta execução
+                    numero_lancado = self.indice_guias.lancada(dados['guia'])
+                    if numero_lancado:
+                        log_message(f"ℹ️ Guia {dados['guia']} repetida na planilha e já lançada (Número: {numero_lancado}) - pulando", "INFO")
+                        continue
+
                     try:
                         log_message(f"➡️ Processando registro {i}/{len(guias_para_processar)} - Guia: {dados['guia']}", "INFO")
                         
                         resultado = self.processar_guia_unimed(driver, wait, dados)
                         resultados_processamento.append(resultado)
+                        self.indice_guias.atualizar(resultado)
+                        if self.gravador_resultados:
+                            self.gravador_resultados.atualizar(dados['guia'], self.valores_resultado(resultado))
                         
                         if resultado.get('status') == 'sucesso':
                             log_message(f"✅ Guia {dados['guia']} processada com sucesso - Número: {resultado.get('numero_guia')}", "SUCCESS")
@@ -1879,7 +1964,6 @@ class LancamentoGuiaUnimedModule(BaseModule):
                         if i < len(guias_para_processar):
                             log_message("🔄 Recarregando página para próxima guia...", "INFO")
                             self.acessar_pagina_procedimento(driver)
-                            time.sleep(2)
                         
                     except Exception as e:
                         log_message(f"❌ Erro ao processar guia {dados['guia']}: {e}", "ERROR")
@@ -1894,139 +1978,42 @@ class LancamentoGuiaUnimedModule(BaseModule):
             # Adicionar guias já processadas aos resultados
             resultados_processamento.extend(guias_ja_processadas)
 
-            # Consultar status das guias criadas (sucesso + análise)
+            # Obter credenciais do PathoWeb dos parâmetros (usar username e password padrão)
+            pathoweb_user = params.get("username")  # Mudança: usar username em vez de pathoweb_user
+            pathoweb_pass = params.get("password")  # Mudança: usar password em vez de pathoweb_pass
+            abertura = AberturaExamesPathoweb(self, driver, wait, pathoweb_user, pathoweb_pass, cancel_flag)
+            if not abertura.credenciais:
+                log_message("⚠️ Credenciais do PathoWeb não fornecidas, pulando acesso ao PathoWeb", "WARNING")
+
+            # Consultar status das guias criadas (sucesso + análise). Cada guia liberada já
+            # tem o exame aberto no PathoWeb enquanto as outras continuam aguardando.
             log_message("\n🔍 Consultando status das guias criadas...", "INFO")
             guias_para_consultar = [r for r in resultados_processamento 
                                    if r.get('status') in ['sucesso', 'analise'] and r.get('numero_guia')]
             
             if guias_para_consultar:
                 log_message(f"📋 {len(guias_para_consultar)} guias para consultar status", "INFO")
-                
-                for i, resultado in enumerate(guias_para_consultar, 1):
-                    if cancel_flag and cancel_flag.is_set():
-                        log_message("Execução cancelada pelo usuário.", "WARNING")
-                        break
-                    
-                    numero_guia = resultado.get('numero_guia')
-                    log_message(f"🔍 Consultando status {i}/{len(guias_para_consultar)} - Guia: {numero_guia}", "INFO")
-                    
-                    try:
-                        status_resultado = self.consultar_status_guia(driver, wait, numero_guia)
-                        
-                        # Atualizar o resultado com o status da guia
-                        resultado['status_guia'] = status_resultado.get('status_guia', 'Erro ao consultar')
-                        
-                        if status_resultado.get('sucesso'):
-                            log_message(f"✅ Status da guia {numero_guia}: {status_resultado.get('status_guia')}", "SUCCESS")
-                           
-                            # Se a guia não estiver liberada, esperar pela liberação
-                            if status_resultado.get('status_guia', '').strip().lower() != 'liberada':
-                                log_message(f"⏳ Guia {numero_guia} não está liberada. Aguardando...", "INFO")
-                                liberacao_resultado = self.esperar_liberacao_guia(driver, wait, numero_guia, cancel_flag)
-                                if not liberacao_resultado.get('sucesso'):
-                                    log_message(f"❌ Guia {numero_guia} não foi liberada após tentativas. Número preservado no Excel para consulta.", "ERROR")
-                                    resultado['status'] = 'erro'
-                                    resultado['erro'] = liberacao_resultado.get('erro', 'Guia não liberada')
-                                    resultado['status_guia'] = liberacao_resultado.get('status_guia', 'Não Liberada')
-                                    # numero_guia já está em resultado, será preservado no Excel
-                                    continue # Pular para a próxima guia, pois esta não foi liberada
-                                else:
-                                    resultado['status_guia'] = liberacao_resultado.get('status_guia')
-                                    log_message(f"✅ Guia {numero_guia} agora está: {resultado['status_guia']}", "SUCCESS")
-                        else:
-                            log_message(f"⚠️ Erro ao consultar guia {numero_guia}: {status_resultado.get('erro')}", "WARNING")
-                        
-                        # Aguardar entre consultas
-                        time.sleep(2)
-                        
-                    except Exception as e:
-                        log_message(f"❌ Erro ao consultar status da guia {numero_guia}: {e}", "ERROR")
-                        resultado['status_guia'] = 'Erro ao consultar'
+                self.esperar_liberacao_guias(driver, wait, guias_para_consultar, cancel_flag,
+                                             ao_liberar=abertura.abrir if abertura.credenciais else None)
             else:
                 log_message("ℹ️ Nenhuma guia nova foi criada para consultar status", "INFO")
 
-            # Acessar PathoWeb para abrir exames das guias (todas as que têm número)
-            log_message("\n🌐 Acessando PathoWeb para abrir exames...", "INFO")
-            
-            # Obter credenciais do PathoWeb dos parâmetros (usar username e password padrão)
-            pathoweb_user = params.get("username")  # Mudança: usar username em vez de pathoweb_user
-            pathoweb_pass = params.get("password")  # Mudança: usar password em vez de pathoweb_pass
-            
-            # Filtrar guias que realmente podem ser abertas (com número e, se houver, status liberada)
+            # Guias que podem ser abertas e não passaram pelo rodízio (com número e, se houver, status liberada)
             guias_para_abrir = [r for r in resultados_processamento 
-                                   if r.get('numero_guia') and (not r.get('status_guia') or str(r.get('status_guia')).strip().lower() == 'liberada')]
-            
-            pathoweb_sucessos = 0
+                                   if r.get('numero_guia') and (not r.get('status_guia') or str(r.get('status_guia')).strip().lower() == 'liberada')
+                                   and not abertura.ja_tentada(r)]
             
-            if not guias_para_abrir:
+            if guias_para_abrir and abertura.credenciais:
+                log_message(f"📋 {len(guias_para_abrir)} guias para abrir no PathoWeb", "INFO")
+                for resultado in guias_para_abrir:
+                    if cancel_flag and cancel_flag.is_set():
+                        log_message("Execução cancelada pelo usuário.", "WARNING")
+                        break
+                    abertura.abrir(resultado)
+            elif not guias_para_abrir and not abertura.tentadas:
                 log_message("ℹ️ Nenhuma guia liberada com número para abrir no PathoWeb. Pulando acesso ao PathoWeb.", "INFO")
-            else:
-                if pathoweb_user and pathoweb_pass:
-                    # Fazer login no PathoWeb
-                    if self.fazer_login_pathoweb(driver, wait, pathoweb_user, pathoweb_pass):
-                        log_message("✅ Login no PathoWeb realizado com sucesso", "SUCCESS")
-                        
-                        log_message(f"📋 {len(guias_para_abrir)} guias para abrir no PathoWeb", "INFO")
-                        
-                        for i, resultado in enumerate(guias_para_abrir, 1):
-                            if cancel_flag and cancel_flag.is_set():
-                                log_message("Execução cancelada pelo usuário.", "WARNING")
-                                break
-                            
-                            numero_guia_unimed = resultado.get('numero_guia')
-                            guia_original = resultado.get('guia')  # Número da guia original da coluna A
-                            status_guia = resultado.get('status_guia', 'Status não consultado')
-                            log_message(f"🔍 Abrindo exame {i}/{len(guias_para_abrir)} - Guia Original: {guia_original} (Unimed: {numero_guia_unimed}, Status: {status_guia})", "INFO")
-                            
-                            try:
-                                sucesso_abertura = self.abrir_exame_pathoweb(driver, wait, guia_original, numero_guia_unimed)
-                                
-                                if sucesso_abertura:
-                                    pathoweb_sucessos += 1
-                                    log_message(f"✅ Exame {guia_original} aberto com sucesso no PathoWeb", "SUCCESS")
-                                else:
-                                    log_message(f"❌ Erro ao abrir exame {guia_original} no PathoWeb", "ERROR")
-                                
-                                # Navegar de volta para página de busca se não for o último exame
-                                if i < len(guias_para_abrir):
-                                    log_message(f"🔄 Retornando para página de busca para próximo exame ({i+1}/{len(guias_para_abrir)})...", "INFO")
-                                    try:
-                                        driver.get("https://dap.pathoweb.com.br/moduloFaturamento/index")
-                                        time.sleep(2)
-                                        
-                                        # Clicar em "Preparar exames para fatura" novamente
-                                        try:
-                                            preparar_btn = self.wait_for_element(driver, wait, By.CSS_SELECTOR,
-                                                "a.btn.btn-danger.chamadaAjax.setupAjax[data-url='/moduloFaturamento/preFaturamento']",
-                                                condition="presence")
-                                            self.click_element(driver, preparar_btn, "botão 'Preparar exames' (reload)")
-                                        except Exception:
-                                            preparar_btn = self.wait_for_element(driver, wait, By.XPATH,
-                                                "//a[contains(@class, 'setupAjax') and contains(text(), 'Preparar exames para fatura')]",
-                                                condition="presence")
-                                            self.click_element(driver, preparar_btn, "botão 'Preparar exames' (reload alt)")
-                                        
-                                        # Aguardar spinner se existir
-                                        try:
-                                            WebDriverWait(driver, 3).until(EC.presence_of_element_located((By.ID, "spinner")))
-                                            WebDriverWait(driver, 30).until(EC.invisibility_of_element_located((By.ID, "spinner")))
-                                        except Exception:
-                                            time.sleep(2)
-                                        
-                                        log_message("✅ Página de busca recarregada", "SUCCESS")
-                                    except Exception as e:
-                                        log_message(f"⚠️ Erro ao recarregar página de busca: {e}", "WARNING")
-                                else:
-                                    log_message(f"✅ Último exame processado ({i}/{len(guias_para_abrir)})", "SUCCESS")
-                                
-                                time.sleep(2)
-                                
-                            except Exception as e:
-                                log_message(f"❌ Erro ao abrir exame {guia_original}: {e}", "ERROR")
-                    else:
-                        log_message("❌ Falha no login do PathoWeb", "ERROR")
-                else:
-                    log_message("⚠️ Credenciais do PathoWeb não fornecidas, pulando acesso ao PathoWeb", "WARNING")
+
+            pathoweb_sucessos = abertura.sucessos
 
             # Salvar resultados no Excel
             try:
@@ -2093,16 +2080,22 @@ class LancamentoGuiaUnimedModule(BaseModule):
             log_message(f"❌ Erro durante a automação: {e}", "ERROR")
             messagebox.showerror("Erro", f"❌ Erro durante a automação:\n{e}")
         finally:
+            # Execução interrompida: grava os resultados que ainda estavam no lote
+            if self.gravador_resultados and not self.gravador_resultados.fechado:
+                try:
+                    self.gravador_resultados.fechar()
+                except Exception as e:
+                    log_message(f"⚠️ Erro ao gravar resultados pendentes: {e}", "WARNING")
             # Aguardar antes de fechar para permitir visualização dos resultados
             if not headless_mode:
                 input("Pressione Enter para fechar o navegador...")
-            driver.quit()
+            BrowserFactory.release_chrome(driver)
 
     def marcar_exames_como_conferidos(self, driver, wait):
         """Marca a coluna 'Conferido' para todos os exames na tabela"""
         try:
             log_message("📝 Marcando exames como 'Conferido' na tabela...", "INFO")
-            time.sleep(2)
+            aguardar_pagina_pronta(driver)
 
             # Re-localizar a tabela sempre antes de processar para evitar elementos stale
             def obter_linhas():
@@ -2132,7 +2125,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
                     except Exception:
                         pass
                     
-                    time.sleep(0.5)  # Pequena pausa para estabilidade
+                    aguardar_ajax(driver, timeout=5)
                     
                     # Re-localizar todas as linhas
                     linhas_atuais = obter_linhas()
@@ -2173,7 +2166,6 @@ class LancamentoGuiaUnimedModule(BaseModule):
                             # Em modo headless, não fazer scroll (pode causar problemas)
                             if not self.headless_mode:
                                 driver.execute_script("arguments[0].scrollIntoView({block:'center'});", ancora)
-                                time.sleep(0.3)
                             
                             # Aguardar spinner invisível
                             try:
@@ -2183,7 +2175,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
                             
                             # Usar método robusto de clique
                             self.click_element(driver, ancora, f"âncora linha {idx + 1}")
-                            time.sleep(0.5)
+                            aguardar_ajax(driver, timeout=5)
                             clicou_ancora = True
                             log_message(f"✅ Linha {idx + 1}: clicou na âncora (tentativa {tentativa + 1})", "INFO")
                             break
@@ -2194,9 +2186,8 @@ class LancamentoGuiaUnimedModule(BaseModule):
                                 # Aguardar spinner e tentar novamente
                                 try:
                                     WebDriverWait(driver, 30).until(EC.invisibility_of_element_located((By.ID, "spinner")))
-                                    time.sleep(0.5)
                                 except Exception:
-                                    time.sleep(1)
+                                    aguardar_pagina_pronta(driver)
                     
                     if not clicou_ancora:
                         log_message(f"❌ Linha {idx + 1}: não conseguiu clicar na âncora após 3 tentativas", "ERROR")
@@ -2225,7 +2216,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
                         except Exception as e:
                             log_message(f"⚠️ Linha {idx + 1}: erro ao selecionar 'Conferido' (tentativa {tentativa + 1}): {e}", "WARNING")
                             if tentativa < 2:
-                                time.sleep(0.5)
+                                dormir(0.5)
                     
                     if not selecionou:
                         log_message(f"❌ Linha {idx + 1}: não conseguiu selecionar 'Conferido' após 3 tentativas", "ERROR")
@@ -2239,7 +2230,7 @@ class LancamentoGuiaUnimedModule(BaseModule):
                         log_message(f"✅ Linha {idx + 1}: processamento concluído", "SUCCESS")
                     except Exception:
                         # Sem spinner; pequena pausa
-                        time.sleep(0.5)
+                        aguardar_ajax(driver, timeout=5)
                         log_message(f"ℹ️ Linha {idx + 1}: sem spinner, aguardando estabilização", "INFO")
 
                 except Exception as e:
@@ -2260,11 +2251,10 @@ class LancamentoGuiaUnimedModule(BaseModule):
             except Exception:
                 # Se não houver spinner, aguardar tempo fixo para garantir
                 log_message("ℹ️ Spinner não detectado, aguardando tempo de segurança...", "INFO")
-                time.sleep(2)
+                aguardar_pagina_pronta(driver)
             
             # Verificação final
             log_message("📋 Realizando verificação final...", "INFO")
-            time.sleep(1)
             linhas_finais = obter_linhas()
             conferidos_final = 0
             for linha_final in linhas_finais:
@@ -2282,10 +2272,10 @@ class LancamentoGuiaUnimedModule(BaseModule):
             # Tempo adicional de segurança antes de fechar/prosseguir
             if conferidos_final == total_linhas and total_linhas > 0:
                 log_message("✅ Todos os exames foram marcados com sucesso, aguardando estabilização...", "SUCCESS")
-                time.sleep(2)
+                aguardar_pagina_pronta(driver)
             elif conferidos_final < total_linhas:
                 log_message(f"⚠️ Alguns exames podem não ter sido marcados ({conferidos_final}/{total_linhas}), aguardando tempo adicional...", "WARNING")
-                time.sleep(3)
+                aguardar_pagina_pronta(driver)
             
         except Exception as e:
             log_message(f"❌ Erro ao marcar exames como 'Conferido': {e}", "ERROR")
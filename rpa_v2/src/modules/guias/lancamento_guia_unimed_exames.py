@@ -12,12 +12,15 @@ import difflib
 
 from src.core.browser_factory import BrowserFactory
 from src.core.logger import log_message
+from src.core.waits import dormir
 from src.modules.base import BaseModule
+from src.modules.guias.lancamento_guia_unimed import ConsultaLiberacaoGuias, IndiceGuiasProcessadas
 
 class LancamentoGuiaUnimedExamesModule(BaseModule):
     def __init__(self):
         super().__init__(nome="Lançamento Guia Unimed - Exames")
         self.headless_mode = False
+        self.indice_guias = None
 
     def read_excel_data(self, excel_file):
         """Lê os dados do arquivo Excel"""
@@ -60,64 +63,10 @@ class LancamentoGuiaUnimedExamesModule(BaseModule):
             raise
 
     def verificar_guia_ja_processada(self, excel_file, guia):
-        """Verifica se uma guia já foi processada anteriormente"""
-        try:
-            # Ler o arquivo Excel
-            df = pd.read_excel(excel_file, header=0)
-
-            # Encontrar a coluna GUIA (pode ter qualquer case)
-            coluna_guia = None
-            for col in df.columns:
-                if col.upper().strip() == 'GUIA':
-                    coluna_guia = col
-                    break
-
-            if not coluna_guia:
-                log_message(f"⚠️ Coluna GUIA não encontrada no Excel", "WARNING")
-                return {'ja_processada': False}
-
-            # Encontrar colunas de resultado (qualquer case)
-            coluna_numero_guia = None
-            coluna_status_guia = None
-
-            for col in df.columns:
-                col_upper = col.upper().strip()
-                if col_upper in ['NUMERO_GUIA', 'NUMEROGUIA', 'NUMERO GUIA']:
-                    coluna_numero_guia = col
-                elif col_upper in ['STATUS_GUIA', 'STATUSGUIA', 'STATUS GUIA']:
-                    coluna_status_guia = col
-
-            # Encontrar linha correspondente
-            mask = df[coluna_guia].astype(str).str.strip() == str(guia).strip()
-            indices = df[mask].index
-
-            if len(indices) > 0:
-                indice = indices[0]
-
-                # Verificar se já tem número da guia e status
-                numero_guia = ''
-                status_guia = ''
-
-                if coluna_numero_guia and coluna_numero_guia in df.columns:
-                    numero_guia = df.loc[indice, coluna_numero_guia]
-
-                if coluna_status_guia and coluna_status_guia in df.columns:
-                    status_guia = df.loc[indice, coluna_status_guia]
-
-                # Se tem número da guia e status não está vazio, considera já processada
-                if pd.notna(numero_guia) and str(numero_guia).strip() and pd.notna(status_guia) and str(
-                        status_guia).strip():
-                    return {
-                        'ja_processada': True,
-                        'numero_guia': str(numero_guia).strip(),
-                        'status_guia': str(status_guia).strip()
-                    }
-
-            return {'ja_processada': False}
-
-        except Exception as e:
-            log_message(f"⚠️ Erro ao verificar se guia já foi processada: {e}", "WARNING")
-            return {'ja_processada': False}
+        """Verifica se uma guia já foi processada anteriormente (planilha lida uma vez só)"""
+        if self.indice_guias is None or self.indice_guias.arquivo != excel_file:
+            self.indice_guias = IndiceGuiasProcessadas.carregar(excel_file)
+        return self.indice_guias.ja_processada(guia)
 
     def fazer_login_unimed(self, driver, wait, username, password):
         """Faz login no portal da Unimed"""
@@ -137,7 +86,7 @@ class LancamentoGuiaUnimedExamesModule(BaseModule):
         # Clicar em entrar
         botao_entrar = driver.find_element(By.ID, "entrar")
         botao_entrar.click()
-        time.sleep(2.5)
+        dormir(2.5)
 
         log_message("✅ Login realizado com sucesso", "SUCCESS")
 
@@ -146,7 +95,7 @@ class LancamentoGuiaUnimedExamesModule(BaseModule):
         url_procedimento = "https://webmed.unimedlondrina.com.br/prestador/procedimento.php?pagina=ff25c04430244fa10de866898f1a24d2"
         log_message(f"Acessando página de procedimentos: {url_procedimento}", "INFO")
         driver.get(url_procedimento)
-        time.sleep(3)
+        dormir(3)
         log_message("✅ Página de procedimentos acessada", "SUCCESS")
 
     def formatar_cartao_17_digitos(self, cartao):
@@ -186,7 +135,7 @@ class LancamentoGuiaUnimedExamesModule(BaseModule):
             janela_original = driver.current_window_handle
 
             # Aguardar um pouco para ver se popup abre
-            time.sleep(2)
+            dormir(2)
 
             # Verificar se há novas janelas
             todas_janelas = driver.window_handles
@@ -285,7 +234,7 @@ class LancamentoGuiaUnimedExamesModule(BaseModule):
             botao_busca.click()
 
             # 2. Aguardar nova janela abrir e fazer switch
-            time.sleep(3)
+            dormir(3)
 
             # Verificar se há novas janelas
             todas_janelas = driver.window_handles
@@ -333,7 +282,7 @@ class LancamentoGuiaUnimedExamesModule(BaseModule):
                     log_message("📝 Campo nome deixado vazio para busca apenas por CRM", "INFO")
 
                 botao_localizar.click()
-                time.sleep(3)  # Aguardar tabela carregar
+                dormir(3)  # Aguardar tabela carregar
 
                 try:
                     tabela = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "table.table-hover tbody")))
@@ -394,7 +343,7 @@ class LancamentoGuiaUnimedExamesModule(BaseModule):
 
                         # Após o clique, o popup pode fechar. Garantir retorno para a janela original.
                         try:
-                            time.sleep(1)
+                            dormir(1)
                             if janela_original in driver.window_handles:
                                 driver.switch_to.window(janela_original)
                                 log_message("↩️ Voltou para janela principal após selecionar médico", "INFO")
@@ -425,7 +374,7 @@ class LancamentoGuiaUnimedExamesModule(BaseModule):
                 raise Exception(f"Médico não foi selecionado após todas as tentativas para CRM: {crm}")
 
             # 9. Aguardar popup fechar automaticamente e voltar para janela original
-            time.sleep(3)
+            dormir(3)
 
             # O popup fecha automaticamente, então só precisamos voltar para janela original
             driver.switch_to.window(janela_original)
@@ -555,7 +504,7 @@ class LancamentoGuiaUnimedExamesModule(BaseModule):
             select2_container.click()
 
             # 2. Aguardar campo de busca aparecer
-            time.sleep(2)
+            dormir(2)
 
             # 3. Preencher campo de busca
             log_message(f"📝 Digitando texto: {texto_formatado}", "INFO")
@@ -567,7 +516,7 @@ class LancamentoGuiaUnimedExamesModule(BaseModule):
             campo_busca.send_keys(texto_formatado)
 
             # 4. Aguardar resultados carregar
-            time.sleep(3)
+            dormir(3)
 
             # 5. Verificar se há resultados ou se precisa usar "DIGITAR MANUALMENTE"
             try:
@@ -660,7 +609,7 @@ class LancamentoGuiaUnimedExamesModule(BaseModule):
                     driver.execute_script(js_procedimento)
 
                     # Aguardar um pouco
-                    time.sleep(1)
+                    dormir(1)
 
                     # Preencher quantidade
                     log_message(f"📝 Preenchendo quantidade{i}: {quantidade}", "INFO")
@@ -674,7 +623,7 @@ class LancamentoGuiaUnimedExamesModule(BaseModule):
                     '''
                     driver.execute_script(js_quantidade)
 
-                    time.sleep(1)
+                    dormir(1)
                     log_message(f"✅ Procedimento {i} preenchido: {procedimento} (qtd: {quantidade})", "SUCCESS")
 
                 except Exception as e:
@@ -733,13 +682,13 @@ class LancamentoGuiaUnimedExamesModule(BaseModule):
 
                             if botao_ok:
                                 botao_ok.click()
-                                time.sleep(0.5)
+                                dormir(0.5)
                                 log_message("✅ Popup de aviso fechado, continuando processamento", "SUCCESS")
                             else:
                                 # Se não encontrou botão, tentar fechar via JavaScript
                                 log_message("⚠️ Botão Ok não encontrado, tentando fechar via JavaScript...", "WARNING")
                                 driver.execute_script("arguments[0].remove();", popup)
-                                time.sleep(0.5)
+                                dormir(0.5)
                     except Exception as e:
                         log_message(f"⚠️ Erro ao processar popup de aviso: {e}", "WARNING")
                         continue
@@ -776,7 +725,7 @@ class LancamentoGuiaUnimedExamesModule(BaseModule):
                 driver.execute_script("arguments[0].click();", botao_autorizar)
 
             # Aguardar um momento e verificar se há popups de aviso
-            time.sleep(2)
+            dormir(2)
             self.fechar_popup_aviso(driver, wait)
 
             # Aguardar modal de resultado aparecer
@@ -1023,7 +972,7 @@ class LancamentoGuiaUnimedExamesModule(BaseModule):
             # Acessar página de rastreabilidade
             url_rastreabilidade = "https://webmed.unimedlondrina.com.br/prestador/Rastreabilidade.php"
             driver.get(url_rastreabilidade)
-            time.sleep(3)
+            dormir(3)
 
             # Preencher campo do número da guia
             log_message(f"📝 Preenchendo número da guia: {numero_guia}", "INFO")
@@ -1037,7 +986,7 @@ class LancamentoGuiaUnimedExamesModule(BaseModule):
             botao_consultar.click()
 
             # Aguardar carregamento da página
-            time.sleep(3)
+            dormir(3)
 
             # Tentar extrair o status da guia
             try:
@@ -1070,31 +1019,14 @@ class LancamentoGuiaUnimedExamesModule(BaseModule):
                 'erro': str(e)
             }
 
-    def esperar_liberacao_guia(self, driver, wait, numero_guia, cancel_flag, max_tentativas=5, tempo_espera=30):
-        """Espera a guia ser liberada, consultando o status repetidamente"""
-        log_message(f"⏳ Aguardando liberação da guia {numero_guia}...", "INFO")
-        for tentativa in range(1, max_tentativas + 1):
-            if cancel_flag and cancel_flag.is_set():
-                log_message("Execução cancelada pelo usuário durante espera por liberação.", "WARNING")
-                return {'sucesso': False, 'status_guia': 'Cancelado', 'numero_guia': numero_guia,
-                        'erro': 'Cancelado pelo usuário'}
-
-            log_message(f"🔍 Tentativa {tentativa}/{max_tentativas}: Consultando status da guia {numero_guia}...",
-                        "INFO")
-            status_resultado = self.consultar_status_guia(driver, wait, numero_guia)
-
-            if status_resultado.get('sucesso') and status_resultado.get('status_guia',
-                                                                        '').strip().lower() == 'liberada':
-                log_message(f"✅ Guia {numero_guia} liberada com sucesso!", "SUCCESS")
-                return status_resultado
-            else:
-                log_message(
-                    f"ℹ️ Guia {numero_guia} ainda em status: {status_resultado.get('status_guia', 'Erro ao consultar')}. Aguardando {tempo_espera} segundos...",
-                    "INFO")
-                time.sleep(tempo_espera)
-
-        log_message(f"❌ Guia {numero_guia} não foi liberada após {max_tentativas} tentativas.", "ERROR")
-        return {'sucesso': False, 'status_guia': 'Não Liberada', 'numero_guia': numero_guia, 'erro': 'Não liberada após tentativas'}
+    def esperar_liberacao_guias(self, driver, wait, resultados, cancel_flag, ao_liberar=None):
+        """Consulta o status das guias criadas em rodízio até serem liberadas (ConsultaLiberacaoGuias)"""
+        consulta = ConsultaLiberacaoGuias(lambda numero_guia: self.consultar_status_guia(driver, wait, numero_guia),
+                                          cancel_flag=cancel_flag)
+        for resultado in resultados:
+            consulta.adicionar(resultado)
+        consulta.executar(ao_liberar)
+        return consulta
 
     def run(self, params: dict):
         username = params.get("unimed_user")
@@ -1117,7 +1049,7 @@ class LancamentoGuiaUnimedExamesModule(BaseModule):
             messagebox.showerror("Erro", "Arquivo Excel é obrigatório para este módulo.")
             return
 
-        driver = BrowserFactory.create_chrome(headless=headless_mode)
+        driver = BrowserFactory.acquire_chrome(headless=headless_mode)
         wait = WebDriverWait(driver, 15)
 
         try:
@@ -1142,6 +1074,7 @@ class LancamentoGuiaUnimedExamesModule(BaseModule):
 
             # Verificar quais guias já foram processadas
             log_message("🔍 Verificando guias já processadas...", "INFO")
+            self.indice_guias = IndiceGuiasProcessadas.carregar(excel_file)
             guias_ja_processadas = []
             guias_para_processar = []
 
@@ -1182,11 +1115,18 @@ class LancamentoGuiaUnimedExamesModule(BaseModule):
                         log_message("Execução cancelada pelo usuário.", "WARNING")
                         break
 
+                    # Guia repetida na planilha que já foi lançada nesta execução
+                    numero_lancado = self.indice_guias.lancada(dados['guia'])
+                    if numero_lancado:
+                        log_message(f"ℹ️ Guia {dados['guia']} repetida na planilha e já lançada (Número: {numero_lancado}) - pulando", "INFO")
+                        continue
+
                     try:
                         log_message(f"➡️ Processando registro {i}/{len(guias_para_processar)} - Guia: {dados['guia']}","INFO")
 
                         resultado = self.processar_guia_unimed(driver, wait, dados)
                         resultados_processamento.append(resultado)
+                        self.indice_guias.atualizar(resultado)
 
                         if resultado.get('status') == 'sucesso':
                             log_message(
@@ -1199,7 +1139,7 @@ class LancamentoGuiaUnimedExamesModule(BaseModule):
                         if i < len(guias_para_processar):
                             log_message("🔄 Recarregando página para próxima guia...", "INFO")
                             self.acessar_pagina_procedimento(driver)
-                            time.sleep(2)
+                            dormir(2)
 
                     except Exception as e:
                         log_message(f"❌ Erro ao processar guia {dados['guia']}: {e}", "ERROR")
@@ -1221,51 +1161,7 @@ class LancamentoGuiaUnimedExamesModule(BaseModule):
             if guias_para_consultar:
                 log_message(f"📋 {len(guias_para_consultar)} guias para consultar status", "INFO")
 
-                for i, resultado in enumerate(guias_para_consultar, 1):
-                    if cancel_flag and cancel_flag.is_set():
-                        log_message("Execução cancelada pelo usuário.", "WARNING")
-                        break
-
-                    numero_guia = resultado.get('numero_guia')
-                    log_message(f"🔍 Consultando status {i}/{len(guias_para_consultar)} - Guia: {numero_guia}", "INFO")
-
-                    try:
-                        status_resultado = self.consultar_status_guia(driver, wait, numero_guia)
-
-                        # Atualizar o resultado com o status da guia
-                        resultado['status_guia'] = status_resultado.get('status_guia', 'Erro ao consultar')
-
-                        if status_resultado.get('sucesso'):
-                            log_message(f"✅ Status da guia {numero_guia}: {status_resultado.get('status_guia')}",
-                                        "SUCCESS")
-
-                            # Se a guia não estiver liberada, esperar pela liberação
-                            if status_resultado.get('status_guia', '').strip().lower() != 'liberada':
-                                log_message(f"⏳ Guia {numero_guia} não está liberada. Aguardando...", "INFO")
-                                liberacao_resultado = self.esperar_liberacao_guia(driver, wait, numero_guia, cancel_flag)
-                                if not liberacao_resultado.get('sucesso'):
-                                    log_message(
-                                        f"❌ Guia {numero_guia} não foi liberada após tentativas. Número preservado no Excel para consulta.",
-                                        "ERROR")
-                                    resultado['status'] = 'erro'
-                                    resultado['erro'] = liberacao_resultado.get('erro', 'Guia não liberada')
-                                    resultado['status_guia'] = liberacao_resultado.get('status_guia', 'Não Liberada')
-                                    # numero_guia já está em resultado, será preservado no Excel
-                                    continue  # Pular para a próxima guia, pois esta não foi liberada
-                                else:
-                                    resultado['status_guia'] = liberacao_resultado.get('status_guia')
-                                    log_message(f"✅ Guia {numero_guia} agora está: {resultado['status_guia']}",
-                                                "SUCCESS")
-                        else:
-                            log_message(f"⚠️ Erro ao consultar guia {numero_guia}: {status_resultado.get('erro')}",
-                                        "WARNING")
-
-                        # Aguardar entre consultas
-                        time.sleep(2)
-
-                    except Exception as e:
-                        log_message(f"❌ Erro ao consultar status da guia {numero_guia}: {e}", "ERROR")
-                        resultado['status_guia'] = 'Erro ao consultar'
+                self.esperar_liberacao_guias(driver, wait, guias_para_consultar, cancel_flag)
             else:
                 log_message("ℹ️ Nenhuma guia nova foi criada para consultar status", "INFO")
 
@@ -1322,7 +1218,7 @@ class LancamentoGuiaUnimedExamesModule(BaseModule):
             #                             "INFO")
             #                         try:
             #                             driver.get("https://dap.pathoweb.com.br/moduloFaturamento/index")
-            #                             time.sleep(2)
+            #                             dormir(2)
             #
             #                             # Clicar em "Preparar exames para fatura" novamente
             #                             try:
@@ -1344,7 +1240,7 @@ class LancamentoGuiaUnimedExamesModule(BaseModule):
             #                                 WebDriverWait(driver, 30).until(
             #                                     EC.invisibility_of_element_located((By.ID, "spinner")))
             #                             except Exception:
-            #                                 time.sleep(2)
+            #                                 dormir(2)
             #
             #                             log_message("✅ Página de busca recarregada", "SUCCESS")
             #                         except Exception as e:
@@ -1352,7 +1248,7 @@ class LancamentoGuiaUnimedExamesModule(BaseModule):
             #                     else:
             #                         log_message(f"✅ Último exame processado ({i}/{len(guias_para_abrir)})", "SUCCESS")
             #
-            #                     time.sleep(2)
+            #                     dormir(2)
             #
             #                 except Exception as e:
             #                     log_message(f"❌ Erro ao abrir exame {guia_original}: {e}", "ERROR")
@@ -1431,7 +1327,7 @@ class LancamentoGuiaUnimedExamesModule(BaseModule):
             # Aguardar antes de fechar para permitir visualização dos resultados
             if not headless_mode:
                 input("Pressione Enter para fechar o navegador...")
-            driver.quit()
+            BrowserFactory.release_chrome(driver)
 
 
 def run(params: dict):
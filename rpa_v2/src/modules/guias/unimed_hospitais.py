@@ -1,5 +1,4 @@
 import os
-import time
 import pandas as pd
 from tkinter import messagebox
 from selenium.webdriver.common.by import By
@@ -8,7 +7,11 @@ from selenium.webdriver.support import expected_conditions as EC
 from datetime import datetime
 
 from src.core.browser_factory import BrowserFactory
+from src.core import progresso
 from src.core.logger import log_message
+from src.core.parallel_executor import ExecutorParalelo
+from src.core.session_manager import login_pathoweb
+from src.core.waits import aguardar, aguardar_ajax, aguardar_modal_fechado, aguardar_pagina_pronta, dormir
 from src.modules.base import BaseModule
 
 class UnimedHospitaisModule(BaseModule):
@@ -103,60 +106,20 @@ class UnimedHospitaisModule(BaseModule):
         except Exception as e:
             raise ValueError(f"Erro ao ler o Excel: {e}")
 
-    def fazer_login_pathoweb(self, driver, wait, username, password):
+    def fazer_login_pathoweb(self, driver, wait, username, password, compartilhar=True):
         """Faz login no PathoWeb e navega para o módulo de faturamento"""
         try:
             log_message("🔐 Fazendo login no PathoWeb...", "INFO")
             
             # URL do PathoWeb
             url = "https://dap.pathoweb.com.br/login/auth"
-            driver.get(url)
-            
-            # Preencher credenciais
-            wait.until(EC.presence_of_element_located((By.ID, "username"))).send_keys(username)
-            driver.find_element(By.ID, "password").send_keys(password)
-            botao_submit = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
-            self.click_element(driver, botao_submit, "botão login PathoWeb")
-            
-            log_message("Verificando se precisa navegar para módulo de faturamento...", "INFO")
-            current_url = driver.current_url
-
-            if current_url == "https://dap.pathoweb.com.br/" or "trocarModulo" in current_url:
-                log_message("Detectada tela de seleção de módulos - navegando para módulo de faturamento...", "INFO")
-                try:
-                    modulo_link = self.wait_for_element(driver, wait, By.CSS_SELECTOR,
-                        "a[href='/site/trocarModulo?modulo=2']", condition="presence")
-                    self.click_element(driver, modulo_link, "link módulo faturamento")
-                    time.sleep(2)
-                    log_message("✅ Navegação para módulo de faturamento realizada", "SUCCESS")
-                except Exception as e:
-                    log_message(f"⚠️ Erro ao navegar para módulo: {e}", "WARNING")
-                    driver.get("https://dap.pathoweb.com.br/moduloFaturamento/index")
-                    time.sleep(2)
-                    log_message("🔄 Navegação direta para módulo realizada", "INFO")
-
-            elif "moduloFaturamento" in current_url:
-                log_message("✅ Já está no módulo de faturamento - pulando navegação", "SUCCESS")
-            else:
-                log_message(f"⚠️ URL inesperada detectada: {current_url}", "WARNING")
-                driver.get("https://dap.pathoweb.com.br/moduloFaturamento/index")
-                time.sleep(2)
-                log_message("🔄 Navegação direta para módulo realizada (fallback)", "INFO")
-
-            # Fechar modal se aparecer
-            try:
-                modal_close_button = driver.find_element(By.CSS_SELECTOR, "#mensagemParaClienteModal .modal-footer button")
-                # Em modo headless, não verificar is_displayed()
-                if self.headless_mode or modal_close_button.is_displayed():
-                    self.click_element(driver, modal_close_button, "fechar modal inicial")
-                    time.sleep(1)
-            except Exception:
-                pass
+            login_pathoweb(driver, username, password, modulo=2, url=url, compartilhar=compartilhar,
+                           headless=self.headless_mode)
 
             # Acessar explicitamente a página do módulo de faturamento
             log_message("Acessando módulo de faturamento via URL...", "INFO")
             driver.get("https://dap.pathoweb.com.br/moduloFaturamento/index")
-            time.sleep(2)
+            aguardar_pagina_pronta(driver)
 
             # Clicar no botão "Preparar exames para fatura"
             log_message("Clicando em 'Preparar exames para fatura'...", "INFO")
@@ -178,7 +141,7 @@ class UnimedHospitaisModule(BaseModule):
                 WebDriverWait(driver, 30).until(EC.invisibility_of_element_located((By.ID, "spinner")))
                 log_message("✅ Modal de carregamento fechado", "INFO")
             except Exception:
-                time.sleep(1)
+                aguardar_pagina_pronta(driver)
 
             log_message("✅ Login no PathoWeb realizado e página de pré-faturamento acessada", "SUCCESS")
             return True
@@ -198,7 +161,7 @@ class UnimedHospitaisModule(BaseModule):
             self.click_element(driver, botao_limpar, "botão Limpar")
             
             # Aguardar processamento
-            time.sleep(2)
+            aguardar_pagina_pronta(driver)
             
             # Aguardar spinner se existir
             try:
@@ -206,7 +169,7 @@ class UnimedHospitaisModule(BaseModule):
                 log_message("🔄 Aguardando processamento após limpar filtros...", "INFO")
                 WebDriverWait(driver, 30).until(EC.invisibility_of_element_located((By.ID, "spinner")))
             except Exception:
-                time.sleep(1)
+                aguardar_pagina_pronta(driver)
             
             log_message("✅ Filtros limpos com sucesso", "SUCCESS")
             return True
@@ -223,10 +186,8 @@ class UnimedHospitaisModule(BaseModule):
             # Limpar e preencher campo número do exame
             campo_numero_exame = self.wait_for_element(driver, wait, By.ID, "numeroExame", condition="presence")
             campo_numero_exame.clear()
-            time.sleep(0.5)
             campo_numero_exame.send_keys(str(numero_exame))
             log_message(f"✅ Número do exame {numero_exame} digitado", "SUCCESS")
-            time.sleep(0.5)
             
             # Clicar no botão Pesquisar
             botao_pesquisar = self.wait_for_element(driver, wait, By.ID, "pesquisaFaturamento", condition="presence")
@@ -241,12 +202,12 @@ class UnimedHospitaisModule(BaseModule):
                     log_message("🔄 Carregando resultados...", "INFO")
                     WebDriverWait(driver, 30).until(EC.invisibility_of_element_located((By.ID, "spinner")))
                 except Exception:
-                    time.sleep(5)
+                    aguardar_pagina_pronta(driver)
             except Exception:
                 log_message("Tempo de carregamento excedido, verificando resultados mesmo assim...", "WARNING")
             
             # Aguardar mais um pouco para garantir que a tabela foi carregada
-            time.sleep(3)
+            aguardar_ajax(driver)
             
             # Verificar se há resultados
             tbody_rows = []
@@ -314,7 +275,7 @@ class UnimedHospitaisModule(BaseModule):
                 else:
                     log_message("ℹ️ Checkbox já estava marcado", "INFO")
                 
-                time.sleep(1)
+                aguardar_ajax(driver, timeout=5)
                 
                 # Procurar e clicar no botão "Abrir exame"
                 log_message("🔍 Procurando botão 'Abrir exame'...", "INFO")
@@ -330,7 +291,7 @@ class UnimedHospitaisModule(BaseModule):
                 
                 # Aguardar o modal aparecer
                 log_message("⏳ Aguardando modal do exame abrir...", "INFO")
-                time.sleep(3)
+                aguardar_pagina_pronta(driver)
                 
                 # Verificar se o modal foi aberto
                 try:
@@ -341,11 +302,11 @@ class UnimedHospitaisModule(BaseModule):
                         return True
                     else:
                         log_message("⚠️ Modal encontrado mas não está visível", "WARNING")
-                        time.sleep(2)
+                        aguardar_pagina_pronta(driver)
                         return True
                 except Exception:
                     log_message("⚠️ Modal não encontrado, tentando continuar...", "WARNING")
-                    time.sleep(2)
+                    aguardar_pagina_pronta(driver)
                     return True
                     
             except Exception as e:
@@ -366,7 +327,7 @@ class UnimedHospitaisModule(BaseModule):
             log_message(f"📝 Preenchendo número da guia: {numero_guia}...", "INFO")
             
             # Aguardar um pouco para garantir que o modal está carregado
-            time.sleep(2)
+            aguardar_pagina_pronta(driver)
             
             # Preencher número da guia usando a função jQuery
             js_numero_guia = f'''
@@ -404,7 +365,12 @@ class UnimedHospitaisModule(BaseModule):
             log_message(f"✅ Número da guia {numero_guia} preenchido", "SUCCESS")
             
             # Aguardar um pouco para o processamento
-            time.sleep(3)
+            aguardar(
+                driver,
+                lambda d: d.execute_script("return $('#numeroGuiaInput').attr('value');") == str(numero_guia),
+                timeout=10, nome="numero_guia_digitado"
+            )
+            aguardar_ajax(driver)
             
             return True
             
@@ -427,7 +393,7 @@ class UnimedHospitaisModule(BaseModule):
                 log_message("✅ Botão 'Próximo' clicado", "SUCCESS")
                 
                 # Aguardar processamento
-                time.sleep(3)
+                aguardar_pagina_pronta(driver)
                 
             except Exception as e:
                 log_message(f"⚠️ Erro ao clicar no botão 'Próximo': {e}", "WARNING")
@@ -438,7 +404,7 @@ class UnimedHospitaisModule(BaseModule):
                         condition="presence")
                     self.click_element(driver, botao_proximo_alt, "botão 'Próximo' (alternativo)")
                     log_message("✅ Botão 'Próximo' clicado (seletor alternativo)", "SUCCESS")
-                    time.sleep(3)
+                    aguardar_pagina_pronta(driver)
                 except Exception as e2:
                     log_message(f"❌ Erro ao clicar no botão 'Próximo' (tentativa alternativa): {e2}", "ERROR")
             
@@ -452,7 +418,7 @@ class UnimedHospitaisModule(BaseModule):
                 log_message("✅ Botão 'Salvar' clicado", "SUCCESS")
                 
                 # Aguardar processamento
-                time.sleep(3)
+                aguardar_pagina_pronta(driver)
             except Exception as e:
                 log_message(f"⚠️ Erro ao clicar no botão 'Salvar': {e}", "WARNING")
                 # Tentar encontrar o botão com seletor alternativo
@@ -462,7 +428,7 @@ class UnimedHospitaisModule(BaseModule):
                         condition="presence")
                     self.click_element(driver, botao_salvar_alt, "botão 'Salvar' (alternativo)")
                     log_message("✅ Botão 'Salvar' clicado (seletor alternativo)", "SUCCESS")
-                    time.sleep(3)
+                    aguardar_pagina_pronta(driver)
                 except Exception as e2:
                     log_message(f"❌ Erro ao clicar no botão 'Salvar' (tentativa alternativa): {e2}", "ERROR")
 
@@ -474,7 +440,7 @@ class UnimedHospitaisModule(BaseModule):
                 except Exception:
                     close_btn = driver.find_element(By.CSS_SELECTOR, "#myModal button.close, #myModal .modal-header button.close")
                 self.click_element(driver, close_btn, "botão fechar modal")
-                time.sleep(2)
+                aguardar_modal_fechado(driver, "#myModal", timeout=5)
                 log_message("✅ Modal fechado após salvar", "INFO")
             except Exception as e:
                 log_message(f"⚠️ Não foi possível fechar o modal automaticamente: {e}", "WARNING")
@@ -483,7 +449,7 @@ class UnimedHospitaisModule(BaseModule):
             try:
                 wait.until(EC.presence_of_element_located((By.ID, "tabelaPreFaturamentoTbody")))
                 log_message("✅ Tabela de pré-faturamento visível", "INFO")
-                time.sleep(1)
+                aguardar_ajax(driver, timeout=5)
             except Exception as e:
                 log_message(f"⚠️ Tabela não encontrada após fechar modal: {e}", "WARNING")
             
@@ -498,7 +464,7 @@ class UnimedHospitaisModule(BaseModule):
         """Marca TODAS as linhas do exame como 'Pendente' na tabela"""
         try:
             log_message("📝 Marcando exames como 'Pendente' na tabela...", "INFO")
-            time.sleep(2)
+            aguardar_pagina_pronta(driver)
 
             # Re-localizar a tabela sempre antes de processar para evitar elementos stale
             def obter_linhas():
@@ -528,7 +494,7 @@ class UnimedHospitaisModule(BaseModule):
                     except Exception:
                         pass
                     
-                    time.sleep(0.5)  # Pequena pausa para estabilidade
+                    aguardar_ajax(driver, timeout=5)
                     
                     # Re-localizar todas as linhas
                     linhas_atuais = obter_linhas()
@@ -569,7 +535,6 @@ class UnimedHospitaisModule(BaseModule):
                             # Em modo headless, não fazer scroll (pode causar problemas)
                             if not self.headless_mode:
                                 driver.execute_script("arguments[0].scrollIntoView({block:'center'});", ancora)
-                                time.sleep(0.3)
                             
                             # Aguardar spinner invisível
                             try:
@@ -579,7 +544,7 @@ class UnimedHospitaisModule(BaseModule):
                             
                             # Usar método robusto de clique
                             self.click_element(driver, ancora, f"âncora linha {idx + 1}")
-                            time.sleep(0.5)
+                            aguardar_ajax(driver, timeout=5)
                             clicou_ancora = True
                             log_message(f"✅ Linha {idx + 1}: clicou na âncora (tentativa {tentativa + 1})", "INFO")
                             break
@@ -590,9 +555,8 @@ class UnimedHospitaisModule(BaseModule):
                                 # Aguardar spinner e tentar novamente
                                 try:
                                     WebDriverWait(driver, 30).until(EC.invisibility_of_element_located((By.ID, "spinner")))
-                                    time.sleep(0.5)
                                 except Exception:
-                                    time.sleep(1)
+                                    aguardar_pagina_pronta(driver)
                     
                     if not clicou_ancora:
                         log_message(f"❌ Linha {idx + 1}: não conseguiu clicar na âncora após 3 tentativas", "ERROR")
@@ -621,7 +585,7 @@ class UnimedHospitaisModule(BaseModule):
                         except Exception as e:
                             log_message(f"⚠️ Linha {idx + 1}: erro ao selecionar 'Pendente' (tentativa {tentativa + 1}): {e}", "WARNING")
                             if tentativa < 2:
-                                time.sleep(0.5)
+                                dormir(0.5)
                     
                     if not selecionou:
                         log_message(f"❌ Linha {idx + 1}: não conseguiu selecionar 'Pendente' após 3 tentativas", "ERROR")
@@ -635,7 +599,7 @@ class UnimedHospitaisModule(BaseModule):
                         log_message(f"✅ Linha {idx + 1}: processamento concluído", "SUCCESS")
                     except Exception:
                         # Sem spinner; pequena pausa
-                        time.sleep(0.5)
+                        aguardar_ajax(driver, timeout=5)
                         log_message(f"ℹ️ Linha {idx + 1}: sem spinner, aguardando estabilização", "INFO")
 
                 except Exception as e:
@@ -656,11 +620,10 @@ class UnimedHospitaisModule(BaseModule):
             except Exception:
                 # Se não houver spinner, aguardar tempo fixo para garantir
                 log_message("ℹ️ Spinner não detectado, aguardando tempo de segurança...", "INFO")
-                time.sleep(2)
+                aguardar_pagina_pronta(driver)
             
             # Verificação final
             log_message("📋 Realizando verificação final...", "INFO")
-            time.sleep(1)
             linhas_finais = obter_linhas()
             pendentes_final = 0
             for linha_final in linhas_finais:
@@ -678,10 +641,10 @@ class UnimedHospitaisModule(BaseModule):
             # Tempo adicional de segurança antes de fechar/prosseguir
             if pendentes_final == total_linhas and total_linhas > 0:
                 log_message("✅ Todos os exames foram marcados com sucesso, aguardando estabilização...", "SUCCESS")
-                time.sleep(2)
+                aguardar_pagina_pronta(driver)
             elif pendentes_final < total_linhas:
                 log_message(f"⚠️ Alguns exames podem não ter sido marcados ({pendentes_final}/{total_linhas}), aguardando tempo adicional...", "WARNING")
-                time.sleep(3)
+                aguardar_pagina_pronta(driver)
             
             return True
             
@@ -699,7 +662,6 @@ class UnimedHospitaisModule(BaseModule):
             
             # 1. Limpar filtros
             self.limpar_filtros(driver, wait)
-            time.sleep(1)
             
             # 2. Pesquisar exame
             if not self.pesquisar_exame(driver, wait, numero_exame):
@@ -755,12 +717,36 @@ class UnimedHospitaisModule(BaseModule):
                 'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             }
 
+    @staticmethod
+    def _resultado_erro(dados, erro):
+        return {
+            'numero_exame': dados.get('numero_exame', ''),
+            'numero_guia': dados.get('numero_guia', ''),
+            'status': 'erro',
+            'erro': str(erro),
+            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+    def processar_registro(self, driver, wait, dados):
+        """Processa uma linha do Excel e devolve o resultado"""
+        try:
+            resultado = self.processar_exame(driver, wait, dados)
+            if resultado.get('status') == 'sucesso':
+                log_message(f"✅ Exame {dados['numero_exame']} processado com sucesso", "SUCCESS")
+            else:
+                log_message(f"❌ Erro no exame {dados['numero_exame']}: {resultado.get('erro')}", "ERROR")
+            return resultado
+        except Exception as e:
+            log_message(f"❌ Erro ao processar exame {dados.get('numero_exame', 'desconhecido')}: {e}", "ERROR")
+            return self._resultado_erro(dados, e)
+
     def run(self, params: dict):
         username = params.get("username")
         password = params.get("password")
         cancel_flag = params.get("cancel_flag")
         headless_mode = params.get("headless_mode")
         excel_file = params.get("excel_file")
+        num_workers = params.get("num_workers", 1)
         
         # Configurar modo headless na instância
         self.headless_mode = headless_mode
@@ -776,7 +762,7 @@ class UnimedHospitaisModule(BaseModule):
             messagebox.showerror("Erro", "Arquivo Excel é obrigatório para este módulo.")
             return
 
-        driver = BrowserFactory.create_chrome(headless=headless_mode)
+        driver = BrowserFactory.acquire_chrome(headless=headless_mode)
         wait = WebDriverWait(driver, 15)
 
         try:
@@ -803,35 +789,30 @@ class UnimedHospitaisModule(BaseModule):
 
             # Processar cada exame
             resultados = []
-            for i, dados in enumerate(dados_excel, 1):
-                if cancel_flag and cancel_flag.is_set():
-                    log_message("Execução cancelada pelo usuário.", "WARNING")
-                    break
-                
-                try:
+            progresso.definir_total(len(dados_excel))
+            if num_workers > 1:
+                def preparar_worker(d):
+                    if not self.fazer_login_pathoweb(d, WebDriverWait(d, 15), username, password, compartilhar=False):
+                        raise Exception("Falha no login do PathoWeb")
+
+                executor = ExecutorParalelo(num_workers, cancel_flag=cancel_flag)
+                resultados = executor.executar(
+                    dados_excel,
+                    processar_item=lambda d, dados: self.processar_registro(d, WebDriverWait(d, 15), dados),
+                    preparar_worker=preparar_worker,
+                    ao_falhar=self._resultado_erro,
+                    driver_principal=driver
+                )
+                # O navegador do módulo pode ter sido trocado se caiu durante a execução
+                driver = executor.driver_principal
+            else:
+                for i, dados in enumerate(dados_excel, 1):
+                    if cancel_flag and cancel_flag.is_set():
+                        log_message("Execução cancelada pelo usuário.", "WARNING")
+                        break
+
                     log_message(f"➡️ Processando registro {i}/{len(dados_excel)} - Exame: {dados['numero_exame']}", "INFO")
-                    
-                    resultado = self.processar_exame(driver, wait, dados)
-                    resultados.append(resultado)
-                    
-                    if resultado.get('status') == 'sucesso':
-                        log_message(f"✅ Exame {dados['numero_exame']} processado com sucesso", "SUCCESS")
-                    else:
-                        log_message(f"❌ Erro no exame {dados['numero_exame']}: {resultado.get('erro')}", "ERROR")
-                    
-                    # Aguardar entre processamentos
-                    if i < len(dados_excel):
-                        time.sleep(2)
-                    
-                except Exception as e:
-                    log_message(f"❌ Erro ao processar exame {dados.get('numero_exame', 'desconhecido')}: {e}", "ERROR")
-                    resultados.append({
-                        'numero_exame': dados.get('numero_exame', ''),
-                        'numero_guia': dados.get('numero_guia', ''),
-                        'status': 'erro',
-                        'erro': str(e),
-                        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    })
+                    resultados.append(self.processar_registro(driver, wait, dados))
 
             # Resumo final
             total = len(resultados)
@@ -864,7 +845,7 @@ class UnimedHospitaisModule(BaseModule):
             # Aguardar antes de fechar para permitir visualização dos resultados
             if not headless_mode:
                 input("Pressione Enter para fechar o navegador...")
-            driver.quit()
+            BrowserFactory.release_chrome(driver)
 
 
 def run(params: dict):
@@ -7,11 +7,13 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
 from dotenv import load_dotenv
-from openpyxl import load_workbook
 
 from src.core.browser_factory import BrowserFactory
 from src.core.logger import log_message
+from src.core.session_manager import login_pathoweb
+from src.core.waits import dormir, esperar_cancelamento
 from src.modules.base import BaseModule
+from src.utils.planilha import ler_registros
 
 load_dotenv()
 
@@ -21,20 +23,17 @@ class LiberacaoGeorgeModule(BaseModule):
 
     def get_dados_exames(self, file_path: str) -> list:
         try:
-            workbook = load_workbook(file_path)
-            sheet = workbook.active
             dados = []
 
             # Lê da linha 2 em diante (linha 1 é cabeçalho)
-            for row in range(2, sheet.max_row + 1):
-                codigo = sheet[f'A{row}'].value
+            for registro in ler_registros(file_path, {"codigo": "A"}):
+                codigo = registro["codigo"]
 
                 if codigo is not None:
                     codigo = str(codigo).strip()
 
                     dados.append({'codigo': codigo})
 
-            workbook.close()
             return dados
         except Exception as e:
             raise Exception(f"Erro ao ler planilha: {e}")
@@ -110,7 +109,7 @@ class LiberacaoGeorgeModule(BaseModule):
                         mensagem_detectada = True
 
                         # Aguardar a mensagem desaparecer (data-time="3" = 3 segundos)
-                        time.sleep(0.5)
+                        dormir(0.5)
                         log_message(f"✅ Conclusão salva com sucesso pelo usuário", "SUCCESS")
                         return True
 
@@ -130,7 +129,9 @@ class LiberacaoGeorgeModule(BaseModule):
                     contador_log = tempo_decorrido
 
                 # Intervalo muito pequeno para capturar a mensagem rápida
-                time.sleep(0.1)  # 100 milissegundos
+                if esperar_cancelamento(0.1):
+                    log_message(f"Execução cancelada pelo usuário enquanto aguardava o exame {codigo}.", "WARNING")
+                    return False
 
             # Timeout atingido
             if not mensagem_detectada:
@@ -244,7 +245,7 @@ class LiberacaoGeorgeModule(BaseModule):
             except:
                 pass
 
-            time.sleep(1)
+            dormir(1)
             if int(time.time() - inicio) % 5 == 0:  # Log a cada 5 segundos
                 log_message(f"⏳ Aguardando carregamento... ({int(time.time() - inicio)}s)", "INFO")
         else:
@@ -317,52 +318,14 @@ class LiberacaoGeorgeModule(BaseModule):
         resultados = []
 
         try:
-            driver = BrowserFactory.create_chrome()
+            driver = BrowserFactory.acquire_chrome()
             wait = WebDriverWait(driver, 20)
 
             log_message("Iniciando automação de liberação George...", "INFO")
 
             # Login
             log_message("Fazendo login...", "INFO")
-            driver.get(url)
-
-            wait.until(EC.presence_of_element_located((By.ID, "username")))
-
-            username_field = driver.find_element(By.ID, "username")
-            username_field.clear()
-            username_field.send_keys(username)
-
-            password_field = driver.find_element(By.ID, "password")
-            password_field.clear()
-            password_field.send_keys(password)
-
-            submit_button = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
-            submit_button.click()
-
-            # Navegar para módulo de exames
-            log_message("Verificando se precisa navegar para módulo de exames...", "INFO")
-            current_url = driver.current_url
-            if current_url == "https://dap.pathoweb.com.br/" or "trocarModulo" in current_url:
-                try:
-                    modulo_link = wait.until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, "a[href='/site/trocarModulo?modulo=1']")))
-                    modulo_link.click()
-                    time.sleep(2)
-                    log_message("✅ Navegação para módulo de exames realizada", "SUCCESS")
-                except Exception:
-                    driver.get("https://dap.pathoweb.com.br/moduloExame/index")
-                    time.sleep(2)
-
-            # Fechar modal se aparecer
-            try:
-                modal_close_button = driver.find_element(By.CSS_SELECTOR,
-                                                         "#mensagemParaClienteModal .modal-footer button")
-                if modal_close_button.is_displayed():
-                    modal_close_button.click()
-                    time.sleep(1)
-                    log_message("✅ Modal de mensagem fechado", "INFO")
-            except Exception:
-                pass
+            login_pathoweb(driver, username, password, modulo=1, url=url)
 
             log_message("✅ Login realizado com sucesso. Iniciando processamento dos exames.", "SUCCESS")
 
@@ -15,6 +15,8 @@ from webdriver_manager.chrome import ChromeDriverManager
 
 from src.core.browser_factory import BrowserFactory
 from src.core.logger import log_message
+from src.core.session_manager import login_pathoweb
+from src.core.waits import dormir
 from src.modules.base import BaseModule
 
 class UnimedUploader(BaseModule):
@@ -31,7 +33,7 @@ class UnimedUploader(BaseModule):
     def inicializar_driver(self):
         if self.driver is None:
             log_message("Inicializando driver do Chrome para upload Unimed...", "INFO")
-            self.driver = BrowserFactory.create_chrome(headless=self.headless)
+            self.driver = BrowserFactory.acquire_chrome(headless=self.headless)
             # Configurar timeouts do driver
             self.driver.set_page_load_timeout(120)
             self.driver.set_script_timeout(60)
@@ -48,7 +50,7 @@ class UnimedUploader(BaseModule):
         campo_senha.send_keys(self.password)
         botao_entrar = self.driver.find_element(By.ID, "entrar")
         botao_entrar.click()
-        time.sleep(2.5)
+        dormir(2.5)
 
     def acessar_url_pos_login(self, url_pos_login):
         log_message("Acessando página de upload TISS...", "INFO")
@@ -70,7 +72,7 @@ class UnimedUploader(BaseModule):
         log_message("Enviando arquivo para Unimed...", "INFO")
         botao_enviar = self.wait.until(EC.element_to_be_clickable((By.ID, "enviar2")))
         botao_enviar.click()
-        time.sleep(2)
+        dormir(2)
         try:
             form_erro = WebDriverWait(self.driver, 10).until(
                 EC.presence_of_element_located((By.XPATH, "//form[contains(@action, 'relatorioErroXml.php')]"))
@@ -85,7 +87,7 @@ class UnimedUploader(BaseModule):
     def fechar(self):
         if self.driver:
             log_message("Fechando navegador do upload Unimed.", "INFO")
-            self.driver.quit()
+            BrowserFactory.release_chrome(self.driver)
 
 class XMLGeneratorAutomation(BaseModule):
     def __init__(self, username, password, timeout=15, pasta_download=None, fechar_em_erro=False, headless=False):
@@ -108,20 +110,15 @@ class XMLGeneratorAutomation(BaseModule):
 
     def inicializar_driver(self):
         log_message("Inicializando driver do Chrome para Pathoweb...", "INFO")
-        self.driver = BrowserFactory.create_chrome(download_dir=self.pasta_download, headless=self.headless_mode)
+        self.driver = BrowserFactory.acquire_chrome(download_dir=self.pasta_download, headless=self.headless_mode)
         # Configurar timeouts do driver para evitar GetHandleVerifier errors
         self.driver.set_page_load_timeout(120)
         self.driver.set_script_timeout(60)
         self.wait = WebDriverWait(self.driver, self.timeout)
 
-    def fazer_login(self):
-        log_message("Fazendo login no Pathoweb...", "INFO")
-        self.driver.get("https://dap.pathoweb.com.br/login/auth")
-        self.wait.until(EC.presence_of_element_located((By.ID, "username"))).send_keys(self.username)
-        self.driver.find_element(By.ID, "password").send_keys(self.password)
-        self.driver.find_element(By.CSS_SELECTOR, "button[type='submit']").click()
-        time.sleep(0.5)
-        self.wait.until(lambda driver: "login" not in driver.current_url.lower())
+    def fazer_login(self, modulo=None):
+        login_pathoweb(self.driver, self.username, self.password, modulo=modulo,
+                       url="https://dap.pathoweb.com.br/login/auth", timeout=self.timeout)
 
     def acessar_modulo_faturamento(self):
         log_message("Acessando módulo de faturamento...", "INFO")
@@ -131,7 +128,7 @@ class XMLGeneratorAutomation(BaseModule):
         link_faturamento.click()
 
     def fechar_modal_se_necessario(self):
-        time.sleep(4)
+        dormir(4)
         try:
             modal_close_button = self.driver.find_element(
                 By.CSS_SELECTOR, "#mensagemParaClienteModal .modal-footer button"
@@ -149,7 +146,7 @@ class XMLGeneratorAutomation(BaseModule):
                 (By.XPATH, "//a[contains(@class, 'setupAjax') and contains(text(), 'Preparar exames para fatura')]"))
         )
         link_preparar.click()
-        time.sleep(2)
+        dormir(2)
 
     def configurar_filtro_convenio_unimed(self):
         log_message("Selecionando convênio UNIMED (LONDRINA)...", "INFO")
@@ -166,7 +163,7 @@ class XMLGeneratorAutomation(BaseModule):
                 
                 # Aguardar mais tempo em headless
                 tempo_espera = 2 if self.headless_mode else 1
-                time.sleep(tempo_espera)
+                dormir(tempo_espera)
                 
                 # Aguardar especificamente pelo select2 do convênio
                 log_message(f"Aguardando elemento do convênio (tentativa {tentativa}/{max_tentativas})...", "INFO")
@@ -177,11 +174,11 @@ class XMLGeneratorAutomation(BaseModule):
                 
                 # Scroll até o elemento para garantir que está visível
                 self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", select2_container)
-                time.sleep(0.5)
+                dormir(0.5)
                 
                 # Clicar no select2
                 select2_container.click()
-                time.sleep(1.5 if self.headless_mode else 1)
+                dormir(1.5 if self.headless_mode else 1)
                 
                 # Aguardar e selecionar a opção UNIMED
                 opcao_unimed = WebDriverWait(self.driver, 15).until(
@@ -189,7 +186,7 @@ class XMLGeneratorAutomation(BaseModule):
                         (By.XPATH, "//li[contains(@class, 'select2-results__option') and text()='UNIMED (LONDRINA)']"))
                 )
                 opcao_unimed.click()
-                time.sleep(1.5 if self.headless_mode else 1)
+                dormir(1.5 if self.headless_mode else 1)
                 
                 log_message("✅ Convênio UNIMED selecionado com sucesso!", "SUCCESS")
                 return
@@ -198,7 +195,7 @@ class XMLGeneratorAutomation(BaseModule):
                 log_message(f"⚠️ Tentativa {tentativa} falhou: {str(e)}", "WARNING")
                 if tentativa < max_tentativas:
                     log_message("🔄 Tentando novamente...", "INFO")
-                    time.sleep(3 if self.headless_mode else 2)
+                    dormir(3 if self.headless_mode else 2)
                 else:
                     log_message("❌ Não foi possível selecionar o convênio após múltiplas tentativas", "ERROR")
                     raise
@@ -214,7 +211,7 @@ class XMLGeneratorAutomation(BaseModule):
         log_message("Executando pesquisa de faturamento...", "INFO")
         botao_pesquisar = self.wait.until(EC.element_to_be_clickable((By.ID, "pesquisaFaturamento")))
         botao_pesquisar.click()
-        time.sleep(3)
+        dormir(3)
 
     def aguardar_finalizacao_pesquisa(self):
         log_message("Aguardando finalização da pesquisa...", "INFO")
@@ -230,7 +227,7 @@ class XMLGeneratorAutomation(BaseModule):
                 modal_carregando = self.driver.find_element(By.XPATH,
                                                             "//div[contains(@class,'modal-body') and contains(., 'Carregando')]")
                 if modal_carregando.is_displayed():
-                    time.sleep(2 if self.headless_mode else 1)
+                    dormir(2 if self.headless_mode else 1)
                 else:
                     log_message("✅ Modal fechado, pesquisa finalizada", "SUCCESS")
                     return
@@ -262,7 +259,7 @@ class XMLGeneratorAutomation(BaseModule):
             log_message("✅ Botão de download clicado com sucesso", "SUCCESS")
 
             # Aguardar um momento para o download iniciar
-            time.sleep(2)
+            dormir(2)
             
         except Exception as e:
             log_message(f"❌ Erro ao clicar no botão de download: {e}", "ERROR")
@@ -306,7 +303,7 @@ class XMLGeneratorAutomation(BaseModule):
                     log_message(f"✅ Arquivo baixado: {arquivo}", "SUCCESS")
                     return os.path.join(self.pasta_download, arquivo)
             
-            time.sleep(2)
+            dormir(2)
         
         log_message(f"❌ Timeout ao aguardar download após {timeout_download}s", "ERROR")
         log_message(f"📋 Arquivos na pasta agora: {os.listdir(self.pasta_download)}", "ERROR")
@@ -435,14 +432,14 @@ class XMLGeneratorAutomation(BaseModule):
                 log_message(f"🔍 Verificando carregamento da página (tentativa {tentativa}/{max_tentativas})...", "INFO")
                 
                 # Aguardar um pouco para a página começar a carregar
-                time.sleep(2)
+                dormir(2)
                 
                 # Verificar se a página não está em branco
                 body_text = self.driver.execute_script("return document.body.innerText;")
                 if not body_text or len(body_text.strip()) < 50:
                     log_message("⚠️ Página parece estar em branco, tentando recarregar...", "WARNING")
                     self.driver.refresh()
-                    time.sleep(3)
+                    dormir(3)
                     continue
                 
                 # Tentar clicar na aba "Pré faturamento e faturar" se existir
@@ -454,7 +451,7 @@ class XMLGeneratorAutomation(BaseModule):
                     if aba_faturamento.is_displayed():
                         log_message("✅ Aba encontrada, clicando...", "INFO")
                         aba_faturamento.click()
-                        time.sleep(2)
+                        dormir(2)
                 except Exception as e:
                     log_message(f"ℹ️ Aba não encontrada ou já está selecionada: {e}", "INFO")
                 
@@ -469,14 +466,14 @@ class XMLGeneratorAutomation(BaseModule):
                 else:
                     log_message("⚠️ Formulário de pesquisa não encontrado, recarregando...", "WARNING")
                     self.driver.refresh()
-                    time.sleep(3)
+                    dormir(3)
                     
             except Exception as e:
                 log_message(f"⚠️ Erro ao verificar carregamento: {e}", "WARNING")
                 if tentativa < max_tentativas:
                     log_message("🔄 Tentando recarregar a página...", "INFO")
                     self.driver.refresh()
-                    time.sleep(3)
+                    dormir(3)
         
         log_message("❌ Página não carregou corretamente após múltiplas tentativas", "ERROR")
         return False
@@ -501,7 +498,7 @@ class XMLGeneratorAutomation(BaseModule):
             if "moduloFaturamento" not in current_url:
                 log_message("⚠️ Não está no módulo de faturamento. Navegando...", "WARNING")
                 self.driver.get("https://dap.pathoweb.com.br/moduloFaturamento/index")
-                time.sleep(3)
+                dormir(3)
             else:
                 log_message("✅ Já está no módulo de faturamento", "SUCCESS")
             
@@ -533,12 +530,12 @@ class XMLGeneratorAutomation(BaseModule):
                     )
                     link_preparar.click()
                     log_message("✅ Link clicado com sucesso", "SUCCESS")
-                    time.sleep(3)
+                    dormir(3)
                 except Exception as e:
                     log_message(f"⚠️ Não foi possível clicar no link: {e}", "WARNING")
                     log_message("Tentando navegação direta como fallback...", "INFO")
                     self.driver.get("https://dap.pathoweb.com.br/moduloFaturamento/faturamento")
-                    time.sleep(2)
+                    dormir(2)
                 
                 # Verificar se a página carregou corretamente
                 if not self.verificar_carregamento_pagina():
@@ -582,7 +579,7 @@ class XMLGeneratorAutomation(BaseModule):
                 log_message("Execução cancelada pelo usuário.", "WARNING")
                 self.fechar_navegador()
                 return False
-            self.fazer_login()
+            self.fazer_login(modulo=2)
             if cancel_flag and cancel_flag.is_set():
                 log_message("Execução cancelada pelo usuário.", "WARNING")
                 self.fechar_navegador()
@@ -597,13 +594,13 @@ class XMLGeneratorAutomation(BaseModule):
                     modulo_link = self.wait.until(
                         EC.element_to_be_clickable((By.CSS_SELECTOR, "a[href='/site/trocarModulo?modulo=2']")))
                     modulo_link.click()
-                    time.sleep(2)
+                    dormir(2)
                     log_message("✅ Navegação para módulo de faturamento realizada", "SUCCESS")
                 except Exception as e:
                     log_message(f"⚠️ Erro ao navegar para módulo: {e}", "WARNING")
                     # Tentar navegar diretamente pela URL como fallback
                     self.driver.get("https://dap.pathoweb.com.br/moduloFaturamento/index")
-                    time.sleep(2)
+                    dormir(2)
                     log_message("🔄 Navegação direta para módulo realizada", "INFO")
 
             elif "moduloFaturamento" in current_url:
@@ -612,7 +609,7 @@ class XMLGeneratorAutomation(BaseModule):
                 log_message(f"⚠️ URL inesperada detectada: {current_url}", "WARNING")
                 # Tentar navegar diretamente como fallback
                 self.driver.get("https://dap.pathoweb.com.br/moduloFaturamento/index")
-                time.sleep(2)
+                dormir(2)
                 log_message("🔄 Navegação direta para módulo realizada (fallback)", "INFO")
 
             self.fechar_modal_se_necessario()
@@ -648,7 +645,7 @@ class XMLGeneratorAutomation(BaseModule):
     def fechar_navegador(self):
         if self.driver:
             log_message("Fechando navegador do Pathoweb.", "INFO")
-            self.driver.quit()
+            BrowserFactory.release_chrome(self.driver)
 
 def run(params):
     """
@@ -1,5 +1,4 @@
 import os
-import pandas as pd
 import time
 from tkinter import messagebox
 from selenium.webdriver.common.by import By
@@ -9,9 +8,15 @@ from selenium.webdriver.support.ui import Select
 from dotenv import load_dotenv
 
 from src.core.browser_factory import BrowserFactory
+from src.core.http_transport import tentar_link_http
+from src.core import progresso
 from src.core.logger import log_message
+from src.core.parallel_executor import ExecutorParalelo
+from src.core.session_manager import login_pathoweb
+from src.core.waits import aguardar_ajax, aguardar_pagina_pronta, dormir
 from src.modules.base import BaseModule
 from src.modules.lote.envio_lote_unimed import XMLGeneratorAutomation
+from src.utils.planilha import ler_abas, ler_registros, valores_unicos
 
 load_dotenv()
 
@@ -21,295 +26,273 @@ class PreparacaoLoteModule(BaseModule):
 
     def get_unique_exames(self, file_path: str, modo_busca: str) -> list:
         if modo_busca == "exame":
-            #Caso precise buscar por tab do excel, usar o sheet_name
-            #df = pd.read_excel(file_path, sheet_name=2)
-            df = pd.read_excel(file_path)
-            unique_exames = df['Exame'].dropna().unique().tolist()
+            registros = ler_registros(file_path, {"exame": ["Exame"]}, aba=0, obrigatorias=("exame",))
         elif modo_busca == "guia":
-            df = pd.read_excel(file_path)
-            unique_exames = df['N Guia'].dropna().unique().tolist()
+            registros = ler_registros(file_path, {"exame": ["N Guia"]}, aba=0, obrigatorias=("exame",))
         else:
             raise ValueError("Modo de busca inválido. Use 'exame' ou 'guia'.")
-        return unique_exames
+        return valores_unicos(registros, "exame")
 
     def get_unique_exames_multiplas_abas(self, file_path: str, modo_busca: str):
-        abas = pd.ExcelFile(file_path).sheet_names
-        exames_por_aba = {}
-        for aba in abas:
-            if modo_busca == "exame":
-                df = pd.read_excel(file_path, sheet_name=aba)
-                unique_exames = df['Exame'].dropna().unique().tolist()
-            elif modo_busca == "guia":
-                df = pd.read_excel(file_path, sheet_name=aba, header=None)
-                unique_exames = df.iloc[:, 0].dropna().unique().tolist()
-            else:
-                raise ValueError("Modo de busca inválido. Use 'exame' ou 'guia'.")
-            exames_por_aba[aba] = unique_exames
-        return exames_por_aba
-
-    def run(self, params: dict):
-        username = params.get("username")
-        password = params.get("password")
-        excel_file = params.get("excel_file")
-        modo_busca = params.get("modo_busca", "exame")
-        cancel_flag = params.get("cancel_flag")
-        gera_xml_tiss = params.get("gera_xml_tiss", "sim")
-        headless_mode = params.get("headless_mode")
-        unimed_user = params.get("unimed_user")
-        unimed_pass = params.get("unimed_pass")
-        pasta_download = params.get("pasta_download", os.path.join(os.getcwd(), "xml"))
-        try:
-            exames_unicos = self.get_unique_exames(excel_file, modo_busca)
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao ler o Excel: {e}")
-            return
-        if not exames_unicos:
-            messagebox.showerror("Erro", "Nenhum exame encontrado no arquivo.")
-            return
-        url = os.getenv("SYSTEM_URL", "https://dap.pathoweb.com.br/login/auth")
-        driver = BrowserFactory.create_chrome(headless=headless_mode)
-        wait = WebDriverWait(driver, 15)
-        resultados = []
+        """{aba: exames únicos} lendo o arquivo uma única vez."""
+        if modo_busca == "exame":
+            abas = ler_abas(file_path, {"exame": ["Exame"]}, obrigatorias=("exame",))
+        elif modo_busca == "guia":
+            abas = ler_abas(file_path, {"exame": "A"}, cabecalho=False)
+        else:
+            raise ValueError("Modo de busca inválido. Use 'exame' ou 'guia'.")
+        return {aba: valores_unicos(registros, "exame") for aba, registros in abas.items()}
+
+    def abrir_preparacao(self, driver, wait, username, password, url, compartilhar=True):
+        """Faz login no módulo de faturamento e abre a tela 'Preparar exames para fatura'"""
+        login_pathoweb(driver, username, password, modulo=2, url=url, compartilhar=compartilhar)
+        wait.until(EC.element_to_be_clickable((
+            By.XPATH, "//a[contains(@class, 'setupAjax') and contains(text(), 'Preparar exames para fatura')]"
+        ))).click()
+        aguardar_pagina_pronta(driver)
+
+    def selecionar_status_online(self, driver, wait):
+        log_message("🎬 Clicando no botão 'Ações'...", "INFO")
         try:
-            log_message("Iniciando automação de preparação de exames...", "INFO")
-            driver.get(url)
-            wait.until(EC.presence_of_element_located((By.ID, "username"))).send_keys(username)
-            driver.find_element(By.ID, "password").send_keys(password)
-            driver.find_element(By.CSS_SELECTOR, "button[type='submit']").click()
+            # Estratégia 1: Aguardar elemento estar clicável
+            acoes_btn = wait.until(EC.element_to_be_clickable((
+                By.XPATH, "//a[contains(@class, 'toggleMaisDeUm') and contains(., 'Ações')]"
+            )))
 
-            log_message("Verificando se precisa navegar para módulo de faturamento...", "INFO")
-            current_url = driver.current_url
-
-            if current_url == "https://dap.pathoweb.com.br/" or "trocarModulo" in current_url:
-                log_message("Detectada tela de seleção de módulos - navegando para módulo de faturamento...", "INFO")
-                try:
-                    modulo_link = wait.until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, "a[href='/site/trocarModulo?modulo=2']")))
-                    modulo_link.click()
-                    time.sleep(2)
-                    log_message("✅ Navegação para módulo de faturamento realizada", "SUCCESS")
-                except Exception as e:
-                    log_message(f"⚠️ Erro ao navegar para módulo: {e}", "WARNING")
-                    driver.get("https://dap.pathoweb.com.br/moduloFaturamento/index")
-                    time.sleep(2)
-                    log_message("🔄 Navegação direta para módulo realizada", "INFO")
-
-            elif "moduloFaturamento" in current_url:
-                log_message("✅ Já está no módulo de faturamento - pulando navegação", "SUCCESS")
-            else:
-                log_message(f"⚠️ URL inesperada detectada: {current_url}", "WARNING")
-                driver.get("https://dap.pathoweb.com.br/moduloFaturamento/index")
-                time.sleep(2)
-                log_message("🔄 Navegação direta para módulo realizada (fallback)", "INFO")
+            # Scroll até o elemento
+            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", acoes_btn)
 
+            # Tentar clicar normalmente
             try:
-                modal_close_button = driver.find_element(By.CSS_SELECTOR, "#mensagemParaClienteModal .modal-footer button")
-                if modal_close_button.is_displayed():
-                    modal_close_button.click()
-                    time.sleep(1)
-            except Exception:
-                pass
-            wait.until(EC.element_to_be_clickable((
-                By.XPATH, "//a[contains(@class, 'setupAjax') and contains(text(), 'Preparar exames para fatura')]"
-            ))).click()
-            time.sleep(1)
-
-            for exame in exames_unicos:
-                if cancel_flag and cancel_flag.is_set():
-                    log_message("Execução cancelada pelo usuário.", "WARNING")
-                    break
-                try:
-                    log_message(f"➡️ Processando {modo_busca}: {exame}", "INFO")
-
-                    # Log: Identificando campo de busca
-                    campo_id = "numeroGuia" if modo_busca == "guia" else "numeroExame"
-                    log_message(f"🔍 Localizando campo de busca: {campo_id}", "INFO")
+                acoes_btn.click()
+                log_message("✅ Botão 'Ações' clicado (click normal)", "INFO")
+            except Exception as e:
+                log_message(f"⚠️ Click normal falhou: {e}. Tentando JavaScript...", "WARNING")
 
-                    campo_exame = wait.until(EC.presence_of_element_located((By.ID, campo_id)))
-                    log_message(f"✅ Campo {campo_id} localizado", "INFO")
+                # Estratégia 2: Click via JavaScript
+                driver.execute_script("arguments[0].click();", acoes_btn)
+                log_message("✅ Botão 'Ações' clicado (JavaScript)", "INFO")
 
-                    campo_exame.clear()
-                    log_message(f"🧹 Campo limpo", "INFO")
+        except Exception as e:
+            log_message(f"⚠️ Erro ao clicar no botão 'Ações'. Tentando localizar novamente: {e}", "WARNING")
 
-                    campo_exame.send_keys(exame)
-                    log_message(f"⌨️ Valor '{exame}' inserido no campo", "INFO")
+            # Estratégia 3: Localizar novamente e usar JavaScript diretamente
+            try:
+                time.sleep(1)
+                acoes_retry = driver.find_element(By.XPATH,
+                                                  "//a[contains(@class, 'toggleMaisDeUm') and contains(., 'Ações')]")
+                driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", acoes_retry)
+                driver.execute_script("arguments[0].click();", acoes_retry)
+                log_message("✅ Botão 'Ações' clicado (retry com JavaScript)", "INFO")
+            except Exception as e2:
+                log_message(f"❌ Falha ao clicar no botão 'Ações' após tentativas: {e2}", "ERROR")
+                raise
+
+        aguardar_ajax(driver, timeout=5)
+
+        log_message("📡 Executando script para selecionar status 'Online'...", "INFO")
+        driver.execute_script("""
+            const onlineBtn = document.querySelector("a[data-url*='statusConferido=O']");
+            if (onlineBtn) { onlineBtn.click(); }
+        """)
+        log_message("✅ Script executado - Status 'Online' selecionado", "INFO")
+
+    def processar_exame(self, driver, wait, exame, modo_busca):
+        """Pesquisa um exame/guia na tela de preparação e marca como conferido On-line"""
+        try:
+            log_message(f"➡️ Processando {modo_busca}: {exame}", "INFO")
 
-                    time.sleep(0.5)
+            # Log: Identificando campo de busca
+            campo_id = "numeroGuia" if modo_busca == "guia" else "numeroExame"
+            log_message(f"🔍 Localizando campo de busca: {campo_id}", "INFO")
 
-                    log_message("🔎 Clicando no botão de pesquisa...", "INFO")
-                    try:
-                        # Estratégia 1: Aguardar elemento estar clicável
-                        botao_pesquisa = wait.until(EC.element_to_be_clickable((By.ID, "pesquisaFaturamento")))
+            campo_exame = wait.until(EC.presence_of_element_located((By.ID, campo_id)))
+            log_message(f"✅ Campo {campo_id} localizado", "INFO")
 
-                        # Tentar clicar normalmente
-                        try:
-                            botao_pesquisa.click()
-                            log_message("✅ Botão de pesquisa clicado (click normal)", "INFO")
-                        except Exception as e:
-                            log_message(f"⚠️ Click normal falhou: {e}. Tentando JavaScript...", "WARNING")
+            campo_exame.clear()
+            log_message(f"🧹 Campo limpo", "INFO")
 
-                            # Estratégia 2: Click via JavaScript
-                            driver.execute_script("arguments[0].click();", botao_pesquisa)
-                            log_message("✅ Botão de pesquisa clicado (JavaScript)", "INFO")
+            campo_exame.send_keys(exame)
+            log_message(f"⌨️ Valor '{exame}' inserido no campo", "INFO")
 
-                    except Exception as e:
-                        log_message(f"⚠️ Erro ao clicar no botão. Tentando localizar novamente: {e}", "WARNING")
 
-                        # Estratégia 3: Localizar novamente e usar JavaScript diretamente
-                        try:
-                            time.sleep(1)
-                            botao_retry = driver.find_element(By.ID, "pesquisaFaturamento")
+            log_message("🔎 Clicando no botão de pesquisa...", "INFO")
+            try:
+                # Estratégia 1: Aguardar elemento estar clicável
+                botao_pesquisa = wait.until(EC.element_to_be_clickable((By.ID, "pesquisaFaturamento")))
 
-                            # Remover atributo disabled se existir
-                            driver.execute_script("arguments[0].removeAttribute('disabled');", botao_retry)
+                # Tentar clicar normalmente
+                try:
+                    botao_pesquisa.click()
+                    log_message("✅ Botão de pesquisa clicado (click normal)", "INFO")
+                except Exception as e:
+                    log_message(f"⚠️ Click normal falhou: {e}. Tentando JavaScript...", "WARNING")
 
-                            # Scroll e click
-                            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", botao_retry)
-                            time.sleep(0.5)
-                            driver.execute_script("arguments[0].click();", botao_retry)
-                            log_message("✅ Botão de pesquisa clicado (retry com JavaScript)", "INFO")
-                        except Exception as e2:
-                            log_message(f"❌ Falha ao clicar no botão após tentativas: {e2}", "ERROR")
-                            raise
+                    # Estratégia 2: Click via JavaScript
+                    driver.execute_script("arguments[0].click();", botao_pesquisa)
+                    log_message("✅ Botão de pesquisa clicado (JavaScript)", "INFO")
 
-                    try:
-                        modal_carregando = driver.find_element(By.XPATH,
-                                                               "//div[contains(@class,'modal-body') and contains(., 'Carregando')]")
-                        if modal_carregando.is_displayed():
-                            log_message("🔄 Modal de carregamento detectado, aguardando...", "INFO")
-                            WebDriverWait(driver, 30).until(EC.invisibility_of_element_located((By.ID, "spinner")))
-                            log_message("✅ Modal de carregamento fechado", "INFO")
-                    except Exception:
-                        log_message("ℹ️ Modal não detectado. Prosseguindo...", "INFO")
+            except Exception as e:
+                log_message(f"⚠️ Erro ao clicar no botão. Tentando localizar novamente: {e}", "WARNING")
 
+                # Estratégia 3: Localizar novamente e usar JavaScript diretamente
+                try:
                     time.sleep(1)
+                    botao_retry = driver.find_element(By.ID, "pesquisaFaturamento")
 
-                    log_message("📋 Validando resultados da tabela...", "INFO")
-                    try:
-                        tbody_rows = driver.find_elements(By.CSS_SELECTOR, "#tabelaPreFaturamentoTbody tr")
-                        log_message(f"📊 Encontradas {len(tbody_rows)} linha(s) na tabela", "INFO")
+                    # Remover atributo disabled se existir
+                    driver.execute_script("arguments[0].removeAttribute('disabled');", botao_retry)
 
-                        if len(tbody_rows) == 0:
-                            log_message(f"⚠️ Nenhum resultado encontrado para {exame}. Pulando.", "WARNING")
-                            resultados.append({"exame": exame, "status": "sem_resultados"})
-                            continue
-                    except Exception as e:
-                        log_message(f"⚠️ Erro ao validar resultados da tabela: {e}", "WARNING")
-                        resultados.append({"exame": exame, "status": "erro_validacao", "erro": str(e)})
-                        continue
+                    # Scroll e click
+                    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", botao_retry)
+                    driver.execute_script("arguments[0].click();", botao_retry)
+                    log_message("✅ Botão de pesquisa clicado (retry com JavaScript)", "INFO")
+                except Exception as e2:
+                    log_message(f"❌ Falha ao clicar no botão após tentativas: {e2}", "ERROR")
+                    raise
 
-                    time.sleep(1)
+            try:
+                modal_carregando = driver.find_element(By.XPATH,
+                                                       "//div[contains(@class,'modal-body') and contains(., 'Carregando')]")
+                if modal_carregando.is_displayed():
+                    log_message("🔄 Modal de carregamento detectado, aguardando...", "INFO")
+                    WebDriverWait(driver, 30).until(EC.invisibility_of_element_located((By.ID, "spinner")))
+                    log_message("✅ Modal de carregamento fechado", "INFO")
+            except Exception:
+                log_message("ℹ️ Modal não detectado. Prosseguindo...", "INFO")
 
-                    log_message("☑️ Marcando checkbox 'checkTodosPreFaturar'...", "INFO")
-                    try:
-                        # Estratégia 1: Aguardar elemento estar clicável
-                        checkbox = wait.until(EC.element_to_be_clickable((By.ID, "checkTodosPreFaturar")))
+            aguardar_pagina_pronta(driver)
 
-                        # Tentar clicar normalmente
-                        try:
-                            checkbox.click()
-                            log_message("✅ Checkbox marcado (click normal)", "INFO")
-                        except Exception as e:
-                            log_message(f"⚠️ Click normal falhou: {e}. Tentando JavaScript...", "WARNING")
-
-                            # Estratégia 2: Click via JavaScript
-                            driver.execute_script("arguments[0].click();", checkbox)
-                            log_message("✅ Checkbox marcado (JavaScript)", "INFO")
+            log_message("📋 Validando resultados da tabela...", "INFO")
+            try:
+                tbody_rows = driver.find_elements(By.CSS_SELECTOR, "#tabelaPreFaturamentoTbody tr")
+                log_message(f"📊 Encontradas {len(tbody_rows)} linha(s) na tabela", "INFO")
 
-                    except Exception as e:
-                        log_message(f"⚠️ Erro ao marcar checkbox. Tentando localizar novamente: {e}", "WARNING")
+                if len(tbody_rows) == 0:
+                    log_message(f"⚠️ Nenhum resultado encontrado para {exame}. Pulando.", "WARNING")
+                    return {"exame": exame, "status": "sem_resultados"}
+            except Exception as e:
+                log_message(f"⚠️ Erro ao validar resultados da tabela: {e}", "WARNING")
+                return {"exame": exame, "status": "erro_validacao", "erro": str(e)}
 
-                        # Estratégia 3: Localizar novamente e usar JavaScript diretamente
-                        try:
-                            time.sleep(1)
-                            checkbox_retry = driver.find_element(By.ID, "checkTodosPreFaturar")
-                            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", checkbox_retry)
-                            time.sleep(0.5)
-                            driver.execute_script("arguments[0].click();", checkbox_retry)
-                            log_message("✅ Checkbox marcado (retry com JavaScript)", "INFO")
-                        except Exception as e2:
-                            log_message(f"❌ Falha ao marcar checkbox após tentativas: {e2}", "ERROR")
-                            raise
-
-                    # Aguardar modal de carregamento desaparecer após marcar checkbox
-                    log_message("⏳ Aguardando processamento após marcar checkbox...", "INFO")
-                    try:
-                        WebDriverWait(driver, 3).until(EC.presence_of_element_located((By.ID, "spinner")))
-                        log_message("🔄 Modal de carregamento detectado, aguardando...", "INFO")
-                        WebDriverWait(driver, 30).until(EC.invisibility_of_element_located((By.ID, "spinner")))
-                        log_message("✅ Modal de carregamento fechado", "INFO")
-                    except Exception:
-                        log_message("ℹ️ Modal não detectado. Prosseguindo...", "INFO")
 
-                    time.sleep(1)
+            log_message("☑️ Marcando checkbox 'checkTodosPreFaturar'...", "INFO")
+            try:
+                # Estratégia 1: Aguardar elemento estar clicável
+                checkbox = wait.until(EC.element_to_be_clickable((By.ID, "checkTodosPreFaturar")))
 
-                    log_message("🎬 Clicando no botão 'Ações'...", "INFO")
-                    try:
-                        # Estratégia 1: Aguardar elemento estar clicável
-                        acoes_btn = wait.until(EC.element_to_be_clickable((
-                            By.XPATH, "//a[contains(@class, 'toggleMaisDeUm') and contains(., 'Ações')]"
-                        )))
+                # Tentar clicar normalmente
+                try:
+                    checkbox.click()
+                    log_message("✅ Checkbox marcado (click normal)", "INFO")
+                except Exception as e:
+                    log_message(f"⚠️ Click normal falhou: {e}. Tentando JavaScript...", "WARNING")
 
-                        # Scroll até o elemento
-                        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", acoes_btn)
-                        time.sleep(0.5)
+                    # Estratégia 2: Click via JavaScript
+                    driver.execute_script("arguments[0].click();", checkbox)
+                    log_message("✅ Checkbox marcado (JavaScript)", "INFO")
 
-                        # Tentar clicar normalmente
-                        try:
-                            acoes_btn.click()
-                            log_message("✅ Botão 'Ações' clicado (click normal)", "INFO")
-                        except Exception as e:
-                            log_message(f"⚠️ Click normal falhou: {e}. Tentando JavaScript...", "WARNING")
+            except Exception as e:
+                log_message(f"⚠️ Erro ao marcar checkbox. Tentando localizar novamente: {e}", "WARNING")
 
-                            # Estratégia 2: Click via JavaScript
-                            driver.execute_script("arguments[0].click();", acoes_btn)
-                            log_message("✅ Botão 'Ações' clicado (JavaScript)", "INFO")
+                # Estratégia 3: Localizar novamente e usar JavaScript diretamente
+                try:
+                    time.sleep(1)
+                    checkbox_retry = driver.find_element(By.ID, "checkTodosPreFaturar")
+                    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", checkbox_retry)
+                    driver.execute_script("arguments[0].click();", checkbox_retry)
+                    log_message("✅ Checkbox marcado (retry com JavaScript)", "INFO")
+                except Exception as e2:
+                    log_message(f"❌ Falha ao marcar checkbox após tentativas: {e2}", "ERROR")
+                    raise
+
+            # Aguardar modal de carregamento desaparecer após marcar checkbox
+            log_message("⏳ Aguardando processamento após marcar checkbox...", "INFO")
+            try:
+                WebDriverWait(driver, 3).until(EC.presence_of_element_located((By.ID, "spinner")))
+                log_message("🔄 Modal de carregamento detectado, aguardando...", "INFO")
+                WebDriverWait(driver, 30).until(EC.invisibility_of_element_located((By.ID, "spinner")))
+                log_message("✅ Modal de carregamento fechado", "INFO")
+            except Exception:
+                log_message("ℹ️ Modal não detectado. Prosseguindo...", "INFO")
 
-                    except Exception as e:
-                        log_message(f"⚠️ Erro ao clicar no botão 'Ações'. Tentando localizar novamente: {e}", "WARNING")
+            aguardar_ajax(driver, timeout=5)
 
-                        # Estratégia 3: Localizar novamente e usar JavaScript diretamente
-                        try:
-                            time.sleep(1)
-                            acoes_retry = driver.find_element(By.XPATH,
-                                                              "//a[contains(@class, 'toggleMaisDeUm') and contains(., 'Ações')]")
-                            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", acoes_retry)
-                            time.sleep(0.5)
-                            driver.execute_script("arguments[0].click();", acoes_retry)
-                            log_message("✅ Botão 'Ações' clicado (retry com JavaScript)", "INFO")
-                        except Exception as e2:
-                            log_message(f"❌ Falha ao clicar no botão 'Ações' após tentativas: {e2}", "ERROR")
-                            raise
+            via_http = tentar_link_http(driver, "a[data-url*='statusConferido=O']", "Status 'Online'",
+                                        campos=("exameId",), escopo="#tabelaPreFaturamentoTbody",
+                                        confirmacao=("On-line",), exigir_campos=True)
+            if not via_http:
+                self.selecionar_status_online(driver, wait)
 
-                    time.sleep(1)
+            aguardar_pagina_pronta(driver)
 
-                    log_message("📡 Executando script para selecionar status 'Online'...", "INFO")
-                    driver.execute_script("""
-                        const onlineBtn = document.querySelector("a[data-url*='statusConferido=O']");
-                        if (onlineBtn) { onlineBtn.click(); }
-                    """)
-                    log_message("✅ Script executado - Status 'Online' selecionado", "INFO")
+            if modo_busca == "guia" and not via_http:
+                log_message("🔄 Modo guia detectado - Aguardando processamento adicional...", "INFO")
+                try:
+                    WebDriverWait(driver, 3).until(EC.presence_of_element_located((By.ID, "spinner")))
+                    log_message("🔄 Modal de carregamento detectado, aguardando...", "INFO")
+                    WebDriverWait(driver, 30).until(EC.invisibility_of_element_located((By.ID, "spinner")))
+                    log_message("✅ Modal de carregamento fechado", "INFO")
+                except Exception:
+                    log_message("ℹ️ Modal não detectado. Prosseguindo...", "INFO")
+                    aguardar_pagina_pronta(driver)
 
-                    time.sleep(1)
+            log_message(f"✅ {modo_busca.title()} {exame} processado com sucesso.", "SUCCESS")
+            return {"exame": exame, "status": "sucesso"}
 
-                    if modo_busca == "guia":
-                        log_message("🔄 Modo guia detectado - Aguardando processamento adicional...", "INFO")
-                        try:
-                            WebDriverWait(driver, 3).until(EC.presence_of_element_located((By.ID, "spinner")))
-                            log_message("🔄 Modal de carregamento detectado, aguardando...", "INFO")
-                            WebDriverWait(driver, 30).until(EC.invisibility_of_element_located((By.ID, "spinner")))
-                            log_message("✅ Modal de carregamento fechado", "INFO")
-                        except Exception:
-                            log_message("ℹ️ Modal não detectado. Prosseguindo...", "INFO")
-                            time.sleep(1)
+        except Exception as e:
+            log_message(f"❌ Erro ao processar {exame}: {e}", "ERROR")
+            log_message(f"🔍 Detalhes do erro: {type(e).__name__}", "ERROR")
+            return {"exame": exame, "status": "erro", "erro": str(e)}
 
-                    resultados.append({"exame": exame, "status": "sucesso"})
-                    log_message(f"✅ {modo_busca.title()} {exame} processado com sucesso.", "SUCCESS")
 
-                except Exception as e:
-                    resultados.append({"exame": exame, "status": "erro", "erro": str(e)})
-                    log_message(f"❌ Erro ao processar {exame}: {e}", "ERROR")
-                    log_message(f"🔍 Detalhes do erro: {type(e).__name__}", "ERROR")
+    def run(self, params: dict):
+        username = params.get("username")
+        password = params.get("password")
+        excel_file = params.get("excel_file")
+        modo_busca = params.get("modo_busca", "exame")
+        cancel_flag = params.get("cancel_flag")
+        gera_xml_tiss = params.get("gera_xml_tiss", "sim")
+        headless_mode = params.get("headless_mode")
+        unimed_user = params.get("unimed_user")
+        unimed_pass = params.get("unimed_pass")
+        pasta_download = params.get("pasta_download", os.path.join(os.getcwd(), "xml"))
+        num_workers = params.get("num_workers", 1)
+        try:
+            exames_unicos = self.get_unique_exames(excel_file, modo_busca)
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao ler o Excel: {e}")
+            return
+        if not exames_unicos:
+            messagebox.showerror("Erro", "Nenhum exame encontrado no arquivo.")
+            return
+        url = os.getenv("SYSTEM_URL", "https://dap.pathoweb.com.br/login/auth")
+        driver = BrowserFactory.acquire_chrome(headless=headless_mode)
+        wait = WebDriverWait(driver, 15)
+        resultados = []
+        try:
+            log_message("Iniciando automação de preparação de exames...", "INFO")
+            self.abrir_preparacao(driver, wait, username, password, url)
+
+            progresso.definir_total(len(exames_unicos))
+            if num_workers > 1:
+                executor = ExecutorParalelo(num_workers, cancel_flag=cancel_flag)
+                resultados = executor.executar(
+                    exames_unicos,
+                    processar_item=lambda d, exame: self.processar_exame(d, WebDriverWait(d, 15), exame, modo_busca),
+                    preparar_worker=lambda d: self.abrir_preparacao(d, WebDriverWait(d, 15), username, password, url, compartilhar=False),
+                    ao_falhar=lambda exame, e: {"exame": exame, "status": "erro", "erro": str(e)},
+                    driver_principal=driver
+                )
+                # O navegador do módulo pode ter sido trocado se caiu durante a execução
+                driver = executor.driver_principal
+                wait = WebDriverWait(driver, 15)
+            else:
+                for exame in exames_unicos:
+                    if cancel_flag and cancel_flag.is_set():
+                        log_message("Execução cancelada pelo usuário.", "WARNING")
+                        break
+                    resultados.append(self.processar_exame(driver, wait, exame, modo_busca))
 
             total = len(resultados)
             sucesso = [r for r in resultados if r["status"] == "sucesso"]
@@ -344,49 +327,45 @@ class PreparacaoLoteModule(BaseModule):
                     campo_id = "numeroGuia" if modo_busca == "guia" else "numeroExame"
                     campo_exame = wait.until(EC.presence_of_element_located((By.ID, campo_id)))
                     campo_exame.clear()
-                    time.sleep(0.5)
 
                     select2_container = wait.until(
                         EC.element_to_be_clickable(
                             (By.CSS_SELECTOR, ".select2-selection[aria-labelledby*='convenioId']"))
                     )
                     select2_container.click()
-                    time.sleep(1)
                     opcao_unimed = wait.until(
                         EC.element_to_be_clickable(
                             (By.XPATH,
                              "//li[contains(@class, 'select2-results__option') and text()='UNIMED (LONDRINA)']"))
                     )
                     opcao_unimed.click()
-                    time.sleep(1)
+                    aguardar_ajax(driver, timeout=5)
 
                     select_element = wait.until(EC.presence_of_element_located((By.ID, "conferido")))
                     select_conferido = Select(select_element)
                     select_conferido.select_by_value("O")
-                    time.sleep(1)
 
                     # Executar pesquisa
                     botao_pesquisar = wait.until(EC.element_to_be_clickable((By.ID, "pesquisaFaturamento")))
                     botao_pesquisar.click()
-                    time.sleep(2)
+                    aguardar_pagina_pronta(driver, timeout=60)
                     # Aguardar finalização da pesquisa
                     tempo_maximo = time.time() + 60
                     while time.time() < tempo_maximo:
                         try:
                             modal_carregando = driver.find_element(By.XPATH,
                                 "//div[contains(@class,'modal-body') and contains(., 'Carregando')]")
-                            if modal_carregando.is_displayed():
-                                time.sleep(1)
-                            else:
+                            if not modal_carregando.is_displayed():
                                 break
                         except Exception:
                             break
+                        dormir(1)
                     try:
                         gerar_tiss_checkbox = driver.find_element(By.ID, "gerarArquivoTiss")
                         if gerar_tiss_checkbox.is_selected():
                             gerar_tiss_checkbox.click()
                             log_message("Checkbox 'gerarArquivoTiss' desmarcado.", "INFO")
-                        time.sleep(1)
+                        aguardar_ajax(driver, timeout=5)
                     except Exception as e:
                         log_message(f"Não foi possível desmarcar gerarArquivoTiss: {e}", "WARNING")
                     # Clicar no botão de situação de faturamento
@@ -397,7 +376,7 @@ class PreparacaoLoteModule(BaseModule):
 
                         modal_carregando = driver.find_element(By.XPATH, "//div[contains(@class,'modal-body') and contains(., 'Carregando')]")
                         if modal_carregando.is_displayed():
-                            time.sleep(1)
+                            aguardar_pagina_pronta(driver)
 
                     except Exception as e:
                         log_message(f"Não foi possível clicar no botão de situação de faturamento: {e}", "ERROR")
@@ -407,7 +386,7 @@ class PreparacaoLoteModule(BaseModule):
             log_message(f"❌ Erro durante a automação: {e}", "ERROR")
             messagebox.showerror("Erro", f"❌ Erro durante a automação:\n{e}")
         finally:
-            driver.quit()
+            BrowserFactory.release_chrome(driver)
 
 def run(params: dict):
     module = PreparacaoLoteModule()
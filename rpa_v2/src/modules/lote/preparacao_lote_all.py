@@ -9,7 +9,10 @@ from selenium.webdriver.support.ui import Select
 from dotenv import load_dotenv
 
 from src.core.browser_factory import BrowserFactory
+from src.core.http_transport import tentar_link_http
 from src.core.logger import log_message
+from src.core.session_manager import login_pathoweb
+from src.core.waits import aguardar_ajax, dormir
 from src.modules.base import BaseModule
 
 load_dotenv()
@@ -57,10 +60,7 @@ class PreparacaoLoteModule(BaseModule):
         Realiza o login no sistema
         """
         log_message("Iniciando automação de preparação de exames...", "INFO")
-        driver.get(url)
-        wait.until(EC.presence_of_element_located((By.ID, "username"))).send_keys(username)
-        driver.find_element(By.ID, "password").send_keys(password)
-        driver.find_element(By.CSS_SELECTOR, "button[type='submit']").click()
+        login_pathoweb(driver, username, password, modulo=2, url=url)
 
     def validate_and_navigate_module(self, driver, wait):
         """
@@ -75,13 +75,13 @@ class PreparacaoLoteModule(BaseModule):
                 modulo_link = wait.until(
                     EC.element_to_be_clickable((By.CSS_SELECTOR, "a[href='/site/trocarModulo?modulo=2']")))
                 modulo_link.click()
-                time.sleep(2)
+                dormir(2)
                 log_message("✅ Navegação para módulo de faturamento realizada", "SUCCESS")
             except Exception as e:
                 log_message(f"⚠️ Erro ao navegar para módulo: {e}", "WARNING")
                 # Tentar navegar diretamente pela URL como fallback
                 driver.get("https://dap.pathoweb.com.br/moduloFaturamento/index")
-                time.sleep(2)
+                dormir(2)
                 log_message("🔄 Navegação direta para módulo realizada", "INFO")
 
         elif "moduloFaturamento" in current_url:
@@ -90,7 +90,7 @@ class PreparacaoLoteModule(BaseModule):
             log_message(f"⚠️ URL inesperada detectada: {current_url}", "WARNING")
             # Tentar navegar diretamente como fallback
             driver.get("https://dap.pathoweb.com.br/moduloFaturamento/index")
-            time.sleep(2)
+            dormir(2)
             log_message("🔄 Navegação direta para módulo realizada (fallback)", "INFO")
 
     def navigate_to_exam_preparation(self, driver, wait):
@@ -174,21 +174,26 @@ class PreparacaoLoteModule(BaseModule):
 
             # Selecionar todos e processar
             wait.until(EC.element_to_be_clickable((By.ID, "checkTodosPreFaturar"))).click()
-            acoes_btn = wait.until(EC.element_to_be_clickable((
-                By.XPATH, "//a[contains(@class, 'toggleMaisDeUm') and contains(., 'Ações')]"
-            )))
-            acoes_btn.click()
-            time.sleep(1)
+            aguardar_ajax(driver, timeout=5)
+            via_http = tentar_link_http(driver, "a[data-url*='statusConferido=O']", "Status 'Online'",
+                                        campos=("exameId",), escopo="#tabelaPreFaturamentoTbody",
+                                        confirmacao=("On-line",), exigir_campos=True)
+            if not via_http:
+                acoes_btn = wait.until(EC.element_to_be_clickable((
+                    By.XPATH, "//a[contains(@class, 'toggleMaisDeUm') and contains(., 'Ações')]"
+                )))
+                acoes_btn.click()
+                time.sleep(1)
 
-            # Executar script para marcar como online
-            driver.execute_script("""
-                const onlineBtn = document.querySelector("a[data-url*='statusConferido=O']");
-                if (onlineBtn) { onlineBtn.click(); }
-            """)
-            time.sleep(1)
+                # Executar script para marcar como online
+                driver.execute_script("""
+                    const onlineBtn = document.querySelector("a[data-url*='statusConferido=O']");
+                    if (onlineBtn) { onlineBtn.click(); }
+                """)
+                time.sleep(1)
 
             # Aguardar carregamento adicional para modo guia
-            if modo_busca == "guia":
+            if modo_busca == "guia" and not via_http:
                 try:
                     WebDriverWait(driver, 3).until(EC.presence_of_element_located((By.ID, "spinner")))
                     log_message("🔄 Modal de carregamento detectado, aguardando...", "INFO")
@@ -302,7 +307,7 @@ class PreparacaoLoteModule(BaseModule):
             # Executar pesquisa
             botao_pesquisar = wait.until(EC.element_to_be_clickable((By.ID, "pesquisaFaturamento")))
             botao_pesquisar.click()
-            time.sleep(2)
+            dormir(2)
 
             # Aguardar finalização da pesquisa
             tempo_maximo = time.time() + 60
@@ -311,7 +316,7 @@ class PreparacaoLoteModule(BaseModule):
                     modal_carregando = driver.find_element(By.XPATH,
                                                            "//div[contains(@class,'modal-body') and contains(., 'Carregando')]")
                     if modal_carregando.is_displayed():
-                        time.sleep(1)
+                        dormir(1)
                     else:
                         break
                 except Exception:
@@ -393,7 +398,7 @@ class PreparacaoLoteModule(BaseModule):
             return
 
         url = os.getenv("SYSTEM_URL", "https://dap.pathoweb.com.br/login/auth")
-        driver = BrowserFactory.create_chrome(headless=headless_mode)
+        driver = BrowserFactory.acquire_chrome(headless=headless_mode)
         wait = WebDriverWait(driver, 15)
         resultados = []
 
@@ -431,7 +436,7 @@ class PreparacaoLoteModule(BaseModule):
             log_message(f"Erro durante a automação: {e}", "ERROR")
             messagebox.showerror("Erro", f"Erro durante a automação:\n{e}")
         finally:
-            driver.quit()
+            BrowserFactory.release_chrome(driver)
 
 def run(params: dict):
     module = PreparacaoLoteModule()
@@ -1,5 +1,4 @@
 import os
-import pandas as pd
 import time
 from tkinter import messagebox
 from selenium.webdriver.common.by import By
@@ -9,9 +8,13 @@ from selenium.webdriver.support.ui import Select
 from dotenv import load_dotenv
 
 from src.core.browser_factory import BrowserFactory
+from src.core.http_transport import tentar_link_http
 from src.core.logger import log_message
+from src.core.session_manager import login_pathoweb
+from src.core.waits import aguardar_ajax, dormir
 from src.modules.base import BaseModule
 from src.modules.lote.envio_lote_unimed import XMLGeneratorAutomation
+from src.utils.planilha import ler_abas, ler_registros, valores_unicos
 
 load_dotenv()
 
@@ -21,31 +24,22 @@ class PreparacaoLoteModule(BaseModule):
 
     def get_unique_exames(self, file_path: str, modo_busca: str) -> list:
         if modo_busca == "exame":
-            #Caso precise buscar por tab do excel, usar o sheet_name
-            #df = pd.read_excel(file_path, sheet_name=2)
-            df = pd.read_excel(file_path)
-            unique_exames = df['Exame'].dropna().unique().tolist()
+            registros = ler_registros(file_path, {"exame": ["Exame"]}, aba=0, obrigatorias=("exame",))
         elif modo_busca == "guia":
-            df = pd.read_excel(file_path, header=None)
-            unique_exames = df.iloc[:, 0].dropna().unique().tolist()
+            registros = ler_registros(file_path, {"exame": "A"}, aba=0, cabecalho=False)
         else:
             raise ValueError("Modo de busca inválido. Use 'exame' ou 'guia'.")
-        return unique_exames
+        return valores_unicos(registros, "exame")
 
     def get_unique_exames_multiplas_abas(self, file_path: str, modo_busca: str):
-        abas = pd.ExcelFile(file_path).sheet_names
-        exames_por_aba = {}
-        for aba in abas:
-            if modo_busca == "exame":
-                df = pd.read_excel(file_path, sheet_name=aba)
-                unique_exames = df['Exame'].dropna().unique().tolist()
-            elif modo_busca == "guia":
-                df = pd.read_excel(file_path, sheet_name=aba, header=None)
-                unique_exames = df.iloc[:, 0].dropna().unique().tolist()
-            else:
-                raise ValueError("Modo de busca inválido. Use 'exame' ou 'guia'.")
-            exames_por_aba[aba] = unique_exames
-        return exames_por_aba
+        """{aba: exames únicos} lendo o arquivo uma única vez."""
+        if modo_busca == "exame":
+            abas = ler_abas(file_path, {"exame": ["Exame"]}, obrigatorias=("exame",))
+        elif modo_busca == "guia":
+            abas = ler_abas(file_path, {"exame": "A"}, cabecalho=False)
+        else:
+            raise ValueError("Modo de busca inválido. Use 'exame' ou 'guia'.")
+        return {aba: valores_unicos(registros, "exame") for aba, registros in abas.items()}
 
     def run(self, params: dict):
         username = params.get("username")
@@ -61,7 +55,9 @@ class PreparacaoLoteModule(BaseModule):
 
         # Verificar se o Excel tem múltiplas abas
         try:
-            abas_excel = pd.ExcelFile(excel_file).sheet_names
+            # Uma única leitura do arquivo serve para todas as abas
+            exames_por_aba = self.get_unique_exames_multiplas_abas(excel_file, modo_busca)
+            abas_excel = list(exames_por_aba)
             log_message(f"Excel possui {len(abas_excel)} aba(s): {abas_excel}", "INFO")
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao ler o Excel: {e}")
@@ -80,7 +76,7 @@ class PreparacaoLoteModule(BaseModule):
 
                 # Processar esta aba específica
                 sucesso_aba = self._processar_aba_especifica(
-                    excel_file, aba, username, password, modo_busca,
+                    exames_por_aba[aba], aba, username, password, modo_busca,
                     cancel_flag, gera_xml_tiss, headless_mode,
                     unimed_user, unimed_pass, pasta_download, idx, len(abas_excel)
                 )
@@ -96,26 +92,16 @@ class PreparacaoLoteModule(BaseModule):
             # Processar Excel com uma única aba (comportamento original)
             log_message("Excel com aba única. Processando normalmente...", "INFO")
             self._processar_aba_unica(
-                excel_file, username, password, modo_busca,
+                exames_por_aba[abas_excel[0]], username, password, modo_busca,
                 cancel_flag, gera_xml_tiss, headless_mode,
                 unimed_user, unimed_pass, pasta_download
             )
 
-    def _processar_aba_especifica(self, excel_file, nome_aba, username, password, modo_busca,
+    def _processar_aba_especifica(self, exames_unicos, nome_aba, username, password, modo_busca,
                                  cancel_flag, gera_xml_tiss, headless_mode,
                                  unimed_user, unimed_pass, pasta_download, idx_aba, total_abas):
         """Processa uma aba específica do Excel"""
         try:
-            # Obter exames únicos desta aba
-            if modo_busca == "exame":
-                df = pd.read_excel(excel_file, sheet_name=nome_aba)
-                exames_unicos = df['Exame'].dropna().unique().tolist()
-            elif modo_busca == "guia":
-                df = pd.read_excel(excel_file, sheet_name=nome_aba, header=None)
-                exames_unicos = df.iloc[:, 0].dropna().unique().tolist()
-            else:
-                raise ValueError("Modo de busca inválido. Use 'exame' ou 'guia'.")
-
             if not exames_unicos:
                 log_message(f"⚠️ Nenhum exame encontrado na aba {nome_aba}", "WARNING")
                 return True  # Continua para próxima aba
@@ -134,16 +120,10 @@ class PreparacaoLoteModule(BaseModule):
             log_message(f"❌ Erro ao processar aba {nome_aba}: {e}", "ERROR")
             return False
 
-    def _processar_aba_unica(self, excel_file, username, password, modo_busca,
+    def _processar_aba_unica(self, exames_unicos, username, password, modo_busca,
                            cancel_flag, gera_xml_tiss, headless_mode,
                            unimed_user, unimed_pass, pasta_download):
         """Processa Excel com aba única (comportamento original)"""
-        try:
-            exames_unicos = self.get_unique_exames(excel_file, modo_busca)
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao ler o Excel: {e}")
-            return
-
         if not exames_unicos:
             messagebox.showerror("Erro", "Nenhum exame encontrado no arquivo.")
             return
@@ -159,49 +139,13 @@ class PreparacaoLoteModule(BaseModule):
                                    unimed_user, unimed_pass, pasta_download, contexto):
         """Executa o processo completo de automação para uma lista de exames"""
         url = os.getenv("SYSTEM_URL", "https://dap.pathoweb.com.br/login/auth")
-        driver = BrowserFactory.create_chrome(headless=headless_mode)
+        driver = BrowserFactory.acquire_chrome(headless=headless_mode)
         wait = WebDriverWait(driver, 15)
         resultados = []
 
         try:
             log_message(f"🚀 Iniciando automação: {contexto}...", "INFO")
-            driver.get(url)
-            wait.until(EC.presence_of_element_located((By.ID, "username"))).send_keys(username)
-            driver.find_element(By.ID, "password").send_keys(password)
-            driver.find_element(By.CSS_SELECTOR, "button[type='submit']").click()
-
-            log_message("Verificando se precisa navegar para módulo de faturamento...", "INFO")
-            current_url = driver.current_url
-
-            if current_url == "https://dap.pathoweb.com.br/" or "trocarModulo" in current_url:
-                log_message("Detectada tela de seleção de módulos - navegando para módulo de faturamento...", "INFO")
-                try:
-                    modulo_link = wait.until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, "a[href='/site/trocarModulo?modulo=2']")))
-                    modulo_link.click()
-                    time.sleep(2)
-                    log_message("✅ Navegação para módulo de faturamento realizada", "SUCCESS")
-                except Exception as e:
-                    log_message(f"⚠️ Erro ao navegar para módulo: {e}", "WARNING")
-                    driver.get("https://dap.pathoweb.com.br/moduloFaturamento/index")
-                    time.sleep(2)
-                    log_message("🔄 Navegação direta para módulo realizada", "INFO")
-
-            elif "moduloFaturamento" in current_url:
-                log_message("✅ Já está no módulo de faturamento - pulando navegação", "SUCCESS")
-            else:
-                log_message(f"⚠️ URL inesperada detectada: {current_url}", "WARNING")
-                driver.get("https://dap.pathoweb.com.br/moduloFaturamento/index")
-                time.sleep(2)
-                log_message("🔄 Navegação direta para módulo realizada (fallback)", "INFO")
-
-            try:
-                modal_close_button = driver.find_element(By.CSS_SELECTOR, "#mensagemParaClienteModal .modal-footer button")
-                if modal_close_button.is_displayed():
-                    modal_close_button.click()
-                    time.sleep(1)
-            except Exception:
-                pass
+            login_pathoweb(driver, username, password, modulo=2, url=url)
 
             wait.until(EC.element_to_be_clickable((
                 By.XPATH, "//a[contains(@class, 'setupAjax') and contains(text(), 'Preparar exames para fatura')]"
@@ -229,7 +173,7 @@ class PreparacaoLoteModule(BaseModule):
                             log_message("✅ Modal de carregamento fechado", "INFO")
                     except Exception:
                         log_message("ℹ️ Modal não detectado. Prosseguindo...", "INFO")
-                    time.sleep(1)
+                    dormir(1)
                     try:
                         tbody_rows = driver.find_elements(By.CSS_SELECTOR, "#tabelaPreFaturamentoTbody tr")
                         if len(tbody_rows) == 0:
@@ -241,17 +185,22 @@ class PreparacaoLoteModule(BaseModule):
                         resultados.append({"exame": exame, "status": "erro_validacao", "erro": str(e)})
                         continue
                     wait.until(EC.element_to_be_clickable((By.ID, "checkTodosPreFaturar"))).click()
-                    acoes_btn = wait.until(EC.element_to_be_clickable((
-                        By.XPATH, "//a[contains(@class, 'toggleMaisDeUm') and contains(., 'Ações')]"
-                    )))
-                    acoes_btn.click()
-                    time.sleep(1)
-                    driver.execute_script("""
-                        const onlineBtn = document.querySelector("a[data-url*='statusConferido=O']");
-                        if (onlineBtn) { onlineBtn.click(); }
-                    """)
-                    time.sleep(1)
-                    if modo_busca == "guia":
+                    aguardar_ajax(driver, timeout=5)
+                    via_http = tentar_link_http(driver, "a[data-url*='statusConferido=O']", "Status 'Online'",
+                                                campos=("exameId",), escopo="#tabelaPreFaturamentoTbody",
+                                                confirmacao=("On-line",), exigir_campos=True)
+                    if not via_http:
+                        acoes_btn = wait.until(EC.element_to_be_clickable((
+                            By.XPATH, "//a[contains(@class, 'toggleMaisDeUm') and contains(., 'Ações')]"
+                        )))
+                        acoes_btn.click()
+                        dormir(1)
+                        driver.execute_script("""
+                            const onlineBtn = document.querySelector("a[data-url*='statusConferido=O']");
+                            if (onlineBtn) { onlineBtn.click(); }
+                        """)
+                        dormir(1)
+                    if modo_busca == "guia" and not via_http:
                         try:
                             WebDriverWait(driver, 3).until(EC.presence_of_element_located((By.ID, "spinner")))
                             log_message("🔄 Modal de carregamento detectado, aguardando...", "INFO")
@@ -259,7 +208,7 @@ class PreparacaoLoteModule(BaseModule):
                             log_message("✅ Modal de carregamento fechado", "INFO")
                         except Exception:
                             log_message("ℹ️ Modal não detectado. Prosseguindo...", "INFO")
-                            time.sleep(1)
+                            dormir(1)
                     resultados.append({"exame": exame, "status": "sucesso"})
                     log_message(f"✅ {modo_busca.title()} {exame} processado com sucesso.", "SUCCESS")
                 except Exception as e:
@@ -321,7 +270,7 @@ class PreparacaoLoteModule(BaseModule):
 
                     botao_pesquisar = wait.until(EC.element_to_be_clickable((By.ID, "pesquisaFaturamento")))
                     botao_pesquisar.click()
-                    time.sleep(2)
+                    dormir(2)
 
                     tempo_maximo = time.time() + 60
                     while time.time() < tempo_maximo:
@@ -329,7 +278,7 @@ class PreparacaoLoteModule(BaseModule):
                             modal_carregando = driver.find_element(By.XPATH,
                                 "//div[contains(@class,'modal-body') and contains(., 'Carregando')]")
                             if modal_carregando.is_displayed():
-                                time.sleep(1)
+                                dormir(1)
                             else:
                                 break
                         except Exception:
@@ -364,7 +313,7 @@ class PreparacaoLoteModule(BaseModule):
             messagebox.showerror("Erro", f"❌ Erro durante a automação:\n{e}")
             return False
         finally:
-            driver.quit()
+            BrowserFactory.release_chrome(driver)
 
 def run(params: dict):
     module = PreparacaoLoteModule()
@@ -10,7 +10,10 @@ from dotenv import load_dotenv
 from socket import timeout as TimeoutException
 
 from src.core.browser_factory import BrowserFactory
+from src.core import progresso
 from src.core.logger import log_message
+from src.core.session_manager import login_pathoweb
+from src.core.waits import dormir
 from src.modules.base import BaseModule
 from src.modules.lote.envio_lote_unimed import XMLGeneratorAutomation
 
@@ -18,6 +21,8 @@ load_dotenv()
 
 
 class PreparacaoLoteMultiploModule(BaseModule):
+    ETAPAS_RASTREADAS = BaseModule.ETAPAS_RASTREADAS + ("fechar_sweetalert", "gerar_ou_enviar_lote")
+
     def __init__(self):
         super().__init__(nome="Preparação de Lote Múltiplo")
         self.max_exames_por_lote = 99
@@ -95,10 +100,11 @@ class PreparacaoLoteMultiploModule(BaseModule):
             # Calcular posição global considerando lotes anteriores
             posicao_global = offset + idx
             log_message(f"➡️ Processando {modo_busca} [{posicao_global}/{offset + total_exames}]: {exame}", "INFO")
+            inicio_item = time.perf_counter()
 
             try:
                 # Aguardar página estar completamente carregada
-                time.sleep(1)
+                dormir(1)
 
                 self.fechar_sweetalert(driver)
 
@@ -107,7 +113,7 @@ class PreparacaoLoteMultiploModule(BaseModule):
                     modal_backdrop = driver.find_element(By.CLASS_NAME, "modal-backdrop")
                     if modal_backdrop.is_displayed():
                         driver.execute_script("$('.modal').modal('hide');")
-                        time.sleep(0.5)
+                        dormir(0.5)
                         log_message("🔄 Modal detectado e fechado", "INFO")
                 except Exception:
                     pass
@@ -129,7 +135,7 @@ class PreparacaoLoteMultiploModule(BaseModule):
                         # Scroll até o elemento
                         driver.execute_script("arguments[0].scrollIntoView({block: 'center', behavior: 'smooth'});",
                                               campo_exame)
-                        time.sleep(0.5)
+                        dormir(0.5)
 
                         # Aguardar elemento estar visível
                         wait.until(EC.visibility_of_element_located((By.ID, campo_id)))
@@ -152,7 +158,7 @@ class PreparacaoLoteMultiploModule(BaseModule):
                             driver.execute_script("arguments[0].value = '';", campo_exame)
                             log_message("🧹 Campo limpo (JavaScript)", "INFO")
 
-                        time.sleep(0.3)
+                        dormir(0.3)
 
                         # Tentar preencher campo
                         try:
@@ -177,20 +183,20 @@ class PreparacaoLoteMultiploModule(BaseModule):
                         else:
                             log_message(f"⚠️ Valor esperado '{exame}', obtido '{valor_atual}'", "WARNING")
                             if tentativa < max_tentativas:
-                                time.sleep(1)
+                                dormir(1)
                                 continue
 
                     except Exception as e:
                         log_message(f"⚠️ Erro na tentativa {tentativa}: {e}", "WARNING")
                         if tentativa < max_tentativas:
-                            time.sleep(1)
+                            dormir(1)
                         else:
                             raise Exception(f"Falha ao preencher campo após {max_tentativas} tentativas")
 
                 if not campo_preenchido:
                     raise Exception(f"Não foi possível preencher o campo {campo_id}")
 
-                time.sleep(0.5)
+                dormir(0.5)
 
                 log_message("🔎 Clicando no botão de pesquisa...", "INFO")
 
@@ -215,7 +221,7 @@ class PreparacaoLoteMultiploModule(BaseModule):
                     log_message(f"⚠️ Erro ao clicar no botão. Tentando localizar novamente: {e}", "WARNING")
 
                     # Estratégia 3: Localizar novamente e usar JavaScript diretamente
-                    time.sleep(1)
+                    dormir(1)
                     botao_retry = driver.find_element(By.ID, "pesquisaFaturamento")
 
                     # Remover atributo disabled se existir
@@ -223,7 +229,7 @@ class PreparacaoLoteMultiploModule(BaseModule):
 
                     # Scroll e click
                     driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", botao_retry)
-                    time.sleep(0.5)
+                    dormir(0.5)
                     driver.execute_script("arguments[0].click();", botao_retry)
                     log_message("✅ Botão de pesquisa clicado (retry com JavaScript)", "INFO")
 
@@ -237,7 +243,7 @@ class PreparacaoLoteMultiploModule(BaseModule):
                 except Exception:
                     log_message("ℹ️ Modal não detectado. Prosseguindo...", "INFO")
 
-                time.sleep(1)
+                dormir(1)
 
                 log_message("📋 Validando resultados da tabela...", "INFO")
                 tbody_rows = driver.find_elements(By.CSS_SELECTOR, "#tabelaPreFaturamentoTbody tr")
@@ -246,9 +252,10 @@ class PreparacaoLoteMultiploModule(BaseModule):
                 if len(tbody_rows) == 0:
                     log_message(f"⚠️ Nenhum resultado encontrado para {exame}. Pulando.", "WARNING")
                     resultados_lote.append({"exame": exame, "status": "sem_resultados"})
+                    progresso.item_concluido(duracao=time.perf_counter() - inicio_item)
                     continue
 
-                time.sleep(1)
+                dormir(1)
 
                 log_message("☑️ Marcando checkbox 'checkTodosPreFaturar'...", "INFO")
 
@@ -295,12 +302,12 @@ class PreparacaoLoteMultiploModule(BaseModule):
                 except Exception:
                     log_message("ℹ️ Modal não detectado. Prosseguindo...", "INFO")
 
-                time.sleep(1)
+                dormir(1)
 
                 log_message("🎬 Clicando no botão 'Ações'...", "INFO")
 
                 self.fechar_sweetalert(driver)
-                time.sleep(1)
+                dormir(1)
 
                 # Laço para garantir que o status seja alterado para "Online"
                 max_tentativas_status = 3
@@ -326,7 +333,7 @@ class PreparacaoLoteMultiploModule(BaseModule):
                             raise Exception("Botão 'Ações' não encontrado ou clicado via JavaScript.")
 
                         log_message("✅ Botão 'Ações' clicado com sucesso (Método 1: JavaScript).", "INFO")
-                        time.sleep(1)  # Aguardar o menu de ações abrir
+                        dormir(1)  # Aguardar o menu de ações abrir
 
                     except Exception as e1:
                         log_message(f"⚠️ Método 1 (JS) falhou: {e1}. Tentando fallback (Método 2: WebDriverWait)...",
@@ -338,7 +345,7 @@ class PreparacaoLoteMultiploModule(BaseModule):
                             )))
                             acoes_btn.click()
                             log_message("✅ Botão 'Ações' clicado com sucesso (Método 2: WebDriverWait).", "INFO")
-                            time.sleep(1)
+                            dormir(1)
                         except Exception as e2:
                             log_message(f"⚠️ Método 2 falhou: {e2}. Tentando fallback (Método 3: Scroll + JS)...",
                                         "WARNING")
@@ -347,15 +354,15 @@ class PreparacaoLoteMultiploModule(BaseModule):
                                 acoes_btn = driver.find_element(By.XPATH,
                                                                 "//a[contains(@class, 'toggleMaisDeUm') and contains(., 'Ações')]")
                                 driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", acoes_btn)
-                                time.sleep(0.5)
+                                dormir(0.5)
                                 driver.execute_script("arguments[0].click();", acoes_btn)
                                 log_message("✅ Botão 'Ações' clicado com sucesso (Método 3).", "INFO")
-                                time.sleep(1)
+                                dormir(1)
                             except Exception as e3:
                                 log_message(
                                     f"❌ Todas as tentativas de clicar em 'Ações' falharam na tentativa {tentativa_status}: {e3}",
                                     "ERROR")
-                                time.sleep(1)
+                                dormir(1)
                                 continue
 
                     # Clicar na opção 'Online' de forma mais robusta
@@ -394,7 +401,7 @@ class PreparacaoLoteMultiploModule(BaseModule):
                         log_message("✅ Processamento do status concluído (spinner desapareceu)", "INFO")
                     except Exception:
                         log_message("ℹ️ Spinner não detectado ou já invisível, aguardando tempo fixo.", "INFO")
-                        time.sleep(1.5)
+                        dormir(1.5)
 
                     # Validação mais robusta, verificando o texto dentro da célula <td>
                     max_tentativas_validacao = 3
@@ -419,7 +426,7 @@ class PreparacaoLoteMultiploModule(BaseModule):
                                 f"⚠️ Validação falhou na tentativa {tentativa_validacao}. O texto 'On-line' não apareceu a tempo.",
                                 "WARNING")
                             if tentativa_validacao < max_tentativas_validacao:
-                                time.sleep(2)  # Aguarda 2 segundos antes de tentar validar novamente
+                                dormir(2)  # Aguarda 2 segundos antes de tentar validar novamente
                             continue  # Próxima tentativa de validação
 
                         except Exception as e:
@@ -433,7 +440,7 @@ class PreparacaoLoteMultiploModule(BaseModule):
 
                     # Se a validação falhou, garante que menus suspensos estejam fechados antes da próxima tentativa
                     driver.execute_script("document.body.click();")
-                    time.sleep(1)
+                    dormir(1)
 
                 if not status_alterado:
                     status_final = "Não foi possível ler"
@@ -446,7 +453,7 @@ class PreparacaoLoteMultiploModule(BaseModule):
                     log_message(f"❌ Falha ao alterar o status para 'Online' após {max_tentativas_status} tentativas.", "ERROR")
                     raise Exception(mensagem_erro)
 
-                time.sleep(1)
+                dormir(1)
 
                 if modo_busca == "guia":
                     log_message("🔄 Modo guia detectado - Aguardando processamento adicional...", "INFO")
@@ -457,13 +464,15 @@ class PreparacaoLoteMultiploModule(BaseModule):
                         log_message("✅ Modal de carregamento fechado", "INFO")
                     except Exception:
                         log_message("ℹ️ Modal não detectado. Prosseguindo...", "INFO")
-                        time.sleep(1)
+                        dormir(1)
 
                 resultados_lote.append({"exame": exame, "status": "sucesso"})
                 log_message(f"✅ {modo_busca.title()} {exame} processado com sucesso.", "SUCCESS")
+                progresso.item_concluido(duracao=time.perf_counter() - inicio_item)
             except Exception as e:
                 log_message(f"❌ Erro ao processar o {modo_busca} '{exame}': {e}", "ERROR")
                 resultados_lote.append({"exame": exame, "status": "erro", "detalhe": str(e)})
+                progresso.item_concluido(ok=False, duracao=time.perf_counter() - inicio_item)
                 continue
 
         return resultados_lote
@@ -513,7 +522,7 @@ class PreparacaoLoteMultiploModule(BaseModule):
 
                 botao_pesquisar = wait.until(EC.element_to_be_clickable((By.ID, "pesquisaFaturamento")))
                 botao_pesquisar.click()
-                time.sleep(2)
+                dormir(2)
 
                 tempo_maximo = time.time() + 60
                 while time.time() < tempo_maximo:
@@ -521,7 +530,7 @@ class PreparacaoLoteMultiploModule(BaseModule):
                         modal_carregando = driver.find_element(By.XPATH,
                                                                "//div[contains(@class,'modal-body') and contains(., 'Carregando')]")
                         if modal_carregando.is_displayed():
-                            time.sleep(1)
+                            dormir(1)
                         else:
                             break
                     except Exception:
@@ -541,7 +550,7 @@ class PreparacaoLoteMultiploModule(BaseModule):
                         (By.CSS_SELECTOR, "a.btn.btn-danger[onclick*='modalFaturamento']")))
                     botao_situacao.click()
                     log_message(f"✅ Lote {numero_lote} preparado para geração manual.", "SUCCESS")
-                    time.sleep(2)
+                    dormir(2)
                     return True
                 except Exception as e:
                     log_message(f"❌ Erro ao preparar lote {numero_lote}: {e}", "ERROR")
@@ -579,51 +588,17 @@ class PreparacaoLoteMultiploModule(BaseModule):
 
         log_message(f"📊 Total de exames únicos: {len(exames_unicos)}", "INFO")
         log_message(f"📦 Divididos em {total_lotes} lote(s) de até {self.max_exames_por_lote} exames", "INFO")
+        progresso.definir_total(len(exames_unicos))
 
         url = os.getenv("SYSTEM_URL", "https://dap.pathoweb.com.br/login/auth")
-        driver = BrowserFactory.create_chrome(headless=headless_mode)
+        driver = BrowserFactory.acquire_chrome(headless=headless_mode)
         wait = WebDriverWait(driver, 15)
 
         todos_resultados = []
 
         try:
             log_message("Iniciando automação de preparação de exames em múltiplos lotes...", "INFO")
-            driver.get(url)
-            wait.until(EC.presence_of_element_located((By.ID, "username"))).send_keys(username)
-            driver.find_element(By.ID, "password").send_keys(password)
-            driver.find_element(By.CSS_SELECTOR, "button[type='submit']").click()
-
-            log_message("Verificando se precisa navegar para módulo de faturamento...", "INFO")
-            current_url = driver.current_url
-
-            if current_url == "https://dap.pathoweb.com.br/" or "trocarModulo" in current_url:
-                log_message("Detectada tela de seleção de módulos - navegando para módulo de faturamento...", "INFO")
-                try:
-                    modulo_link = wait.until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, "a[href='/site/trocarModulo?modulo=2']")))
-                    modulo_link.click()
-                    time.sleep(2)
-                    log_message("✅ Navegação para módulo de faturamento realizada", "SUCCESS")
-                except Exception as e:
-                    log_message(f"⚠️ Erro ao navegar para módulo: {e}", "WARNING")
-                    driver.get("https://dap.pathoweb.com.br/moduloFaturamento/index")
-                    time.sleep(2)
-
-            elif "moduloFaturamento" in current_url:
-                log_message("✅ Já está no módulo de faturamento - pulando navegação", "SUCCESS")
-            else:
-                log_message(f"⚠️ URL inesperada detectada: {current_url}", "WARNING")
-                driver.get("https://dap.pathoweb.com.br/moduloFaturamento/index")
-                time.sleep(2)
-
-            try:
-                modal_close_button = driver.find_element(By.CSS_SELECTOR,
-                                                         "#mensagemParaClienteModal .modal-footer button")
-                if modal_close_button.is_displayed():
-                    modal_close_button.click()
-                    time.sleep(1)
-            except Exception:
-                pass
+            login_pathoweb(driver, username, password, modulo=2, url=url)
 
             wait.until(EC.element_to_be_clickable((
                 By.XPATH, "//a[contains(@class, 'setupAjax') and contains(text(), 'Preparar exames para fatura')]"
@@ -717,7 +692,7 @@ class PreparacaoLoteMultiploModule(BaseModule):
             log_message(f"❌ Erro durante a automação: {e}", "ERROR")
             messagebox.showerror("Erro", f"❌ Erro durante a automação:\n{e}")
         finally:
-            driver.quit()
+            BrowserFactory.release_chrome(driver)
 
 
 def run(params: dict):
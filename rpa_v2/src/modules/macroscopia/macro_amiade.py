@@ -7,11 +7,13 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
 from dotenv import load_dotenv
-from openpyxl import load_workbook
 
 from src.core.browser_factory import BrowserFactory
 from src.core.logger import log_message
+from src.core.session_manager import login_pathoweb
+from src.core.waits import aguardar, aguardar_ajax, aguardar_modal_fechado, aguardar_pagina_pronta, aguardar_spinner, dormir
 from src.modules.base import BaseModule
+from src.utils.planilha import ler_registros
 
 load_dotenv()
 
@@ -22,61 +24,37 @@ class MacroAmiadeModule(BaseModule):
 
     def get_dados_exames(self, file_path: str) -> list:
         try:
-            workbook = load_workbook(file_path)
-            sheet = workbook.active
             dados = []
             ultima_mascara = None
             data_fixacao = None
             macroscopista_valor = None
             frag_ade_valor = None
 
-            # Ler cabeçalho (linha 1) e criar mapeamento de colunas
-            colunas = {}
-            for col_idx in range(1, sheet.max_column + 1):
-                cell_value = sheet.cell(row=1, column=col_idx).value
-                if cell_value:
-                    nome_coluna = str(cell_value).strip().lower()
-                    colunas[nome_coluna] = col_idx
-
-            log_message(f"📋 Colunas detectadas: {list(colunas.keys())}", "INFO")
-
-            def encontrar_coluna(nomes_possiveis):
-                """Encontra a coluna baseado em uma lista de nomes possíveis"""
-                for nome in nomes_possiveis:
-                    for coluna_nome, col_idx in colunas.items():
-                        if nome.lower() in coluna_nome:
-                            return col_idx
-                return None
-
-            # Encontrar índices das colunas
-            col_data = encontrar_coluna(['data', 'data fixacao', 'data fixação', 'datafixacao'])
-            col_num_exame = encontrar_coluna(['num_exame', 'numero', 'número', 'codigo', 'código', 'cod'])
-            col_mascara = encontrar_coluna(['mascara', 'máscara', 'mask'])
-            col_macroscopista = encontrar_coluna(['macroscopista', 'responsavel', 'responsável', 'resp'])
-            col_amg_maior = encontrar_coluna(['amg>', 'amg maior'])
-            col_amg_menor = encontrar_coluna(['amg<', 'amg menor'])
-            col_frag_ade = encontrar_coluna(['frag ade', 'fragade', 'frag_ade'])
-            col_ade = encontrar_coluna(['med ade', 'medade', 'med_ade'])
-            col_legenda = encontrar_coluna(['legenda', 'leg'])
-
-            # Validar colunas obrigatórias
-            if not col_num_exame:
-                raise Exception("Coluna de número do exame não encontrada!")
-
-            log_message(f"✅ Mapeamento: Num_Exame=col{col_num_exame}, Máscara=col{col_mascara}, Data=col{col_data}",
-                        "INFO")
+            # Colunas localizadas pelo cabeçalho (linha 1)
+            colunas = {
+                "data": ['data', 'data fixacao', 'data fixação', 'datafixacao'],
+                "num_exame": ['num_exame', 'numero', 'número', 'codigo', 'código', 'cod'],
+                "mascara": ['mascara', 'máscara', 'mask'],
+                "macroscopista": ['macroscopista', 'responsavel', 'responsável', 'resp'],
+                "amg_maior": ['amg>', 'amg maior'],
+                "amg_menor": ['amg<', 'amg menor'],
+                "frag_ade": ['frag ade', 'fragade', 'frag_ade'],
+                "ade": ['med ade', 'medade', 'med_ade'],
+                "legenda": ['legenda', 'leg'],
+            }
 
             # Lê da linha 2 em diante (linha 1 é cabeçalho)
-            for row in range(2, sheet.max_row + 1):
-                data = sheet.cell(row=row, column=col_data).value if col_data else None
-                num_exame = sheet.cell(row=row, column=col_num_exame).value if col_num_exame else None
-                mascara = sheet.cell(row=row, column=col_mascara).value if col_mascara else None
-                macroscopista = sheet.cell(row=row, column=col_macroscopista).value if col_macroscopista else None
-                amg_maior = sheet.cell(row=row, column=col_amg_maior).value if col_amg_maior else None
-                amg_menor = sheet.cell(row=row, column=col_amg_menor).value if col_amg_menor else None
-                frag_ade = sheet.cell(row=row, column=col_frag_ade).value if col_frag_ade else None
-                ade = sheet.cell(row=row, column=col_ade).value if col_ade else None
-                legenda = sheet.cell(row=row, column=col_legenda).value if col_legenda else None
+            for registro in ler_registros(file_path, colunas, obrigatorias=("num_exame",), mostrar_mapeamento=True):
+                row = registro["_linha"]
+                data = registro["data"]
+                num_exame = registro["num_exame"]
+                mascara = registro["mascara"]
+                macroscopista = registro["macroscopista"]
+                amg_maior = registro["amg_maior"]
+                amg_menor = registro["amg_menor"]
+                frag_ade = registro["frag_ade"]
+                ade = registro["ade"]
+                legenda = registro["legenda"]
 
                 if row == 2 and data:
                     data_fixacao = str(data).strip()
@@ -119,7 +97,6 @@ class MacroAmiadeModule(BaseModule):
                         'data_fixacao': data_fixacao
                     })
 
-            workbook.close()
             return dados
         except Exception as e:
             raise Exception(f"Erro ao ler planilha: {e}")
@@ -177,67 +154,32 @@ class MacroAmiadeModule(BaseModule):
             return True
 
     def aguardar_pagina_estavel(self, driver, wait, timeout=10):
-        """Aguarda até que a página esteja estável (sem animações ou carregamentos)"""
-        try:
-            driver.execute_script("""
-                return new Promise((resolve) => {
-                    if (window.jQuery && window.jQuery.active === 0) {
-                        resolve();
-                        return;
-                    }
-
-                    var checkInterval = setInterval(() => {
-                        if (window.jQuery && window.jQuery.active === 0) {
-                            clearInterval(checkInterval);
-                            resolve();
-                        }
-                    }, 100);
-
-                    setTimeout(() => {
-                        clearInterval(checkInterval);
-                        resolve();
-                    }, arguments[0]);
-                });
-            """, timeout * 1000)
-
-            time.sleep(0.5)
+        """Aguarda até que a página esteja estável (sem AJAX em andamento nem spinner visível)"""
+        if aguardar_pagina_pronta(driver, timeout=timeout):
             log_message("✅ Página estável", "INFO")
-
-        except Exception as e:
-            log_message(f"⚠️ Erro ao aguardar página estável: {e}", "WARNING")
-            time.sleep(1)
+        else:
+            log_message("⚠️ Página não estabilizou no tempo esperado", "WARNING")
 
     def aguardar_spinner_desaparecer(self, driver, wait, timeout=30):
         """Aguarda até que o spinner de loading desapareça"""
-        try:
-            log_message("⏳ Aguardando spinner desaparecer...", "INFO")
-            wait.until(EC.invisibility_of_element_located((By.ID, "spinner")))
-            time.sleep(1)
-
-            spinners = driver.find_elements(By.CSS_SELECTOR, ".loadModal, .spinner, [class*='loading']")
-            for spinner in spinners:
-                if spinner.is_displayed():
-                    log_message("⚠️ Outro spinner ainda visível, aguardando...", "WARNING")
-                    time.sleep(2)
-                    break
-
+        log_message("⏳ Aguardando spinner desaparecer...", "INFO")
+        if aguardar_spinner(driver, timeout=timeout, seletor="#spinner, .loadModal, .spinner, [class*='loading']"):
             log_message("✅ Spinner desapareceu", "SUCCESS")
+            return
 
-        except Exception as e:
-            log_message(f"⚠️ Erro ao aguardar spinner: {e}", "WARNING")
-            try:
-                driver.execute_script("""
-                    var spinners = document.querySelectorAll('.loadModal, .spinner, [class*="loading"]');
-                    spinners.forEach(function(spinner) {
-                        if (spinner.style.display !== 'none') {
-                            spinner.style.display = 'none';
-                        }
-                    });
-                """)
-                log_message("🔧 Spinner fechado via JavaScript", "INFO")
-                time.sleep(1)
-            except:
-                pass
+        # Tentar fechar o spinner via JavaScript se necessário
+        try:
+            driver.execute_script("""
+                var spinners = document.querySelectorAll('.loadModal, .spinner, [class*="loading"]');
+                spinners.forEach(function(spinner) {
+                    if (spinner.style.display !== 'none') {
+                        spinner.style.display = 'none';
+                    }
+                });
+            """)
+            log_message("🔧 Spinner fechado via JavaScript", "INFO")
+        except:
+            pass
 
     def selecionar_responsavel_macroscopia(self, driver, wait, responsavel_macro):
         """Seleciona o responsável pela macroscopia conforme o nome recebido (nome curto)"""
@@ -260,14 +202,13 @@ class MacroAmiadeModule(BaseModule):
                 (By.XPATH, "//span[@aria-labelledby='select2-responsavelMacroscopiaId-container']"))
         )
         select2_container.click()
-        time.sleep(0.3)
 
         opcao = wait.until(
             EC.element_to_be_clickable((By.XPATH, f"//li[contains(text(), '{nome_completo}')]"))
         )
         opcao.click()
         log_message(f"✅ {nome_completo} selecionado como responsável", "SUCCESS")
-        time.sleep(0.2)
+        aguardar_ajax(driver, timeout=5)
 
     def definir_data_fixacao(self, driver, wait, data_fixacao=None):
         """Define a data de fixação no campo de data de fixação"""
@@ -289,7 +230,6 @@ class MacroAmiadeModule(BaseModule):
                 campo.dispatchEvent(new Event('change', { bubbles: true }));
             """, campo_data, data_formatada)
             log_message(f"📅 Data de fixação definida para: {data_formatada}", "SUCCESS")
-            time.sleep(0.1)
         except Exception as e:
             log_message(f"⚠️ Erro ao definir data de fixação: {e}", "WARNING")
 
@@ -301,7 +241,6 @@ class MacroAmiadeModule(BaseModule):
         campo_hora.clear()
         campo_hora.send_keys("18:00")
         log_message("🕕 Hora de fixação definida para: 18:00", "SUCCESS")
-        time.sleep(0.1)
 
     def fechar_exame(self, driver, wait):
         """Clica no botão de fechar exame"""
@@ -322,9 +261,9 @@ class MacroAmiadeModule(BaseModule):
                     if "modulo=1" not in current_url:
                         modulo_link = driver.find_element(By.CSS_SELECTOR, "a[href='/site/trocarModulo?modulo=1']")
                         modulo_link.click()
-                        time.sleep(1.5)
+                        aguardar_pagina_pronta(driver)
                         log_message("🔄 Navegou de volta ao módulo de exames", "INFO")
-                except:
+                except Exception:
                     pass
 
         except Exception as e:
@@ -336,7 +275,7 @@ class MacroAmiadeModule(BaseModule):
         campo_busca.send_keys(mascara)
         campo_busca.send_keys(Keys.ENTER)
         log_message(f"✍️ Máscara '{mascara}' digitada no campo buscaArvore", "SUCCESS")
-        time.sleep(0.5)
+        aguardar_ajax(driver, timeout=5)
 
     def abrir_modal_variaveis_e_preencher(self, driver, wait, mascara, amg_maior, amg_menor, frag_ade, ade, legenda, legenda_original):
         """Abre o modal de variáveis e preenche os campos baseado na máscara AMIADE"""
@@ -347,7 +286,7 @@ class MacroAmiadeModule(BaseModule):
             )
             botao_variaveis.click()
             log_message("🔍 Clicou no botão de variáveis", "INFO")
-            time.sleep(0.8)
+            aguardar(driver, lambda d: EC.alert_is_present()(d) or d.find_elements(By.CLASS_NAME, "swal2-popup"), timeout=3, nome="variaveis")
 
             # Verificar se apareceu um alerta
             try:
@@ -366,7 +305,7 @@ class MacroAmiadeModule(BaseModule):
             # Aguardar o modal aparecer
             wait.until(EC.presence_of_element_located((By.CLASS_NAME, "swal2-popup")))
             log_message("🔍 Modal de variáveis aberto", "SUCCESS")
-            time.sleep(0.3)
+            aguardar(driver, lambda d: d.find_elements(By.CSS_SELECTOR, "input[style*='width: 100px'][style*='color: red']"), timeout=3, nome="campos_variaveis")
 
             # Preencher os campos usando classe genérica
             campos_input = driver.find_elements(By.CSS_SELECTOR, "input[style*='width: 100px'][style*='color: red']")
@@ -405,9 +344,8 @@ class MacroAmiadeModule(BaseModule):
             for i, campo in enumerate(campos_input[:len(valores)]):
                 if i < len(valores) and valores[i]:
                     try:
-                        driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});",
+                        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});",
                                               campo)
-                        time.sleep(0.1)
 
                         driver.execute_script("""
                             arguments[0].value = '';
@@ -417,11 +355,9 @@ class MacroAmiadeModule(BaseModule):
                         """, campo, valores[i])
 
                         log_message(f"✅ Campo {i + 1} preenchido com: {valores[i]}", "SUCCESS")
-                        time.sleep(0.1)
                     except Exception as e:
                         log_message(f"⚠️ Erro ao preencher campo {i + 1}: {e}", "WARNING")
 
-            time.sleep(0.2)
 
             # Clicar no botão "Inserir"
             botao_inserir = wait.until(
@@ -435,7 +371,7 @@ class MacroAmiadeModule(BaseModule):
                 wait.until(EC.invisibility_of_element_located((By.CLASS_NAME, "swal2-popup")))
                 log_message("✅ Modal fechado completamente", "SUCCESS")
             except:
-                time.sleep(1)
+                aguardar_modal_fechado(driver, ".swal2-container", timeout=5)
                 log_message("⏳ Aguardou fechamento do modal", "INFO")
 
         except Exception as e:
@@ -449,8 +385,8 @@ class MacroAmiadeModule(BaseModule):
             if modal.is_displayed():
                 botao_fechar = driver.find_element(By.CSS_SELECTOR, ".swal2-close")
                 botao_fechar.click()
-                time.sleep(0.5)
-        except:
+                aguardar_modal_fechado(driver, ".swal2-container", timeout=3)
+        except Exception:
             pass
 
         botao_salvar = wait.until(
@@ -458,7 +394,7 @@ class MacroAmiadeModule(BaseModule):
         )
         botao_salvar.click()
         log_message("💾 Macroscopia salva", "SUCCESS")
-        time.sleep(0.3)
+        aguardar_pagina_pronta(driver)
 
     def definir_grupo(self, driver, wait):
         """Define o grupo como 'Seios da Face' usando JavaScript com retry"""
@@ -503,13 +439,12 @@ class MacroAmiadeModule(BaseModule):
 
                     if not campo_grupo_ancora:
                         log_message(f"⚠️ Âncora de grupo não encontrada na tentativa {tentativa}", "WARNING")
-                        time.sleep(0.5)
+                        dormir(0.5)
                         continue
 
                     # Scroll até o elemento e aguardar
-                    driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});",
+                    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});",
                                           campo_grupo_ancora)
-                    time.sleep(0.3)
 
                     # Clicar usando diferentes métodos
                     try:
@@ -521,7 +456,7 @@ class MacroAmiadeModule(BaseModule):
                         campo_grupo_ancora.click()
                         log_message(f"🖱️ Clicou na âncora via Selenium (tentativa {tentativa})", "INFO")
 
-                    time.sleep(0.5)
+                    aguardar(driver, lambda d: d.find_element(By.ID, "idRegiao").is_displayed(), timeout=3, nome="input_grupo")
 
                     # Validar se o input ficou visível após o clique
                     input_grupo = driver.find_element(By.ID, "idRegiao")
@@ -533,7 +468,7 @@ class MacroAmiadeModule(BaseModule):
 
                     if not is_visible:
                         log_message(f"⚠️ Input ainda não está visível após clique (tentativa {tentativa})", "WARNING")
-                        time.sleep(0.3)
+                        dormir(0.3)
                         continue
 
                     log_message(f"✅ Input de grupo está visível e pronto para preenchimento", "SUCCESS")
@@ -550,7 +485,6 @@ class MacroAmiadeModule(BaseModule):
                     """, input_grupo, grupo_selecionado)
 
                     log_message(f"✅ Grupo '{grupo_selecionado}' preenchido no campo", "SUCCESS")
-                    time.sleep(0.5)
 
                     # Tentar selecionar da lista de autocomplete
                     try:
@@ -567,7 +501,7 @@ class MacroAmiadeModule(BaseModule):
                         )
                         opcao_autocomplete.click()
                         log_message(f"✅ Opção '{grupo_selecionado}' selecionada do autocomplete", "SUCCESS")
-                        time.sleep(0.3)
+                        aguardar_ajax(driver, timeout=5)
 
                         # Validar se o valor foi realmente preenchido
                         valor_final = input_grupo.get_attribute("value")
@@ -585,22 +519,22 @@ class MacroAmiadeModule(BaseModule):
                         # Tentar confirmar com Enter
                         try:
                             input_grupo.send_keys(Keys.ENTER)
-                            time.sleep(0.3)
+                            aguardar_ajax(driver, timeout=5)
                             log_message("✅ Confirmado com Enter", "SUCCESS")
 
                             # Validar se o valor foi preenchido
                             valor_final = input_grupo.get_attribute("value")
                             if valor_final == grupo_selecionado:
                                 return
-                        except:
+                        except Exception:
                             # Clicar fora para fechar o dropdown
                             driver.execute_script("document.body.click();")
-                            time.sleep(0.3)
+                            aguardar_ajax(driver, timeout=5)
                         continue
 
                 except Exception as e:
                     log_message(f"⚠️ Erro na tentativa {tentativa}: {e}", "WARNING")
-                    time.sleep(0.5)
+                    dormir(0.5)
                     continue
 
             # Se chegou aqui, esgotou todas as tentativas
@@ -688,7 +622,6 @@ class MacroAmiadeModule(BaseModule):
             # Clicar via JavaScript
             driver.execute_script("arguments[0].click();", campo_representacao)
             log_message("🔍 Clicou no campo de representação via JS", "INFO")
-            time.sleep(0.5)
 
             # Aguardar o select aparecer e selecionar via JavaScript
             select_representacao = wait.until(
@@ -702,11 +635,10 @@ class MacroAmiadeModule(BaseModule):
             """, select_representacao)
 
             log_message("✅ Representação definida como 'Seção' via JS", "SUCCESS")
-            time.sleep(0.5)
 
             # Clicar fora para confirmar a seleção
             driver.execute_script("document.body.click();")
-            time.sleep(0.3)
+            aguardar_ajax(driver, timeout=5)
 
         except Exception as e:
             log_message(f"⚠️ Erro ao definir representação: {e}", "WARNING")
@@ -774,7 +706,6 @@ class MacroAmiadeModule(BaseModule):
                 # Clicar na âncora para abrir o campo de edição
                 driver.execute_script("arguments[0].click();", campo_regiao)
                 log_message("🔍 Clicou no campo de região para editar", "INFO")
-                time.sleep(0.5)
 
                 # Aguardar o input ficar visível e preencher
                 try:
@@ -791,11 +722,10 @@ class MacroAmiadeModule(BaseModule):
                                 """, input_regiao, regiao_valor)
 
                     log_message(f"✍️ Definiu região como '{regiao_valor}' via JS", "SUCCESS")
-                    time.sleep(0.5)
 
                     # Clicar fora para confirmar a edição
                     driver.execute_script("document.body.click();")
-                    time.sleep(0.5)
+                    aguardar_ajax(driver, timeout=5)
 
                     # Verificar se o valor foi realmente definido
                     valor_definido = input_regiao.get_attribute("value")
@@ -858,7 +788,6 @@ class MacroAmiadeModule(BaseModule):
                 # Clicar na âncora para abrir o campo
                 driver.execute_script("arguments[0].click();", campo_quantidade)
                 log_message("🔍 Clicou no campo de quantidade para editar", "INFO")
-                time.sleep(0.5)
 
                 # Aguardar o input ficar visível e preencher
                 try:
@@ -875,11 +804,10 @@ class MacroAmiadeModule(BaseModule):
                     """, input_quantidade, quantidade_valor)
 
                     log_message(f"✍️ Definiu quantidade como '{quantidade_valor}' via JS", "SUCCESS")
-                    time.sleep(0.5)
 
                     # Clicar fora para confirmar a edição
                     driver.execute_script("document.body.click();")
-                    time.sleep(0.3)
+                    aguardar_ajax(driver, timeout=5)
 
                     # Verificar se o valor foi definido
                     valor_definido = input_quantidade.get_attribute("value")
@@ -937,7 +865,6 @@ class MacroAmiadeModule(BaseModule):
                 # Clicar na âncora para abrir o campo
                 driver.execute_script("arguments[0].click();", campo_blocos)
                 log_message("🔍 Clicou no campo de quantidade de blocos para editar", "INFO")
-                time.sleep(0.5)
 
                 # Aguardar o input ficar visível e preencher
                 try:
@@ -954,11 +881,10 @@ class MacroAmiadeModule(BaseModule):
                     """, input_blocos)
 
                     log_message("✍️ Definiu quantidade de blocos como '1' via JS", "SUCCESS")
-                    time.sleep(0.5)
 
                     # Clicar fora para confirmar a edição
                     driver.execute_script("document.body.click();")
-                    time.sleep(0.3)
+                    aguardar_ajax(driver, timeout=5)
 
                     # Verificar se o valor foi definido
                     valor_definido = input_blocos.get_attribute("value")
@@ -991,9 +917,8 @@ class MacroAmiadeModule(BaseModule):
                 return
 
             # Rolar até o botão para garantir visibilidade
-            driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});",
+            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});",
                                   botao_salvar_fragmentos)
-            time.sleep(0.5)
 
             # Clicar no botão
             botao_salvar_fragmentos.click()
@@ -1010,14 +935,13 @@ class MacroAmiadeModule(BaseModule):
                 botao_titulo = wait.until(
                     EC.element_to_be_clickable((By.XPATH, "//a[@title='Salvar' and contains(@class, 'btn-primary')]"))
                 )
-                driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});",
+                driver.execute_script("arguments[0].scrollIntoView({block: 'center'});",
                                       botao_titulo)
-                time.sleep(0.5)
                 botao_titulo.click()
                 log_message("💾 Clicou em Salvar fragmentos (por título)", "SUCCESS")
                 self.aguardar_spinner_desaparecer(driver, wait, timeout=15)
                 return
-            except:
+            except Exception:
                 pass
 
             try:
@@ -1026,14 +950,13 @@ class MacroAmiadeModule(BaseModule):
                     EC.element_to_be_clickable(
                         (By.XPATH, "//a[contains(@class, 'btn-primary') and contains(text(), 'Salvar')]"))
                 )
-                driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});",
+                driver.execute_script("arguments[0].scrollIntoView({block: 'center'});",
                                       botao_texto)
-                time.sleep(0.5)
                 botao_texto.click()
                 log_message("💾 Clicou em Salvar fragmentos (por texto)", "SUCCESS")
                 self.aguardar_spinner_desaparecer(driver, wait, timeout=15)
                 return
-            except:
+            except Exception:
                 pass
 
             log_message(f"❌ Não foi possível encontrar o botão Salvar fragmentos: {e}", "ERROR")
@@ -1110,7 +1033,7 @@ class MacroAmiadeModule(BaseModule):
                 botao_enviar.click()
                 log_message("➡️ Clicou em Enviar para próxima etapa", "INFO")
 
-            time.sleep(2)
+            aguardar_pagina_pronta(driver, timeout=30)
 
             # Verificar modal de assinatura
             try:
@@ -1161,21 +1084,19 @@ class MacroAmiadeModule(BaseModule):
             )
             checkbox_george.click()
             log_message("✅ Checkbox do Dr. George marcado", "INFO")
-            time.sleep(1)
 
             campo_senha = wait.until(
                 EC.presence_of_element_located((By.NAME, "senha_2173"))
             )
             campo_senha.send_keys("1323")
             log_message("🔐 Senha digitada", "INFO")
-            time.sleep(1)
 
             botao_assinar = wait.until(
                 EC.element_to_be_clickable((By.ID, "salvarAss"))
             )
             botao_assinar.click()
             log_message("✍️ Clicou em Assinar", "INFO")
-            time.sleep(1.5)
+            aguardar_modal_fechado(driver, "#assinatura", timeout=15)
 
         except Exception as e:
             log_message(f"Erro no processo de assinatura: {e}", "ERROR")
@@ -1233,8 +1154,8 @@ class MacroAmiadeModule(BaseModule):
         try:
             wait.until(EC.presence_of_element_located((By.ID, "divAndamentoExame")))
             log_message("📋 Div de andamento do exame encontrada!", "SUCCESS")
-            time.sleep(0.5)
-        except:
+            aguardar_pagina_pronta(driver)
+        except Exception:
             log_message("⚠️ Div de andamento não apareceu no tempo esperado", "WARNING")
             return {'status': 'sem_andamento', 'detalhes': 'Exame não encontrado ou não carregou'}
 
@@ -1356,61 +1277,13 @@ class MacroAmiadeModule(BaseModule):
         resultados = []
 
         try:
-            driver = BrowserFactory.create_chrome(headless=headless_mode)
+            driver = BrowserFactory.acquire_chrome(headless=headless_mode)
             wait = WebDriverWait(driver, 10)
 
             log_message("Iniciando automação de macroscopia amiade...", "INFO")
 
             # Login
-            log_message("Fazendo login...", "INFO")
-            driver.get(url)
-
-            wait.until(EC.presence_of_element_located((By.ID, "username")))
-
-            username_field = driver.find_element(By.ID, "username")
-            username_field.clear()
-            username_field.send_keys(username)
-
-            password_field = driver.find_element(By.ID, "password")
-            password_field.clear()
-            password_field.send_keys(password)
-
-            submit_button = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
-            submit_button.click()
-
-            log_message("Verificando se precisa navegar para módulo de exames...", "INFO")
-            current_url = driver.current_url
-
-            if current_url == "https://dap.pathoweb.com.br/" or "trocarModulo" in current_url:
-                log_message("Detectada tela de seleção de módulos - navegando para módulo de exames...", "INFO")
-                try:
-                    modulo_link = wait.until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, "a[href='/site/trocarModulo?modulo=1']")))
-                    modulo_link.click()
-                    time.sleep(2)
-                    log_message("✅ Navegou para o módulo de exames", "SUCCESS")
-                except Exception as e:
-                    log_message(f"⚠️ Erro ao navegar para módulo: {e}", "WARNING")
-                    driver.get("https://dap.pathoweb.com.br/moduloExame/index")
-                    time.sleep(2)
-
-            elif "moduloExame" in current_url:
-                log_message("✅ Já está no módulo de exames - pulando navegação", "SUCCESS")
-            else:
-                log_message(f"⚠️ URL inesperada detectada: {current_url}", "WARNING")
-                driver.get("https://dap.pathoweb.com.br/moduloExame/index")
-                time.sleep(2)
-                log_message("🔄 Navegação direta para módulo realizada (fallback)", "INFO")
-
-            # Fechar modal se aparecer
-            try:
-                modal_close_button = driver.find_element(By.CSS_SELECTOR,
-                                                         "#mensagemParaClienteModal .modal-footer button")
-                if modal_close_button.is_displayed():
-                    modal_close_button.click()
-                    time.sleep(0.5)
-            except Exception:
-                pass
+            login_pathoweb(driver, username, password, modulo=1, url=url)
 
             log_message("✅ Login realizado com sucesso. Iniciando processamento dos exames.", "SUCCESS")
 
@@ -1455,7 +1328,7 @@ class MacroAmiadeModule(BaseModule):
         finally:
             if driver:
                 try:
-                    driver.quit()
+                    BrowserFactory.release_chrome(driver)
                     log_message("✅ Browser fechado com sucesso", "SUCCESS")
                 except Exception as quit_error:
                     log_message(f"⚠️ Erro ao fechar browser: {quit_error}", "WARNING")
@@ -1,5 +1,4 @@
 import os
-import time
 from tkinter import messagebox
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
@@ -8,11 +7,15 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
 from selenium.webdriver.common.action_chains import ActionChains
 from dotenv import load_dotenv
-from openpyxl import load_workbook
 
 from src.core.browser_factory import BrowserFactory
+from src.core import progresso
 from src.core.logger import log_message
+from src.core.parallel_executor import ExecutorParalelo
+from src.core.session_manager import login_pathoweb
+from src.core.waits import aguardar, aguardar_ajax, aguardar_modal_fechado, aguardar_pagina_pronta, aguardar_spinner, dormir
 from src.modules.base import BaseModule
+from src.utils.planilha import ler_registros
 
 load_dotenv()
 
@@ -22,72 +25,42 @@ class MacroGastricaModule(BaseModule):
 
     def get_dados_exames(self, file_path: str) -> list:
         try:
-            workbook = load_workbook(file_path)
-            sheet = workbook.active
             dados = []
             ultima_mascara = None
             data_fixacao = None
             responsavel_macro_valor = None
 
-            # Ler cabeçalho (linha 1) e criar mapeamento de colunas
-            colunas = {}
-            for col_idx in range(1, sheet.max_column + 1):
-                cell_value = sheet.cell(row=1, column=col_idx).value
-                if cell_value:
-                    # Normalizar nome da coluna (minúsculo, sem espaços extras)
-                    nome_coluna = str(cell_value).strip().lower()
-                    colunas[nome_coluna] = col_idx
-            
-            log_message(f"📋 Colunas detectadas: {list(colunas.keys())}", "INFO")
-            
-            # Mapear nomes possíveis para cada campo (flexível)
-            def encontrar_coluna(nomes_possiveis):
-                """Encontra a coluna baseado em uma lista de nomes possíveis"""
-                for nome in nomes_possiveis:
-                    for coluna_nome, col_idx in colunas.items():
-                        if nome.lower() in coluna_nome:
-                            return col_idx
-                return None
-            
-            # Encontrar índices das colunas
-            col_codigo = encontrar_coluna(['codigo', 'código', 'cod', 'num_exame', 'numero', 'número'])
-            col_mascara = encontrar_coluna(['mascara', 'máscara', 'mask'])
-            col_responsavel = encontrar_coluna(['responsavel', 'responsável', 'resp', 'macroscopista'])
-            col_qtd_frag = encontrar_coluna(['qtd_frag', 'qtd frag', 'fragmentos', 'quantidade', 'qtd'])
-            col_qtd_frag2 = encontrar_coluna(['qtd_frag_2', 'qtd frag 2', 'fragmentos2', 'quantidade2', 'qtd2'])
-            col_md1 = encontrar_coluna(['md1', 'medida 1', 'med1', 'medida1', 'campo e', 'e'])
-            col_md2 = encontrar_coluna(['md2', 'medida 2', 'med2', 'medida2', 'campo f', 'f'])
-            col_md3 = encontrar_coluna(['md3', 'medida 3', 'med3', 'medida3', 'campo g', 'g'])
-            col_md4 = encontrar_coluna(['md4', 'medida 4', 'med4', 'medida4'])
-            col_md5 = encontrar_coluna(['md5', 'medida 5', 'med5', 'medida5'])
-            col_md6 = encontrar_coluna(['md6', 'medida 6', 'med6', 'medida6'])
-            col_data = encontrar_coluna(['data', 'data fixacao', 'data fixação', 'datafixacao'])
-            
-            # Validar colunas obrigatórias
-            if not col_codigo:
-                raise Exception("Coluna de código não encontrada! Use um nome como 'Código' ou 'Codigo'")
-            
-            log_message(
-                f"✅ Mapeamento: Código=col{col_codigo}, Máscara=col{col_mascara}, Data=col{col_data}, "
-                f"QtdFrag=col{col_qtd_frag}, QtdFrag2=col{col_qtd_frag2}, "
-                f"Md1=col{col_md1}, Md2=col{col_md2}, Md3=col{col_md3}, Md4=col{col_md4}, Md5=col{col_md5}, Md6=col{col_md6}",
-                "INFO"
-            )
+            # Colunas localizadas pelo cabeçalho (linha 1)
+            colunas = {
+                "codigo": ['codigo', 'código', 'cod', 'num_exame', 'numero', 'número'],
+                "mascara": ['mascara', 'máscara', 'mask'],
+                "responsavel": ['responsavel', 'responsável', 'resp', 'macroscopista'],
+                "qtd_frag": ['qtd_frag', 'qtd frag', 'fragmentos', 'quantidade', 'qtd'],
+                "qtd_frag2": ['qtd_frag_2', 'qtd frag 2', 'fragmentos2', 'quantidade2', 'qtd2'],
+                "md1": ['md1', 'medida 1', 'med1', 'medida1', 'campo e', 'e'],
+                "md2": ['md2', 'medida 2', 'med2', 'medida2', 'campo f', 'f'],
+                "md3": ['md3', 'medida 3', 'med3', 'medida3', 'campo g', 'g'],
+                "md4": ['md4', 'medida 4', 'med4', 'medida4'],
+                "md5": ['md5', 'medida 5', 'med5', 'medida5'],
+                "md6": ['md6', 'medida 6', 'med6', 'medida6'],
+                "data": ['data', 'data fixacao', 'data fixação', 'datafixacao'],
+            }
 
             # Lê da linha 2 em diante (linha 1 é cabeçalho)
-            for row in range(2, sheet.max_row + 1):
-                codigo = sheet.cell(row=row, column=col_codigo).value if col_codigo else None
-                mascara = sheet.cell(row=row, column=col_mascara).value if col_mascara else None
-                responsavel_macro = sheet.cell(row=row, column=col_responsavel).value if col_responsavel else None
-                qtd_frag = sheet.cell(row=row, column=col_qtd_frag).value if col_qtd_frag else None
-                md1 = sheet.cell(row=row, column=col_md1).value if col_md1 else None
-                md2 = sheet.cell(row=row, column=col_md2).value if col_md2 else None
-                md3 = sheet.cell(row=row, column=col_md3).value if col_md3 else None
-                qtd_frag2 = sheet.cell(row=row, column=col_qtd_frag2).value if col_qtd_frag2 else None
-                md4 = sheet.cell(row=row, column=col_md4).value if col_md4 else None
-                md5 = sheet.cell(row=row, column=col_md5).value if col_md5 else None
-                md6 = sheet.cell(row=row, column=col_md6).value if col_md6 else None
-                data_col = sheet.cell(row=row, column=col_data).value if col_data else None
+            for registro in ler_registros(file_path, colunas, obrigatorias=("codigo",), mostrar_mapeamento=True):
+                row = registro["_linha"]
+                codigo = registro["codigo"]
+                mascara = registro["mascara"]
+                responsavel_macro = registro["responsavel"]
+                qtd_frag = registro["qtd_frag"]
+                md1 = registro["md1"]
+                md2 = registro["md2"]
+                md3 = registro["md3"]
+                qtd_frag2 = registro["qtd_frag2"]
+                md4 = registro["md4"]
+                md5 = registro["md5"]
+                md6 = registro["md6"]
+                data_col = registro["data"]
 
                 if row == 2 and data_col:
                     data_fixacao = str(data_col).strip()
@@ -135,7 +108,6 @@ class MacroGastricaModule(BaseModule):
                         'md6': str(md6).strip() if md6 is not None else "",
                         'data_fixacao': data_fixacao
                     })
-            workbook.close()
             return dados
         except Exception as e:
             raise Exception(f"Erro ao ler planilha: {e}")
@@ -180,83 +152,38 @@ class MacroGastricaModule(BaseModule):
             return False
 
     def aguardar_pagina_estavel(self, driver, wait, timeout=10):
-        """Aguarda até que a página esteja estável (sem animações ou carregamentos)"""
-        try:
-            # Aguardar até que não haja requisições AJAX em andamento
-            driver.execute_script("""
-                return new Promise((resolve) => {
-                    if (window.jQuery && window.jQuery.active === 0) {
-                        resolve();
-                        return;
-                    }
-                    
-                    var checkInterval = setInterval(() => {
-                        if (window.jQuery && window.jQuery.active === 0) {
-                            clearInterval(checkInterval);
-                            resolve();
-                        }
-                    }, 100);
-                    
-                    // Timeout de segurança
-                    setTimeout(() => {
-                        clearInterval(checkInterval);
-                        resolve();
-                    }, arguments[0]);
-                });
-            """, timeout * 1000)
-            
-            # Aguardar um pouco mais para garantir estabilidade
-            time.sleep(0.5)
+        """Aguarda até que a página esteja estável (sem AJAX em andamento nem spinner visível)"""
+        if aguardar_pagina_pronta(driver, timeout=timeout):
             log_message("✅ Página estável", "INFO")
-            
-        except Exception as e:
-            log_message(f"⚠️ Erro ao aguardar página estável: {e}", "WARNING")
-            time.sleep(1)  # Fallback
+        else:
+            log_message("⚠️ Página não estabilizou no tempo esperado", "WARNING")
 
     def aguardar_spinner_desaparecer(self, driver, wait, timeout=30):
         """Aguarda até que o spinner de loading desapareça"""
-        try:
-            log_message("⏳ Aguardando spinner desaparecer...", "INFO")
-            
-            # Aguardar até que o spinner não esteja mais visível
-            wait.until(EC.invisibility_of_element_located((By.ID, "spinner")))
-            
-            # Aguardar um pouco mais para garantir que não há outros spinners
-            time.sleep(1)
-            
-            # Verificar se há outros spinners ou modais de loading
-            spinners = driver.find_elements(By.CSS_SELECTOR, ".loadModal, .spinner, [class*='loading']")
-            for spinner in spinners:
-                if spinner.is_displayed():
-                    log_message("⚠️ Outro spinner ainda visível, aguardando...", "WARNING")
-                    time.sleep(2)
-                    break
-            
+        log_message("⏳ Aguardando spinner desaparecer...", "INFO")
+        if aguardar_spinner(driver, timeout=timeout, seletor="#spinner, .loadModal, .spinner, [class*='loading']"):
             log_message("✅ Spinner desapareceu", "SUCCESS")
-            
-        except Exception as e:
-            log_message(f"⚠️ Erro ao aguardar spinner: {e}", "WARNING")
-            # Tentar fechar o spinner via JavaScript se necessário
-            try:
-                driver.execute_script("""
-                    var spinners = document.querySelectorAll('.loadModal, .spinner, [class*="loading"]');
-                    spinners.forEach(function(spinner) {
-                        if (spinner.style.display !== 'none') {
-                            spinner.style.display = 'none';
-                        }
-                    });
-                """)
-                log_message("🔧 Spinner fechado via JavaScript", "INFO")
-                time.sleep(1)
-            except:
-                pass
+            return
+
+        # Tentar fechar o spinner via JavaScript se necessário
+        try:
+            driver.execute_script("""
+                var spinners = document.querySelectorAll('.loadModal, .spinner, [class*="loading"]');
+                spinners.forEach(function(spinner) {
+                    if (spinner.style.display !== 'none') {
+                        spinner.style.display = 'none';
+                    }
+                });
+            """)
+            log_message("🔧 Spinner fechado via JavaScript", "INFO")
+        except:
+            pass
 
     def clicar_elemento_robusto(self, driver, wait, elemento, nome_elemento="elemento"):
         """Clica em um elemento de forma robusta, lidando com elementos interceptados"""
         try:
             # Rolar até o elemento para garantir visibilidade
-            driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", elemento)
-            time.sleep(1)
+            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", elemento)
             
             # Verificar se há elementos sobrepostos e aguardar eles desaparecerem
             try:
@@ -309,14 +236,13 @@ class MacroGastricaModule(BaseModule):
             EC.element_to_be_clickable((By.XPATH, "//span[@aria-labelledby='select2-responsavelMacroscopiaId-container']"))
         )
         select2_container.click()
-        time.sleep(0.3)
         # Seleciona a opção pelo nome completo
         opcao = wait.until(
             EC.element_to_be_clickable((By.XPATH, f"//li[contains(text(), '{nome_completo}')]") )
         )
         opcao.click()
         log_message(f"✅ {nome_completo} selecionado como responsável", "SUCCESS")
-        time.sleep(0.2)
+        aguardar_ajax(driver, timeout=5)
 
     def selecionar_auxiliar_macroscopia(self, driver, wait):
         """Seleciona 'Renata Silva Sevidanis' como auxiliar da macroscopia"""
@@ -325,7 +251,6 @@ class MacroGastricaModule(BaseModule):
             EC.element_to_be_clickable((By.XPATH, "//span[@aria-labelledby='select2-auxiliarMacroscopiaId-container']"))
         )
         select2_container.click()
-        time.sleep(0.2)
         
         # Aguardar e clicar na opção "Renata Silva Sevidanis"
         opcao_renata = wait.until(
@@ -333,7 +258,7 @@ class MacroGastricaModule(BaseModule):
         )
         opcao_renata.click()
         log_message("✅ Renata Silva Sevidanis selecionada como auxiliar", "SUCCESS")
-        time.sleep(0.2)
+        aguardar_ajax(driver, timeout=5)
 
     def definir_data_fixacao(self, driver, wait, data_fixacao=None):
         """Define a data de fixação no campo de data de fixação"""
@@ -354,7 +279,6 @@ class MacroGastricaModule(BaseModule):
                 campo.dispatchEvent(new Event('change', { bubbles: true }));
             """, campo_data, data_formatada)
             log_message(f"📅 Data de fixação definida para: {data_formatada}", "SUCCESS")
-            time.sleep(0.1)
         except Exception as e:
             log_message(f"⚠️ Erro ao definir data de fixação: {e}", "WARNING")
 
@@ -369,7 +293,6 @@ class MacroGastricaModule(BaseModule):
         campo_hora.clear()
         campo_hora.send_keys("18:00")
         log_message("🕕 Hora de fixação definida para: 18:00", "SUCCESS")
-        time.sleep(0.1)
 
     def fechar_exame(self, driver, wait):
         """Clica no botão de fechar exame"""
@@ -393,9 +316,9 @@ class MacroGastricaModule(BaseModule):
                     if "modulo=1" not in current_url:
                         modulo_link = driver.find_element(By.CSS_SELECTOR, "a[href='/site/trocarModulo?modulo=1']")
                         modulo_link.click()
-                        time.sleep(1.5)
+                        aguardar_pagina_pronta(driver)
                         log_message("🔄 Navegou de volta ao módulo de exames", "INFO")
-                except:
+                except Exception:
                     pass
                     
         except Exception as e:
@@ -428,7 +351,7 @@ class MacroGastricaModule(BaseModule):
         except Exception as e:
             log_message(f"⚠️ Timeout/erro ao aguardar botão Salvar ficar vermelho: {e}", "WARNING")
 
-        time.sleep(1)
+        aguardar_ajax(driver, timeout=5)
 
     def abrir_modal_variaveis_e_preencher(self, driver, wait, mascara, qtd_frag, qtd_frag_original, md1, md2, md3, qtd_frag2, qtd_frag2_original, md4, md5, md6):
         """Abre o modal de variáveis e preenche os campos baseado na máscara.
@@ -448,7 +371,7 @@ class MacroGastricaModule(BaseModule):
                 log_message("🔍 Clicou no botão de variáveis", "INFO")
 
                 # Aguardar um pouco para o sistema processar
-                time.sleep(0.8)
+                aguardar(driver, lambda d: EC.alert_is_present()(d) or d.find_elements(By.CLASS_NAME, "swal2-popup"), timeout=3, nome="variaveis")
 
                 # Verificar se apareceu um alerta
                 try:
@@ -462,7 +385,7 @@ class MacroGastricaModule(BaseModule):
                         if tentativas_alerta == 1:
                             # Primeira vez: tentar novamente após pequena espera
                             log_message("🔁 Tentando abrir o modal de variáveis novamente após alerta de 'não há variáveis'", "INFO")
-                            time.sleep(0.5)
+                            aguardar_ajax(driver, timeout=5)
                             continue  # volta para o while e clica de novo no botão de variáveis
                         else:
                             # Segunda vez ou mais: aceitar e seguir o fluxo normal
@@ -487,7 +410,7 @@ class MacroGastricaModule(BaseModule):
                 log_message("⚠️ Modal de variáveis não foi aberto - seguindo fluxo sem preencher variáveis", "WARNING")
                 return
 
-            time.sleep(0.3)
+            aguardar(driver, lambda d: d.find_elements(By.CSS_SELECTOR, "input[style*='width: 100px'][style*='color: red']"), timeout=3, nome="campos_variaveis")
         
             # Preencher os campos usando classe genérica (IDs podem mudar)
             campos_input = driver.find_elements(By.CSS_SELECTOR, "input[style*='width: 100px'][style*='color: red']")
@@ -572,7 +495,6 @@ class MacroGastricaModule(BaseModule):
                     except Exception as e:
                         log_message(f"⚠️ Erro ao preencher campo {i+1}: {e}", "WARNING")
             
-            time.sleep(0.2)
             
             # Clicar no botão "Inserir"
             botao_inserir = wait.until(
@@ -587,7 +509,7 @@ class MacroGastricaModule(BaseModule):
                 log_message("✅ Modal fechado completamente", "SUCCESS")
             except:
                 # Se não conseguir detectar fechamento, aguardar um tempo fixo
-                time.sleep(1)
+                aguardar_modal_fechado(driver, ".swal2-container", timeout=5)
                 log_message("⏳ Aguardou fechamento do modal", "INFO")
             
         except Exception as e:
@@ -605,12 +527,12 @@ class MacroGastricaModule(BaseModule):
                 try:
                     botao_cancelar = driver.find_element(By.CSS_SELECTOR, ".swal2-cancel")
                     botao_cancelar.click()
-                    time.sleep(0.5)
-                except:
+                    aguardar_modal_fechado(driver, ".swal2-container", timeout=3)
+                except Exception:
                     # Se não conseguir fechar, pressionar ESC
                     driver.find_element(By.TAG_NAME, "body").send_keys(Keys.ESCAPE)
-                    time.sleep(0.5)
-        except:
+                    aguardar_modal_fechado(driver, ".swal2-container", timeout=3)
+        except Exception:
             # Não há modal, continuar normalmente
             pass
         
@@ -620,7 +542,7 @@ class MacroGastricaModule(BaseModule):
         )
         botao_salvar.click()
         log_message("💾 Macroscopia salva", "SUCCESS")
-        time.sleep(0.3)
+        aguardar_pagina_pronta(driver)
 
     def definir_grupo_baseado_mascara(self, driver, wait, mascara):
         """Define o grupo baseado na máscara (Estômago ou Intestino) - versão melhorada com JavaScript."""
@@ -732,7 +654,6 @@ class MacroGastricaModule(BaseModule):
                 # Usar JavaScript para clicar no elemento
                 driver.execute_script("arguments[0].click();", campo_grupo)
                 log_message(f"🔍 Clicou no campo de grupo via JS", "INFO")
-                time.sleep(0.5)
 
                 # Aguardar o campo de input aparecer e preencher via JavaScript
                 input_grupo = wait.until(
@@ -749,9 +670,6 @@ class MacroGastricaModule(BaseModule):
                     arguments[0].dispatchEvent(new Event('change', { bubbles: true }));
                 """, input_grupo, grupo_selecionado)
                 
-                # Aguardar um pouco para o dropdown aparecer e tentar clicar na opção
-                time.sleep(0.5)
-                
                 # Tentar clicar na opção do dropdown com timeout menor
                 try:
                     # Aguardar até 3 segundos pela opção aparecer
@@ -771,7 +689,7 @@ class MacroGastricaModule(BaseModule):
                         driver.execute_script("document.body.click();")
                         log_message(f"🔍 Clicou fora para fechar dropdown de '{grupo_selecionado}'", "INFO")
                 
-                time.sleep(0.5)
+                aguardar_ajax(driver, timeout=5)
             else:
                 log_message("⚠️ Campo de grupo não encontrado ou não visível", "WARNING")
                 
@@ -856,7 +774,6 @@ class MacroGastricaModule(BaseModule):
             # Clicar via JavaScript
             driver.execute_script("arguments[0].click();", campo_representacao)
             log_message("🔍 Clicou no campo de representação via JS", "INFO")
-            time.sleep(0.5)
 
             # Aguardar o select aparecer e selecionar via JavaScript
             select_representacao = wait.until(
@@ -870,11 +787,10 @@ class MacroGastricaModule(BaseModule):
             """, select_representacao)
 
             log_message("✅ Representação definida como 'Seção' via JS", "SUCCESS")
-            time.sleep(0.5)
             
             # Clicar fora para confirmar a seleção
             driver.execute_script("document.body.click();")
-            time.sleep(0.3)
+            aguardar_ajax(driver, timeout=5)
 
         except Exception as e:
             log_message(f"⚠️ Erro ao definir representação: {e}", "WARNING")
@@ -970,7 +886,6 @@ class MacroGastricaModule(BaseModule):
                 # Clicar na âncora para abrir o campo de edição
                 driver.execute_script("arguments[0].click();", campo_regiao)
                 log_message("🔍 Clicou no campo de região para editar", "INFO")
-                time.sleep(0.5)
 
                 # Aguardar o input ficar visível e preencher via JavaScript
                 try:
@@ -986,11 +901,10 @@ class MacroGastricaModule(BaseModule):
                     """, input_regiao, regiao_valor)
                     
                     log_message(f"✍️ Definiu região como '{regiao_valor}' via JS", "SUCCESS")
-                    time.sleep(0.5)
                     
                     # Clicar fora para confirmar a edição
                     driver.execute_script("document.body.click();")
-                    time.sleep(0.5)
+                    aguardar_ajax(driver, timeout=5)
                     
                     # Verificar se o valor foi realmente definido
                     valor_definido = input_regiao.get_attribute("value")
@@ -1124,7 +1038,6 @@ class MacroGastricaModule(BaseModule):
 
         driver.execute_script("arguments[0].click();", campo_regiao)
         log_message("🔍 Clicou no próximo campo de região vazio", "INFO")
-        time.sleep(0.4)
 
         try:
             wait.until(lambda d: input_regiao.is_displayed() or input_regiao.get_attribute("style") != "display: none;")
@@ -1139,9 +1052,8 @@ class MacroGastricaModule(BaseModule):
                 regiao_valor,
             )
             log_message(f"✍️ Região preenchida com '{regiao_valor}'", "SUCCESS")
-            time.sleep(0.3)
             driver.execute_script("document.body.click();")
-            time.sleep(0.3)
+            aguardar_ajax(driver, timeout=5)
         except Exception as e:
             log_message(f"⚠️ Erro ao preencher linha de região: {e}", "WARNING")
 
@@ -1159,7 +1071,6 @@ class MacroGastricaModule(BaseModule):
 
         driver.execute_script("arguments[0].click();", campo_qtd)
         log_message("🔍 Clicou no próximo campo de quantidade vazio", "INFO")
-        time.sleep(0.4)
 
         try:
             wait.until(lambda d: input_qtd.is_displayed() or input_qtd.get_attribute("style") != "display: none;")
@@ -1174,9 +1085,8 @@ class MacroGastricaModule(BaseModule):
                 str(quantidade_valor),
             )
             log_message(f"✍️ Quantidade de fragmentos preenchida com '{quantidade_valor}'", "SUCCESS")
-            time.sleep(0.3)
             driver.execute_script("document.body.click();")
-            time.sleep(0.3)
+            aguardar_ajax(driver, timeout=5)
         except Exception as e:
             log_message(f"⚠️ Erro ao preencher linha de quantidade: {e}", "WARNING")
 
@@ -1194,7 +1104,6 @@ class MacroGastricaModule(BaseModule):
 
         driver.execute_script("arguments[0].click();", campo_blocos)
         log_message("🔍 Clicou no próximo campo de blocos vazio", "INFO")
-        time.sleep(0.4)
 
         try:
             wait.until(lambda d: input_blocos.is_displayed() or input_blocos.get_attribute("style") != "display: none;")
@@ -1209,9 +1118,8 @@ class MacroGastricaModule(BaseModule):
                 str(blocos_valor),
             )
             log_message(f"✍️ Quantidade de blocos preenchida com '{blocos_valor}'", "SUCCESS")
-            time.sleep(0.3)
             driver.execute_script("document.body.click();")
-            time.sleep(0.3)
+            aguardar_ajax(driver, timeout=5)
         except Exception as e:
             log_message(f"⚠️ Erro ao preencher linha de blocos: {e}", "WARNING")
 
@@ -1346,7 +1254,6 @@ class MacroGastricaModule(BaseModule):
                 # Clicar na âncora para abrir o campo
                 driver.execute_script("arguments[0].click();", campo_quantidade)
                 log_message("🔍 Clicou no campo de quantidade para editar", "INFO")
-                time.sleep(0.5)
 
                 # Aguardar o input ficar visível e preencher via JavaScript
                 try:
@@ -1362,11 +1269,10 @@ class MacroGastricaModule(BaseModule):
                     """, input_quantidade, quantidade_valor)
                     
                     log_message(f"✍️ Definiu quantidade como '{quantidade_valor}' via JS", "SUCCESS")
-                    time.sleep(0.5)
                     
                     # Clicar fora para confirmar a edição
                     driver.execute_script("document.body.click();")
-                    time.sleep(0.3)
+                    aguardar_ajax(driver, timeout=5)
                     
                     # Verificar se o valor foi definido
                     valor_definido = input_quantidade.get_attribute("value")
@@ -1422,7 +1328,6 @@ class MacroGastricaModule(BaseModule):
                 # Clicar na âncora para abrir o campo
                 driver.execute_script("arguments[0].click();", campo_blocos)
                 log_message("🔍 Clicou no campo de quantidade de blocos para editar", "INFO")
-                time.sleep(0.5)
 
                 # Aguardar o input ficar visível e preencher via JavaScript
                 try:
@@ -1438,11 +1343,10 @@ class MacroGastricaModule(BaseModule):
                     """, input_blocos)
                     
                     log_message("✍️ Definiu quantidade de blocos como '1' via JS", "SUCCESS")
-                    time.sleep(0.5)
                     
                     # Clicar fora para confirmar a edição
                     driver.execute_script("document.body.click();")
-                    time.sleep(0.3)
+                    aguardar_ajax(driver, timeout=5)
                     
                     # Verificar se o valor foi definido
                     valor_definido = input_blocos.get_attribute("value")
@@ -1517,8 +1421,7 @@ class MacroGastricaModule(BaseModule):
                 return
             
             # Rolar até o botão para garantir visibilidade
-            driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", botao_salvar_fragmentos)
-            time.sleep(1)  # Aumentar tempo de espera
+            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", botao_salvar_fragmentos)
             
             # Verificar se há elementos sobrepostos e aguardar eles desaparecerem
             try:
@@ -1550,7 +1453,7 @@ class MacroGastricaModule(BaseModule):
                 
                 self.aguardar_spinner_desaparecer(driver, wait, timeout=15)
                 return
-            except:
+            except Exception:
                 pass
             
             try:
@@ -1564,7 +1467,7 @@ class MacroGastricaModule(BaseModule):
                 
                 self.aguardar_spinner_desaparecer(driver, wait, timeout=15)
                 return
-            except:
+            except Exception:
                 pass
             
             log_message(f"❌ Não foi possível encontrar o botão Salvar fragmentos: {e}", "ERROR")
@@ -1649,7 +1552,6 @@ class MacroGastricaModule(BaseModule):
                     actions = ActionChains(driver)
                     actions.key_down(Keys.ALT).send_keys('m').key_up(Keys.ALT).perform()
                     log_message("✅ Atalho ALT + M executado", "SUCCESS")
-                    time.sleep(0.5)
                     self.aguardar_pagina_estavel(driver, wait, timeout=3)
                 except Exception as e:
                     log_message(f"⚠️ Erro ao executar ALT + M: {e}", "WARNING")
@@ -1734,7 +1636,7 @@ class MacroGastricaModule(BaseModule):
                 log_message("➡️ Clicou em Enviar para próxima etapa", "INFO")
             
             # Aguardar processamento
-            time.sleep(2)
+            aguardar_pagina_pronta(driver, timeout=30)
             
             # Verificar se apareceu algum modal ou erro
             try:
@@ -1758,7 +1660,6 @@ class MacroGastricaModule(BaseModule):
 
             self.aguardar_spinner_desaparecer(driver, wait)
             self.aguardar_pagina_estavel(driver, wait, timeout=30)
-            time.sleep(1)
 
             log_message("✅ Envio para próxima etapa realizado com sucesso", "SUCCESS")
             return {'status': 'sucesso', 'detalhes': 'Enviado para próxima etapa'}
@@ -1793,7 +1694,6 @@ class MacroGastricaModule(BaseModule):
             )
             checkbox_george.click()
             log_message("✅ Checkbox do Dr. George marcado", "INFO")
-            time.sleep(1)
             
             # Aguardar o campo de senha aparecer e digitar a senha
             campo_senha = wait.until(
@@ -1801,7 +1701,6 @@ class MacroGastricaModule(BaseModule):
             )
             campo_senha.send_keys("1323")
             log_message("🔐 Senha digitada", "INFO")
-            time.sleep(1)
             
             # Clicar no botão Assinar
             botao_assinar = wait.until(
@@ -1809,7 +1708,7 @@ class MacroGastricaModule(BaseModule):
             )
             botao_assinar.click()
             log_message("✍️ Clicou em Assinar", "INFO")
-            time.sleep(1.5)
+            aguardar_modal_fechado(driver, "#assinatura", timeout=15)
             
         except Exception as e:
             log_message(f"Erro no processo de assinatura: {e}", "ERROR")
@@ -1821,6 +1720,7 @@ class MacroGastricaModule(BaseModule):
         excel_file = params.get("excel_file")
         cancel_flag = params.get("cancel_flag")
         headless_mode = params.get("headless_mode")
+        num_workers = params.get("num_workers", 1)
 
         try:
             # Lê os dados dos exames da planilha (código e máscara)
@@ -1840,182 +1740,63 @@ class MacroGastricaModule(BaseModule):
         resultados = []
         
         try:
-            driver = BrowserFactory.create_chrome(headless=headless_mode)
+            driver = BrowserFactory.acquire_chrome(headless=headless_mode)
             wait = WebDriverWait(driver, 10)
             
             log_message("Iniciando automação de macroscopia gástrica...", "INFO")
             
             # Login
-            log_message("Fazendo login...", "INFO")
-            driver.get(url)
-            
-            # Aguardar página carregar completamente
-            wait.until(EC.presence_of_element_located((By.ID, "username")))
-            
-            username_field = driver.find_element(By.ID, "username")
-            username_field.clear()
-            username_field.send_keys(username)
-            
-            password_field = driver.find_element(By.ID, "password")
-            password_field.clear()
-            password_field.send_keys(password)
-            
-            submit_button = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
-            submit_button.click()
-
-            log_message("Verificando se precisa navegar para módulo de exames...", "INFO")
-            current_url = driver.current_url
-
-            if current_url == "https://dap.pathoweb.com.br/" or "trocarModulo" in current_url:
-                log_message("Detectada tela de seleção de módulos - navegando para módulo de exames...", "INFO")
-                try:
-                    modulo_link = wait.until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, "a[href='/site/trocarModulo?modulo=1']")))
-                    modulo_link.click()
-                    time.sleep(2)
-                    log_message("✅ Navegação para módulo de exames realizada", "SUCCESS")
-                except Exception as e:
-                    log_message(f"⚠️ Erro ao navegar para módulo: {e}", "WARNING")
-                    # Tentar navegar diretamente pela URL como fallback
-                    driver.get("https://dap.pathoweb.com.br/moduloExame/index")
-                    time.sleep(2)
-                    log_message("🔄 Navegação direta para módulo realizada", "INFO")
-
-            elif "moduloExame" in current_url:
-                log_message("✅ Já está no módulo de exames - pulando navegação", "SUCCESS")
-            else:
-                log_message(f"⚠️ URL inesperada detectada: {current_url}", "WARNING")
-                # Tentar navegar diretamente como fallback
-                driver.get("https://dap.pathoweb.com.br/moduloExame/index")
-                time.sleep(2)
-                log_message("🔄 Navegação direta para módulo realizada (fallback)", "INFO")
-            
-            # Fechar modal se aparecer
-            try:
-                modal_close_button = driver.find_element(By.CSS_SELECTOR, "#mensagemParaClienteModal .modal-footer button")
-                if modal_close_button.is_displayed():
-                    modal_close_button.click()
-                    time.sleep(1)
-                    log_message("✅ Modal de mensagem fechado", "INFO")
-            except Exception:
-                pass
+            login_pathoweb(driver, username, password, modulo=1, url=url)
 
             log_message("✅ Login realizado com sucesso. Iniciando processamento dos exames.", "SUCCESS")
-            
+            progresso.definir_total(len(dados_exames))
+
+            if num_workers > 1:
+                executor = ExecutorParalelo(num_workers, cancel_flag=cancel_flag)
+                resultados = executor.executar(
+                    dados_exames,
+                    processar_item=lambda d, exame_data: self.processar_dados_exame(d, WebDriverWait(d, 10), exame_data),
+                    preparar_worker=lambda d: login_pathoweb(d, username, password, modulo=1, url=url, compartilhar=False),
+                    ao_falhar=self._resultado_erro,
+                    driver_principal=driver
+                )
+                # O navegador do módulo pode ter sido trocado se caiu durante a execução
+                driver = executor.driver_principal
+                self.mostrar_resumo_final(resultados)
+                return
+
             # Processar cada exame da planilha
             for i, exame_data in enumerate(dados_exames, 1):
                 if cancel_flag and cancel_flag.is_set():
                     log_message("Execução cancelada pelo usuário.", "WARNING")
                     break
-                
-                codigo = exame_data['codigo']
-                mascara = exame_data['mascara']
-                qtd_frag = exame_data['qtd_frag']
-                qtd_frag_original = exame_data['qtd_frag_original']
-                md1 = exame_data['md1']
-                md2 = exame_data['md2']
-                md3 = exame_data['md3']
-                qtd_frag2 = exame_data['qtd_frag2']
-                qtd_frag2_original = exame_data['qtd_frag2_original']
-                md4 = exame_data['md4']
-                md5 = exame_data['md5']
-                md6 = exame_data['md6']
-                responsavel_macro = exame_data['responsavel_macro']
-                data_fixacao = exame_data['data_fixacao']
-
-                log_message(f"\n➡️ Processando exame {i}/{len(dados_exames)}: {codigo} (máscara: {mascara})", "INFO")
-                
-                try:
-                    # Verificar se o browser ainda está ativo
-                    if not self.verificar_sessao_browser(driver):
-                        log_message("🔄 Recriando browser devido à sessão perdida...", "WARNING")
-                        try:
-                            driver.quit()
-                        except:
-                            pass
-                        
+
+                log_message(f"\n➡️ Processando exame {i}/{len(dados_exames)}: {exame_data['codigo']} (máscara: {exame_data['mascara']})", "INFO")
+
+                # Verificar se o browser ainda está ativo
+                if not self.verificar_sessao_browser(driver):
+                    log_message("🔄 Recriando browser devido à sessão perdida...", "WARNING")
+                    try:
+                        BrowserFactory.release_chrome(driver)
+                    except:
+                        pass
+
+                    try:
                         # Recriar browser e fazer login novamente
-                        driver = BrowserFactory.create_chrome(headless=headless_mode)
+                        driver = BrowserFactory.acquire_chrome(headless=headless_mode)
                         wait = WebDriverWait(driver, 10)
-                        
-                        # Fazer login novamente
+
+                        # Fazer login novamente (reaproveita a sessão salva se ainda válida)
                         log_message("🔄 Fazendo login novamente...", "INFO")
-                        driver.get(url)
-                        
-                        # Aguardar página carregar completamente
-                        wait.until(EC.presence_of_element_located((By.ID, "username")))
-                        time.sleep(2)
-                        
-                        username_field = driver.find_element(By.ID, "username")
-                        username_field.clear()
-                        username_field.send_keys(username)
-                        
-                        password_field = driver.find_element(By.ID, "password")
-                        password_field.clear()
-                        password_field.send_keys(password)
-                        
-                        submit_button = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
-                        submit_button.click()
-                        
-                        log_message("🔄 Navegando para módulo de exames novamente...", "INFO")
-                        
-                        # Navegar para o módulo de exames (módulo 1)
-                        modulo_link = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "a[href='/site/trocarModulo?modulo=1']")))
-                        modulo_link.click()
-                        time.sleep(2.5)
-                        
-                        # Fechar modal se aparecer
-                        try:
-                            modal_close_button = driver.find_element(By.CSS_SELECTOR, "#mensagemParaClienteModal .modal-footer button")
-                            if modal_close_button.is_displayed():
-                                modal_close_button.click()
-                                time.sleep(1)
-                        except Exception:
-                            pass
-                        
+                        login_pathoweb(driver, username, password, modulo=1, url=url)
+
                         log_message("✅ Browser recriado e login realizado novamente", "SUCCESS")
-                    
-                    # Processar este exame específico
-                    resultado = self.processar_exame(
-                        driver, wait,
-                        codigo, mascara,
-                        qtd_frag, qtd_frag_original,
-                        md1, md2, md3,
-                        qtd_frag2, qtd_frag2_original,
-                        md4, md5, md6,
-                        responsavel_macro, data_fixacao
-                    )
-                    resultados.append({
-                        'codigo': codigo,
-                        'mascara': mascara,
-                        'qtd_frag': qtd_frag,
-                        'md1': md1,
-                        'md2': md2,
-                        'md3': md3,
-                        'qtd_frag2': qtd_frag2,
-                        'md4': md4,
-                        'md5': md5,
-                        'md6': md6,
-                        'status': resultado['status'],
-                        'detalhes': resultado.get('detalhes', '')
-                    })
-                    
-                except Exception as e:
-                    log_message(f"❌ Erro ao processar exame {codigo}: {e}", "ERROR")
-                    resultados.append({
-                        'codigo': codigo,
-                        'mascara': mascara,
-                        'qtd_frag': qtd_frag,
-                        'md1': md1,
-                        'md2': md2,
-                        'md3': md3,
-                        'qtd_frag2': qtd_frag2,
-                        'md4': md4,
-                        'md5': md5,
-                        'md6': md6,
-                        'status': 'erro',
-                        'detalhes': str(e)
-                    })
+                    except Exception as e:
+                        log_message(f"❌ Erro ao processar exame {exame_data['codigo']}: {e}", "ERROR")
+                        resultados.append(self._resultado_erro(exame_data, e))
+                        continue
+
+                resultados.append(self.processar_dados_exame(driver, wait, exame_data))
             
             # Mostrar resumo final
             self.mostrar_resumo_final(resultados)
@@ -2026,11 +1807,50 @@ class MacroGastricaModule(BaseModule):
         finally:
             if driver:
                 try:
-                    driver.quit()
+                    BrowserFactory.release_chrome(driver)
                     log_message("Browser fechado", "INFO")
                 except Exception as quit_error:
                     log_message(f"Erro ao fechar browser: {quit_error}", "WARNING")
 
+    @staticmethod
+    def _resultado_erro(exame_data, erro):
+        return {
+            'codigo': exame_data['codigo'],
+            'mascara': exame_data['mascara'],
+            'qtd_frag': exame_data['qtd_frag'],
+            'md1': exame_data['md1'],
+            'md2': exame_data['md2'],
+            'md3': exame_data['md3'],
+            'qtd_frag2': exame_data['qtd_frag2'],
+            'md4': exame_data['md4'],
+            'md5': exame_data['md5'],
+            'md6': exame_data['md6'],
+            'status': 'erro',
+            'detalhes': str(erro)
+        }
+
+    def processar_dados_exame(self, driver, wait, exame_data):
+        """Processa uma linha da planilha e devolve o registro de resultado"""
+        codigo = exame_data['codigo']
+        try:
+            resultado = self.processar_exame(
+                driver, wait,
+                codigo, exame_data['mascara'],
+                exame_data['qtd_frag'], exame_data['qtd_frag_original'],
+                exame_data['md1'], exame_data['md2'], exame_data['md3'],
+                exame_data['qtd_frag2'], exame_data['qtd_frag2_original'],
+                exame_data['md4'], exame_data['md5'], exame_data['md6'],
+                exame_data['responsavel_macro'], exame_data['data_fixacao']
+            )
+        except Exception as e:
+            log_message(f"❌ Erro ao processar exame {codigo}: {e}", "ERROR")
+            return self._resultado_erro(exame_data, e)
+
+        registro = self._resultado_erro(exame_data, '')
+        registro['status'] = resultado['status']
+        registro['detalhes'] = resultado.get('detalhes', '')
+        return registro
+
     def processar_exame(self, driver, wait, codigo, mascara, qtd_frag, qtd_frag_original, md1, md2, md3, qtd_frag2, qtd_frag2_original, md4, md5, md6, responsavel_macro, data_fixacao):
         """Processa um exame individual"""
         try:
@@ -2043,7 +1863,7 @@ class MacroGastricaModule(BaseModule):
                 modal_close_button = driver.find_element(By.CSS_SELECTOR, "#mensagemParaClienteModal .modal-footer button")
                 if modal_close_button.is_displayed():
                     modal_close_button.click()
-                    time.sleep(1)
+                    aguardar_modal_fechado(driver, "#mensagemParaClienteModal", timeout=5)
                     log_message("✅ Modal de mensagem fechado antes de processar exame", "INFO")
             except Exception:
                 pass
@@ -2069,8 +1889,7 @@ class MacroGastricaModule(BaseModule):
 
                     # Garantir que o campo está visível na tela
                     try:
-                        driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", campo_codigo)
-                        time.sleep(0.2)
+                        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", campo_codigo)
                     except Exception as e_scroll:
                         log_message(f"⚠️ Erro ao fazer scroll até o campo de código: {e_scroll}", "WARNING")
 
@@ -2102,9 +1921,9 @@ class MacroGastricaModule(BaseModule):
                         except Exception as e_reloc:
                             ultimo_erro_campo = e_reloc
                             log_message(f"❌ Não foi possível relocalizar o campo de código: {e_reloc}", "ERROR")
-                            time.sleep(0.5)
+                            dormir(0.5)
                     else:
-                        time.sleep(0.5)
+                        dormir(0.5)
 
             if tentativas_campo >= max_tentativas_campo and ultimo_erro_campo is not None:
                 raise Exception(f"Não foi possível preencher o campo de código após {max_tentativas_campo} tentativas: {ultimo_erro_campo}")
@@ -2123,8 +1942,7 @@ class MacroGastricaModule(BaseModule):
 
                     # Garantir que o botão esteja visível na tela
                     try:
-                        driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", botao_pesquisar)
-                        time.sleep(0.3)
+                        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", botao_pesquisar)
                     except Exception as e_scroll:
                         log_message(f"⚠️ Erro ao fazer scroll até o botão de pesquisar: {e_scroll}", "WARNING")
 
@@ -2162,11 +1980,11 @@ class MacroGastricaModule(BaseModule):
                                 log_message(f"⚠️ Erro no clique via JavaScript no botão de pesquisar: {e_js}", "WARNING")
 
                         # Pequena espera antes de nova tentativa
-                        time.sleep(0.5)
+                        dormir(0.5)
                 except Exception as e_local:
                     ultimo_erro = e_local
                     log_message(f"⚠️ Erro ao localizar/clicar no botão de pesquisar: {e_local}", "WARNING")
-                    time.sleep(0.5)
+                    dormir(0.5)
 
             if tentativa >= max_tentativas and ultimo_erro is not None:
                 raise Exception(f"Não foi possível clicar no botão de pesquisar exame após {max_tentativas} tentativas: {ultimo_erro}")
@@ -2195,8 +2013,8 @@ class MacroGastricaModule(BaseModule):
             wait_longo = WebDriverWait(driver, 60)
             wait_longo.until(EC.presence_of_element_located((By.ID, "divAndamentoExame")))
             log_message("📋 Div de andamento do exame encontrada!", "SUCCESS")
-            time.sleep(0.5)  # Reduzido de 2 para 0.5
-        except:
+            aguardar_pagina_pronta(driver)
+        except Exception:
             log_message("⚠️ Div de andamento não apareceu no tempo esperado (60s)", "WARNING")
             return {'status': 'sem_andamento', 'detalhes': 'Exame não encontrado ou não carregou'}
         
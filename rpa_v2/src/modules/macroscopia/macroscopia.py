@@ -8,11 +8,13 @@ from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.webdriver.support import expected_conditions as EC
 
 from dotenv import load_dotenv
-from openpyxl import load_workbook
 
 from src.core.browser_factory import BrowserFactory
 from src.core.logger import log_message
+from src.core.session_manager import login_pathoweb
+from src.core.waits import dormir
 from src.modules.base import BaseModule
+from src.utils.planilha import ler_registros
 
 load_dotenv()
 
@@ -84,16 +86,14 @@ class MacroscopiaModule(BaseModule):
     # --- Métodos principais ---
     def get_dados_exames(self, file_path: str) -> list:
         try:
-            workbook = load_workbook(file_path)
-            sheet = workbook.active
             dados = []
             ultima_mascara = None
 
             # Lê da linha 2 em diante (linha 1 é cabeçalho)
-            for row in range(2, sheet.max_row + 1):
-                codigo = sheet[f'A{row}'].value
-                mascara = sheet[f'B{row}'].value
-                citotecnica = sheet[f'C{row}'].value
+            for registro in ler_registros(file_path, {"codigo": "A", "mascara": "B", "citotecnica": "C"}):
+                codigo = registro["codigo"]
+                mascara = registro["mascara"]
+                citotecnica = registro["citotecnica"]
 
                 if codigo is not None:
                     codigo = str(codigo).strip()
@@ -111,7 +111,6 @@ class MacroscopiaModule(BaseModule):
                         'citotecnica': citotecnica
                     })
 
-            workbook.close()
             return dados
         except Exception as e:
             raise Exception(f"Erro ao ler planilha: {e}")
@@ -308,7 +307,7 @@ class MacroscopiaModule(BaseModule):
                     f"🟢 Div ainda não encontrada (tentativa {tentativas}): {type(e).__name__}",
                     "INFO")
 
-            time.sleep(1)
+            dormir(1)
         else:
             log_message(f"❌ Timeout de {DEFAULT_TIMEOUT}s atingido após {tentativas} tentativas",
                         "ERROR")
@@ -440,50 +439,11 @@ class MacroscopiaModule(BaseModule):
         driver = None
         resultados = []
         try:
-            driver = BrowserFactory.create_chrome(headless=headless_mode)
+            driver = BrowserFactory.acquire_chrome(headless=headless_mode)
             wait = WebDriverWait(driver, DEFAULT_TIMEOUT)
             log_message("Iniciando automação de macroscopia...", "INFO")
-            driver.get(url)
             # Login
-            wait.until(EC.presence_of_element_located((By.ID, "username"))).send_keys(username)
-            wait.until(EC.presence_of_element_located((By.ID, "password"))).send_keys(password)
-            driver.find_element(By.CSS_SELECTOR, "button[type='submit']").click()
-
-            log_message("Verificando se precisa navegar para módulo de exames...", "INFO")
-            current_url = driver.current_url
-            if current_url == "https://dap.pathoweb.com.br/" or "trocarModulo" in current_url:
-                log_message("Detectada tela de seleção de módulos - navegando para módulo de exames...", "INFO")
-                try:
-                    modulo_link = wait.until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, "a[href='/site/trocarModulo?modulo=1']")))
-                    modulo_link.click()
-                    time.sleep(MEDIUM_DELAY)
-                    log_message("✅ Navegação para módulo de exames realizada", "SUCCESS")
-                except Exception as e:
-                    log_message(f"⚠️ Erro ao navegar para módulo: {e}", "WARNING")
-                    # Tentar navegar diretamente pela URL como fallback
-                    driver.get("https://dap.pathoweb.com.br/moduloExame/index")
-                    time.sleep(MEDIUM_DELAY)
-                    log_message("🔄 Navegação direta para módulo realizada", "INFO")
-
-            elif "moduloExame" in current_url:
-                log_message("✅ Já está no módulo de exames - pulando navegação", "SUCCESS")
-            else:
-                log_message(f"⚠️ URL inesperada detectada: {current_url}", "WARNING")
-                # Tentar navegar diretamente como fallback
-                driver.get("https://dap.pathoweb.com.br/moduloExame/index")
-                time.sleep(MEDIUM_DELAY)
-                log_message("🔄 Navegação direta para módulo realizada (fallback)", "INFO")
-
-            try:
-                modal_close_button = driver.find_element(By.CSS_SELECTOR,
-                                                         "#mensagemParaClienteModal .modal-footer button")
-                if modal_close_button.is_displayed():
-                    modal_close_button.click()
-                    time.sleep(1)
-                    log_message("✅ Modal de mensagem fechado", "INFO")
-            except Exception:
-                pass
+            login_pathoweb(driver, username, password, modulo=1, url=url)
 
             codigos_processados = []
             for i, exame_data in enumerate(dados_exames, 1):
@@ -510,7 +470,7 @@ class MacroscopiaModule(BaseModule):
         finally:
             if driver:
                 try:
-                    driver.quit()
+                    BrowserFactory.release_chrome(driver)
                 except Exception:
                     pass
 
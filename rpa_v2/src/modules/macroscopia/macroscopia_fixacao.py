@@ -8,11 +8,13 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
 from dotenv import load_dotenv
-from openpyxl import load_workbook
 
 from src.core.browser_factory import BrowserFactory
 from src.core.logger import log_message
+from src.core.session_manager import login_pathoweb
+from src.core.waits import dormir
 from src.modules.base import BaseModule
+from src.utils.planilha import ler_registros
 
 load_dotenv()
 
@@ -23,17 +25,15 @@ class MacroscopiaFixacaoModule(BaseModule):
     def get_dados_exames(self, file_path: str) -> list:
         """Lê os dados dos exames da planilha Excel"""
         try:
-            workbook = load_workbook(file_path)
-            sheet = workbook.active
             dados = []
             ultima_mascara = None
             ultimo_macroscopista = None
             
             # Lê da linha 2 em diante (linha 1 é cabeçalho)
-            for row in range(2, sheet.max_row + 1):
-                codigo = sheet[f'A{row}'].value  # Código do exame
-                mascara = sheet[f'B{row}'].value  # Máscara/valor para campo buscaArvore
-                macroscopista = sheet[f'C{row}'].value  # Macroscopista
+            for registro in ler_registros(file_path, {"codigo": "A", "mascara": "B", "macroscopista": "C"}):
+                codigo = registro["codigo"]  # Código do exame
+                mascara = registro["mascara"]  # Máscara/valor para campo buscaArvore
+                macroscopista = registro["macroscopista"]  # Macroscopista
                 
                 if codigo is not None:
                     codigo = str(codigo).strip()
@@ -58,7 +58,6 @@ class MacroscopiaFixacaoModule(BaseModule):
                         'macroscopista': macroscopista
                     })
             
-            workbook.close()
             return dados
         except Exception as e:
             raise Exception(f"Erro ao ler planilha: {e}")
@@ -214,7 +213,7 @@ class MacroscopiaFixacaoModule(BaseModule):
             
             # Aguardar carregamento do exame
             log_message("⏳ Aguardando carregamento do exame...", "INFO")
-            time.sleep(3)
+            dormir(3)
             
             # Processar os campos específicos do exame
             log_message("🔧 Processando campos do exame...", "INFO")
@@ -275,46 +274,13 @@ class MacroscopiaFixacaoModule(BaseModule):
         resultados = []
         
         try:
-            driver = BrowserFactory.create_chrome()
+            driver = BrowserFactory.acquire_chrome()
             wait = WebDriverWait(driver, 20)
             
             log_message("Iniciando automação de macroscopia e fixação...", "INFO")
             
             # Login
-            log_message("Fazendo login...", "INFO")
-            driver.get(url)
-            
-            # Aguardar página carregar completamente
-            wait.until(EC.presence_of_element_located((By.ID, "username")))
-            
-            username_field = driver.find_element(By.ID, "username")
-            username_field.clear()
-            username_field.send_keys(username)
-            
-            password_field = driver.find_element(By.ID, "password")
-            password_field.clear()
-            password_field.send_keys(password)
-            
-            submit_button = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
-            submit_button.click()
-            
-            log_message("Navegando para módulo de exames...", "INFO")
-            
-            # Navegar para o módulo de exames (módulo 1)
-            modulo_link = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "a[href='/site/trocarModulo?modulo=1']")))
-            modulo_link.click()
-            time.sleep(2)
-            
-            # Fechar modal se aparecer
-            try:
-                modal_close_button = driver.find_element(By.CSS_SELECTOR,
-                                                         "#mensagemParaClienteModal .modal-footer button")
-                if modal_close_button.is_displayed():
-                    modal_close_button.click()
-                    time.sleep(1)
-                    log_message("✅ Modal de mensagem fechado", "INFO")
-            except Exception:
-                pass
+            login_pathoweb(driver, username, password, modulo=1, url=url)
 
             log_message("✅ Login realizado com sucesso. Iniciando processamento dos exames.", "SUCCESS")
             
@@ -337,49 +303,18 @@ class MacroscopiaFixacaoModule(BaseModule):
                     if not self.verificar_sessao_browser(driver):
                         log_message("🔄 Recriando browser devido à sessão perdida...", "WARNING")
                         try:
-                            driver.quit()
+                            BrowserFactory.release_chrome(driver)
                         except:
                             pass
                         
                         # Recriar browser e fazer login novamente
-                        driver = BrowserFactory.create_chrome()
+                        driver = BrowserFactory.acquire_chrome()
                         wait = WebDriverWait(driver, 20)
                         
-                        # Fazer login novamente
+                        # Fazer login novamente (reaproveita a sessão salva se ainda válida)
                         log_message("🔄 Fazendo login novamente...", "INFO")
-                        driver.get(url)
-                        
-                        # Aguardar página carregar completamente
-                        wait.until(EC.presence_of_element_located((By.ID, "username")))
-                        time.sleep(2)
-                        
-                        username_field = driver.find_element(By.ID, "username")
-                        username_field.clear()
-                        username_field.send_keys(username)
-                        
-                        password_field = driver.find_element(By.ID, "password")
-                        password_field.clear()
-                        password_field.send_keys(password)
-                        
-                        submit_button = driver.find_element(By.CSS_SELECTOR, "button[type='submit']")
-                        submit_button.click()
-                        
-                        log_message("🔄 Navegando para módulo de exames novamente...", "INFO")
-                        
-                        # Navegar para o módulo de exames (módulo 1)
-                        modulo_link = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "a[href='/site/trocarModulo?modulo=1']")))
-                        modulo_link.click()
-                        time.sleep(2.5)
-                        
-                        # Fechar modal se aparecer
-                        try:
-                            modal_close_button = driver.find_element(By.CSS_SELECTOR, "#mensagemParaClienteModal .modal-footer button")
-                            if modal_close_button.is_displayed():
-                                modal_close_button.click()
-                                time.sleep(1)
-                        except Exception:
-                            pass
-                        
+                        login_pathoweb(driver, username, password, modulo=1, url=url)
+
                         log_message("✅ Browser recriado e login realizado novamente", "SUCCESS")
                     
                     # Processar este exame específico
@@ -411,7 +346,7 @@ class MacroscopiaFixacaoModule(BaseModule):
         finally:
             if driver:
                 try:
-                    driver.quit()
+                    BrowserFactory.release_chrome(driver)
                     log_message("Browser fechado", "INFO")
                 except Exception as quit_error:
                     log_message(f"Erro ao fechar browser: {quit_error}", "WARNING")
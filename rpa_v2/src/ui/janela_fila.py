@@ -0,0 +1,84 @@
+"""
+Janela de gerenciamento da fila de execuções (src/core/fila_jobs.py).
+
+Lista os jobs gravados em disco e permite remover pendentes, limpar os finalizados e
+iniciar a fila. A lista é relida a cada ATUALIZACAO_MS enquanto a janela está aberta.
+"""
+import os
+import tkinter as tk
+from tkinter import ttk
+
+from src.core.fila_jobs import fila_jobs
+
+ATUALIZACAO_MS = 2000
+COLUNAS = (
+    ("id", "Job", 50),
+    ("modulo", "Módulo", 220),
+    ("planilha", "Planilha", 220),
+    ("situacao", "Situação", 90),
+    ("criado_em", "Criado em", 140),
+    ("erro", "Erro", 260),
+)
+
+
+class JanelaFila:
+    def __init__(self, root, modulos, ao_executar):
+        self.modulos = modulos
+        self.janela = tk.Toplevel(root)
+        self.janela.title("Fila de execuções")
+        self.janela.geometry("1050x380")
+        self.janela.columnconfigure(0, weight=1)
+        self.janela.rowconfigure(0, weight=1)
+        self._agendado = None
+
+        self.tabela = ttk.Treeview(self.janela, columns=[c[0] for c in COLUNAS], show="headings")
+        for coluna, titulo, largura in COLUNAS:
+            self.tabela.heading(coluna, text=titulo)
+            self.tabela.column(coluna, width=largura, anchor="w")
+        scrollbar = ttk.Scrollbar(self.janela, orient="vertical", command=self.tabela.yview)
+        self.tabela.configure(yscrollcommand=scrollbar.set)
+        self.tabela.grid(row=0, column=0, sticky="nsew", padx=(10, 0), pady=10)
+        scrollbar.grid(row=0, column=1, sticky="ns", pady=10, padx=(0, 10))
+
+        botoes = ttk.Frame(self.janela)
+        botoes.grid(row=1, column=0, columnspan=2, sticky="w", padx=10, pady=(0, 10))
+        ttk.Button(botoes, text="▶ Executar fila", command=ao_executar).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(botoes, text="Remover selecionado", command=self.remover).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(botoes, text="Limpar finalizados", command=self.limpar).pack(side=tk.LEFT)
+
+        self.janela.protocol("WM_DELETE_WINDOW", self.fechar)
+        self.atualizar()
+
+    def atualizar(self):
+        selecionados = self.tabela.selection()
+        self.tabela.delete(*self.tabela.get_children())
+        for job in fila_jobs.listar():
+            nome = self.modulos.get(job["modulo"], {}).get("name", job["modulo"])
+            self.tabela.insert("", tk.END, iid=str(job["id"]), values=(
+                job["id"], nome, os.path.basename(job["excel_file"] or ""), job["situacao"],
+                job["criado_em"], job["erro"] or "",
+            ))
+        existentes = [iid for iid in selecionados if self.tabela.exists(iid)]
+        if existentes:
+            self.tabela.selection_set(existentes)
+        self._agendado = self.janela.after(ATUALIZACAO_MS, self.atualizar)
+
+    def remover(self):
+        for iid in self.tabela.selection():
+            fila_jobs.remover(int(iid))
+        self._reagendar()
+
+    def limpar(self):
+        fila_jobs.limpar_finalizados()
+        self._reagendar()
+
+    def _reagendar(self):
+        if self._agendado is not None:
+            self.janela.after_cancel(self._agendado)
+        self.atualizar()
+
+    def fechar(self):
+        if self._agendado is not None:
+            self.janela.after_cancel(self._agendado)
+            self._agendado = None
+        self.janela.destroy()
@@ -1,8 +1,14 @@
 # src/ui/main_window.py
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from datetime import datetime
 from src.core.logger import set_logger_callback
+from src.core.browser_factory import BrowserFactory
+from src.core.execucao_processo import EXECUCAO_PROCESSO, ExecucaoProcesso
+from src.core.fila_jobs import FILA_CONCORRENCIA, ExecutorFila, fila_jobs
+from src.core.waits import ExecucaoCancelada, definir_cancelamento, log_resumo_esperas, resetar_estatisticas
+from src.ui.janela_fila import JanelaFila
+from src.ui.painel_log import PainelLog
+from src.ui.painel_progresso import PainelProgresso
 import importlib
 import json
 import os
@@ -34,6 +40,8 @@ class MainWindow:
         self.gera_xml_tiss = tk.StringVar(value="sim")
         self.headless_mode = tk.BooleanVar(value=True)
         self.pular_para_laudos = tk.BooleanVar(value=False)
+        self.retomar = tk.BooleanVar(value=False)
+        self.num_workers = tk.IntVar(value=1)
 
         self.unimed_user = tk.StringVar()
         self.unimed_password = tk.StringVar()
@@ -59,7 +67,12 @@ class MainWindow:
         set_logger_callback(self.log)
 
         self.execution_thread = None
+        self.execucao_processo = None
+        self.executor_fila = None
         self.cancel_requested = threading.Event()
+        # As esperas dos módulos (src/core/waits.py) acordam na hora quando o Parar é acionado
+        definir_cancelamento(self.cancel_requested)
+        self.log_pending_queue()
 
     def load_modules(self):
         try:
@@ -89,6 +102,7 @@ class MainWindow:
         self.create_module_section(main_frame)
         self.create_params_section(main_frame)
         self.create_control_buttons(main_frame)
+        self.create_progress_section(main_frame)
         self.create_log_section(main_frame)
         self.create_menu()
 
@@ -167,6 +181,7 @@ class MainWindow:
         has_pular_para_laudos = module.get("has_pular_para_laudos") if module else False
         has_data_tipo = module.get("has_data_tipo") if module else False
         requires_codificacao = module.get("requires_codificacao") if module else False
+        supports_parallel = module.get("supports_parallel") if module else False
 
         # Armazenar referências dos módulos para uso posterior
         self.current_module_config = {
@@ -178,7 +193,8 @@ class MainWindow:
             'has_cobrar_de': has_cobrar_de,
             'has_pular_para_laudos': has_pular_para_laudos,
             'has_data_tipo': has_data_tipo,
-            'requires_codificacao': requires_codificacao
+            'requires_codificacao': requires_codificacao,
+            'supports_parallel': supports_parallel
         }
 
         row = 0
@@ -189,6 +205,12 @@ class MainWindow:
             entry.grid(row=row, column=1, sticky="ew", padx=(0, 10))
             ttk.Button(self.params_frame, text="Selecionar", command=self.select_excel_file).grid(row=row, column=2)
             row += 1
+            ttk.Checkbutton(
+                self.params_frame,
+                text="🔁 Retomar: pular os itens já concluídos em execução anterior com esta planilha",
+                variable=self.retomar
+            ).grid(row=row, column=0, columnspan=3, sticky="w", pady=(5, 0))
+            row += 1
         if requires_codificacao:
             self.params_frame.columnconfigure(1, weight=1)
             ttk.Label(self.params_frame, text="Planilha Codificação:").grid(row=row, column=0, sticky="w")
@@ -253,6 +275,15 @@ class MainWindow:
             self.pular_para_laudos_check.grid(row=row, column=0, columnspan=3, sticky="w", pady=(15, 0))
             row += 1
 
+        if supports_parallel:
+            ttk.Label(self.params_frame, text="Navegadores paralelos:").grid(row=row, column=0, sticky="w", pady=(15, 5))
+            workers_frame = ttk.Frame(self.params_frame)
+            workers_frame.grid(row=row, column=1, sticky="w", columnspan=2, pady=(15, 5))
+            ttk.Spinbox(workers_frame, from_=1, to=4, textvariable=self.num_workers, width=5, state="readonly").pack(side=tk.LEFT)
+            ttk.Label(workers_frame, text="(acima de 1, os navegadores extras rodam em segundo plano)",
+                      foreground="gray").pack(side=tk.LEFT, padx=(10, 0))
+            row += 1
+
         # Criar container para credenciais Unimed (será mostrado/escondido dinamicamente)
         if requires_unimed_credentials:
             self.unimed_credentials_frame = ttk.Frame(self.params_frame)
@@ -387,9 +418,13 @@ class MainWindow:
         self.stop_button = ttk.Button(frame, text="■ Parar", command=self.stop_module)
         self.stop_button.pack(side=tk.LEFT)
 
+    def create_progress_section(self, parent):
+        self.painel_progresso = PainelProgresso(self.root, parent)
+        self.painel_progresso.grid(row=4, column=0, columnspan=2, sticky="ew", pady=(0, 10))
+
     def create_log_section(self, parent):
         frame = ttk.LabelFrame(parent, text="Logs", padding="10")
-        frame.grid(row=4, column=0, columnspan=2, sticky="nsew")
+        frame.grid(row=5, column=0, columnspan=2, sticky="nsew")
         frame.columnconfigure(0, weight=1)
         frame.rowconfigure(0, weight=1)
 
@@ -400,6 +435,7 @@ class MainWindow:
         scrollbar.grid(row=0, column=1, sticky="ns")
         for tag, color in [("INFO", "blue"), ("SUCCESS", "green"), ("WARNING", "orange"), ("ERROR", "red")]:
             self.log_text.tag_configure(tag, foreground=color)
+        self.painel_log = PainelLog(self.root, self.log_text)
 
     def create_menu(self):
         menubar = tk.Menu(self.root)
@@ -411,6 +447,12 @@ class MainWindow:
         file_menu.add_command(label="Limpar Credenciais Salvas", command=self.clear_saved_credentials)
         file_menu.add_separator()
         file_menu.add_command(label="Sair", command=self.root.quit)
+        fila_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Fila", menu=fila_menu)
+        fila_menu.add_command(label="Adicionar execução à fila", command=self.add_to_queue)
+        fila_menu.add_command(label="Executar fila", command=self.run_queue)
+        fila_menu.add_separator()
+        fila_menu.add_command(label="Gerenciar fila...", command=self.open_queue_window)
 
     def toggle_password_visibility(self):
         self.password_entry.config(show="" if self.show_password.get() else "*")
@@ -452,15 +494,33 @@ class MainWindow:
         self.update_params_section()
         self.log(f"Módulo selecionado: {selected_name} (id: {module['id']})", "INFO")
 
-    def run_module(self):
+        # Pré-aquece um Chrome headless enquanto o usuário preenche os parâmetros
+        if self.headless_mode.get():
+            BrowserFactory.warm_up(headless=True)
+
+        # Módulos com OCR: carrega o modelo do PaddleOCR antes de o usuário clicar em executar
+        if module.get("prewarm_ocr"):
+            threading.Thread(target=self._pre_aquecer_ocr, daemon=True).start()
+
+    def _pre_aquecer_ocr(self):
+        try:
+            from exame_data_extractor import pre_aquecer_ocr
+            pre_aquecer_ocr()
+        except Exception as e:
+            self.log(f"Pré-carregamento do OCR indisponível: {e}", "WARNING")
+
+    def selected_module(self):
         module_id = self.selected_module_id.get()
         if not module_id or not self.username.get().strip() or not self.password.get().strip():
             messagebox.showwarning("Aviso", "Preencha usuário, senha e selecione o módulo.")
-            return
+            return None
         module = self.module_id_map.get(module_id)
         if not module:
             self.log("Módulo não encontrado", "ERROR")
-            return
+        return module
+
+    def build_params(self, module):
+        """Params da execução a partir da tela. None se faltar algo (o aviso já foi mostrado)."""
         params = {
             "username": self.username.get(),
             "password": self.password.get(),
@@ -474,7 +534,8 @@ class MainWindow:
                 return
             params.update({
                 "excel_file": excel_path,
-                "modo_busca": "exame" if self.tipo_busca.get() == "numero_exame" else "guia"
+                "modo_busca": "exame" if self.tipo_busca.get() == "numero_exame" else "guia",
+                "retomar": self.retomar.get()
             })
         if module.get("requires_codificacao"):
             codificacao_path = self.codificacao_file_path.get()
@@ -490,6 +551,8 @@ class MainWindow:
             params["pular_para_laudos"] = self.pular_para_laudos.get()
         if module.get("has_data_tipo"):
             params["data_tipo"] = self.data_tipo.get()
+        if module.get("supports_parallel"):
+            params["num_workers"] = self.num_workers.get()
         if module.get("requires_unimed_credentials"):
             unimed_user = self.unimed_user.get().strip()
             unimed_pass = self.unimed_password.get().strip()
@@ -511,18 +574,39 @@ class MainWindow:
                 "hospital_user": hospital_user,
                 "hospital_pass": hospital_pass
             })
+        return params
+
+    def run_module(self):
+        module = self.selected_module()
+        params = self.build_params(module) if module else None
+        if params is None:
+            return
+        self.run_button.config(state="disabled")
+        self.stop_button.config(state="normal")
+        self.cancel_requested.clear()
+        self.painel_progresso.espelhar(None)
+        if EXECUCAO_PROCESSO:
+            self.execucao_processo = ExecucaoProcesso(
+                module["module_path"], params,
+                ao_log=self.log,
+                ao_progresso=self.painel_progresso.espelhar,
+                ao_terminar=lambda: self.root.after(0, self.execution_finished),
+            ).iniciar()
+            return
+
         def run_in_thread():
+            resetar_estatisticas()
             try:
                 mod = importlib.import_module(module["module_path"]) 
                 if hasattr(mod, "run"):
                     mod.run(params)
+            except ExecucaoCancelada as e:
+                self.log(f"⏹️ {e}", "WARNING")
             except Exception as e:
                 self.log(f"Erro: {e}", "ERROR")
             finally:
+                log_resumo_esperas()
                 self.root.after(0, self.execution_finished)
-        self.run_button.config(state="disabled")
-        self.stop_button.config(state="normal")
-        self.cancel_requested.clear()
         self.execution_thread = threading.Thread(target=run_in_thread, daemon=True)
         self.execution_thread.start()
 
@@ -531,20 +615,76 @@ class MainWindow:
         self.run_button.config(state="normal")
         self.stop_button.config(state="disabled")
 
+    def log_pending_queue(self):
+        if not os.path.exists(fila_jobs.caminho):
+            return
+        pendentes = [job for job in fila_jobs.listar() if job["situacao"] in ("pendente", "executando")]
+        if pendentes:
+            self.log(f"📋 {len(pendentes)} job(s) pendente(s) na fila - use Fila > Executar fila", "INFO")
+
+    def queue_credentials(self):
+        # Lidas aqui, na thread do Tk: o executor da fila roda em outra thread
+        return {
+            "username": self.username.get().strip(),
+            "password": self.password.get().strip(),
+            "unimed_user": self.unimed_user.get().strip(),
+            "unimed_pass": self.unimed_password.get().strip(),
+            "hospital_user": self.hospital_user.get().strip(),
+            "hospital_pass": self.hospital_password.get().strip(),
+        }
+
+    def add_to_queue(self):
+        module = self.selected_module()
+        params = self.build_params(module) if module else None
+        if params is None:
+            return
+        job_id = fila_jobs.adicionar(module["id"], params)
+        self.log(f"📋 Job {job_id} adicionado à fila: {module['name']}", "INFO")
+
+    def run_queue(self):
+        if str(self.run_button.cget("state")) == "disabled":
+            messagebox.showwarning("Fila", "Aguarde a execução atual terminar.")
+            return
+        if not fila_jobs.listar(somente_pendentes=True):
+            messagebox.showinfo("Fila", "Não há jobs pendentes na fila.")
+            return
+        credenciais = self.queue_credentials()
+        self.run_button.config(state="disabled")
+        self.stop_button.config(state="normal")
+        self.cancel_requested.clear()
+        self.painel_progresso.espelhar(None)
+        self.executor_fila = ExecutorFila(
+            self.module_id_map,
+            credenciais=lambda: credenciais,
+            cancel_flag=self.cancel_requested,
+            ao_log=self.log,
+            ao_progresso=self.painel_progresso.espelhar if FILA_CONCORRENCIA > 1 else None,
+            ao_terminar=lambda: self.root.after(0, self.execution_finished),
+        ).iniciar()
+
+    def open_queue_window(self):
+        JanelaFila(self.root, self.module_id_map, ao_executar=self.run_queue)
+
     def stop_module(self):
         self.log("Execução interrompida pelo usuário", "WARNING")
         self.cancel_requested.set()
-        self.run_button.config(state="normal")
         self.stop_button.config(state="disabled")
+        if self.executor_fila is not None and self.executor_fila.em_execucao:
+            # Os jobs restantes continuam pendentes na fila
+            self.executor_fila.parar()
+            return
+        if self.execucao_processo is not None and self.execucao_processo.em_execucao:
+            # O botão Executar volta quando o processo sair (no máximo RPA_CANCELAMENTO_PRAZO)
+            self.execucao_processo.cancelar()
+            return
+        self.run_button.config(state="normal")
 
     def set_initial_focus(self):
         (self.password_entry if self.username.get() else self.username_entry).focus_set()
 
     def log(self, message: str, level: str = "INFO"):
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        self.log_text.insert(tk.END, f"[{timestamp}] {message}\n", level)
-        self.log_text.see(tk.END)
-        self.root.update_idletasks()
+        # Chamado também pelas threads dos módulos: o painel enfileira e a thread do Tk insere
+        self.painel_log.registrar(message, level)
 
     def get_credentials(self):
         return {
@@ -626,7 +766,7 @@ class MainWindow:
             return ""
 
     def clear_logs(self):
-        self.log_text.delete(1.0, tk.END)
+        self.painel_log.limpar()
 
     def clear_credentials(self):
         self.username.set("")
@@ -788,6 +928,13 @@ Os módulos serão implementados gradualmente.
     def on_closing(self):
         if self.username.get().strip():
             self.save_last_username()
+        if self.execucao_processo is not None:
+            self.execucao_processo.encerrar()
+        if self.executor_fila is not None and self.executor_fila.em_execucao:
+            self.executor_fila.parar(imediato=True)
+        BrowserFactory.shutdown_pool()
+        self.painel_progresso.fechar()
+        self.painel_log.fechar()
         self.root.destroy()
 
     def run(self):
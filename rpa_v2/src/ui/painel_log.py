@@ -0,0 +1,117 @@
+"""
+Painel de log da janela principal.
+
+Os módulos chamam `log_message` da thread de execução (e dos workers paralelos); o Tk só
+pode ser usado pela thread principal. Por isso as mensagens entram numa fila e a thread
+principal esvazia a fila a cada RPA_LOG_INTERVALO_MS, inserindo o lote inteiro no Text
+de uma vez. O Text guarda no máximo RPA_LOG_MAX_LINHAS linhas (as mais antigas saem),
+para execuções de horas não acumularem memória.
+
+Com RPA_LOG_ARQUIVO definido, as mesmas linhas vão também para esse arquivo, com rotação
+ao atingir RPA_LOG_ARQUIVO_MB (mantendo RPA_LOG_ARQUIVO_BACKUPS arquivos antigos).
+"""
+import logging
+import os
+import queue
+import tkinter as tk
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+LOG_INTERVALO_MS = int(os.getenv("RPA_LOG_INTERVALO_MS", "75"))
+LOG_MAX_LINHAS = int(os.getenv("RPA_LOG_MAX_LINHAS", "5000"))
+LOG_ARQUIVO = os.getenv("RPA_LOG_ARQUIVO", "")
+LOG_ARQUIVO_MB = float(os.getenv("RPA_LOG_ARQUIVO_MB", "5"))
+LOG_ARQUIVO_BACKUPS = int(os.getenv("RPA_LOG_ARQUIVO_BACKUPS", "5"))
+
+# Limite de mensagens por ciclo: uma rajada grande é dividida entre ciclos seguidos
+# em vez de travar a interface de uma vez
+MAX_POR_CICLO = 2000
+
+
+def criar_arquivo_log(caminho, max_mb=LOG_ARQUIVO_MB, backups=LOG_ARQUIVO_BACKUPS):
+    """Logger com rotação por tamanho que grava as linhas do painel em `caminho`."""
+    pasta = os.path.dirname(os.path.abspath(caminho))
+    os.makedirs(pasta, exist_ok=True)
+    handler = RotatingFileHandler(caminho, maxBytes=int(max_mb * 1024 * 1024), backupCount=backups,
+                                  encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger = logging.getLogger("rpa.painel")
+    logger.handlers[:] = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+class PainelLog:
+    """Liga um tk.Text à fila de mensagens. `registrar` pode ser chamado de qualquer thread."""
+
+    def __init__(self, root, text, intervalo_ms=LOG_INTERVALO_MS, max_linhas=LOG_MAX_LINHAS,
+                 arquivo=LOG_ARQUIVO):
+        self.root = root
+        self.text = text
+        self.intervalo_ms = intervalo_ms
+        self.max_linhas = max_linhas
+        self.fila = queue.SimpleQueue()
+        self.arquivo = None
+        self._agendado = None
+        if arquivo:
+            try:
+                self.arquivo = criar_arquivo_log(arquivo)
+            except OSError as e:
+                self.registrar(f"Não foi possível abrir o arquivo de log {arquivo}: {e}", "WARNING")
+        self._agendar()
+
+    def registrar(self, message, level="INFO"):
+        """Callback do log_message: só enfileira (o horário é o da chamada)."""
+        self.fila.put((datetime.now(), str(message), level))
+
+    def _agendar(self):
+        self._agendado = self.root.after(self.intervalo_ms, self._drenar)
+
+    def _drenar(self):
+        try:
+            self.descarregar()
+        finally:
+            self._agendar()
+
+    def descarregar(self, limite=MAX_POR_CICLO):
+        """Insere no Text as mensagens da fila (até `limite`). Só na thread principal."""
+        partes = []
+        linhas_arquivo = []
+        for _ in range(limite):
+            try:
+                momento, message, level = self.fila.get_nowait()
+            except queue.Empty:
+                break
+            partes += [f"[{momento:%H:%M:%S}] {message}\n", level]
+            if self.arquivo:
+                linhas_arquivo.append(f"[{momento:%Y-%m-%d %H:%M:%S}] [{level}] {message}")
+        if not partes:
+            return 0
+
+        # Só acompanha o fim se o usuário não tiver rolado para cima para ler algo
+        no_fim = self.text.yview()[1] >= 0.999
+        self.text.insert(tk.END, *partes)
+        excesso = int(self.text.index("end-1c").split(".")[0]) - 1 - self.max_linhas
+        if excesso > 0:
+            self.text.delete("1.0", f"{excesso + 1}.0")
+        if no_fim:
+            self.text.see(tk.END)
+
+        for linha in linhas_arquivo:
+            self.arquivo.info(linha)
+        return len(partes) // 2
+
+    def limpar(self):
+        self.text.delete(1.0, tk.END)
+
+    def fechar(self):
+        """Para o ciclo, insere o que ficou na fila e fecha o arquivo de log."""
+        if self._agendado is not None:
+            self.root.after_cancel(self._agendado)
+            self._agendado = None
+        while self.descarregar():
+            pass
+        if self.arquivo:
+            for handler in self.arquivo.handlers:
+                handler.close()
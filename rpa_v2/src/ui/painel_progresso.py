@@ -0,0 +1,142 @@
+"""
+Painel de progresso da janela principal.
+
+Lê `progresso.instantaneo()` (src/core/progresso.py) a cada RPA_PROGRESSO_INTERVALO_MS na
+thread principal do Tk e mostra itens feitos/total, sucessos/erros, ritmo (itens/min na
+janela recente), previsão de término e uma sparkline com as últimas durações das etapas
+mais demoradas. Os módulos não falam com o painel: só alimentam o progresso. Quando o
+módulo roda num processo separado (src/core/execucao_processo.py), os instantâneos que
+chegam do filho são passados a `espelhar` e mostrados no lugar dos locais.
+"""
+import os
+import time
+import tkinter as tk
+from tkinter import ttk
+
+from src.core.progresso import progresso
+
+PROGRESSO_INTERVALO_MS = int(os.getenv("RPA_PROGRESSO_INTERVALO_MS", "500"))
+
+# Sparkline: uma linha por etapa, as mais demoradas primeiro
+MAX_ETAPAS = 4
+ALTURA_LINHA = 20
+LARGURA_CANVAS = 460
+LARGURA_ROTULO = 200
+
+
+def formatar_duracao(segundos):
+    if segundos is None:
+        return "--"
+    segundos = int(segundos)
+    horas, resto = divmod(segundos, 3600)
+    minutos, segundos = divmod(resto, 60)
+    if horas:
+        return f"{horas}h{minutos:02d}min"
+    if minutos:
+        return f"{minutos}min{segundos:02d}s"
+    return f"{segundos}s"
+
+
+class PainelProgresso:
+    """Frame com os números da execução atual. Só a thread principal mexe nos widgets."""
+
+    def __init__(self, root, parent, intervalo_ms=PROGRESSO_INTERVALO_MS):
+        self.root = root
+        self.intervalo_ms = intervalo_ms
+        self._geracao = None
+        self._agendado = None
+        self._remoto = None
+
+        self.frame = ttk.LabelFrame(parent, text="Progresso", padding="10")
+        self.frame.columnconfigure(0, weight=1)
+
+        self.barra = ttk.Progressbar(self.frame, mode="determinate", maximum=1)
+        self.barra.grid(row=0, column=0, sticky="ew", pady=(0, 5))
+
+        numeros = ttk.Frame(self.frame)
+        numeros.grid(row=1, column=0, sticky="w")
+        self.rotulo_itens = ttk.Label(numeros, text="Itens: -", width=24)
+        self.rotulo_itens.grid(row=0, column=0, sticky="w")
+        self.rotulo_resultado = ttk.Label(numeros, text="✅ 0   ❌ 0", width=18)
+        self.rotulo_resultado.grid(row=0, column=1, sticky="w")
+        self.rotulo_ritmo = ttk.Label(numeros, text="Ritmo: -", width=22)
+        self.rotulo_ritmo.grid(row=0, column=2, sticky="w")
+        self.rotulo_tempo = ttk.Label(numeros, text="Tempo: -", width=36)
+        self.rotulo_tempo.grid(row=0, column=3, sticky="w")
+
+        self.canvas = tk.Canvas(self.frame, width=LARGURA_CANVAS, height=ALTURA_LINHA * MAX_ETAPAS,
+                                highlightthickness=0, background="white")
+        self.canvas.grid(row=0, column=1, rowspan=2, sticky="e", padx=(10, 0))
+
+        self._agendar()
+
+    def grid(self, **kwargs):
+        self.frame.grid(**kwargs)
+
+    def _agendar(self):
+        self._agendado = self.root.after(self.intervalo_ms, self._atualizar_periodicamente)
+
+    def _atualizar_periodicamente(self):
+        try:
+            self.atualizar()
+        finally:
+            self._agendar()
+
+    def espelhar(self, dados):
+        """Mostra o instantâneo recebido de outro processo (None volta ao progresso local)."""
+        self._remoto = dados
+        self._geracao = None
+
+    def atualizar(self):
+        dados = self._remoto if self._remoto is not None else progresso.instantaneo()
+        if dados["em_execucao"] or dados["geracao"] != self._geracao:
+            # O tempo decorrido muda a cada ciclo enquanto a execução está em andamento
+            self._mostrar_numeros(dados)
+        if dados["geracao"] != self._geracao:
+            self._desenhar_sparklines(dados["etapas"])
+            self._geracao = dados["geracao"]
+
+    def _mostrar_numeros(self, dados):
+        total, feitos = dados["total"], dados["concluidos"]
+        if total:
+            self.barra.configure(maximum=total, value=min(feitos, total))
+            self.rotulo_itens.configure(text=f"Itens: {feitos}/{total} ({feitos * 100 // total}%)")
+        else:
+            self.barra.configure(maximum=1, value=0)
+            self.rotulo_itens.configure(text=f"Itens: {feitos}" if dados["modulo"] else "Itens: -")
+        self.rotulo_resultado.configure(text=f"✅ {dados['sucessos']}   ❌ {dados['erros']}")
+        self.rotulo_ritmo.configure(text=f"Ritmo: {dados['itens_por_minuto']:.1f} itens/min")
+
+        tempo = f"Tempo: {formatar_duracao(dados['decorrido'])}"
+        if dados["eta"] is not None:
+            termino = time.strftime("%H:%M", time.localtime(time.time() + dados["eta"]))
+            tempo += f"   Restante: ~{formatar_duracao(dados['eta'])} ({termino})"
+        self.rotulo_tempo.configure(text=tempo)
+
+    def _desenhar_sparklines(self, etapas):
+        self.canvas.delete("all")
+        mais_demoradas = sorted(etapas.items(), key=lambda par: sum(par[1]) / len(par[1]), reverse=True)
+        for linha, (nome, duracoes) in enumerate(mais_demoradas[:MAX_ETAPAS]):
+            topo = linha * ALTURA_LINHA
+            media = sum(duracoes) / len(duracoes)
+            self.canvas.create_text(2, topo + ALTURA_LINHA / 2, anchor="w", font=("Consolas", 8),
+                                    text=f"{nome[:20]:<20} {media:6.1f}s")
+            self._desenhar_linha(duracoes, topo)
+
+    def _desenhar_linha(self, duracoes, topo):
+        maior = max(duracoes) or 1.0
+        largura = LARGURA_CANVAS - LARGURA_ROTULO - 4
+        passo = largura / max(len(duracoes) - 1, 1)
+        pontos = []
+        for i, duracao in enumerate(duracoes):
+            pontos += [LARGURA_ROTULO + i * passo, topo + ALTURA_LINHA - 3 - (duracao / maior) * (ALTURA_LINHA - 6)]
+        if len(pontos) == 2:
+            pontos += [pontos[0] + 1, pontos[1]]
+        self.canvas.create_line(*pontos, fill="steelblue")
+        self.canvas.create_oval(pontos[-2] - 2, pontos[-1] - 2, pontos[-2] + 2, pontos[-1] + 2,
+                                fill="steelblue", outline="")
+
+    def fechar(self):
+        if self._agendado is not None:
+            self.root.after_cancel(self._agendado)
+            self._agendado = None
@@ -0,0 +1,342 @@
+"""
+Leitura rápida das planilhas de entrada dos módulos.
+
+O arquivo é aberto uma única vez e cada aba é percorrida uma vez, lendo só as colunas
+pedidas. Cada linha vira um dict compacto com as chaves pedidas mais `_linha` (número da
+linha no Excel). Com o pacote opcional `python-calamine` instalado a leitura usa esse
+motor, bem mais rápido; sem ele, o openpyxl em modo somente leitura (streaming).
+RPA_EXCEL_ENGINE=openpyxl força o openpyxl.
+
+As colunas são indicadas por chave:
+    - letra ("A", "B", ...): posição fixa, como `sheet['A2']`;
+    - lista de nomes possíveis: procurados no cabeçalho com `encontrar_coluna`;
+    - inteiro: índice da coluna começando em 1, como `sheet.cell(column=...)`.
+
+    colunas = {"codigo": "A", "mascara": ["mascara", "máscara", "mask"]}
+    for registro in ler_registros(caminho, colunas, obrigatorias=("codigo",)):
+        ...
+
+Para devolver resultados à planilha, `GravadorResultados` altera só as colunas de
+resultado das linhas processadas, em lotes, mantendo o resto do arquivo como está.
+"""
+import os
+import re
+import time
+import zipfile
+from copy import copy
+from datetime import date, datetime
+
+from openpyxl import load_workbook
+from openpyxl.utils import column_index_from_string, get_column_letter
+
+from src.core.diario import diario
+from src.core.logger import log_message
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:  # motor opcional; o openpyxl atende sozinho
+    CalamineWorkbook = None
+
+EXCEL_ENGINE = os.getenv("RPA_EXCEL_ENGINE", "auto")
+RESULTADOS_LOTE = int(os.getenv("RPA_RESULTADOS_LOTE", "10"))
+RESULTADOS_INTERVALO = float(os.getenv("RPA_RESULTADOS_INTERVALO", "30"))
+
+
+class _LeitorOpenpyxl:
+    def __init__(self, caminho):
+        self.workbook = load_workbook(caminho, read_only=True, data_only=True)
+        self.abas = self.workbook.sheetnames
+        self.aba_ativa = self.workbook.active.title
+
+    def linhas(self, aba):
+        sheet = self.workbook[aba]
+        # Alguns geradores gravam a dimensão errada; sem isso o modo somente leitura para antes
+        sheet.reset_dimensions()
+        return sheet.iter_rows(values_only=True)
+
+    def fechar(self):
+        self.workbook.close()
+
+
+class _LeitorCalamine:
+    """Devolve os valores como o openpyxl: None para vazio, int para números inteiros e
+    datetime para datas, para os módulos não perceberem a troca de motor."""
+
+    def __init__(self, caminho):
+        self.workbook = CalamineWorkbook.from_path(caminho)
+        self.abas = self.workbook.sheet_names
+        self.aba_ativa = self.abas[_indice_aba_ativa(caminho)] if self.abas else None
+
+    @staticmethod
+    def _valor(valor):
+        if valor == "":
+            return None
+        if isinstance(valor, float) and valor.is_integer():
+            return int(valor)
+        if isinstance(valor, date) and not isinstance(valor, datetime):
+            return datetime(valor.year, valor.month, valor.day)
+        return valor
+
+    def linhas(self, aba):
+        valor = self._valor
+        for linha in self.workbook.get_sheet_by_name(aba).to_python(skip_empty_area=False):
+            yield tuple(valor(v) for v in linha)
+
+    def fechar(self):
+        if hasattr(self.workbook, "close"):
+            self.workbook.close()
+
+
+def _indice_aba_ativa(caminho):
+    # O calamine não informa a aba ativa; ela fica em <workbookView activeTab="n">
+    try:
+        with zipfile.ZipFile(caminho) as arquivo:
+            xml = arquivo.read("xl/workbook.xml").decode("utf-8", "ignore")
+        encontrado = re.search(r'activeTab="(\d+)"', xml)
+        return int(encontrado.group(1)) if encontrado else 0
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return 0
+
+
+def _abrir(caminho):
+    if CalamineWorkbook is not None and EXCEL_ENGINE != "openpyxl" and caminho.lower().endswith((".xlsx", ".xlsm")):
+        return _LeitorCalamine(caminho)
+    return _LeitorOpenpyxl(caminho)
+
+
+def mapear_cabecalho(valores) -> dict:
+    """{nome da coluna em minúsculas: índice (base 0)} a partir da linha de cabeçalho."""
+    colunas = {}
+    for indice, valor in enumerate(valores or ()):
+        if valor is not None and str(valor).strip():
+            colunas[str(valor).strip().lower()] = indice
+    return colunas
+
+
+def encontrar_coluna(colunas: dict, nomes_possiveis, parcial: bool = True) -> int:
+    """Índice da coluna para o primeiro nome possível que aparece no cabeçalho.
+
+    Para cada nome, na ordem, vale o cabeçalho igual ao nome e, se não houver e `parcial`
+    estiver ligado, o primeiro que contém o nome (mesma regra usada nos módulos de macroscopia).
+    """
+    for nome in nomes_possiveis:
+        nome = nome.lower()
+        if nome in colunas:
+            return colunas[nome]
+        if not parcial:
+            continue
+        for coluna_nome, indice in colunas.items():
+            if nome in coluna_nome:
+                return indice
+    return None
+
+
+def _resolver_colunas(colunas: dict, cabecalho: dict, parcial: bool) -> dict:
+    indices = {}
+    for chave, especificacao in colunas.items():
+        if isinstance(especificacao, int):
+            indices[chave] = especificacao - 1
+        elif isinstance(especificacao, str) and re.fullmatch(r"[A-Za-z]{1,3}", especificacao):
+            indices[chave] = column_index_from_string(especificacao.upper()) - 1
+        else:
+            nomes = [especificacao] if isinstance(especificacao, str) else especificacao
+            indices[chave] = encontrar_coluna(cabecalho, nomes, parcial)
+    return indices
+
+
+def _ler_aba(linhas, nome_aba, colunas, cabecalho, obrigatorias, mostrar_mapeamento, parcial):
+    linhas = iter(linhas)
+    primeira = 1
+
+    mapa_cabecalho = {}
+    if cabecalho:
+        mapa_cabecalho = mapear_cabecalho(next(linhas, None))
+        primeira = 2
+
+    indices = _resolver_colunas(colunas, mapa_cabecalho, parcial)
+    faltando = [chave for chave in obrigatorias if indices.get(chave) is None]
+    if faltando:
+        raise ValueError(f"Coluna(s) {', '.join(faltando)} não encontrada(s) na aba '{nome_aba}'")
+    if mostrar_mapeamento:
+        if cabecalho:
+            log_message(f"📋 Colunas detectadas em '{nome_aba}': {list(mapa_cabecalho.keys())}", "INFO")
+        mapeamento = ", ".join(
+            f"{chave}={get_column_letter(indice + 1) if indice is not None else '-'}"
+            for chave, indice in indices.items()
+        )
+        log_message(f"✅ Mapeamento: {mapeamento}", "INFO")
+
+    usadas = [(chave, indice) for chave, indice in indices.items() if indice is not None]
+    ausentes = [chave for chave, indice in indices.items() if indice is None]
+
+    registros = []
+    for numero, valores in enumerate(linhas, start=primeira):
+        registro = {chave: (valores[indice] if indice < len(valores) else None) for chave, indice in usadas}
+        if all(valor is None for valor in registro.values()):
+            continue
+        for chave in ausentes:
+            registro[chave] = None
+        registro["_linha"] = numero
+        registros.append(registro)
+    return registros
+
+
+def ler_abas(caminho: str, colunas: dict, abas=None, cabecalho: bool = True,
+             obrigatorias=(), mostrar_mapeamento: bool = False, parcial: bool = True) -> dict:
+    """{nome da aba: [registros]} lendo o arquivo uma única vez.
+
+    Args:
+        caminho: arquivo .xlsx.
+        colunas: {chave: letra | [nomes possíveis] | índice} - ver docstring do módulo.
+        abas: nomes das abas a ler; None lê todas, na ordem do arquivo.
+        cabecalho: se a primeira linha é cabeçalho (é pulada e usada no mapeamento).
+        obrigatorias: chaves cuja coluna precisa existir; senão levanta ValueError.
+        mostrar_mapeamento: registra no log as colunas encontradas no cabeçalho.
+        parcial: aceita cabeçalho que apenas contém o nome procurado.
+
+    Linhas sem nenhum valor nas colunas pedidas são descartadas.
+    """
+    leitor = _abrir(caminho)
+    try:
+        nomes = leitor.abas if abas is None else list(abas)
+        return {
+            nome: _ler_aba(leitor.linhas(nome), nome, colunas, cabecalho, obrigatorias, mostrar_mapeamento, parcial)
+            for nome in nomes
+        }
+    finally:
+        leitor.fechar()
+
+
+def ler_registros(caminho: str, colunas: dict, aba=None, cabecalho: bool = True,
+                  obrigatorias=(), mostrar_mapeamento: bool = False, parcial: bool = True) -> list:
+    """Registros de uma aba: pelo nome, pela posição (0 = primeira, como o pd.read_excel)
+    ou a ativa, se `aba` não for informada."""
+    leitor = _abrir(caminho)
+    try:
+        nome = leitor.abas[aba] if isinstance(aba, int) else (aba or leitor.aba_ativa)
+        return _ler_aba(leitor.linhas(nome), nome, colunas, cabecalho, obrigatorias, mostrar_mapeamento, parcial)
+    finally:
+        leitor.fechar()
+
+
+def valores_unicos(registros: list, chave: str) -> list:
+    """Valores não vazios da chave, sem repetição e na ordem em que aparecem."""
+    vistos = {}
+    for registro in registros:
+        valor = registro.get(chave)
+        if valor is not None and not (isinstance(valor, str) and not valor.strip()):
+            vistos.setdefault(valor, None)
+    return list(vistos)
+
+
+def texto_celula(valor) -> str:
+    """Valor da célula como texto, sem o .0 de números inteiros lidos como float."""
+    if valor is None:
+        return ""
+    texto = str(valor).strip()
+    return texto[:-2] if texto.endswith(".0") else texto
+
+
+class GravadorResultados:
+    """Grava resultados na própria planilha de entrada, linha a linha, sem reescrevê-la.
+
+    Só as células das colunas de resultado das linhas processadas são alteradas; colunas
+    que faltam são criadas no fim do cabeçalho com o estilo dele. O resto do arquivo
+    (formatação, larguras, outras abas, CARTAO como texto) fica como estava. As alterações
+    vão para o disco a cada `lote` itens ou `intervalo` segundos e no `fechar()`, sempre
+    num arquivo temporário que substitui o original de uma vez: uma queda no meio da
+    execução deixa a planilha com os resultados do último lote gravado. Cada gravação é
+    registrada no diário de progresso, para a retomada reconhecer a planilha regravada.
+
+    Se o arquivo estiver aberto em outro programa, passa a gravar em
+    `<nome>_com_resultados_<data>.xlsx`.
+
+        gravador = GravadorResultados(excel_file, "GUIA", ["Numero_Guia", "Status_Guia"])
+        gravador.atualizar(guia, {"Numero_Guia": numero, "Status_Guia": status})
+        caminho = gravador.fechar()
+    """
+
+    def __init__(self, caminho: str, coluna_chave: str, colunas: list, lote: int = RESULTADOS_LOTE,
+                 intervalo: float = RESULTADOS_INTERVALO):
+        self.caminho = caminho
+        self.lote = max(1, lote)
+        self.intervalo = intervalo
+        self.pendentes = 0
+        self.fechado = False
+        self._ultima_gravacao = time.monotonic()
+
+        self.workbook = load_workbook(caminho)
+        # Primeira aba, a mesma lida pelo pd.read_excel e pelos módulos
+        self.sheet = self.workbook.worksheets[0]
+        cabecalho = {
+            texto_celula(celula.value).upper(): celula.column
+            for celula in self.sheet[1] if texto_celula(celula.value)
+        }
+        if coluna_chave.upper() not in cabecalho:
+            raise ValueError(f"Coluna {coluna_chave} não encontrada no Excel")
+
+        self.colunas = {}
+        ultima = max(cabecalho.values())
+        adicionadas = []
+        for nome in colunas:
+            indice = cabecalho.get(nome.upper())
+            if indice is None:
+                indice = ultima = ultima + 1
+                nova = self.sheet.cell(row=1, column=indice, value=nome)
+                nova._style = copy(self.sheet.cell(row=1, column=indice - 1)._style)
+                adicionadas.append(nome)
+            self.colunas[nome] = indice
+        if adicionadas:
+            log_message(f"✅ Colunas adicionadas: {adicionadas}", "SUCCESS")
+            self.pendentes += 1
+
+        coluna = cabecalho[coluna_chave.upper()]
+        self.linhas = {}
+        for numero, (valor,) in enumerate(
+                self.sheet.iter_rows(min_row=2, min_col=coluna, max_col=coluna, values_only=True), start=2):
+            chave = texto_celula(valor)
+            if chave:
+                self.linhas.setdefault(chave, numero)
+
+    def atualizar(self, chave, valores: dict) -> bool:
+        """Altera as colunas de resultado da linha da chave. False se a chave não existe."""
+        numero = self.linhas.get(texto_celula(chave))
+        if numero is None:
+            return False
+        for nome, valor in valores.items():
+            self.sheet.cell(row=numero, column=self.colunas[nome], value=valor)
+        self.pendentes += 1
+        if self.pendentes >= self.lote or time.monotonic() - self._ultima_gravacao >= self.intervalo:
+            self.gravar()
+        return True
+
+    def gravar(self):
+        """Grava as alterações pendentes (arquivo temporário + troca atômica)."""
+        if not self.pendentes:
+            return self.caminho
+        pasta, nome = os.path.split(os.path.abspath(self.caminho))
+        temporario = os.path.join(pasta, f".~{nome}.tmp")
+        try:
+            self.workbook.save(temporario)
+            os.replace(temporario, self.caminho)
+        except PermissionError:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            base = os.path.splitext(self.caminho)[0]
+            self.caminho = f"{base}_com_resultados_{datetime.now():%Y%m%d_%H%M%S}.xlsx"
+            log_message(f"⚠️ Planilha em uso, resultados serão gravados em {self.caminho}", "WARNING")
+            self.workbook.save(self.caminho)
+        diario.registrar_versao(self.caminho)
+        self.pendentes = 0
+        self._ultima_gravacao = time.monotonic()
+        return self.caminho
+
+    def fechar(self):
+        """Grava o que falta e libera a planilha. Retorna o arquivo com os resultados."""
+        if self.fechado:
+            return self.caminho
+        try:
+            return self.gravar()
+        finally:
+            self.fechado = True
+            self.workbook.close()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Os módulos são importados como `src.core...`, a partir da pasta rpa_v2
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
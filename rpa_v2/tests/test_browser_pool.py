@@ -0,0 +1,27 @@
+import pytest
+
+pytest.importorskip("selenium")
+
+from src.core.browser_factory import BrowserFactory, BrowserPool
+
+
+class DriverFalso:
+    def __init__(self):
+        self.fechado = False
+
+    def quit(self):
+        self.fechado = True
+
+
+def test_shutdown_fecha_os_emprestados_so_quando_pedido(monkeypatch):
+    monkeypatch.setattr(BrowserFactory, "create_chrome", staticmethod(lambda **kwargs: DriverFalso()))
+    pool = BrowserPool(size=1)
+    deixado_aberto = pool.acquire()
+    outro = pool.acquire(headless=True)
+
+    pool.shutdown()
+    assert not deixado_aberto.fechado and not outro.fechado
+
+    pool.shutdown(emprestados=True)
+    assert deixado_aberto.fechado and outro.fechado
+    assert not pool._in_use
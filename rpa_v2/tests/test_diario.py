@@ -0,0 +1,117 @@
+import threading
+
+import pytest
+from openpyxl import Workbook
+
+from src.core import diario as diario_mod
+from src.core.diario import Diario, registrar_item
+from src.utils.planilha import GravadorResultados
+
+
+class ModuloFalso:
+    def __init__(self):
+        self.processados = []
+
+    @registrar_item
+    def processar_guia(self, guia):
+        self.processados.append(guia)
+        return {"status": "sucesso", "guia": guia}
+
+
+def criar_planilha(caminho, guias):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["GUIA", "Status_Guia"])
+    for guia in guias:
+        sheet.append([guia, None])
+    workbook.save(caminho)
+
+
+def test_retomada_depois_de_gravar_resultados(tmp_path, monkeypatch):
+    diario = Diario(caminho=str(tmp_path / "progresso.sqlite3"), ativo=True)
+    monkeypatch.setattr(diario_mod, "diario", diario)
+    monkeypatch.setattr("src.utils.planilha.diario", diario)
+    planilha = tmp_path / "guias.xlsx"
+    criar_planilha(planilha, ["111", "222", "333"])
+
+    # Primeira execução cai depois de duas guias, com os resultados já gravados na planilha
+    diario.iniciar("guias.teste", str(planilha))
+    modulo = ModuloFalso()
+    gravador = GravadorResultados(str(planilha), "GUIA", ["Status_Guia"], lote=1)
+    for guia in ("111", "222"):
+        gravador.atualizar(guia, {"Status_Guia": modulo.processar_guia(guia)["status"]})
+    gravador.fechar()
+    diario.finalizar("erro")
+
+    diario.iniciar("guias.teste", str(planilha), retomar=True)
+    retomado = ModuloFalso()
+    resultados = [retomado.processar_guia(guia) for guia in ("111", "222", "333")]
+    diario.finalizar()
+
+    assert retomado.processados == ["333"]
+    assert diario.pulados == 2
+    assert resultados[0] == {"status": "sucesso", "guia": "111"}
+
+
+def test_planilha_alterada_processa_tudo_de_novo(tmp_path, monkeypatch):
+    diario = Diario(caminho=str(tmp_path / "progresso.sqlite3"), ativo=True)
+    monkeypatch.setattr(diario_mod, "diario", diario)
+    planilha = tmp_path / "guias.xlsx"
+    criar_planilha(planilha, ["111"])
+
+    diario.iniciar("guias.teste", str(planilha))
+    ModuloFalso().processar_guia("111")
+    diario.finalizar()
+
+    criar_planilha(planilha, ["111", "444"])
+    diario.iniciar("guias.teste", str(planilha), retomar=True)
+    modulo = ModuloFalso()
+    modulo.processar_guia("111")
+    diario.finalizar()
+
+    assert modulo.processados == ["111"]
+
+
+def test_execucao_cancelada_fica_registrada_como_cancelada(tmp_path, monkeypatch):
+    diario = Diario(caminho=str(tmp_path / "progresso.sqlite3"), ativo=True)
+    monkeypatch.setattr(diario_mod, "diario", diario)
+    planilha = tmp_path / "guias.xlsx"
+    criar_planilha(planilha, ["111"])
+    cancel_flag = threading.Event()
+
+    class Cancelada(BaseException):
+        pass
+
+    class Modulo:
+        def run(self, params):
+            params["cancel_flag"].set()
+            raise Cancelada()
+
+    diario_mod.instrumentar_classe(Modulo)
+    with pytest.raises(Cancelada):
+        Modulo().run({"excel_file": str(planilha), "cancel_flag": cancel_flag})
+
+    assert diario.execucoes_recentes(1)[0][5] == "cancelada"
+
+
+def test_metodo_sem_retorno_e_refeito_na_retomada(tmp_path, monkeypatch):
+    diario = Diario(caminho=str(tmp_path / "progresso.sqlite3"), ativo=True)
+    monkeypatch.setattr(diario_mod, "diario", diario)
+    planilha = tmp_path / "guias.xlsx"
+    criar_planilha(planilha, ["111"])
+    processados = []
+
+    @registrar_item
+    def processar_guia(modulo, guia):
+        processados.append(guia)
+
+    diario.iniciar("guias.teste", str(planilha))
+    processar_guia(None, "111")
+    assert diario.finalizar()["indefinido"] == 1
+
+    diario.iniciar("guias.teste", str(planilha), retomar=True)
+    processar_guia(None, "111")
+    diario.finalizar()
+
+    assert processados == ["111", "111"]
+    assert diario.pulados == 0
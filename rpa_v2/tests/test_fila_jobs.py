@@ -0,0 +1,125 @@
+import sys
+import types
+
+import pytest
+
+pytest.importorskip("selenium")
+
+from src.core.fila_jobs import ExecutorFila, FilaJobs, ler_limites, portais_do_modulo
+
+MODULOS = {
+    "conclusao": {"name": "Conclusão", "module_path": "modulo_falso"},
+    "guias": {"name": "Guias", "module_path": "modulo_falso", "requires_unimed_credentials": True},
+    "lote": {"name": "Lote", "module_path": "modulo_falso", "portais": ["Unimed"]},
+}
+
+
+@pytest.fixture
+def fila(tmp_path):
+    return FilaJobs(caminho=str(tmp_path / "fila.sqlite3"))
+
+
+def test_ler_limites():
+    assert ler_limites("pathoweb=2, Unimed=1,hospital=x,,=3") == {"pathoweb": 2, "unimed": 1}
+    assert ler_limites("") == {}
+
+
+def test_portais_do_modulo():
+    assert portais_do_modulo(MODULOS["conclusao"]) == ["pathoweb"]
+    assert portais_do_modulo(MODULOS["guias"]) == ["pathoweb", "unimed"]
+    assert portais_do_modulo(MODULOS["lote"]) == ["unimed"]
+
+
+def test_senhas_e_cancel_flag_nao_sao_gravadas(fila):
+    job_id = fila.adicionar("guias", {"excel_file": "guias.xlsx", "username": "ana", "password": "segredo",
+                                      "unimed_pass": "segredo", "cancel_flag": object()})
+
+    job = fila.listar()[0]
+    assert job["id"] == job_id
+    assert job["params"] == {"excel_file": "guias.xlsx", "username": "ana"}
+    assert job["excel_file"] == "guias.xlsx"
+
+
+def test_interrompidos_voltam_em_modo_retomar(fila):
+    com_planilha = fila.adicionar("guias", {"excel_file": "guias.xlsx"})
+    sem_planilha = fila.adicionar("conclusao", {})
+    fila.adicionar("lote", {})
+    fila.marcar(com_planilha, "executando")
+    fila.marcar(sem_planilha, "executando")
+
+    assert fila.recuperar_interrompidos() == 2
+
+    jobs = {job["id"]: job for job in fila.listar(somente_pendentes=True)}
+    assert len(jobs) == 3
+    assert jobs[com_planilha]["params"] == {"excel_file": "guias.xlsx", "retomar": True}
+    assert jobs[sem_planilha]["params"] == {}
+
+
+def test_limite_por_portal(fila):
+    guias = fila.adicionar("guias", {})
+    lote = fila.adicionar("lote", {})
+    conclusao = fila.adicionar("conclusao", {})
+    executor = ExecutorFila(MODULOS, fila=fila, concorrencia=3, limites={"pathoweb": 2, "unimed": 1})
+
+    assert executor._proximo()["id"] == guias
+    executor._rodando[guias] = (fila.listar()[0], None)
+    # unimed (limite 1) já ocupado pelo job de guias: o lote espera, a conclusão entra
+    assert executor._proximo()["id"] == conclusao
+    executor._rodando[conclusao] = (fila.listar()[2], None)
+    assert executor._proximo() is None
+
+    executor._rodando.pop(guias)
+    fila.marcar(guias, "concluido")
+    assert executor._proximo()["id"] == lote
+
+
+def test_portal_sem_limite_usa_a_concorrencia(fila):
+    guias = fila.adicionar("guias", {})
+    lote = fila.adicionar("lote", {})
+    executor = ExecutorFila(MODULOS, fila=fila, concorrencia=2, limites={})
+
+    assert executor.limite("unimed") == 2
+    executor._rodando[guias] = (fila.listar()[0], None)
+    assert executor._proximo()["id"] == lote
+    executor._rodando[lote] = (fila.listar()[1], None)
+    fila.adicionar("conclusao", {})
+    assert executor._proximo() is None
+
+
+def test_jobs_rodam_em_ordem_com_as_credenciais(fila, monkeypatch):
+    chamadas = []
+    modulo = types.ModuleType("modulo_falso")
+    modulo.run = lambda params: chamadas.append(params)
+    monkeypatch.setitem(sys.modules, "modulo_falso", modulo)
+    primeiro = fila.adicionar("conclusao", {"excel_file": "a.xlsx", "password": "velha"})
+    segundo = fila.adicionar("guias", {"excel_file": "b.xlsx"})
+    logs = []
+
+    executor = ExecutorFila(MODULOS, credenciais=lambda: {"username": "ana", "password": "nova"}, fila=fila,
+                            ao_log=lambda mensagem, nivel="INFO": logs.append(mensagem))
+    executor.iniciar().thread.join(5)
+
+    assert [params["excel_file"] for params in chamadas] == ["a.xlsx", "b.xlsx"]
+    assert all(params["password"] == "nova" and params["cancel_flag"] is executor.cancel_flag
+               for params in chamadas)
+    assert {job["id"]: job["situacao"] for job in fila.listar()} == {primeiro: "concluido", segundo: "concluido"}
+    assert logs[-1] == "📋 Fila encerrada - 0 job(s) pendente(s)"
+
+
+def test_erro_pausa_a_fila(fila, monkeypatch):
+    modulo = types.ModuleType("modulo_falso")
+
+    def run(params):
+        raise RuntimeError("planilha inválida")
+
+    modulo.run = run
+    monkeypatch.setitem(sys.modules, "modulo_falso", modulo)
+    primeiro = fila.adicionar("conclusao", {})
+    segundo = fila.adicionar("conclusao", {})
+
+    executor = ExecutorFila(MODULOS, fila=fila, ao_log=lambda mensagem, nivel="INFO": None, parar_em_erro=True)
+    executor.iniciar().thread.join(5)
+
+    jobs = {job["id"]: job for job in fila.listar()}
+    assert (jobs[primeiro]["situacao"], jobs[primeiro]["erro"]) == ("erro", "planilha inválida")
+    assert jobs[segundo]["situacao"] == "pendente"
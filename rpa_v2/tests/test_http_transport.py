@@ -0,0 +1,151 @@
+import json
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("selenium")
+
+from src.core import http_transport
+
+
+@pytest.fixture(autouse=True)
+def estado_limpo(monkeypatch):
+    monkeypatch.setattr(http_transport, "HTTP_FAST_PATH", True)
+    http_transport.reiniciar()
+    yield
+    http_transport.reiniciar()
+    http_transport._transportes.clear()
+
+
+def test_falhas_seguidas_desligam_ate_a_proxima_execucao():
+    class Modulo:
+        def run(self, params):
+            return http_transport.http_ativo()
+
+    http_transport.instrumentar_classe(Modulo)
+    for _ in range(http_transport.MAX_FALHAS_SEGUIDAS):
+        http_transport._registrar_resultado(False)
+    assert not http_transport.http_ativo()
+
+    assert Modulo().run({}) is True
+
+
+def test_sucesso_zera_as_falhas():
+    http_transport._registrar_resultado(False)
+    http_transport._registrar_resultado(True)
+    for _ in range(http_transport.MAX_FALHAS_SEGUIDAS - 1):
+        http_transport._registrar_resultado(False)
+    assert http_transport.http_ativo()
+
+
+def test_transporte_descartado_com_o_driver():
+    driver = object()
+    primeiro = http_transport.transporte_para(driver)
+    assert http_transport.transporte_para(driver) is primeiro
+
+    http_transport.descartar_transporte(driver)
+
+    assert id(driver) not in http_transport._transportes
+    assert http_transport.transporte_para(driver) is not primeiro
+
+
+class RespostaFalsa:
+    def __init__(self, texto="", tipo="text/html", status=200, url="https://pathoweb/moduloFaturamento/x"):
+        self.text = texto
+        self.status_code = status
+        self.url = url
+        self.headers = {"Content-Type": tipo}
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class DriverFalso:
+    def __init__(self, dados):
+        self.dados = dados
+        self.argumentos = None
+
+    def execute_script(self, script, *argumentos):
+        self.argumentos = argumentos
+        return self.dados
+
+    def get_cookies(self):
+        return [{"name": "JSESSIONID", "value": "abc", "domain": "pathoweb", "path": "/"}]
+
+
+def dados_link(campos, formulario=False, escopo=True):
+    return {"url": "/moduloFaturamento/alterarStatus?statusConferido=O", "metodo": "POST", "campos": campos,
+            "escopo": escopo, "formulario": formulario, "pagina": "https://pathoweb/moduloFaturamento/index",
+            "agente": "Chrome"}
+
+
+@pytest.fixture
+def envios(monkeypatch):
+    enviados = []
+    respostas = []
+    transporte = http_transport.TransporteAjax()
+
+    def post(url, data=None, headers=None, timeout=None):
+        enviados.append((url, data))
+        return respostas.pop(0)
+
+    monkeypatch.setattr(transporte.http, "post", post)
+    return transporte, enviados, respostas
+
+
+@pytest.mark.parametrize("texto, tipo", [
+    ('{"sucesso": true}', "application/json"),
+    ('<div class="alert alert-success">Exame salvo</div>', "text/html"),
+])
+def test_resposta_confirmada(texto, tipo):
+    http_transport.TransporteAjax._validar(RespostaFalsa(texto, tipo))
+
+
+@pytest.mark.parametrize("resposta", [
+    RespostaFalsa("<html><h1>Pathoweb</h1></html>"),
+    RespostaFalsa("{}", "application/json"),
+    RespostaFalsa('<div class="alert alert-danger">Erro</div><div class="alert-success"></div>'),
+    RespostaFalsa("<form>...</form>", url="https://pathoweb/login/auth"),
+])
+def test_resposta_sem_confirmacao_volta_para_o_navegador(resposta):
+    with pytest.raises(http_transport.FalhaTransporte):
+        http_transport.TransporteAjax._validar(resposta)
+
+
+def test_link_sem_formulario_exige_campos_declarados(envios):
+    transporte, enviados, _ = envios
+    driver = DriverFalso(dados_link([]))
+
+    with pytest.raises(http_transport.FalhaTransporte, match="campos da ação"):
+        transporte.disparar_link(driver, "a.online")
+    assert enviados == []
+
+
+def test_link_sem_formulario_envia_so_os_campos_da_tabela(envios):
+    transporte, enviados, respostas = envios
+    driver = DriverFalso(dados_link([["exameId", "E1"], ["exameId", "E2"]]))
+    respostas.append(RespostaFalsa("<tr><td>E1</td><td>On-line</td></tr><tr><td>E2</td><td>On-line</td></tr>"))
+
+    transporte.disparar_link(driver, "a.online", campos=("exameId",), escopo="#tabela", confirmacao=("On-line",))
+
+    assert driver.argumentos == ("a.online", ["exameId"], "#tabela")
+    assert enviados == [("https://pathoweb/moduloFaturamento/alterarStatus?statusConferido=O",
+                         [("exameId", "E1"), ("exameId", "E2")])]
+
+
+def test_tabela_sem_os_itens_enviados_nao_confirma(envios):
+    transporte, _, respostas = envios
+    driver = DriverFalso(dados_link([["exameId", "E1"], ["exameId", "E2"]]))
+    respostas.append(RespostaFalsa("<tr><td>E1</td><td>On-line</td></tr>"))
+
+    with pytest.raises(http_transport.FalhaTransporte, match="E2"):
+        transporte.disparar_link(driver, "a.online", campos=("exameId",), confirmacao=("On-line",))
+
+
+def test_tabela_da_acao_ausente(envios):
+    transporte, enviados, _ = envios
+    driver = DriverFalso(dados_link([], escopo=False))
+
+    with pytest.raises(http_transport.FalhaTransporte, match="tabela"):
+        transporte.disparar_link(driver, "a.online", campos=("exameId",), escopo="#tabela")
+    assert enviados == []
@@ -0,0 +1,115 @@
+import threading
+
+import pytest
+
+pytest.importorskip("selenium")
+
+from src.modules.guias import lancamento_guia_unimed
+from src.modules.guias.lancamento_guia_unimed import ConsultaLiberacaoGuias
+
+
+class ConsultaFalsa:
+    """`consultar_status_guia` sem navegador: cada guia é liberada na consulta de número `liberar_em`."""
+
+    def __init__(self, liberar_em):
+        self.liberar_em = liberar_em
+        self.consultas = []
+
+    def __call__(self, numero_guia):
+        self.consultas.append(numero_guia)
+        if self.consultas.count(numero_guia) >= self.liberar_em.get(numero_guia, float("inf")):
+            return {"sucesso": True, "status_guia": "Liberada"}
+        return {"sucesso": True, "status_guia": "Em análise"}
+
+
+@pytest.fixture
+def esperas(monkeypatch):
+    # Não espera de verdade: só registra quanto tempo a consulta esperaria
+    registradas = []
+
+    def esperar_cancelamento(segundos, cancel_flag=None):
+        registradas.append(round(segundos))
+        return cancel_flag is not None and cancel_flag.is_set()
+
+    monkeypatch.setattr(lancamento_guia_unimed, "esperar_cancelamento", esperar_cancelamento)
+    return registradas
+
+
+def guia(numero):
+    return {"guia": f"g{numero}", "numero_guia": numero, "status": "sucesso"}
+
+
+def test_espera_cresce_ate_o_maximo(esperas):
+    consultar = ConsultaFalsa({"1": 5})
+    consulta = ConsultaLiberacaoGuias(consultar, espera=10, espera_max=30, fator=2, intervalo=0)
+    consulta.adicionar(guia("1"))
+    liberadas = []
+
+    consulta.executar(ao_liberar=liberadas.append)
+
+    assert esperas == [0, 10, 20, 30, 30]
+    assert liberadas == [guia("1") | {"status_guia": "Liberada"}]
+    assert consulta.liberadas == 1
+
+
+def test_rodizio_libera_cada_guia_na_hora(esperas):
+    consultar = ConsultaFalsa({"1": 3, "2": 1, "3": 2})
+    consulta = ConsultaLiberacaoGuias(consultar, espera=10, espera_max=40, fator=2, intervalo=0)
+    for numero in ("1", "2", "3"):
+        consulta.adicionar(guia(numero))
+    liberadas = []
+
+    consulta.executar(ao_liberar=lambda resultado: liberadas.append(resultado["numero_guia"]))
+
+    assert consultar.consultas == ["1", "2", "3", "1", "3", "1"]
+    assert liberadas == ["2", "3", "1"]
+
+
+def test_desiste_depois_das_tentativas(esperas):
+    consultar = ConsultaFalsa({})
+    consulta = ConsultaLiberacaoGuias(consultar, max_tentativas=2, espera=5, espera_max=5, intervalo=0)
+    resultado = guia("1")
+    consulta.adicionar(resultado)
+
+    consulta.executar()
+
+    assert len(consultar.consultas) == 3
+    assert resultado["status"] == "erro"
+    assert resultado["status_guia"] == "Não Liberada"
+    assert not consulta.pendentes
+
+
+def test_erro_na_primeira_consulta_nao_entra_na_espera(esperas):
+    def consultar(numero_guia):
+        raise RuntimeError("sessão expirada")
+
+    consulta = ConsultaLiberacaoGuias(consultar, intervalo=0)
+    resultado = guia("1")
+    consulta.adicionar(resultado)
+
+    consulta.executar()
+
+    assert esperas == [0]
+    assert resultado["status"] == "sucesso"
+    assert resultado["status_guia"] == "Erro ao consultar"
+
+
+def test_cancelamento_marca_so_as_guias_ja_consultadas(esperas):
+    cancel_flag = threading.Event()
+    consultar = ConsultaFalsa({})
+    consulta = ConsultaLiberacaoGuias(consultar, cancel_flag=cancel_flag, espera=10, intervalo=0)
+    consultada, nova = guia("1"), guia("2")
+    consulta.adicionar(consultada)
+
+    def consultar_e_cancelar(numero_guia):
+        cancel_flag.set()
+        return consultar(numero_guia)
+
+    consulta.consultar = consultar_e_cancelar
+    consulta.executar()
+    consulta.adicionar(nova)
+    consulta.executar()
+
+    assert consultada["status_guia"] == "Cancelado"
+    assert nova == guia("2")
+    assert not consulta.pendentes
@@ -0,0 +1,34 @@
+import importlib
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("PIL")
+pytest.importorskip("pdf2image")
+
+
+@pytest.fixture
+def extrator(tmp_path, monkeypatch):
+    # O módulo cria resultados_ocr/ na pasta atual ao ser importado
+    monkeypatch.chdir(tmp_path)
+    modulo = importlib.import_module("exame_data_extractor")
+    monkeypatch.setattr(modulo, "process_single_file_optimized", lambda caminho, nome: {"arquivo": nome})
+    return modulo
+
+
+def test_pool_que_nao_inicia_segue_sequencial(extrator, monkeypatch):
+    class PoolDentroDeDaemon:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def submit(self, *args, **kwargs):
+            raise AssertionError("daemonic processes are not allowed to have children")
+
+        def shutdown(self, wait=True, cancel_futures=False):
+            pass
+
+    monkeypatch.setattr(extrator, "ProcessPoolExecutor", PoolDentroDeDaemon)
+
+    resultados = list(extrator.iterar_resultados_ocr(["a.pdf", "b.pdf"], workers=2))
+
+    assert resultados == [("a.pdf", {"arquivo": "a.pdf"}), ("b.pdf", {"arquivo": "b.pdf"})]
@@ -0,0 +1,141 @@
+import threading
+
+import pytest
+
+pytest.importorskip("selenium")
+
+from src.core import parallel_executor
+from src.core.parallel_executor import ExecutorParalelo
+from src.core.waits import dormir
+
+
+class DriverFalso:
+    def __init__(self, nome):
+        self.nome = nome
+        self.vivo = True
+
+    def execute_script(self, script):
+        if not self.vivo:
+            raise RuntimeError("invalid session id")
+        return 1
+
+
+@pytest.fixture
+def navegadores(monkeypatch):
+    criados, liberados = [], []
+
+    def acquire_chrome(headless=True):
+        driver = DriverFalso(f"d{len(criados)}")
+        criados.append(driver)
+        return driver
+
+    monkeypatch.setattr(parallel_executor.BrowserFactory, "acquire_chrome", staticmethod(acquire_chrome))
+    monkeypatch.setattr(parallel_executor.BrowserFactory, "release_chrome", staticmethod(liberados.append))
+    return criados, liberados
+
+
+def processar_ate_o_navegador_cair(item_que_derruba, processados):
+    # Como os métodos por item dos módulos: captura tudo e devolve um dict de erro
+    def processar_item(driver, item):
+        if item == item_que_derruba:
+            driver.vivo = False
+        if not driver.vivo:
+            return {"status": "erro", "erro": "invalid session id"}
+        processados.append((driver.nome, item))
+        return {"status": "sucesso", "item": item}
+    return processar_item
+
+
+def test_navegador_morto_com_resultado_de_erro_e_recriado(navegadores):
+    criados, liberados = navegadores
+    processados = []
+    preparados = []
+
+    resultados = ExecutorParalelo(num_workers=1).executar(
+        range(5), processar_ate_o_navegador_cair(2, processados), preparar_worker=preparados.append)
+
+    assert [r["status"] for r in resultados] == ["sucesso", "sucesso", "erro", "sucesso", "sucesso"]
+    assert len(criados) == 2
+    assert preparados == criados
+    assert criados[0] in liberados
+    assert processados[-2:] == [("d1", 3), ("d1", 4)]
+
+
+def test_erro_com_navegador_ativo_nao_recria(navegadores):
+    criados, _ = navegadores
+
+    resultados = ExecutorParalelo(num_workers=1).executar(
+        range(3), lambda driver, item: {"status": "erro" if item == 1 else "sucesso"})
+
+    assert [r["status"] for r in resultados] == ["sucesso", "erro", "sucesso"]
+    assert len(criados) == 1
+
+
+def test_excecao_continua_registrada_por_ao_falhar(navegadores):
+    def processar_item(driver, item):
+        if item == 0:
+            raise ValueError("linha inválida")
+        return {"status": "sucesso"}
+
+    resultados = ExecutorParalelo(num_workers=1).executar(range(2), processar_item)
+
+    assert resultados[0] == {"status": "erro", "erro": "linha inválida"}
+    assert resultados[1] == {"status": "sucesso"}
+
+
+def test_cancelamento_no_meio_do_item_encerra_o_worker(navegadores):
+    _, liberados = navegadores
+    cancel_flag = threading.Event()
+
+    def processar_item(driver, item):
+        if item == 1:
+            cancel_flag.set()
+            dormir(5, cancel_flag)
+        return {"status": "sucesso", "item": item}
+
+    resultados = ExecutorParalelo(num_workers=1, cancel_flag=cancel_flag).executar(range(3), processar_item)
+
+    assert resultados == [{"status": "sucesso", "item": 0}]
+    assert len(liberados) == 1
+
+
+def test_navegador_do_modulo_trocado_e_liberado_uma_vez(navegadores):
+    criados, liberados = navegadores
+    principal = DriverFalso("principal")
+    executor = ExecutorParalelo(num_workers=1)
+
+    resultados = executor.executar(range(3), processar_ate_o_navegador_cair(1, []), driver_principal=principal)
+
+    assert [r["status"] for r in resultados] == ["sucesso", "erro", "sucesso"]
+    assert executor.driver_principal is criados[0]
+    assert liberados == [principal]
+
+
+def test_navegador_do_modulo_fica_com_o_modulo_sem_substituto(navegadores, monkeypatch):
+    _, liberados = navegadores
+    principal = DriverFalso("principal")
+
+    def sem_navegador(headless=True):
+        raise RuntimeError("chromedriver não iniciou")
+
+    monkeypatch.setattr(parallel_executor.BrowserFactory, "acquire_chrome", staticmethod(sem_navegador))
+    executor = ExecutorParalelo(num_workers=1)
+
+    resultados = executor.executar(range(3), processar_ate_o_navegador_cair(0, []), driver_principal=principal)
+
+    assert resultados[0]["status"] == "erro"
+    assert resultados[1:] == [{"status": "erro", "erro": "chromedriver não iniciou"}] * 2
+    assert executor.driver_principal is principal
+    assert liberados == []
+
+
+def test_itens_sem_navegador_voltam_como_falha(navegadores):
+    def preparar_worker(driver):
+        raise RuntimeError("Falha no login do PathoWeb")
+
+    resultados = ExecutorParalelo(num_workers=2).executar(
+        ["a", "b", "c"], lambda driver, item: {"status": "sucesso"}, preparar_worker=preparar_worker,
+        ao_falhar=lambda item, erro: {"item": item, "status": "erro", "erro": str(erro)})
+
+    assert resultados == [{"item": item, "status": "erro", "erro": "Falha no login do PathoWeb"}
+                          for item in ("a", "b", "c")]
@@ -0,0 +1,118 @@
+import os
+
+import pytest
+from openpyxl import Workbook, load_workbook
+
+from src.utils import planilha
+from src.utils.planilha import GravadorResultados, ler_abas, ler_registros
+
+
+@pytest.fixture(autouse=True)
+def motor_openpyxl(monkeypatch):
+    monkeypatch.setattr(planilha, "EXCEL_ENGINE", "openpyxl")
+
+
+def criar_planilha(caminho, abas):
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for nome, linhas in abas.items():
+        sheet = workbook.create_sheet(nome)
+        for linha in linhas:
+            sheet.append(linha)
+    workbook.save(caminho)
+    return str(caminho)
+
+
+def test_ler_registros_por_nome_letra_e_indice(tmp_path):
+    caminho = criar_planilha(tmp_path / "exames.xlsx", {"Plan1": [
+        ["Código", "Máscara do exame", "Obs"],
+        ["A1", "m1", "x"],
+        [None, None, None],
+        ["A2", None, "y"],
+    ]})
+
+    registros = ler_registros(caminho, {"codigo": "A", "mascara": ["máscara", "mask"], "obs": 3})
+
+    assert registros == [
+        {"codigo": "A1", "mascara": "m1", "obs": "x", "_linha": 2},
+        {"codigo": "A2", "mascara": None, "obs": "y", "_linha": 4},
+    ]
+
+
+def test_coluna_obrigatoria_ausente(tmp_path):
+    caminho = criar_planilha(tmp_path / "exames.xlsx", {"Plan1": [["Código"], ["A1"]]})
+
+    with pytest.raises(ValueError, match="mascara"):
+        ler_registros(caminho, {"codigo": "A", "mascara": ["máscara"]}, obrigatorias=("mascara",))
+
+
+def test_ler_abas_le_todas_em_ordem(tmp_path):
+    caminho = criar_planilha(tmp_path / "lotes.xlsx", {
+        "Lote 1": [["Guia"], ["111"], ["222"]],
+        "Lote 2": [["Guia"], ["333"]],
+    })
+
+    abas = ler_abas(caminho, {"guia": ["guia"]})
+
+    assert list(abas) == ["Lote 1", "Lote 2"]
+    assert [r["guia"] for r in abas["Lote 1"]] == ["111", "222"]
+    assert abas["Lote 2"] == [{"guia": "333", "_linha": 2}]
+
+
+def guias_gravadas(caminho):
+    workbook = load_workbook(caminho)
+    sheet = workbook.worksheets[0]
+    linhas = {linha[0]: linha[1:] for linha in sheet.iter_rows(min_row=2, values_only=True)}
+    cabecalho = [celula.value for celula in sheet[1]]
+    workbook.close()
+    return cabecalho, linhas
+
+
+def test_gravador_grava_em_lotes(tmp_path):
+    caminho = criar_planilha(tmp_path / "guias.xlsx", {"Plan1": [
+        ["GUIA", "Status_Guia"], ["111", None], ["222", None], ["333", None]]})
+    gravador = GravadorResultados(caminho, "GUIA", ["Status_Guia"], lote=2, intervalo=3600)
+
+    assert gravador.atualizar("111", {"Status_Guia": "Liberada"})
+    assert guias_gravadas(caminho)[1]["111"] == (None,)
+
+    gravador.atualizar(222, {"Status_Guia": "Negada"})
+    cabecalho, linhas = guias_gravadas(caminho)
+    assert cabecalho == ["GUIA", "Status_Guia"]
+    assert linhas["111"] == ("Liberada",)
+    assert linhas["222"] == ("Negada",)
+
+    assert not gravador.atualizar("999", {"Status_Guia": "Liberada"})
+    gravador.atualizar("333", {"Status_Guia": "Liberada"})
+    assert gravador.fechar() == caminho
+    assert guias_gravadas(caminho)[1]["333"] == ("Liberada",)
+    assert not os.path.exists(tmp_path / ".~guias.xlsx.tmp")
+
+
+def test_gravador_com_planilha_em_uso_grava_em_outro_arquivo(tmp_path, monkeypatch):
+    caminho = criar_planilha(tmp_path / "guias.xlsx", {"Plan1": [["GUIA", "Status_Guia"], ["111", None]]})
+
+    def arquivo_em_uso(origem, destino):
+        raise PermissionError(destino)
+
+    monkeypatch.setattr(planilha.os, "replace", arquivo_em_uso)
+    gravador = GravadorResultados(caminho, "GUIA", ["Status_Guia", "Numero_Guia"], lote=1)
+    gravador.atualizar("111", {"Status_Guia": "Liberada", "Numero_Guia": "9001"})
+    novo = gravador.fechar()
+
+    assert novo != caminho
+    assert os.path.basename(novo).startswith("guias_com_resultados_")
+    assert guias_gravadas(novo) == (["GUIA", "Status_Guia", "Numero_Guia"], {"111": ("Liberada", "9001")})
+    assert guias_gravadas(caminho) == (["GUIA", "Status_Guia"], {"111": (None,)})
+    assert not os.path.exists(tmp_path / ".~guias.xlsx.tmp")
+
+
+def test_aba_por_posicao_ignora_a_aba_ativa(tmp_path):
+    caminho = tmp_path / "lote.xlsx"
+    criar_planilha(caminho, {"Exames": [["Exame"], ["E1"]], "Resumo": [["Total"], [1]]})
+    workbook = load_workbook(caminho)
+    workbook.active = 1
+    workbook.save(caminho)
+
+    assert ler_registros(str(caminho), {"exame": ["exame"]}, aba=0) == [{"exame": "E1", "_linha": 2}]
+    assert ler_registros(str(caminho), {"total": ["total"]}) == [{"total": 1, "_linha": 2}]
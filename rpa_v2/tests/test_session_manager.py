@@ -0,0 +1,36 @@
+import os
+import stat
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("selenium")
+
+from src.core import session_manager
+
+
+class DriverFalso:
+    def get_cookies(self):
+        return [{"name": "JSESSIONID", "value": "abc"}]
+
+
+def test_caminho_resolvido_no_uso(monkeypatch, tmp_path):
+    monkeypatch.delenv("RPA_SESSION_FILE", raising=False)
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path))
+    monkeypatch.setenv("LOCALAPPDATA", str(tmp_path))
+    gerenciador = session_manager.PathowebSessionManager()
+    monkeypatch.chdir(tmp_path)
+    assert gerenciador.session_file == os.path.join(str(tmp_path), "SistemaRPA", "pathoweb_session.json")
+
+    monkeypatch.setenv("RPA_SESSION_FILE", str(tmp_path / "outro.json"))
+    assert session_manager.PathowebSessionManager().session_file == str(tmp_path / "outro.json")
+
+
+@pytest.mark.skipif(os.name == "nt", reason="permissões POSIX")
+def test_arquivo_gravado_so_para_o_usuario(tmp_path):
+    arquivo = tmp_path / "dados" / "pathoweb_session.json"
+    gerenciador = session_manager.PathowebSessionManager(session_file=str(arquivo))
+    gerenciador.salvar(DriverFalso(), "usuario")
+
+    assert stat.S_IMODE(os.stat(arquivo).st_mode) == 0o600
+    assert gerenciador.carregar("USUARIO")["cookies"][0]["value"] == "abc"
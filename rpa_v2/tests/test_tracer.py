@@ -0,0 +1,51 @@
+from src.core import tracer
+from src.core.tracer import Rastreador, carregar_spans, percentil, relatorio, resumir
+
+
+def test_percentil_pelo_posto_mais_proximo():
+    valores = list(range(1, 21))
+
+    assert percentil(valores, 50) == 10
+    assert percentil(valores, 95) == 19
+    assert percentil(valores, 100) == 20
+    assert percentil([3.5], 95) == 3.5
+    assert percentil([], 50) == 0.0
+
+
+def test_resumir_por_nome():
+    spans = [{"nome": "login", "duracao": d, "ok": True} for d in (2.0, 1.0, 3.0)]
+    spans.append({"nome": "processar_guia", "duracao": 5.0, "ok": False})
+
+    resumo = resumir(spans)
+
+    assert resumo["login"] == {"total": 3, "falhas": 0, "p50": 2.0, "p95": 3.0, "max": 3.0, "soma": 6.0}
+    assert resumo["processar_guia"]["falhas"] == 1
+
+
+def test_spans_gravados_e_relatorio(tmp_path, monkeypatch):
+    rastreador = Rastreador(pasta=str(tmp_path), ativo=True)
+    caminho = rastreador.iniciar("Lançamento Guia")
+    with rastreador.etapa("login"):
+        pass
+    for guia in ("111", "222"):
+        try:
+            with rastreador.item(guia, nome="processar_guia"):
+                if guia == "222":
+                    raise ValueError("guia negada")
+        except ValueError:
+            pass
+    rastreador.finalizar()
+
+    spans = carregar_spans(caminho)
+    assert [(s["nome"], s["item"], s["ok"]) for s in spans] == [
+        ("login", None, True), ("processar_guia", "111", True), ("processar_guia", "222", False)]
+    assert spans[2]["erro"] == "ValueError: guia negada"
+
+    texto = relatorio(caminho)
+    assert "p95" in texto
+    assert "processar_guia           222  [falha]" in texto
+
+    registradas = []
+    monkeypatch.setattr(tracer, "log_message", lambda mensagem, nivel="INFO": registradas.append(mensagem))
+    tracer.log_resumo(caminho)
+    assert any(m.startswith("📈 processar_guia: 2x") for m in registradas)
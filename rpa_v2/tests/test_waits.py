@@ -0,0 +1,25 @@
+import threading
+
+import pytest
+
+pytest.importorskip("selenium")
+
+from src.core.waits import ExecucaoCancelada, dormir, esperar_cancelamento
+
+
+def test_dormir_cancelado_nao_e_engolido_por_except_exception():
+    cancel_flag = threading.Event()
+    cancel_flag.set()
+
+    with pytest.raises(ExecucaoCancelada):
+        try:
+            dormir(5, cancel_flag)
+        except Exception:
+            pytest.fail("ExecucaoCancelada capturada como Exception")
+
+
+def test_esperar_cancelamento_devolve_em_vez_de_lancar():
+    cancel_flag = threading.Event()
+    assert esperar_cancelamento(0.01, cancel_flag) is False
+    cancel_flag.set()
+    assert esperar_cancelamento(5, cancel_flag) is True